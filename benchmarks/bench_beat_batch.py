@@ -0,0 +1,93 @@
+"""
+Generating jittered beat variants in bulk: per beat cost of editing the
+HeartBeatModel point by point (what a script had to do before), of one
+scipy PchipInterpolator per beat, and of render_beats() on the whole
+(beats, points) matrix, in process and over a process pool. Then writes
+the batch as a float32 dataset and reads it back.
+
+Run from the repository root:
+    python -m benchmarks.bench_beat_batch [--beats N] [--workers N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from PySide6.QtCore import QCoreApplication
+from scipy.interpolate import PchipInterpolator
+
+from model.beat_batch import BeatJitter, jitter_reference_points, load_beat_dataset, render_beats, write_beat_dataset
+from model.heart_beat_model import HeartBeatModel
+
+BEAT_LENGTHS = (1_000, 10_000)
+MODEL_BEATS = 100                   # the model path is slow, time only a few
+
+
+def model_loop_us(model: HeartBeatModel, times: np.ndarray, pressures: np.ndarray, num_samples: int) -> float:
+    """Per beat: move every reference point of the model, then take its beat."""
+    model.set_num_of_samples_per_heart_beat(num_samples)
+    keys = model.get_reference_point_keys()
+    features = model._waveform_reference_points['abp_waveform_features']
+    order = np.argsort([features[key]['time_s'] for key in keys], kind='stable')
+    start = time.perf_counter()
+    for x, y in zip(times[:MODEL_BEATS], pressures[:MODEL_BEATS]):
+        for j, key in zip(order, keys):
+            model.update_reference_point(key, float(x[j]), float(y[j]))
+        model.get_waveform_points()
+    return (time.perf_counter() - start) / MODEL_BEATS * 1e6
+
+
+def scipy_loop_us(times: np.ndarray, pressures: np.ndarray, num_samples: int) -> float:
+    phase = np.arange(num_samples) / num_samples
+    count = min(len(times), 1000)
+    start = time.perf_counter()
+    for x, y in zip(times[:count], pressures[:count]):
+        PchipInterpolator(x, y)(phase)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--beats", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    QCoreApplication.instance() or QCoreApplication([])
+    model = HeartBeatModel()
+    base_times, base_pressures = model.get_waveform_knots('abp')
+    times, pressures = jitter_reference_points(
+        base_times, base_pressures, args.beats,
+        BeatJitter(time_sd=0.01, pressure_sd_mmHg=3.0, amplitude=(0.7, 1.3), offset_mmHg=(-10.0, 10.0)), seed=1)
+
+    print(f"{args.beats} beats, {times.shape[1]} reference points, {args.workers} worker(s); us per beat:")
+    print(f"{'samples':>8} {'model':>9} {'scipy':>9} {'batch':>9} {'pool':>9} {'batch MS/s':>11}")
+    for num_samples in BEAT_LENGTHS:
+        model_us = model_loop_us(model, times, pressures, num_samples)
+        scipy_us = scipy_loop_us(times, pressures, num_samples)
+        start = time.perf_counter()
+        beats = render_beats(times, pressures, num_samples)
+        batch_us = (time.perf_counter() - start) / args.beats * 1e6
+        start = time.perf_counter()
+        pooled = render_beats(times, pressures, num_samples, workers=args.workers)
+        pool_us = (time.perf_counter() - start) / args.beats * 1e6
+        assert np.array_equal(beats, pooled)
+        print(f"{num_samples:>8} {model_us:>9.1f} {scipy_us:>9.1f} {batch_us:>9.2f} {pool_us:>9.2f} "
+              f"{num_samples / batch_us:>11.1f}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "beats")
+        written = write_beat_dataset(path, times, pressures, BEAT_LENGTHS[0], workers=args.workers,
+                                     metadata={'seed': 1})
+        start = time.perf_counter()
+        dataset = load_beat_dataset(path)
+        checksum = float(np.sum(dataset.beats, dtype=np.float64))
+        read_s = time.perf_counter() - start
+        print(f"\ndataset: {written['bytes'] / 1e6:.1f} MB written in {written['seconds']:.2f} s "
+              f"({'pool' if written['parallel'] else 'in process'}), read back in {read_s:.2f} s "
+              f"(checksum {checksum:.6g})")
+        del dataset
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Throughput of the beat sequence synthesizer: beats and samples per second
+rendering the HeartBeatModel beat from a BPM schedule at typical output
+rates and chunk sizes (the 25 ms DAQ top-up and 1 s), with a constant rate
+and with a ramp plus beat-to-beat variability and systolic warping. Then
+streams a whole --hours profile at 1 kHz and reports its peak memory.
+
+Run from the repository root:
+    python -m benchmarks.bench_beat_sequence [--seconds S] [--hours H]
+"""
+import argparse
+import time
+import tracemalloc
+
+from model.beat_sequence import (
+    BeatSequence,
+    BeatVariability,
+    ConstantBpm,
+    RampBpm,
+    ScheduleSequence,
+    SinusoidalBpm,
+)
+from model.heart_beat_model import HeartBeatModel
+
+SAMPLE_RATES_HZ = (1_000, 10_000, 50_000)
+CHUNKS_S = (0.025, 1.0)
+
+
+def _schedules(seconds: float) -> dict:
+    return {
+        "constant 75 BPM": (ConstantBpm(75, seconds), {}),
+        "ramp + HRV + warp": (ScheduleSequence([RampBpm(60, 150, seconds / 2), RampBpm(150, 60, seconds / 2)]),
+                              dict(variability=BeatVariability(), seed=0, systole_fraction=0.35)),
+    }
+
+
+def run(heart_beat: HeartBeatModel, schedule, kwargs: dict, rate_hz: float, chunk_s: float) -> dict:
+    sequence = BeatSequence.from_heart_beat_model(heart_beat, schedule, rate_hz, **kwargs)
+    chunk = max(1, int(round(chunk_s * rate_hz)))
+    start = time.perf_counter()
+    samples = sum(len(block) for block in sequence.chunks(chunk))
+    seconds = time.perf_counter() - start
+    return {'beats_per_s': sequence.beats_rendered / seconds, 'msamples_per_s': samples / seconds / 1e6,
+            'realtime': schedule.duration_s / seconds}
+
+
+def profile(heart_beat: HeartBeatModel, hours: float) -> dict:
+    """A day/night heart rate swing with HRV, streamed in 1 s chunks at 1 kHz without keeping it."""
+    schedule = SinusoidalBpm(70, 15, period_s=86_400.0, seconds=hours * 3600.0)
+    sequence = BeatSequence.from_heart_beat_model(heart_beat, schedule, 1_000, variability=BeatVariability(),
+                                                  seed=0, systole_fraction=0.35)
+    tracemalloc.start()
+    start = time.perf_counter()
+    samples = sum(len(block) for block in sequence.chunks(1_000))
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'samples': samples, 'beats': sequence.beats_rendered, 'seconds': seconds, 'peak_mb': peak / 1e6,
+            'materialized_mb': samples * 8 / 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=120.0, help="schedule length per case")
+    parser.add_argument("--hours", type=float, default=24.0, help="length of the streamed profile")
+    args = parser.parse_args()
+
+    heart_beat = HeartBeatModel()
+    print(f"{'schedule':<20} {'rate Hz':>8} {'chunk':>6} {'beats/s':>10} {'MS/s':>7} {'x realtime':>11}")
+    for name, (schedule, kwargs) in _schedules(args.seconds).items():
+        for rate in SAMPLE_RATES_HZ:
+            for chunk_s in CHUNKS_S:
+                s = run(heart_beat, schedule, kwargs, rate, chunk_s)
+                print(f"{name:<20} {rate:>8} {chunk_s * 1e3:>4.0f}ms {s['beats_per_s']:>10,.0f} "
+                      f"{s['msamples_per_s']:>7.1f} {s['realtime']:>11,.0f}")
+
+    p = profile(heart_beat, args.hours)
+    print(f"\n{args.hours:g} h profile at 1 kHz in 1 s chunks: {p['beats']:,} beats, {p['samples']:,} samples "
+          f"in {p['seconds']:.1f} s; peak memory {p['peak_mb']:.2f} MB "
+          f"(materialized: {p['materialized_mb']:,.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Throughput of pressure → DAC volts conversion: the old per-sample list
+comprehension over mm_hg_to_volts against Calibration.convert (new buffer and
+in place, float64 and float32, linear and cubic tables).
+
+Run from the repository root:
+    python -m benchmarks.bench_calibration [--sizes N [N ...]] [--repeat R]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from model.calibration import Calibration, ChannelCalibration
+from model.transducer_model import BRIDGE_GAIN_V_PER_MM_HG, mm_hg_to_volts
+
+# The list comprehension is ~1 µs/sample; cap it so large sizes finish
+LEGACY_MAX_SAMPLES = 1_000_000
+
+
+def _best_of(repeat: int, fn) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    linear = Calibration.bridge_default()
+    cubic = Calibration({"ao0": ChannelCalibration((0.0, BRIDGE_GAIN_V_PER_MM_HG, 1e-7, -1e-10))})
+    rng = np.random.default_rng(0)
+
+    print(f"{'samples':>10} {'method':<28} {'ms':>10} {'Msamples/s':>11}")
+    for n in args.sizes:
+        pressure = rng.uniform(0.0, 300.0, n)
+        pressure32 = pressure.astype(np.float32)
+        work64 = pressure.copy()
+        work32 = pressure32.copy()
+        cases = [
+            ("list comprehension (old)",
+             lambda: np.array([mm_hg_to_volts(p) for p in pressure]), n <= LEGACY_MAX_SAMPLES),
+            ("linear f64, new buffer", lambda: linear.convert("ao0", pressure), True),
+            ("linear f64, in place", lambda: linear.convert("ao0", work64, out=work64), True),
+            ("linear f32, in place", lambda: linear.convert("ao0", work32, out=work32), True),
+            ("cubic f64, new buffer", lambda: cubic.convert("ao0", pressure), True),
+        ]
+        for name, fn, enabled in cases:
+            if not enabled:
+                print(f"{n:>10} {name:<28} {'skipped':>10}")
+                continue
+            # Re-seed the in-place buffers so every repeat converts pressures, not volts
+            work64[:] = pressure
+            work32[:] = pressure32
+            seconds = _best_of(args.repeat if n < LEGACY_MAX_SAMPLES else 1, fn)
+            print(f"{n:>10} {name:<28} {seconds * 1e3:>10.3f} {n / seconds / 1e6:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
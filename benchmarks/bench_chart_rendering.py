@@ -0,0 +1,104 @@
+"""
+Chart rendering benchmark: a full-resolution QLineSeries vs. the min/max
+level-of-detail path of InteractiveChartView (direct and pyramid-backed),
+at full view and while zooming.
+
+Run from the repository root (no display needed):
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_chart_rendering [file] [--tile N]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PySide6.QtCharts import QChart, QLineSeries, QValueAxis
+from PySide6.QtCore import QPointF, Qt
+from PySide6.QtWidgets import QApplication
+
+from model.minmax_pyramid import MinMaxPyramid
+from model.waveform_file_loader import load_waveform_file
+from view.interactive_chart_view import InteractiveChartView
+
+DEFAULT_FILE = (Path(__file__).resolve().parent.parent / "model" / "waveform_db"
+                / "BioSiPressureRawFile" / "INTERSS LONDRA 35A0 30-100SEC.txt")
+VIEW_SIZE = (1200, 500)
+
+
+def _build_view(x: np.ndarray, y: np.ndarray, mode: str):
+    chart = QChart()
+    series = QLineSeries()
+    chart.addSeries(series)
+    axis_x, axis_y = QValueAxis(), QValueAxis()
+    chart.addAxis(axis_x, Qt.AlignBottom)
+    chart.addAxis(axis_y, Qt.AlignLeft)
+    series.attachAxis(axis_x)
+    series.attachAxis(axis_y)
+    axis_x.setRange(float(x[0]), float(x[-1]))
+    axis_y.setRange(float(y.min()) - 5, float(y.max()) + 5)
+
+    view = InteractiveChartView(chart)
+    view.resize(*VIEW_SIZE)
+    view.show()
+    start = time.perf_counter()
+    if mode == "pyramid":
+        view.set_decimated_series(series, x, y, MinMaxPyramid(y))
+    elif mode == "decimated":
+        view.set_decimated_series(series, x, y)
+    else:
+        series.replace([QPointF(t, p) for t, p in zip(x, y)])
+    populate_s = time.perf_counter() - start
+    return view, series, populate_s
+
+
+def _render_ms(view, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        view.grab()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def _zoom_pan_ms(view, steps: int) -> float:
+    """Average cost of one zoom step + repaint, going through the view's own LOD refresh."""
+    start = time.perf_counter()
+    for _ in range(steps):
+        view.chart().zoom(1.15)
+        view._refresh_lod()
+        view.grab()
+    for _ in range(steps):
+        view.chart().scroll(-20, 0)
+        view._refresh_lod()
+        view.grab()
+    return (time.perf_counter() - start) / (2 * steps) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("file", nargs="?", type=Path, default=DEFAULT_FILE)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--tile", type=int, default=1,
+                        help="repeat the recording N times to emulate longer sessions")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    y = np.tile(load_waveform_file(args.file), args.tile)
+    x = np.arange(len(y), dtype=np.float64)
+    print(f"{args.file.name}: {len(y)} samples, view {VIEW_SIZE[0]}x{VIEW_SIZE[1]} px")
+    print(f"{'mode':<12} {'points':>8} {'populate ms':>12} {'render ms':>10} {'zoom/pan ms':>12}")
+
+    modes = ("decimated", "pyramid") if len(y) > 200_000 else ("full", "decimated", "pyramid")
+    for label in modes:
+        view, series, populate_s = _build_view(x, y, label)
+        app.processEvents()
+        points = series.count()
+        render = _render_ms(view, args.repeat)
+        zoom_pan = _zoom_pan_ms(view, args.steps)
+        print(f"{label:<12} {points:>8} {populate_s * 1e3:>12.1f} {render:>10.1f} {zoom_pan:>12.1f}")
+        view.close()
+
+
+if __name__ == "__main__":
+    main()
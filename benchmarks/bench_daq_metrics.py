@@ -0,0 +1,78 @@
+"""
+Cost and timing accuracy of the DAQ health metrics: streams the heart beat
+on the simulated NI-6216 while DaqMetrics samples Ni6216DaqMx.health_snapshot()
+at several rates, and reports snapshot cost, sampler lateness, skipped ticks
+and whether streaming kept its headroom.
+
+Run from the repository root (no hardware or NI driver needed):
+    python -m benchmarks.bench_daq_metrics [--seconds S] [--rate-hz R]
+"""
+import argparse
+import time
+
+import numpy as np
+from PySide6.QtCore import QCoreApplication
+
+from model.abp_waveform_file_model import AbpWaveformFileModel
+from model.heart_beat_model import HeartBeatModel
+from model.ni6216daqmx_model import Ni6216DaqMx
+from model.simulated_daq_backend import SimulatedDaqBackend
+
+METRICS_INTERVALS_S = (0.1, 0.02, 0.005)
+
+
+def _spin(app, seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        app.processEvents()
+        time.sleep(0.002)
+
+
+def run(app, interval_s: float, rate_hz: float, seconds: float) -> dict:
+    daq = Ni6216DaqMx(HeartBeatModel(), AbpWaveformFileModel(), backend=SimulatedDaqBackend())
+    # Swap in a sampler at the rate under test
+    daq._metrics.stop()
+    daq._metrics = type(daq._metrics)(daq.health_snapshot, interval_s, daq.METRICS_HISTORY_S,
+                                      on_sample=daq.metrics_updated.emit)
+    received = []
+    daq.metrics_updated.connect(lambda row: received.append(time.perf_counter()))
+    daq.set_sample_rate_hz(rate_hz)
+    _spin(app, 0.1)
+    daq._metrics.start()
+    daq.start_generation()
+    _spin(app, seconds)
+    history = daq.metrics_history()
+    stream = daq.stream_stats()
+    daq.stop()
+
+    times = np.array([row['t_s'] for row in history])
+    intervals = np.diff(times)
+    stats = daq.metrics_stats()
+    stats.update(
+        interval_avg_ms=intervals.mean() * 1e3 if intervals.size else 0.0,
+        interval_max_ms=intervals.max() * 1e3 if intervals.size else 0.0,
+        delivered=len(received),
+        min_headroom_ms=stream['min_headroom_s'] * 1e3,
+        underflows=stream['underflows'],
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rate-hz", type=float, default=50_000)
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    print(f"{'interval ms':>11} {'samples':>7} {'skipped':>7} {'avg ms':>7} {'max ms':>7} "
+          f"{'late max':>8} {'snap ms':>7} {'to GUI':>6} {'headroom':>8} {'underflows':>10}")
+    for interval_s in METRICS_INTERVALS_S:
+        s = run(app, interval_s, args.rate_hz, args.seconds)
+        print(f"{interval_s * 1e3:>11.0f} {s['samples']:>7} {s['skipped']:>7} {s['interval_avg_ms']:>7.2f} "
+              f"{s['interval_max_ms']:>7.2f} {s['late_max_ms']:>8.2f} {s['snapshot_avg_ms']:>7.3f} "
+              f"{s['delivered']:>6} {s['min_headroom_ms']:>8.0f} {s['underflows']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Scaling of multi-device output: N simulated NI-6216s in a DaqDevicePool
+stream the heart beat at --rate-hz while reference points are edited.
+Reports how long start_all() holds the caller, the slowest unit's start to
+first sample, each edit's cost on the GUI thread (every unit re-syncs its
+waveform), and the worst headroom and underflows over all units.
+
+Run from the repository root (no hardware or NI driver needed):
+    python -m benchmarks.bench_daq_pool [--seconds S] [--rate-hz R]
+"""
+import argparse
+import concurrent.futures
+import time
+
+import numpy as np
+from PySide6.QtCore import QCoreApplication
+
+from model.abp_waveform_file_model import AbpWaveformFileModel
+from model.daq_device_pool import DaqDevicePool
+from model.heart_beat_model import HeartBeatModel
+from model.simulated_daq_backend import SimulatedDaqBackend
+
+DEVICE_COUNTS = (1, 2, 4, 8)
+
+
+def _spin(app, seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        app.processEvents()
+        time.sleep(0.002)
+
+
+def run(app, num_devices: int, rate_hz: float, seconds: float, edits_per_s: float = 2.0) -> dict:
+    heart_beat = HeartBeatModel()
+    pool = DaqDevicePool(heart_beat, AbpWaveformFileModel(),
+                         backend=SimulatedDaqBackend.with_devices(num_devices))
+    pool.set_sample_rate_hz(rate_hz)
+    _spin(app, 0.2)
+
+    start = time.perf_counter()
+    futures = pool.start_all()
+    start_call_s = time.perf_counter() - start
+    concurrent.futures.wait(futures)
+
+    rng = np.random.default_rng(0)
+    keys = heart_beat.get_reference_point_keys()
+    features = heart_beat._waveform_reference_points['abp_waveform_features']
+    edit_s = []
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        key = keys[rng.integers(1, len(keys) - 1)]
+        edit_start = time.perf_counter()
+        heart_beat.update_reference_point(key, features[key]['time_s'],
+                                          features[key]['pressure_mmHg'] + rng.normal(0.0, 3.0))
+        edit_s.append(time.perf_counter() - edit_start)
+        _spin(app, 1.0 / edits_per_s)
+
+    streams = [device.stream_stats() for device in pool.devices]
+    first_sample_s = [device.task_stats().get('waveform', {}).get('max_s', float('nan'))
+                      for device in pool.devices]
+    written = sum(stream['written'] for stream in streams)
+    concurrent.futures.wait(pool.stop_all())
+    pool.stop()
+    return {
+        'devices': num_devices,
+        'start_call_ms': start_call_s * 1e3,
+        'first_sample_max_ms': max(first_sample_s) * 1e3,
+        'edit_avg_ms': float(np.mean(edit_s)) * 1e3,
+        'edit_max_ms': max(edit_s) * 1e3,
+        'min_headroom_ms': min(stream['min_headroom_s'] for stream in streams) * 1e3,
+        'underflows': sum(stream['underflows'] for stream in streams),
+        'write_rate_sps': written / seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rate-hz", type=float, default=50_000)
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    print(f"{'devices':>7} {'start ms':>8} {'1st smp ms':>10} {'edit ms':>8} {'edit max':>8} "
+          f"{'headroom':>8} {'underflows':>10} {'total S/s':>12}")
+    for num_devices in DEVICE_COUNTS:
+        s = run(app, num_devices, args.rate_hz, args.seconds)
+        print(f"{s['devices']:>7} {s['start_call_ms']:>8.2f} {s['first_sample_max_ms']:>10.1f} "
+              f"{s['edit_avg_ms']:>8.2f} {s['edit_max_ms']:>8.2f} {s['min_headroom_ms']:>8.0f} "
+              f"{s['underflows']:>10} {s['write_rate_sps']:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
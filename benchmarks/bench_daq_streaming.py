@@ -0,0 +1,86 @@
+"""
+Load test of the streaming output path on the simulated NI-6216: streams the
+heart beat through Ni6216DaqMx at several sample rates while reference points
+are edited at a fixed rate, then checks the captured output sample by sample
+(every beat is a whole old or a whole new beat, nothing torn) and reports
+switch latency, buffer headroom and underflows.
+
+Run from the repository root (no hardware or NI driver needed):
+    python -m benchmarks.bench_daq_streaming [--seconds S] [--edits-per-s E]
+"""
+import argparse
+import time
+
+import numpy as np
+from PySide6.QtCore import QCoreApplication
+
+from model.abp_waveform_file_model import AbpWaveformFileModel
+from model.heart_beat_model import HeartBeatModel
+from model.ni6216daqmx_model import Ni6216DaqMx
+from model.simulated_daq_backend import SimulatedDaqBackend
+
+SAMPLE_RATES_HZ = (1_000, 10_000, 50_000)
+
+
+def _spin(app, seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        app.processEvents()
+        time.sleep(0.002)
+
+
+def _torn_beats(captured: np.ndarray, beat_length: int, beats_seen: set[bytes]) -> int:
+    """Beats in the capture that match none of the beats that were ever queued."""
+    whole = captured[:captured.size // beat_length * beat_length].reshape(-1, beat_length)
+    return sum(row.tobytes() not in beats_seen for row in whole)
+
+
+def run(app, rate_hz: int, seconds: float, edits_per_s: float, seed: int) -> dict:
+    backend = SimulatedDaqBackend()
+    heart_beat = HeartBeatModel()
+    heart_beat.set_num_of_samples_per_heart_beat(rate_hz)      # one beat per second
+    daq = Ni6216DaqMx(heart_beat, AbpWaveformFileModel(), backend=backend)
+    daq.set_sample_rate_hz(rate_hz)
+    beats_seen = {daq._stacked_waveforms()[0].tobytes()}
+
+    _spin(app, 0.1)
+    daq.start_generation()
+    rng = np.random.default_rng(seed)
+    keys = heart_beat.get_reference_point_keys()
+    features = heart_beat._waveform_reference_points['abp_waveform_features']
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        key = keys[rng.integers(1, len(keys) - 1)]
+        heart_beat.update_reference_point(key, features[key]['time_s'],
+                                          features[key]['pressure_mmHg'] + rng.normal(0.0, 3.0))
+        beats_seen.add(daq._stacked_waveforms()[0].tobytes())
+        _spin(app, 1.0 / edits_per_s)
+    _spin(app, 1.5)
+
+    stats = daq.stream_stats()
+    captured = backend.last_task.captured_output()[0]
+    daq.stop()
+    stats['torn_beats'] = _torn_beats(captured, rate_hz, beats_seen)
+    stats['captured'] = captured.size
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--edits-per-s", type=float, default=4.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    print(f"{'rate Hz':>8} {'captured':>9} {'switches':>8} {'lat avg ms':>10} {'lat max ms':>10} "
+          f"{'headroom ms':>11} {'underflows':>10} {'torn':>5}")
+    for rate in SAMPLE_RATES_HZ:
+        s = run(app, rate, args.seconds, args.edits_per_s, args.seed)
+        print(f"{rate:>8} {s['captured']:>9} {s['switches']:>8} "
+              f"{s.get('latency_avg_s', 0.0) * 1e3:>10.0f} {s['latency_max_s'] * 1e3:>10.0f} "
+              f"{s['min_headroom_s'] * 1e3:>11.0f} {s['underflows']:>10} {s['torn_beats']:>5}")
+
+
+if __name__ == "__main__":
+    main()
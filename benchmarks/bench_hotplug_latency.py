@@ -0,0 +1,74 @@
+"""
+Hot-plug reaction time of Ni6216DaqMx on the simulated NI-6216: the device is
+unplugged and replugged repeatedly (mid-generation) and the time from the
+event to the model reporting the new connection/generation state is measured,
+for event-driven notifications and for the 1 s polling fallback.
+
+Run from the repository root (no hardware or NI driver needed):
+    python -m benchmarks.bench_hotplug_latency [--cycles N]
+"""
+import argparse
+import time
+
+import numpy as np
+from PySide6.QtCore import QCoreApplication
+
+from model.abp_waveform_file_model import AbpWaveformFileModel
+from model.heart_beat_model import HeartBeatModel
+from model.ni6216daqmx_model import Ni6216DaqMx
+from model.simulated_daq_backend import SimulatedDaqBackend
+from model.usb_hotplug import PollingHotplugMonitor
+
+POLL_INTERVAL_S = 1.0
+
+
+def _wait_for(condition, since: float, timeout_s: float = 5.0) -> float:
+    """Seconds from `since` until `condition()` holds (busy-waits for sub-ms resolution)."""
+    while not condition():
+        if time.perf_counter() - since > timeout_s:
+            raise TimeoutError("State change not observed")
+        time.sleep(0.0002)
+    return time.perf_counter() - since
+
+
+def run(app, polling: bool, cycles: int) -> dict:
+    backend = SimulatedDaqBackend()
+    monitor = PollingHotplugMonitor(backend.find_device, POLL_INTERVAL_S) if polling else None
+    daq = Ni6216DaqMx(HeartBeatModel(), AbpWaveformFileModel(), backend=backend,
+                      hotplug_monitor=monitor)
+    _wait_for(lambda: daq.is_connected, time.perf_counter())
+    connect, disconnect, stop_output = [], [], []
+    for _ in range(cycles):
+        app.processEvents()
+        daq.start_generation()
+        time.sleep(0.2)
+        unplugged_at = time.perf_counter()
+        backend.device.unplug()
+        stop_output.append(_wait_for(lambda: not daq.is_generating, unplugged_at))
+        disconnect.append(_wait_for(lambda: not daq.is_connected, unplugged_at))
+        plugged_at = time.perf_counter()
+        backend.device.plug()
+        connect.append(_wait_for(lambda: daq.is_connected, plugged_at))
+    daq.stop()
+    ms = lambda values: (np.mean(values) * 1e3, np.max(values) * 1e3)
+    return {'monitor': daq.hotplug_stats()['monitor'], 'connect': ms(connect),
+            'disconnect': ms(disconnect), 'stop_output': ms(stop_output)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cycles", type=int, default=5)
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    print(f"{'monitor':<24} {'connect avg/max ms':>19} {'disconnect avg/max ms':>22} "
+          f"{'generation stopped avg/max ms':>30}")
+    for polling in (False, True):
+        r = run(app, polling, args.cycles)
+        print(f"{r['monitor']:<24} {r['connect'][0]:>9.2f}/{r['connect'][1]:<9.2f} "
+              f"{r['disconnect'][0]:>11.2f}/{r['disconnect'][1]:<10.2f} "
+              f"{r['stop_output'][0]:>15.2f}/{r['stop_output'][1]:<14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Soak test of loopback capture on the simulated NI-6216: streams the heart
+beat through Ni6216DaqMx with ai0/ai1 captured on the AO sample clock
+(ai1 is a monitor return delayed by --monitor-delay-ms), while reference
+points are edited. Reports capture completeness, input overflows, output
+fidelity, the measured monitor latency, and reader / disk cost.
+
+Run from the repository root (no hardware or NI driver needed):
+    python -m benchmarks.bench_loopback_capture [--seconds S] [--noise-mv N]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PySide6.QtCore import QCoreApplication
+
+from model.abp_waveform_file_model import AbpWaveformFileModel
+from model.heart_beat_model import HeartBeatModel
+from model.loopback_capture import load_capture
+from model.ni6216daqmx_model import Ni6216DaqMx
+from model.simulated_daq_backend import SimulatedDaqBackend, SimulatedDaqDevice
+
+SAMPLE_RATES_HZ = (1_000, 10_000, 50_000)
+
+
+def _spin(app, seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        app.processEvents()
+        time.sleep(0.002)
+
+
+def run(app, rate_hz: int, seconds: float, noise_v: float, monitor_delay_s: float,
+        capture_dir: Path, edits_per_s: float = 1.0) -> dict:
+    device = SimulatedDaqDevice(ai_noise_v=noise_v, loopback={0: (0, 0.0), 1: (0, monitor_delay_s)})
+    backend = SimulatedDaqBackend(device)
+    heart_beat = HeartBeatModel()
+    daq = Ni6216DaqMx(heart_beat, AbpWaveformFileModel(), backend=backend)
+    daq.set_sample_rate_hz(rate_hz)
+    daq.CAPTURE_DIR = capture_dir
+    daq.set_loopback_capture(True)
+    live_views = []
+    daq.capture_view.connect(lambda times, values: live_views.append(values.shape[1]))
+
+    _spin(app, 0.1)
+    daq.start_generation()
+    rng = np.random.default_rng(0)
+    keys = heart_beat.get_reference_point_keys()
+    features = heart_beat._waveform_reference_points['abp_waveform_features']
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        key = keys[rng.integers(1, len(keys) - 1)]
+        heart_beat.update_reference_point(key, features[key]['time_s'],
+                                          features[key]['pressure_mmHg'] + rng.normal(0.0, 3.0))
+        _spin(app, 1.0 / edits_per_s)
+    daq.stop_generation()
+    _spin(app, 0.1)
+
+    stats = daq.capture_stats()
+    generated = backend.last_task.captured_output().shape[1]
+    daq.stop()
+    data, meta = load_capture(stats['path'])
+    stats.update(generated=generated, on_disk=data.shape[0], live_views=len(live_views),
+                 live_points=max(live_views, default=0))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--noise-mv", type=float, default=1.0, help="AI noise, mV rms")
+    parser.add_argument("--monitor-delay-ms", type=float, default=12.0)
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    print(f"{'rate Hz':>8} {'generated':>10} {'captured':>10} {'on disk':>10} {'overflow':>8} "
+          f"{'rms mV':>7} {'max mV':>7} {'lat ms':>7} {'read ms':>8} {'disk ms':>8} {'views':>6}")
+    with tempfile.TemporaryDirectory() as directory:
+        for rate in SAMPLE_RATES_HZ:
+            s = run(app, rate, args.seconds, args.noise_mv * 1e-3, args.monitor_delay_ms * 1e-3,
+                    Path(directory))
+            print(f"{rate:>8} {s['generated']:>10} {s['samples']:>10} {s['on_disk']:>10} "
+                  f"{s['overflows']:>8} {s.get('fidelity_rms_v', float('nan')) * 1e3:>7.2f} "
+                  f"{s.get('fidelity_max_v', float('nan')) * 1e3:>7.2f} "
+                  f"{s.get('latency_avg_s', float('nan')) * 1e3:>7.2f} "
+                  f"{s['read_avg_ms']:>8.2f} {s['disk_write_avg_ms']:>8.2f} {s['live_views']:>6}")
+
+
+if __name__ == "__main__":
+    main()
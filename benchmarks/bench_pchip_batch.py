@@ -0,0 +1,96 @@
+"""
+Multi-channel beat synthesis: K PCHIP templates rendered on one timebase
+with PchipBatch (one vectorized pass) against one scipy PchipInterpolator
+per template, at several beat lengths, with the largest difference between
+the two. Then the NI-6216 side: syncing both AO channels (ABP on ao0, CVP
+on ao1) after a rate change, and after an edit of one waveform, which only
+re-renders its own channel.
+
+Run from the repository root (no hardware or NI driver needed):
+    python -m benchmarks.bench_pchip_batch [--repeats N]
+"""
+import argparse
+import time
+
+import numpy as np
+from PySide6.QtCore import QCoreApplication
+from scipy.interpolate import PchipInterpolator
+
+from model.abp_waveform_file_model import AbpWaveformFileModel
+from model.calibration import Calibration
+from model.heart_beat_model import HeartBeatModel
+from model.ni6216daqmx_model import Ni6216DaqMx
+from model.pchip_batch import PchipBatch
+from model.simulated_daq_backend import SimulatedDaqBackend
+
+TEMPLATE_COUNTS = (2, 8, 32)
+BEAT_LENGTHS = (1_000, 50_000, 250_000)
+OUTPUT_RATES_HZ = (1_000, 50_000, 250_000)
+
+
+def _per_call_ms(action, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        action()
+    return (time.perf_counter() - start) / repeats * 1e3
+
+
+def _templates(heart_beat: HeartBeatModel, count: int, rng) -> list[tuple[np.ndarray, np.ndarray]]:
+    """The settings' waveforms with their pressures jittered, `count` of them."""
+    base = [heart_beat.get_waveform_knots(name) for name in heart_beat.get_waveform_names()]
+    return [(x, y + rng.normal(0.0, 2.0, len(y))) for x, y in (base[i % len(base)] for i in range(count))]
+
+
+def synthesis(heart_beat: HeartBeatModel, count: int, num_samples: int, repeats: int) -> dict:
+    knots = _templates(heart_beat, count, np.random.default_rng(count))
+    phase = np.arange(num_samples) / num_samples
+
+    def looped():
+        return np.vstack([PchipInterpolator(x, y)(phase) for x, y in knots])
+
+    def batched():
+        return PchipBatch([x for x, _ in knots], [y for _, y in knots])(phase)
+
+    return {
+        'scipy_ms': _per_call_ms(looped, repeats),
+        'batch_ms': _per_call_ms(batched, repeats),
+        'max_diff': float(np.abs(looped() - batched()).max()),
+    }
+
+
+def daq_sync(app, heart_beat: HeartBeatModel, rate_hz: float, repeats: int) -> dict:
+    daq = Ni6216DaqMx(heart_beat, AbpWaveformFileModel(), backend=SimulatedDaqBackend(),
+                      calibration=Calibration.bridge_default())
+    daq.set_sample_rate_hz(rate_hz)
+    stats = {
+        'both_ms': _per_call_ms(daq._sync_waveform, repeats),
+        'abp_ms': _per_call_ms(lambda: daq._sync_waveform(['abp']), repeats),
+        'cvp_ms': _per_call_ms(lambda: daq._sync_waveform(['cvp']), repeats),
+    }
+    daq.stop()
+    app.processEvents()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    heart_beat = HeartBeatModel()
+    print(f"{'templates':>9} {'samples':>8} {'scipy ms':>9} {'batch ms':>9} {'speedup':>8} {'max diff':>9}")
+    for count in TEMPLATE_COUNTS:
+        for num_samples in BEAT_LENGTHS:
+            s = synthesis(heart_beat, count, num_samples, args.repeats)
+            print(f"{count:>9} {num_samples:>8} {s['scipy_ms']:>9.3f} {s['batch_ms']:>9.3f} "
+                  f"{s['scipy_ms'] / s['batch_ms']:>7.1f}x {s['max_diff']:>9.1e}")
+
+    print(f"\n{'output S/s':>10} {'ao0+ao1 ms':>10} {'ABP edit ms':>11} {'CVP edit ms':>11}")
+    for rate_hz in OUTPUT_RATES_HZ:
+        s = daq_sync(app, heart_beat, rate_hz, args.repeats)
+        print(f"{rate_hz:>10} {s['both_ms']:>10.3f} {s['abp_ms']:>11.3f} {s['cvp_ms']:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Throughput of the polyphase resampler: one-shot resample() of a recording,
+StreamingResampler fed in DAQ-sized chunks, and resample_periodic() of one
+beat, for typical source → output rate pairs.
+
+Run from the repository root:
+    python -m benchmarks.bench_resampler [--seconds S] [--chunk N] [--repeat R]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from model.resampler import StreamingResampler, design_filter, rational_ratio, resample, resample_periodic
+
+RATE_PAIRS = [(25, 1_000), (125, 1_000), (1_000, 10_000), (1_000, 250_000), (44_100, 1_000), (360, 1_000)]
+
+
+def _best_of(repeat: int, fn) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _stream(resampler_args, signal: np.ndarray, chunk: int) -> int:
+    resampler = StreamingResampler(*resampler_args)
+    produced = 0
+    for i in range(0, signal.shape[1], chunk):
+        produced += resampler.process(signal[:, i:i + chunk]).shape[1]
+    return produced + resampler.flush().shape[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=60.0, help="recording length")
+    parser.add_argument("--chunk", type=int, default=256, help="streaming input chunk, samples")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'rate':>17} {'taps':>6} {'method':<22} {'ms':>9} {'Mout/s':>8} {'x realtime':>11}")
+    for src, dst in RATE_PAIRS:
+        up, down = rational_ratio(src, dst)
+        taps = len(design_filter(up, down))
+        signal = rng.standard_normal((1, int(src * args.seconds)))
+        num_out = -(-signal.shape[1] * up // down)
+        beat = signal[0, :max(2, int(src))]     # one second: a 60 BPM beat
+        beat_out = max(2, int(dst))
+        cases = [
+            ("one-shot", lambda: resample(signal, src, dst), num_out, args.seconds),
+            (f"streaming ({args.chunk})", lambda: _stream((up, down), signal, args.chunk), num_out,
+             args.seconds),
+            ("periodic beat", lambda: resample_periodic(beat, beat_out), beat_out, 1.0),
+        ]
+        for name, fn, outputs, duration_s in cases:
+            seconds = _best_of(args.repeat, fn)
+            print(f"{src:>7} → {dst:>7} {taps:>6} {name:<22} {seconds * 1e3:>9.2f} "
+                  f"{outputs / seconds / 1e6:>8.1f} {duration_s / seconds:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
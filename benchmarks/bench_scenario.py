@@ -0,0 +1,92 @@
+"""
+Throughput of the clinical scenario engine: renders every bundled scenario
+at several output rates and reports seconds of output per second of CPU,
+checks that the samples are bit-for-bit the same whatever the chunk size,
+then streams one through a read-ahead thread the way the DAQ writer reads
+it and counts stalls.
+
+Run from the repository root:
+    python -m benchmarks.bench_scenario [--rates 1000 50000] [--chunk-s 0.025]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from model.daq_stream_writer import PrefetchingSampleSource
+from model.scenario import (DEFAULT_SCENARIO_DIR, ScenarioRenderer, ScenarioSource, load_scenario,
+                            scenario_digest)
+
+# An ABP and a CVP beat (phase, mmHg), so the benchmark does not need the waveform editor
+TEMPLATES = {
+    'abp': (np.array([0.0, 0.05, 0.15, 0.2, 0.25, 0.38, 0.4, 0.45, 0.6, 0.8, 1.0]),
+            np.array([65.0, 68.0, 115.0, 120.0, 115.0, 80.0, 70.0, 75.0, 71.0, 67.0, 65.0])),
+    'cvp': (np.array([0.0, 0.08, 0.16, 0.22, 0.38, 0.52, 0.66, 1.0]),
+            np.array([6.0, 9.0, 7.0, 8.0, 4.0, 8.5, 4.5, 6.0])),
+}
+
+
+def throughput(scenario, rate_hz: float, chunk_samples: int) -> dict:
+    renderer = ScenarioRenderer(scenario, TEMPLATES, rate_hz)
+    start = time.perf_counter()
+    for _ in renderer.chunks(chunk_samples):
+        pass
+    seconds = time.perf_counter() - start
+    stats = renderer.stats()
+    return {'cpu_s': seconds, 'realtime': stats['seconds'] / seconds, **stats}
+
+
+def chunk_invariant(scenario, rate_hz: float) -> bool:
+    digests = {scenario_digest(ScenarioRenderer(scenario, TEMPLATES, rate_hz), chunk)
+               for chunk in (997, 4096, 65_536)}
+    return len(digests) == 1
+
+
+def prefetched(scenario, rate_hz: float, chunk_s: float, seconds: float) -> dict:
+    """Read `seconds` of output at real-time pace, one writer chunk at a time."""
+    renderer = ScenarioRenderer(scenario, TEMPLATES, rate_hz)
+    source = PrefetchingSampleSource(
+        ScenarioSource(renderer, [("ao0", "abp"), ("ao1", "cvp")], lambda channel, p: p),
+        block_samples=int(0.1 * rate_hz), ahead_samples=int(2.0 * rate_hz))
+    source.prime(5.0)
+    chunk = max(1, int(chunk_s * rate_hz))
+    worst = 0.0
+    deadline = time.perf_counter()
+    for _ in range(int(seconds / chunk_s)):
+        deadline += chunk_s
+        start = time.perf_counter()
+        source.read(chunk)
+        worst = max(worst, time.perf_counter() - start)
+        time.sleep(max(0.0, deadline - time.perf_counter()))
+    stats = source.stats()
+    source.close()
+    return {'read_max_ms': worst * 1e3, **stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rates", type=float, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--chunk-s", type=float, default=0.025, help="writer chunk (s)")
+    parser.add_argument("--stream-s", type=float, default=5.0, help="real-time prefetch run (s)")
+    args = parser.parse_args()
+
+    scenarios = [load_scenario(path) for path in sorted(DEFAULT_SCENARIO_DIR.glob("*.toml"))]
+    print(f"{'scenario':<24} {'rate':>7} {'output s':>9} {'cpu s':>7} {'x realtime':>10} {'beats':>6} "
+          f"{'ectopic':>7} {'chunk-invariant':>15}")
+    for scenario in scenarios:
+        for rate in args.rates:
+            s = throughput(scenario, rate, max(1, int(args.chunk_s * rate)))
+            invariant = chunk_invariant(scenario, rate) if rate == args.rates[0] else None
+            print(f"{scenario.name[:24]:<24} {rate:>7g} {s['seconds']:>9.1f} {s['cpu_s']:>7.2f} "
+                  f"{s['realtime']:>10.0f} {s['beats']:>6} {s['ectopic_beats']:>7} "
+                  f"{'' if invariant is None else str(invariant):>15}")
+
+    rate = args.rates[-1]
+    s = prefetched(scenarios[0], rate, args.chunk_s, args.stream_s)
+    print(f"\nprefetched at {rate:g} S/s for {args.stream_s:g} s: read max {s['read_max_ms']:.3f} ms, "
+          f"{s['stalls']} stalls, read-ahead min {s['min_ahead_samples'] / rate:.2f} s, "
+          f"block render {s['render_avg_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Start-to-first-sample latency of Ni6216DaqMx on the simulated NI-6216 when
+starting, restarting and switching between waveform and static pressure
+output, with the task manager reusing pre-configured tasks versus building a
+fresh task for every start (the old behaviour).
+
+The simulator charges the driver's task-creation and commit overhead given on
+the command line; the defaults are rough figures for a USB device, so measure
+them on hardware for real numbers.
+
+Run from the repository root (no hardware or NI driver needed):
+    python -m benchmarks.bench_task_switching [--cycles N] [--create-ms C] [--commit-ms M]
+"""
+import argparse
+import time
+
+import numpy as np
+from PySide6.QtCore import QCoreApplication
+
+from model.abp_waveform_file_model import AbpWaveformFileModel
+from model.heart_beat_model import HeartBeatModel
+from model.ni6216daqmx_model import Ni6216DaqMx
+from model.simulated_daq_backend import SimulatedDaqBackend, SimulatedDaqDevice
+
+
+def _wait_for(condition, timeout_s: float = 5.0):
+    deadline = time.perf_counter() + timeout_s
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("State change not observed")
+        time.sleep(0.001)
+
+
+def run(app, reuse: bool, cycles: int, create_s: float, commit_s: float) -> dict:
+    device = SimulatedDaqDevice(task_create_s=create_s, commit_s=commit_s)
+    daq = Ni6216DaqMx(HeartBeatModel(), AbpWaveformFileModel(), backend=SimulatedDaqBackend(device))
+    _wait_for(lambda: daq.is_connected)
+    time.sleep(0.1)                         # let the connect-time task preparation finish
+
+    def fresh_tasks():
+        if not reuse:
+            with daq._task_lock:
+                daq._task_manager.close()
+
+    latencies = {'start': [], 'waveform -> static': [], 'static -> waveform': [], 'restart': []}
+
+    def waveform_latency(starts_before: int) -> float:
+        _wait_for(lambda: daq.task_stats().get('waveform', {}).get('starts', 0) > starts_before)
+        return daq.task_stats()['waveform']['last_s']
+
+    for _ in range(cycles):
+        app.processEvents()
+        starts = daq.task_stats().get('waveform', {}).get('starts', 0)
+        fresh_tasks()
+        daq.start_generation()
+        latencies['start'].append(waveform_latency(starts))
+        time.sleep(0.1)
+
+        fresh_tasks()
+        daq.set_static_pressure(40)
+        latencies['waveform -> static'].append(daq.task_stats()['static']['last_s'])
+
+        starts = daq.task_stats()['waveform']['starts']
+        fresh_tasks()
+        daq.start_generation()
+        latencies['static -> waveform'].append(waveform_latency(starts))
+        time.sleep(0.1)
+
+        daq.stop_generation()
+        starts = daq.task_stats()['waveform']['starts']
+        fresh_tasks()
+        daq.start_generation()
+        latencies['restart'].append(waveform_latency(starts))
+        time.sleep(0.1)
+        daq.stop_generation()
+    daq.stop()
+    return {name: (np.mean(values) * 1e3, np.max(values) * 1e3) for name, values in latencies.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--create-ms", type=float, default=40.0,
+                        help="simulated driver cost of creating a task and adding its channels")
+    parser.add_argument("--commit-ms", type=float, default=15.0,
+                        help="simulated driver cost of committing a task to the hardware")
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    print(f"{'transition':<20} {'new task avg/max ms':>20} {'reused task avg/max ms':>23}")
+    cold = run(app, False, args.cycles, args.create_ms / 1e3, args.commit_ms / 1e3)
+    warm = run(app, True, args.cycles, args.create_ms / 1e3, args.commit_ms / 1e3)
+    for name in cold:
+        print(f"{name:<20} {cold[name][0]:>10.2f}/{cold[name][1]:<9.2f} "
+              f"{warm[name][0]:>11.2f}/{warm[name][1]:<11.2f}")
+
+
+if __name__ == "__main__":
+    main()
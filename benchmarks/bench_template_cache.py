@@ -0,0 +1,87 @@
+"""
+Cost of revisiting beat shapes with and without the beat template cache:
+Load Defaults, an edit followed by its undo, and flipping between a few
+stored shapes, at several beat lengths. Then renders the beat at one
+length per heart rate (as a rate sweep would) twice, and reports the
+cache's hit rate and memory.
+
+Run from the repository root:
+    python -m benchmarks.bench_template_cache [--repeats N]
+"""
+import argparse
+import time
+
+import numpy as np
+from PySide6.QtCore import QCoreApplication
+
+from model.beat_template_cache import BeatTemplateCache
+from model.heart_beat_model import HeartBeatModel
+
+BEAT_LENGTHS = (1_000, 50_000, 500_000)
+SHAPES = 4
+
+
+def _per_call_ms(action, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        action()
+    return (time.perf_counter() - start) / repeats * 1e3
+
+
+def run(num_samples: int, max_bytes: int, repeats: int) -> dict:
+    model = HeartBeatModel(BeatTemplateCache(max_bytes))
+    model.set_num_of_samples_per_heart_beat(num_samples)
+    keys = model.get_reference_point_keys()
+    features = model._waveform_reference_points['abp_waveform_features']
+    key = keys[len(keys) // 2]
+    time_pct, pressure = features[key]['time_s'], features[key]['pressure_mmHg']
+
+    def edit_and_undo():
+        model.update_reference_point(key, time_pct, pressure + 4.0)
+        model.update_reference_point(key, time_pct, pressure)
+
+    shapes = [pressure + 2.0 * i for i in range(SHAPES)]
+    position = iter(range(10 ** 9))
+
+    def flip_shape():
+        model.update_reference_point(key, time_pct, shapes[next(position) % SHAPES])
+
+    return {
+        'defaults_ms': _per_call_ms(model.load_default_settings, repeats),
+        'undo_ms': _per_call_ms(edit_and_undo, repeats) / 2,
+        'flip_ms': _per_call_ms(flip_shape, repeats),
+    }
+
+
+def rate_sweep(max_bytes: int, rate_hz: float = 50_000) -> dict:
+    model = HeartBeatModel(BeatTemplateCache(max_bytes))
+    lengths = [round(rate_hz * 60.0 / bpm) for bpm in np.arange(40, 181)]
+    start = time.perf_counter()
+    for _ in range(2):
+        for length in lengths:
+            model.get_beat_template(length)
+    seconds = time.perf_counter() - start
+    return {'ms': seconds * 1e3, **model.template_cache.stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    QCoreApplication.instance() or QCoreApplication([])
+    print(f"{'samples':>8} {'cache':>6} {'defaults ms':>11} {'edit/undo ms':>12} {'flip ms':>8}")
+    for num_samples in BEAT_LENGTHS:
+        for label, max_bytes in (("off", 0), ("on", BeatTemplateCache().stats['max_bytes'])):
+            s = run(num_samples, max_bytes, args.repeats)
+            print(f"{num_samples:>8} {label:>6} {s['defaults_ms']:>11.3f} {s['undo_ms']:>12.3f} {s['flip_ms']:>8.3f}")
+
+    print("\nbeat at 40..180 BPM (1 BPM steps) at 50 kHz, swept twice:")
+    for label, max_bytes in (("off", 0), ("64 MiB", 64 * 1024 * 1024), ("8 MiB", 8 * 1024 * 1024)):
+        s = rate_sweep(max_bytes)
+        print(f"  cache {label:>7}: {s['ms']:>8.1f} ms, hit rate {s['hit_rate']:.0%}, "
+              f"{s['entries']} entries, {s['bytes'] / 1e6:.1f} MB, {s['evictions']} evictions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Waveform library scan benchmark: what a spawned worker process costs to
+start, what indexing one recording costs, and from how many files a process
+pool pays off (PARALLEL_SCAN_MIN_FILES in model.waveform_library).
+
+Run from the repository root:
+    python -m benchmarks.bench_waveform_library [--workers N] [--repeat N] [files ...]
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from model.waveform_library import PARALLEL_SCAN_MIN_FILES, extract_waveform_metadata
+
+WAVEFORM_DB = Path(__file__).resolve().parent.parent / "model" / "waveform_db"
+
+
+def _pool_start_s(workers: int, path: str) -> float:
+    """Wall time for a fresh spawn pool to run one extraction per worker, minus the extraction."""
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        list(pool.map(extract_waveform_metadata, [path] * workers))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="*", type=Path)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    files = [str(p) for p in (args.files or sorted((WAVEFORM_DB / "BioSiPressureRawFile").glob("*.txt")))]
+    per_file = min(_serial_s(files) for _ in range(args.repeat)) / len(files)
+    startup = min(_pool_start_s(args.workers, files[0]) for _ in range(args.repeat)) - per_file
+
+    print(f"files: {len(files)}, workers: {args.workers}")
+    print(f"indexing one file (in process): {per_file * 1e3:8.1f} ms")
+    print(f"starting the worker pool:       {startup * 1e3:8.1f} ms")
+    if args.workers > 1:
+        # serial n·t  vs  startup + n·t/workers
+        break_even = startup / (per_file * (1 - 1 / args.workers))
+        print(f"pool pays off from about {break_even:.0f} files "
+              f"(PARALLEL_SCAN_MIN_FILES = {PARALLEL_SCAN_MIN_FILES})")
+
+
+def _serial_s(files: list[str]) -> float:
+    start = time.perf_counter()
+    for path in files:
+        extract_waveform_metadata(path)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
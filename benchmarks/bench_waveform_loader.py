@@ -0,0 +1,72 @@
+"""
+Waveform file parsing benchmark: legacy per-row csv.reader parser vs. the
+bulk NumPy loader in model.waveform_file_loader.
+
+Run from the repository root:
+    python -m benchmarks.bench_waveform_loader [--repeat N] [files ...]
+"""
+import argparse
+import csv
+import time
+from pathlib import Path
+
+import numpy as np
+
+from model.waveform_file_loader import load_waveform_file
+
+WAVEFORM_DB = Path(__file__).resolve().parent.parent / "model" / "waveform_db"
+
+
+def legacy_parse_csv(path) -> list:
+    """The parser HeartBeatLoadWaveformFromFilePageViewModel shipped with originally."""
+    pressure_points = []
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        for line_num, row in enumerate(reader, start=1):
+            if not row or row[0].strip().startswith("#"):
+                continue
+            try:
+                pressure_points.append(float(row[0].strip()))
+            except ValueError:
+                raise ValueError(
+                    f"Line {line_num}: cannot parse pressure value → {row[0]!r}"
+                )
+    if not pressure_points:
+        raise ValueError("File contains no valid data rows.")
+    return pressure_points
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="*", type=Path)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    files = args.files or sorted(
+        p for p in (WAVEFORM_DB / "BioSiPressureRawFile").glob("*.txt")
+    )
+
+    print(f"{'file':<48} {'samples':>8} {'legacy ms':>10} {'bulk ms':>9} {'speedup':>8}")
+    for path in files:
+        legacy = legacy_parse_csv(path)
+        bulk = load_waveform_file(path)
+        if len(legacy) == len(bulk):
+            assert np.array_equal(np.asarray(legacy), bulk), f"{path.name}: parsers disagree"
+
+        t_legacy = _best_of(lambda: legacy_parse_csv(path), args.repeat)
+        t_bulk = _best_of(lambda: load_waveform_file(path), args.repeat)
+        print(f"{path.name[:48]:<48} {len(bulk):>8} {t_legacy * 1e3:>10.2f} "
+              f"{t_bulk * 1e3:>9.2f} {t_legacy / t_bulk:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Repaint cost of HeartBeatWaveformPage per waveform change: the legacy
+clear() + per-sample append() population vs. the buffered replaceNp() /
+dirty-range path, for single reference point edits at several beat lengths.
+
+Run from the repository root (no display needed):
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_waveform_page_update [--edits N]
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+from PySide6.QtCore import QPointF
+from PySide6.QtWidgets import QApplication
+
+from model.heart_beat_model import HeartBeatModel
+from view.heart_beat_waveform_page_view import HeartBeatWaveformPage
+from viewmodel.heart_beat_waveform_page_viewmodel import HeartBeatWaveformPageViewModel
+
+SAMPLES_PER_BEAT = (1_000, 10_000, 100_000)
+VIEW_SIZE = (1200, 600)
+
+
+def _legacy_update(page):
+    """HeartBeatWaveformPage.update_waveform_data as it was before the buffered path."""
+    page.series.clear()
+    page.ref_points_series.clear()
+    waveform = page._viewmodel.abp_waveform
+    time_points = waveform['abp_waveform_time_points']
+    pressure_points = waveform['abp_waveform_pressure_points']
+    for t, p in zip(time_points, pressure_points):
+        page.series.append(float(t), float(p))
+    ref = page._viewmodel.reference_abp_waveform
+    ref_times = ref['abp_ref_waveform_time_points']
+    ref_pressures = ref['abp_ref_waveform_pressure_points']
+    for t, p in zip(ref_times, ref_pressures):
+        page.ref_points_series.append(float(t), float(p))
+    page.chart_view.set_reference_points(
+        [QPointF(float(t), float(p)) for t, p in zip(ref_times, ref_pressures)]
+    )
+    page.axis_x.setRange(float(np.min(time_points)), float(np.max(time_points)))
+    page.axis_y.setRange(float(np.min(pressure_points)) - 5, float(np.max(pressure_points)) + 5)
+    page._update_ref_table(page._viewmodel.reference_point_keys, ref_times, ref_pressures)
+
+
+def _run(app, model, viewmodel, page, legacy: bool, edits: int, seed: int) -> tuple[float, float]:
+    """Average (update ms, repaint ms) over `edits` random single-point moves."""
+    rng = np.random.default_rng(seed)
+    features = model._waveform_reference_points['abp_waveform_features']
+    keys = model.get_reference_point_keys()
+    update_s = repaint_s = 0.0
+    for _ in range(edits):
+        key = keys[rng.integers(1, len(keys) - 1)]          # interior point, order kept
+        pressure = features[key]['pressure_mmHg'] + rng.normal(0.0, 2.0)
+        start = time.perf_counter()
+        viewmodel.update_reference_point(key, features[key]['time_s'], pressure)
+        if legacy:
+            _legacy_update(page)
+        update_s += time.perf_counter() - start
+        start = time.perf_counter()
+        page.chart_view.grab()
+        repaint_s += time.perf_counter() - start
+        app.processEvents()
+    return update_s / edits * 1e3, repaint_s / edits * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--edits", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--legacy-max-samples", type=int, default=10_000,
+                        help="skip the legacy path above this beat length (it is O(n^2) once shown)")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    print(f"{'samples/beat':>12} {'mode':<10} {'update ms':>10} {'repaint ms':>11} {'total ms':>9}")
+    for n in SAMPLES_PER_BEAT:
+        for legacy in (True, False):
+            if legacy and n > args.legacy_max_samples:
+                continue
+            model = HeartBeatModel()
+            viewmodel = HeartBeatWaveformPageViewModel(model)
+            page = HeartBeatWaveformPage(viewmodel)
+            if legacy:
+                viewmodel.waveform_data_changed.disconnect(page.update_waveform_data)
+            page.resize(*VIEW_SIZE)
+            page.show()
+            model.set_num_of_samples_per_heart_beat(n)
+            if legacy:
+                _legacy_update(page)
+            app.processEvents()
+            edits = 1 if legacy and n > 1_000 else args.edits
+            update_ms, repaint_ms = _run(app, model, viewmodel, page, legacy, edits, args.seed)
+            label = "legacy" if legacy else "buffered"
+            print(f"{n:>12} {label:<10} {update_ms:>10.2f} {repaint_ms:>11.2f} {update_ms + repaint_ms:>9.2f}")
+            page.close()
+
+
+if __name__ == "__main__":
+    main()
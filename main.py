@@ -14,6 +14,8 @@ from PySide6.QtWidgets import (
 )
 
 import sys
+import logging
+import multiprocessing
 import model
 import view
 import viewmodel
@@ -21,7 +23,8 @@ from enum import StrEnum
 
 import qtawesome as qta
 from logger_config import configure_logging
-from model.ni6216daqmx_model import Ni6216DaqMx
+
+logger = logging.getLogger(__name__)
 
 
 SW_VERSION = "0.0.1"
@@ -118,16 +121,29 @@ class MainWindow(QMainWindow):
         # Create ABP Waveform from file model
         self.abp_waveform_from_file_model = model.AbpWaveformFileModel()
 
+        # Catalogue of recordings in model/waveform_db and user folders
+        self.waveform_library = model.WaveformLibrary()
+
         # Create heart beat models
         self.heart_beat_model = model.HeartBeatModel()
 
-        # Pass the two model to the NI DAQMx
-        self.ni_daq_mx_model = Ni6216DaqMx(heart_beat_model=self.heart_beat_model, abp_waveform_file_model=self.abp_waveform_from_file_model)
+        # Pass the two model to the NI DAQMx devices, one Ni6216DaqMx per attached unit
+        daq_backend = (model.SimulatedDaqBackend.with_devices(self.settings.daqSimulatedDevices)
+                       if self.settings.daqBackend == "simulated" else None)
+        self.daq_pool = model.DaqDevicePool(heart_beat_model=self.heart_beat_model, abp_waveform_file_model=self.abp_waveform_from_file_model,
+                                            backend=daq_backend)
+        try:
+            self.daq_pool.set_sample_rate_hz(self.settings.daqSampleRateHz)
+        except ValueError as e:
+            logger.warning(f"Ignoring the configured DAQ output rate: {e}")
 
-        self.ni_6216_viewmodel = viewmodel.NI6216ViewModel(self.ni_daq_mx_model)
+        self.daq_pool_viewmodel = viewmodel.DaqDevicePoolViewModel(self.daq_pool)
 
         self.initialize_views()
 
+        # Bring the waveform library index up to date in the background
+        self.waveform_library_viewmodel.rescan()
+
         # Clock label in status bar
         self.clock_label = QLabel()
         self.status_bar.addPermanentWidget(self.clock_label)
@@ -142,27 +158,28 @@ class MainWindow(QMainWindow):
         # HEART BEAT VIEW
         heart_beat_waveform_page_viewmodel = viewmodel.HeartBeatWaveformPageViewModel(self.heart_beat_model)
         load_from_file_page_viewmodel = viewmodel.HeartBeatLoadWaveformFromFilePageViewModel(self.abp_waveform_from_file_model)
-        heart_beat_view = view.HeartBeatView(heart_beat_waveform_page_viewmodel, load_from_file_page_viewmodel)
+        self.waveform_library_viewmodel = viewmodel.WaveformLibraryViewModel(self.waveform_library, load_from_file_page_viewmodel)
+        self.waveform_library_viewmodel.status_message.connect(self.status_bar.showMessage)
+        heart_beat_view = view.HeartBeatView(heart_beat_waveform_page_viewmodel, load_from_file_page_viewmodel, self.waveform_library_viewmodel)
         self.view_lookup[ViewID.HEARTBEAT] = heart_beat_view
         self.stacked_widget.addWidget(heart_beat_view)
 
-        # NI VIEW
-        #ni_6216_viewmodel = viewmodel.NI6216ViewModel(self.ni_daq_mx_model)
-        self.ni_6216_viewmodel.connection_changed.connect(self._on_daq_connection_changed)
-        self.ni_6216_viewmodel.generation_state_changed.connect(self._on_daq_generation_state_changed)
+        # NI VIEW: every DAQ unit, with the selected unit's controls
+        self.daq_pool_viewmodel.connection_changed.connect(self._on_daq_connection_changed)
+        self.daq_pool_viewmodel.generation_state_changed.connect(self._on_daq_generation_state_changed)
 
         # Set initial toolbar state
-        self._on_daq_connection_changed(self.ni_6216_viewmodel.is_connected)
-        self.ni_6216_viewmodel.status_message.connect(self.status_bar.showMessage)
-        ni_6216_view = view.NI6216View(self.ni_6216_viewmodel)
-        self.view_lookup[ViewID.NI_6216] = ni_6216_view
-        self.stacked_widget.addWidget(ni_6216_view)
+        self._on_daq_connection_changed(self.daq_pool_viewmodel.is_connected)
+        self.daq_pool_viewmodel.status_message.connect(self.status_bar.showMessage)
+        daq_pool_view = view.DaqDevicePoolView(self.daq_pool_viewmodel)
+        self.view_lookup[ViewID.NI_6216] = daq_pool_view
+        self.stacked_widget.addWidget(daq_pool_view)
 
     def on_about_to_quit(self):
 
         # Disconnect USB-CAN Peak
-        # Disconnect USB NI DAQ
-        self.ni_daq_mx_model.stop()
+        # Disconnect USB NI DAQs
+        self.daq_pool.stop()
 
     # HELP MENU ACTIONS
     def show_about_dialog(self):
@@ -190,7 +207,7 @@ class MainWindow(QMainWindow):
         self.clock_label.setText(now.toString("dd/MM/yyyy   hh:mm:ss"))
 
     def _on_daq_connection_changed(self, connected: bool):
-        """Enable/disable toolbar button when device plugs or unplugs."""
+        """Enable/disable toolbar button when the first device plugs in or the last unplugs."""
         self._daq_action.setEnabled(connected)
         if not connected:
             # Device yanked mid-run — reset button to stopped state
@@ -201,18 +218,18 @@ class MainWindow(QMainWindow):
             self._daq_action.setText("Start DAQMx Generation")
 
     def _on_daq_action_triggered(self, checked: bool):
-        """Start or stop waveform generation from the toolbar."""
+        """Start or stop waveform generation on every device from the toolbar."""
         if checked:
-            self.ni_6216_viewmodel.start_generation()
+            self.daq_pool_viewmodel.start_all()
             self._daq_action.setIcon(qta.icon("fa5s.stop", color="#FF4444"))
             self._daq_action.setText("Stop DAQMx Generation")
         else:
-            self.ni_6216_viewmodel.stop_generation()
+            self.daq_pool_viewmodel.stop_all()
             self._daq_action.setIcon(qta.icon("fa5s.play", color="#00FF00"))
             self._daq_action.setText("Start DAQMx Generation")
 
     def _on_daq_generation_state_changed(self, running: bool):
-        """Keep toolbar icon in sync if state changes from the NI6216View button."""
+        """Keep toolbar icon in sync if state changes from a device's NI6216View button (any device generating)."""
         self._daq_action.blockSignals(True)
         self._daq_action.setChecked(running)
         self._daq_action.blockSignals(False)
@@ -226,6 +243,7 @@ class MainWindow(QMainWindow):
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()   # library indexing uses a process pool in the frozen exe
     configure_logging()
     app = QApplication(sys.argv)
 
@@ -1,6 +1,49 @@
-from .abp_waveform_file_model import AbpWaveformFileModel
-from .heart_beat_model import HeartBeatModel
-from .item_model import ItemModel
-from .list_model import ListModel
-from .ni6216daqmx_model import Ni6216DaqMx
-from .settings_model import SettingsModel
\ No newline at end of file
+"""
+Models of the app. Names are imported from their submodule on first use, so
+that importing one light module (e.g. model.waveform_library in a scan worker
+process) does not load PySide6, scipy and the DAQ driver with the rest.
+"""
+import importlib
+
+_EXPORTS = {
+    'abp_waveform_file_model': ("AbpWaveformFileModel",),
+    'beat_batch': ("BeatDataset", "BeatJitter", "jitter_reference_points", "load_beat_dataset", "render_beats",
+                   "write_beat_dataset"),
+    'beat_sequence': ("BeatRhythm", "BeatSequence", "BeatVariability", "ConstantBpm", "RampBpm", "ScheduleSequence",
+                      "SinusoidalBpm"),
+    'beat_template_cache': ("BeatTemplateCache",),
+    'calibration': ("Calibration", "ChannelCalibration", "load_calibration"),
+    'daq_backend': ("DaqBackend", "DaqDeviceInfo"),
+    'daq_device_pool': ("DaqDevicePool",),
+    'daq_stream_writer': ("PrefetchingSampleSource",),
+    'heart_beat_model': ("HeartBeatModel",),
+    'item_model': ("ItemModel",),
+    'list_model': ("ListModel",),
+    'loopback_capture': ("CaptureConfig", "LoopbackCapture", "load_capture"),
+    'pchip_batch': ("PchipBatch",),
+    'ni6216daqmx_model': ("Ni6216DaqMx",),
+    'resampler': ("ResamplingSampleSource", "StreamingResampler", "resample", "resample_periodic"),
+    'scenario': ("Scenario", "ScenarioRenderer", "ScenarioSource", "load_scenario", "parse_scenario",
+                 "scenario_digest"),
+    'settings_model': ("SettingsModel",),
+    'simulated_daq_backend': ("SimulatedDaqBackend", "SimulatedDaqDevice"),
+    'usb_hotplug': ("HotplugEvent", "HotplugMonitor", "ManualHotplugMonitor"),
+    'waveform_library': ("WaveformLibrary",),
+    'waveform_library_table_model': ("WaveformLibraryTableModel",),
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_MODULE_OF)
+
+
+def __getattr__(name):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value         # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
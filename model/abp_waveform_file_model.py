@@ -1,22 +1,40 @@
 from PySide6.QtCore import QObject, Signal
 import numpy as np
 
+from .minmax_pyramid import MinMaxPyramid
+from .waveform_library import DEFAULT_SAMPLE_RATE_HZ
+
+# Recordings longer than this get their min/max pyramid built off the calling thread
+PYRAMID_BACKGROUND_BUILD_SAMPLES = 1_000_000
+
 class AbpWaveformFileModel(QObject):
     waveform_changed = Signal()
 
     def __init__(self):
         super().__init__()
-        self._abp_waveform_time_points = []
-        self._abp_waveform_pressure_points = []
+        self._abp_waveform_time_points = np.empty(0)
+        self._abp_waveform_pressure_points = np.empty(0)
+        self._sample_rate_hz = DEFAULT_SAMPLE_RATE_HZ
+        self._pyramid = MinMaxPyramid(self._abp_waveform_pressure_points)
+
+    @property
+    def sample_rate_hz(self) -> float:
+        """Rate the recording was sampled at; output resamples it to the DAQ rate."""
+        return self._sample_rate_hz
 
     @property
-    def time_points(self) -> list:
+    def time_points(self) -> np.ndarray:
         return self._abp_waveform_time_points
 
     @property
-    def pressure_points(self) -> list:
+    def pressure_points(self) -> np.ndarray:
         return self._abp_waveform_pressure_points
 
+    @property
+    def pyramid(self) -> MinMaxPyramid:
+        """Min/max pyramid of pressure_points, shared by every chart showing this recording."""
+        return self._pyramid
+
     '''
     The key point is that set_waveform() in the model 
     is the single entry point for writing data — 
@@ -25,12 +43,20 @@ class AbpWaveformFileModel(QObject):
     (e.g. a future status bar or export button) 
     can react automatically.
     '''
-    def set_waveform(self, pressure_points: list):
-        self._abp_waveform_pressure_points = pressure_points
-        self._abp_waveform_time_points = list(range(len(pressure_points)))  # 0, 1, 2, ...
+    def set_waveform(self, pressure_points: np.ndarray, sample_rate_hz: float | None = None):
+        if sample_rate_hz is not None and sample_rate_hz <= 0:
+            raise ValueError(f"Sample rate must be positive, got {sample_rate_hz} Hz")
+        self._abp_waveform_pressure_points = np.asarray(pressure_points, dtype=np.float64)
+        self._sample_rate_hz = float(sample_rate_hz) if sample_rate_hz else DEFAULT_SAMPLE_RATE_HZ
+        self._abp_waveform_time_points = np.arange(len(self._abp_waveform_pressure_points))  # 0, 1, 2, ...
+        self._pyramid = MinMaxPyramid(
+            self._abp_waveform_pressure_points,
+            background=len(self._abp_waveform_pressure_points) > PYRAMID_BACKGROUND_BUILD_SAMPLES
+        )
         self.waveform_changed.emit()
 
     def clear(self):
-        self._abp_waveform_pressure_points = []
-        self._abp_waveform_time_points = []
+        self._abp_waveform_pressure_points = np.empty(0)
+        self._abp_waveform_time_points = np.empty(0)
+        self._pyramid = MinMaxPyramid(self._abp_waveform_pressure_points)
         self.waveform_changed.emit()
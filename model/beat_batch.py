@@ -0,0 +1,266 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from .pchip_batch import PchipBatch
+
+DATASET_DTYPE = np.dtype('<f4')
+KNOTS_DTYPE = np.dtype('<f8')
+DATASET_FORMAT = "beat-dataset"
+DATASET_VERSION = 1
+# Working memory of one block of beats (their per-sample coefficients and result)
+BLOCK_BYTES = 64 * 1024 * 1024
+PARALLEL_MIN_BEATS = 2048           # below this a process pool costs more than it saves
+
+
+# ── Variants ──────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class BeatJitter:
+    """
+    How beat variants differ from a base beat: every inner reference point
+    moves by N(0, `time_sd`) in phase and N(0, `pressure_sd_mmHg`); the pulse
+    is scaled about the first point's pressure by a factor drawn from
+    `amplitude` and shifted by an offset drawn from `offset_mmHg` (uniform
+    ranges). The first and last points keep their phase and move only with
+    the amplitude and offset, so beats still join up; points stay at least
+    `min_gap` apart.
+    """
+    time_sd: float = 0.01
+    pressure_sd_mmHg: float = 2.0
+    amplitude: tuple[float, float] = (1.0, 1.0)
+    offset_mmHg: tuple[float, float] = (0.0, 0.0)
+    min_gap: float = 0.005
+
+    def __post_init__(self):
+        if self.time_sd < 0 or self.pressure_sd_mmHg < 0:
+            raise ValueError(f"Jitter must not be negative, got {self.time_sd}, {self.pressure_sd_mmHg} mmHg")
+        if not self.min_gap > 0:
+            raise ValueError(f"min_gap must be positive, got {self.min_gap}")
+
+
+def jitter_reference_points(times: np.ndarray, pressures: np.ndarray, count: int,
+                            jitter: BeatJitter = BeatJitter(),
+                            seed: int | np.random.SeedSequence | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    `count` variants of one beat's reference points (phase 0..1 and mmHg,
+    e.g. HeartBeatModel.get_waveform_knots()), as (count, points) matrices
+    sorted by phase; the same seed draws the same variants.
+    """
+    order = np.argsort(times, kind='stable')
+    times = np.asarray(times, dtype=np.float64)[order]
+    pressures = np.asarray(pressures, dtype=np.float64)[order]
+    k = len(times)
+    if k < 2 or len(pressures) != k:
+        raise ValueError(f"Need at least 2 reference points with a pressure each, got {k} and {len(pressures)}")
+    if np.any(np.diff(times) < jitter.min_gap):
+        raise ValueError(f"Reference points closer than min_gap={jitter.min_gap}")
+    rng = np.random.default_rng(seed)
+
+    x = np.broadcast_to(times, (count, k)).copy()
+    inner = slice(1, k - 1)
+    x[:, inner] += rng.normal(0.0, jitter.time_sd, (count, k - 2))
+    # Keep the inner points min_gap clear of the pinned ends, then sort
+    # and push them apart (a running maximum of x - i * gap)
+    steps = np.arange(k) * jitter.min_gap
+    x[:, inner] = np.clip(x[:, inner], times[0] + jitter.min_gap, times[-1] - jitter.min_gap)
+    y = np.broadcast_to(pressures, (count, k)).copy()
+    y[:, inner] += rng.normal(0.0, jitter.pressure_sd_mmHg, (count, k - 2))
+    order = np.argsort(x, axis=1, kind='stable')
+    x = np.take_along_axis(x, order, axis=1)
+    y = np.take_along_axis(y, order, axis=1)
+    x = np.maximum.accumulate(x - steps, axis=1) + steps
+    x = np.minimum(x, times[-1] - steps[::-1])
+    x[:, -1] = times[-1]
+
+    amplitude = rng.uniform(*jitter.amplitude, (count, 1))
+    offset = rng.uniform(*jitter.offset_mmHg, (count, 1))
+    y = y[:, :1] + amplitude * (y - y[:, :1]) + offset
+    return x, y
+
+
+# ── Rendering ─────────────────────────────────────────────────────────────
+
+def render_beats(times: np.ndarray, pressures: np.ndarray, num_samples: int,
+                 out: np.ndarray | None = None, workers: int | None = 1) -> np.ndarray:
+    """
+    Every beat of a (beats, points) matrix of reference points (phase 0..1,
+    strictly increasing per row, and mmHg) as PCHIP evaluated at phase
+    j / `num_samples`: a (beats, num_samples) array, into `out` (any float
+    dtype) if given. No Qt, no signals: beats are evaluated in blocks with
+    one PchipBatch each, over `workers` processes (all CPUs when None) for
+    large batches.
+    """
+    times, pressures = _check_knots(times, pressures)
+    num_samples = int(num_samples)
+    if num_samples < 2:
+        raise ValueError(f"A heart beat needs at least 2 samples, got {num_samples}")
+    shape = (len(times), num_samples)
+    if out is None:
+        out = np.empty(shape, dtype=np.float64)
+    elif out.shape != shape:
+        raise ValueError(f"out must have shape {shape}, got {out.shape}")
+
+    blocks = _blocks(len(times), num_samples)
+    if _use_pool(len(times), workers):
+        with _process_pool(workers) as pool:
+            futures = {pool.submit(_render_block, times[a:b], pressures[a:b], num_samples): a for a, b in blocks}
+            for future in as_completed(futures):
+                block = future.result()
+                out[futures[future]:futures[future] + len(block)] = block
+        return out
+    for a, b in blocks:
+        if out.dtype == np.float64 and out.flags.c_contiguous:
+            _render_block(times[a:b], pressures[a:b], num_samples, out=out[a:b])
+        else:
+            out[a:b] = _render_block(times[a:b], pressures[a:b], num_samples)
+    return out
+
+
+def _render_block(times: np.ndarray, pressures: np.ndarray, num_samples: int,
+                  out: np.ndarray | None = None) -> np.ndarray:
+    phase = np.arange(num_samples, dtype=np.float64) / num_samples
+    return PchipBatch(times, pressures)(phase, out=out)
+
+
+def _render_block_to_file(data_path: str, first_beat: int, times: np.ndarray, pressures: np.ndarray,
+                          num_samples: int) -> int:
+    """Render beats into their rows of a pre-sized dataset file (in a pool process); returns the beat count."""
+    rows = np.memmap(data_path, dtype=DATASET_DTYPE, mode='r+', shape=(len(times), num_samples),
+                     offset=first_beat * num_samples * DATASET_DTYPE.itemsize)
+    rows[:] = _render_block(times, pressures, num_samples)
+    rows.flush()
+    del rows
+    return len(times)
+
+
+def _check_knots(times, pressures) -> tuple[np.ndarray, np.ndarray]:
+    times = np.ascontiguousarray(times, dtype=np.float64)
+    pressures = np.ascontiguousarray(pressures, dtype=np.float64)
+    if times.ndim != 2 or times.shape != pressures.shape:
+        raise ValueError(f"Need (beats, points) matrices of equal shape, got {times.shape} and {pressures.shape}")
+    if times.shape[1] < 2:
+        raise ValueError(f"A beat needs at least 2 reference points, got {times.shape[1]}")
+    unordered = np.flatnonzero(np.any(np.diff(times, axis=1) <= 0, axis=1))
+    if len(unordered):
+        raise ValueError(f"Beat {unordered[0]}: reference point phases must be strictly increasing "
+                         f"({len(unordered)} beat(s) are not)")
+    return times, pressures
+
+
+def _blocks(num_beats: int, num_samples: int) -> list[tuple[int, int]]:
+    # Per beat and sample: five spread coefficients and the result, float64
+    rows = max(1, BLOCK_BYTES // (6 * 8 * num_samples))
+    return [(a, min(a + rows, num_beats)) for a in range(0, num_beats, rows)]
+
+
+def _process_pool(workers: int | None) -> ProcessPoolExecutor:
+    # spawn, not fork: these run inside the app, whose Qt and DAQ threads a forked child would inherit mid-lock
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
+
+
+def _use_pool(num_beats: int, workers: int | None) -> bool:
+    return workers != 1 and num_beats >= PARALLEL_MIN_BEATS and (workers or os.cpu_count() or 1) > 1
+
+
+# ── Datasets ──────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class BeatDataset:
+    """A beat dataset on disk: read-only (beats, samples) memory map, reference points and metadata."""
+    beats: np.ndarray
+    times: np.ndarray
+    pressures: np.ndarray
+    meta: dict
+
+
+def write_beat_dataset(path: str | Path, times: np.ndarray, pressures: np.ndarray, num_samples: int,
+                       workers: int | None = None, metadata: dict | None = None,
+                       progress_callback: Callable[[int, int], None] | None = None) -> dict:
+    """
+    Render a (beats, points) matrix of reference points and store it as
+    `<name>.f32` (little-endian float32, one row of `num_samples` per beat),
+    `<name>.knots.f64` (per beat: the phases, then the pressures) and
+    `<name>.json` (shape, dtypes and `metadata`). Pool processes write their
+    blocks straight into the data file; nothing is held in memory but the
+    block being rendered. Returns what was written.
+    """
+    times, pressures = _check_knots(times, pressures)
+    num_samples = int(num_samples)
+    if num_samples < 2:
+        raise ValueError(f"A heart beat needs at least 2 samples, got {num_samples}")
+    path = Path(path)
+    data_path = path.with_suffix(".f32")
+    knots_path = path.with_suffix(".knots.f64")
+    meta_path = path.with_suffix(".json")
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+    num_beats = len(times)
+    start = time.perf_counter()
+
+    np.stack((times, pressures), axis=1).astype(KNOTS_DTYPE).tofile(knots_path)
+    with open(data_path, "wb") as file:
+        file.truncate(num_beats * num_samples * DATASET_DTYPE.itemsize)
+
+    blocks = _blocks(num_beats, num_samples)
+    done = 0
+    if _use_pool(num_beats, workers):
+        with _process_pool(workers) as pool:
+            futures = [pool.submit(_render_block_to_file, str(data_path), a, times[a:b], pressures[a:b], num_samples)
+                       for a, b in blocks]
+            for future in as_completed(futures):
+                done += future.result()
+                if progress_callback:
+                    progress_callback(done, num_beats)
+    else:
+        for a, b in blocks:
+            done += _render_block_to_file(str(data_path), a, times[a:b], pressures[a:b], num_samples)
+            if progress_callback:
+                progress_callback(done, num_beats)
+
+    meta = {
+        'format': DATASET_FORMAT,
+        'version': DATASET_VERSION,
+        'dtype': DATASET_DTYPE.str,
+        'knots_dtype': KNOTS_DTYPE.str,
+        'beats': num_beats,
+        'samples_per_beat': num_samples,
+        'reference_points': times.shape[1],
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        **(metadata or {}),
+    }
+    with open(meta_path, "w") as file:
+        json.dump(meta, file, indent=2)
+    seconds = time.perf_counter() - start
+    logger.info(f"Beat dataset {data_path.name}: {num_beats} beats x {num_samples} samples in {seconds:.2f} s")
+    return {
+        'path': str(data_path),
+        'beats': num_beats,
+        'samples_per_beat': num_samples,
+        'bytes': num_beats * num_samples * DATASET_DTYPE.itemsize,
+        'seconds': seconds,
+        'parallel': _use_pool(num_beats, workers),
+    }
+
+
+def load_beat_dataset(path: str | Path) -> BeatDataset:
+    """A dataset written by write_beat_dataset(); the beats are memory-mapped, not read."""
+    path = Path(path)
+    with open(path.with_suffix(".json"), "r") as file:
+        meta = json.load(file)
+    if meta.get('format') != DATASET_FORMAT:
+        raise ValueError(f"{path.with_suffix('.json').name} is not a beat dataset")
+    shape = (meta['beats'], meta['samples_per_beat'])
+    beats = np.memmap(path.with_suffix(".f32"), dtype=np.dtype(meta['dtype']), mode='r', shape=shape)
+    knots = np.fromfile(path.with_suffix(".knots.f64"), dtype=np.dtype(meta['knots_dtype']))
+    knots = knots.reshape(meta['beats'], 2, meta['reference_points'])
+    return BeatDataset(beats, knots[:, 0], knots[:, 1], meta)
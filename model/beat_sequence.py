@@ -0,0 +1,405 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import math
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Iterator, Sequence
+
+import numpy as np
+from scipy.interpolate import PchipInterpolator
+
+from .daq_stream_writer import SampleSource
+
+# Beat phase (0 = beat start, 1 = next beat) → pressure, mmHg; (channels, n) for a multi-channel template
+BeatTemplate = Callable[[np.ndarray], np.ndarray]
+
+# Normal-noise draws taken from the RNG at a time; the sequence does not depend on it
+VARIABILITY_BLOCK = 1024
+# Bounds of the warped systolic fraction of a beat
+MIN_SYSTOLE_FRACTION = 0.05
+MAX_SYSTOLE_FRACTION = 0.95
+
+
+# ── BPM schedules ─────────────────────────────────────────────────────────
+
+class BpmSchedule(ABC):
+    """Heart rate over time. The beat starting at time t lasts 60 / bpm_at(t) seconds."""
+
+    @property
+    @abstractmethod
+    def duration_s(self) -> float | None:
+        """Length of the schedule; None for one that never ends."""
+
+    @abstractmethod
+    def bpm_at(self, t_s: float) -> float:
+        """Heart rate at `t_s` seconds from the start, for 0 <= t_s < duration_s."""
+
+
+@dataclass(frozen=True)
+class ConstantBpm(BpmSchedule):
+    bpm: float
+    seconds: float | None = None
+
+    def __post_init__(self):
+        _check_bpm(self.bpm)
+
+    @property
+    def duration_s(self) -> float | None:
+        return self.seconds
+
+    def bpm_at(self, t_s: float) -> float:
+        return self.bpm
+
+
+@dataclass(frozen=True)
+class RampBpm(BpmSchedule):
+    """Linear change from `start_bpm` to `end_bpm` over `seconds`."""
+    start_bpm: float
+    end_bpm: float
+    seconds: float
+
+    def __post_init__(self):
+        _check_bpm(self.start_bpm)
+        _check_bpm(self.end_bpm)
+        if self.seconds <= 0:
+            raise ValueError(f"A ramp needs a positive duration, got {self.seconds} s")
+
+    @property
+    def duration_s(self) -> float:
+        return self.seconds
+
+    def bpm_at(self, t_s: float) -> float:
+        fraction = min(max(t_s / self.seconds, 0.0), 1.0)
+        return self.start_bpm + (self.end_bpm - self.start_bpm) * fraction
+
+
+@dataclass(frozen=True)
+class SinusoidalBpm(BpmSchedule):
+    """`mean_bpm` ± `amplitude_bpm` over `period_s`, e.g. a day/night (circadian) swing."""
+    mean_bpm: float
+    amplitude_bpm: float
+    period_s: float = 86_400.0
+    seconds: float | None = None
+    phase_s: float = 0.0        # time of the maximum
+
+    def __post_init__(self):
+        _check_bpm(self.mean_bpm - abs(self.amplitude_bpm))
+
+    @property
+    def duration_s(self) -> float | None:
+        return self.seconds
+
+    def bpm_at(self, t_s: float) -> float:
+        return self.mean_bpm + self.amplitude_bpm * math.cos(2.0 * math.pi * (t_s - self.phase_s) / self.period_s)
+
+
+class ScheduleSequence(BpmSchedule):
+    """Schedules played one after the other; only the last may be endless."""
+
+    def __init__(self, segments: list[BpmSchedule]):
+        if not segments:
+            raise ValueError("A schedule sequence needs at least one segment")
+        if any(segment.duration_s is None for segment in segments[:-1]):
+            raise ValueError("Only the last segment of a schedule sequence may be endless")
+        self._segments = list(segments)
+        self._ends = np.cumsum([segment.duration_s or 0.0 for segment in segments[:-1]])
+        last = segments[-1].duration_s
+        self._duration_s = None if last is None else float(sum(s.duration_s for s in segments))
+
+    @property
+    def segments(self) -> list[BpmSchedule]:
+        return list(self._segments)
+
+    @property
+    def duration_s(self) -> float | None:
+        return self._duration_s
+
+    def bpm_at(self, t_s: float) -> float:
+        index = int(np.searchsorted(self._ends, t_s, side='right'))
+        offset = self._ends[index - 1] if index else 0.0
+        return self._segments[index].bpm_at(t_s - offset)
+
+
+def _check_bpm(bpm: float):
+    if not bpm > 0:
+        raise ValueError(f"Heart rate must be positive, got {bpm} BPM")
+
+
+@dataclass(frozen=True)
+class BeatVariability:
+    """
+    Beat-to-beat (RR interval) variability: each interval is scaled by
+    1 + sdnn_fraction * z, where z is unit-variance AR(1) noise with lag-one
+    `correlation`, so consecutive beats drift rather than jump.
+    """
+    sdnn_fraction: float = 0.03
+    correlation: float = 0.7
+
+    def __post_init__(self):
+        if not 0 <= self.sdnn_fraction < 0.5:
+            raise ValueError(f"sdnn_fraction must be in [0, 0.5), got {self.sdnn_fraction}")
+        if not -1 < self.correlation < 1:
+            raise ValueError(f"correlation must be in (-1, 1), got {self.correlation}")
+
+
+class BeatRhythm(ABC):
+    """
+    Rhythm disturbances (e.g. ectopic beats) layered on a schedule. For every
+    scheduled beat, in order, beats() returns the beats actually played
+    instead, as (rr_s, amplitude) pairs; amplitude scales the beat's pulse
+    about its starting (end-diastolic) pressure. It is called exactly once
+    per scheduled beat, so a seeded implementation renders the same beats
+    however the output is chunked.
+    """
+
+    @abstractmethod
+    def beats(self, t_s: float, rr_s: float) -> list[tuple[float, float]]:
+        ...
+
+
+# ── Sequence ──────────────────────────────────────────────────────────────
+
+class BeatSequence:
+    """
+    A beat train rendered from a BPM schedule: every beat is the PCHIP beat
+    template time-warped to that beat's RR interval and sampled at
+    `sample_rate_hz`. Samples are produced on demand (render(), chunks()),
+    keeping only the beats that overlap the next chunk, so a 24-hour profile
+    streams in constant memory.
+
+    Beat timing is drawn beat by beat from the schedule (and a seeded RNG for
+    `variability`), so the output does not depend on the chunk sizes it is
+    read in. Warping is linear unless `systole_fraction` (the template's
+    systolic share at `template_bpm`) is given: systole then lasts
+    ∝ sqrt(RR) (Bazett) and diastole takes up the rest of the beat.
+
+    A template may return several channels for one phase (e.g. a PchipBatch
+    of ABP and CVP), which then share every beat's timing; render() returns
+    (channels, n) for it. A `rhythm` replaces scheduled beats with disturbed
+    ones (see BeatRhythm).
+
+    set_template() swaps the template from the next beat on; it may be called
+    from another thread while rendering.
+    """
+
+    def __init__(self, template: BeatTemplate, schedule: BpmSchedule, sample_rate_hz: float,
+                 variability: BeatVariability | None = None,
+                 seed: int | np.random.SeedSequence | None = None,
+                 systole_fraction: float | None = None, template_bpm: float = 60.0,
+                 rhythm: BeatRhythm | None = None):
+        if sample_rate_hz <= 0:
+            raise ValueError(f"Sample rate must be positive, got {sample_rate_hz}")
+        if systole_fraction is not None and not 0 < systole_fraction < 1:
+            raise ValueError(f"systole_fraction must be in (0, 1), got {systole_fraction}")
+        _check_bpm(template_bpm)
+        self._template = template
+        self._template_lock = threading.Lock()
+        self._schedule = schedule
+        self._rate = float(sample_rate_hz)
+        self._variability = variability
+        self._rng = np.random.default_rng(seed)
+        self._noise = np.empty(0)
+        self._z = None
+        self._systole_fraction = systole_fraction
+        self._template_rr_s = 60.0 / template_bpm
+        self._rhythm = rhythm
+
+        # Beats overlapping the samples still to render: (start, length) in samples,
+        # systolic fraction, template, amplitude, pressure at the beat's start
+        self._beats = deque()
+        self._next_beat_s = 0.0
+        self._end_sample = None         # known once the schedule has run out
+        self._samples_rendered = 0
+        self._beats_started = 0         # beats with samples rendered
+
+    @classmethod
+    def from_heart_beat_model(cls, heart_beat_model, schedule: BpmSchedule, sample_rate_hz: float,
+                              waveforms: Sequence[str] | None = None, **kwargs) -> "BeatSequence":
+        """
+        A sequence of the model's current ABP beat, or of its `waveforms` (one
+        row each, on shared beat timing); the model's heart rate is the template's.
+        """
+        kwargs.setdefault('template_bpm', heart_beat_model.get_heart_rate_bpm())
+        template = (heart_beat_model.get_beat_interpolator() if waveforms is None
+                    else heart_beat_model.get_waveforms_interpolator(list(waveforms)))
+        return cls(template, schedule, sample_rate_hz, **kwargs)
+
+    @classmethod
+    def from_samples(cls, beat: np.ndarray, schedule: BpmSchedule, sample_rate_hz: float,
+                     **kwargs) -> "BeatSequence":
+        """A sequence of one sampled beat (sample j at phase j / len), PCHIP-interpolated."""
+        beat = np.asarray(beat, dtype=np.float64)
+        if len(beat) < 2:
+            raise ValueError("A beat template needs at least 2 samples")
+        return cls(PchipInterpolator(np.arange(len(beat)) / len(beat), beat), schedule,
+                   sample_rate_hz, **kwargs)
+
+    @property
+    def sample_rate_hz(self) -> float:
+        return self._rate
+
+    @property
+    def duration_s(self) -> float | None:
+        return self._schedule.duration_s
+
+    @property
+    def samples_rendered(self) -> int:
+        return self._samples_rendered
+
+    @property
+    def beats_rendered(self) -> int:
+        return self._beats_started
+
+    @property
+    def finished(self) -> bool:
+        return self._end_sample is not None and self._samples_rendered >= self._end_sample
+
+    def set_template(self, template: BeatTemplate):
+        """Use `template` from the next beat on (every beat queued so far has already started)."""
+        with self._template_lock:
+            self._template = template
+
+    def render(self, num_samples: int) -> np.ndarray:
+        """The next (up to) `num_samples` pressure samples; fewer only at the end of the schedule."""
+        start = self._samples_rendered
+        stop = start + max(0, int(num_samples))
+        self._queue_beats(stop)
+        if self._end_sample is not None:
+            stop = min(stop, self._end_sample)
+        if stop <= start:
+            return np.empty(self._channel_shape() + (0,))
+
+        beats = self._beats
+        starts = np.fromiter((b[0] for b in beats), dtype=np.float64, count=len(beats))
+        lengths = np.fromiter((b[1] for b in beats), dtype=np.float64, count=len(beats))
+        index = np.arange(start, stop, dtype=np.float64)
+        beat = np.searchsorted(starts, index, side='right') - 1
+        np.maximum(beat, 0, out=beat)
+        # Per sample: its beat's phase, time-warped to the template's
+        phase = (index - starts[beat]) / lengths[beat]
+        np.clip(phase, 0.0, np.nextafter(1.0, 0.0), out=phase)
+        if self._systole_fraction is not None:
+            systole = np.fromiter((b[2] for b in beats), dtype=np.float64, count=len(beats))[beat]
+            s0 = self._systole_fraction
+            phase = np.where(phase < systole, phase * (s0 / systole),
+                             s0 + (phase - systole) * ((1.0 - s0) / (1.0 - systole)))
+
+        templates = [b[3] for b in beats]
+        if all(template is templates[0] for template in templates):
+            out = np.asarray(templates[0](phase), dtype=np.float64)
+        else:
+            # A template swap inside this chunk: evaluate each template on its own beats
+            out = None
+            for template in dict.fromkeys(templates):
+                mask = np.isin(beat, [i for i, t in enumerate(templates) if t is template])
+                values = np.asarray(template(phase[mask]), dtype=np.float64)
+                if out is None:
+                    out = np.empty(values.shape[:-1] + phase.shape)
+                out[..., mask] = values
+
+        amplitudes = np.fromiter((b[4] for b in beats), dtype=np.float64, count=len(beats))
+        if np.any(amplitudes != 1.0):
+            # Only samples of scaled beats are touched, so the others do not depend on chunking
+            amplitude = amplitudes[beat]
+            scaled = amplitude != 1.0
+            reference = next(b[5] for b in beats if b[5] is not None)
+            bases = np.stack([reference if b[5] is None else b[5] for b in beats], axis=-1)
+            base = bases[..., beat[scaled]]
+            out[..., scaled] = base + amplitude[scaled] * (out[..., scaled] - base)
+
+        self._beats_started += int(np.count_nonzero((starts >= start) & (starts < stop)))
+        self._samples_rendered = stop
+        # Beats ending before the next sample are done
+        while len(beats) > 1 and beats[1][0] <= stop:
+            beats.popleft()
+        return out
+
+    def chunks(self, chunk_samples: int) -> Iterator[np.ndarray]:
+        """Render until the schedule ends (forever for an endless one), `chunk_samples` at a time."""
+        while True:
+            chunk = self.render(chunk_samples)
+            if chunk.shape[-1] == 0:
+                return
+            yield chunk
+
+    def _channel_shape(self) -> tuple:
+        with self._template_lock:
+            template = self._template
+        return np.shape(template(np.zeros(1)))[:-1]
+
+    def _queue_beats(self, stop: int):
+        """Draw beats until they cover samples up to `stop`, or the schedule ends."""
+        duration = self._schedule.duration_s
+        while self._end_sample is None and (not self._beats or self._beats[-1][0] + self._beats[-1][1] < stop):
+            t = self._next_beat_s
+            if duration is not None and t >= duration:
+                self._end_sample = int(math.ceil(t * self._rate - 1e-9))
+                break
+            rr = 60.0 / self._schedule.bpm_at(t)
+            if self._variability is not None:
+                rr *= max(0.1, 1.0 + self._variability.sdnn_fraction * self._next_noise())
+            with self._template_lock:
+                template = self._template
+            played = self._rhythm.beats(t, rr) if self._rhythm is not None else ((rr, 1.0),)
+            for rr, amplitude in played:
+                systole = None
+                if self._systole_fraction is not None:
+                    systole = min(max(self._systole_fraction * math.sqrt(self._template_rr_s / rr),
+                                      MIN_SYSTOLE_FRACTION), MAX_SYSTOLE_FRACTION)
+                base = None if amplitude == 1.0 else np.asarray(template(np.zeros(1)), dtype=np.float64)[..., 0]
+                self._beats.append((t * self._rate, rr * self._rate, systole, template, amplitude, base))
+                t += rr
+            self._next_beat_s = t
+
+    def _next_noise(self) -> float:
+        if not len(self._noise):
+            self._noise = self._rng.standard_normal(VARIABILITY_BLOCK)
+        e, self._noise = self._noise[0], self._noise[1:]
+        rho = self._variability.correlation
+        # The first beat draws from the stationary distribution straight away
+        self._z = e if self._z is None else rho * self._z + math.sqrt(1.0 - rho * rho) * e
+        return self._z
+
+
+class BeatSequenceSource(SampleSource):
+    """
+    A BeatSequence as DAQ output volts: one row per (output channel, template
+    row) pair of `outputs` (row 0 for a single-channel template), converted
+    with `to_volts(channel, pressure)` (which may convert in place); a channel
+    without a row holds `reference_v`.
+    """
+
+    def __init__(self, sequence: BeatSequence, outputs: Sequence[tuple[str, int | None]],
+                 to_volts: Callable[[str, np.ndarray], np.ndarray], reference_v: float = 0.0):
+        self._sequence = sequence
+        self._outputs = list(outputs)
+        self._to_volts = to_volts
+        self._reference_v = reference_v
+        rows = [row for _, row in self._outputs if row is not None]
+        # A row played on two outputs is converted from a copy, not twice in place
+        self._shared_rows = {row for row in rows if rows.count(row) > 1}
+
+    @property
+    def sequence(self) -> BeatSequence:
+        return self._sequence
+
+    @property
+    def num_channels(self) -> int:
+        return len(self._outputs)
+
+    def read(self, num_samples: int) -> np.ndarray | None:
+        pressure = self._sequence.render(num_samples)
+        if not pressure.shape[-1]:
+            return None
+        pressure = pressure.reshape(-1, pressure.shape[-1])
+        out = np.empty((len(self._outputs), pressure.shape[-1]))
+        for index, (channel, row) in enumerate(self._outputs):
+            if row is None:
+                out[index] = self._reference_v
+            else:
+                out[index] = self._to_volts(channel, pressure[row].copy() if row in self._shared_rows
+                                            else pressure[row])
+        return out
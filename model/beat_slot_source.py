@@ -0,0 +1,95 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .daq_stream_writer import SampleSource
+
+
+@dataclass(frozen=True)
+class WaveformSwitch:
+    """A queued waveform taking over the output stream."""
+    sample_index: int        # stream position of the first sample of the new waveform
+    queued_at: float         # time.perf_counter() when it was queued
+    written_at: float        # time.perf_counter() when the block containing it was produced
+
+
+class DoubleBufferedBeatSource(SampleSource):
+    """
+    Endless sample stream that loops one waveform (a beat, or a whole recording)
+    from an active slot, with a second, pending slot for its replacement.
+
+    queue() only fills the pending slot; read() keeps looping the active slot
+    and promotes the pending one exactly at the next loop boundary (or at the
+    next sample with at_boundary=False), so the output never tears mid-beat and
+    never pauses. Every promotion is recorded as a WaveformSwitch with its
+    stream position, for latency reporting by the writer.
+    """
+
+    def __init__(self, waveform: np.ndarray):
+        self._lock = threading.Lock()
+        self._active = self._as_channels(waveform)
+        self._position = 0                 # index into the active waveform
+        self._samples_read = 0             # stream position
+        self._pending = None               # (waveform, at_boundary, queued_at)
+        self._switches: list[WaveformSwitch] = []
+
+    @property
+    def num_channels(self) -> int:
+        return self._active.shape[0]
+
+    @property
+    def samples_read(self) -> int:
+        return self._samples_read
+
+    @property
+    def has_pending(self) -> bool:
+        return self._pending is not None
+
+    def queue(self, waveform: np.ndarray, at_boundary: bool = True):
+        """Replace the pending slot; a waveform queued before the previous one went live supersedes it."""
+        waveform = self._as_channels(waveform)
+        if waveform.shape[0] != self._active.shape[0]:
+            raise ValueError(f"Expected {self._active.shape[0]} channels, got {waveform.shape[0]}")
+        with self._lock:
+            self._pending = (waveform, at_boundary, time.perf_counter())
+
+    def read(self, num_samples: int) -> np.ndarray:
+        """The next `num_samples` of the stream, shape (channels, num_samples), C-contiguous."""
+        out = np.empty((self._active.shape[0], num_samples), dtype=np.float64)
+        now = time.perf_counter()
+        with self._lock:
+            filled = 0
+            while filled < num_samples:
+                if self._pending is not None and (self._position == 0 or not self._pending[1]):
+                    self._promote(self._samples_read + filled, now)
+                length = self._active.shape[1]
+                take = min(num_samples - filled, length - self._position)
+                out[:, filled:filled + take] = self._active[:, self._position:self._position + take]
+                filled += take
+                self._position = (self._position + take) % length
+            self._samples_read += num_samples
+        return out
+
+    def pop_switches(self) -> list[WaveformSwitch]:
+        with self._lock:
+            switches, self._switches = self._switches, []
+        return switches
+
+    def _promote(self, sample_index: int, now: float):
+        waveform, _, queued_at = self._pending
+        self._pending = None
+        self._active = waveform
+        self._position = 0
+        self._switches.append(WaveformSwitch(sample_index, queued_at, now))
+
+    @staticmethod
+    def _as_channels(waveform: np.ndarray) -> np.ndarray:
+        waveform = np.atleast_2d(np.asarray(waveform, dtype=np.float64))
+        if waveform.shape[1] == 0:
+            raise ValueError("Cannot stream an empty waveform")
+        return waveform
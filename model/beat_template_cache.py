@@ -0,0 +1,111 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import threading
+from collections import OrderedDict
+from typing import Hashable
+
+import numpy as np
+
+DEFAULT_MAX_TEMPLATE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class BeatTemplateCache:
+    """
+    Bounded in-memory LRU of rendered beat templates.
+
+    Entries are keyed by whatever identifies a rendering, typically the
+    reference point set and the number of samples per beat, and hold the
+    evaluated samples. Stored arrays are made read-only so they can be handed
+    out to any number of consumers without copying; anyone who needs to edit
+    one copies it first. The total size of the stored arrays is bounded by
+    `max_bytes`, least recently used entries are evicted first.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_TEMPLATE_CACHE_BYTES):
+        if max_bytes < 0:
+            raise ValueError(f"Cache size must not be negative, got {max_bytes} B")
+        self._max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, np.ndarray] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self._max_bytes,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        # A membership test is not a use: neither counted nor refreshed
+        with self._lock:
+            return key in self._entries
+
+    # ── Public API ─────────────────────────────────────────────────────────
+
+    def get(self, key: Hashable) -> np.ndarray | None:
+        """The read-only template stored under `key`, or None on a miss."""
+        with self._lock:
+            template = self._entries.get(key)
+            if template is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return template
+
+    def put(self, key: Hashable, template: np.ndarray) -> np.ndarray:
+        """
+        Store `template` under `key` and return it frozen in place (read-only,
+        not copied): the cache takes ownership, so the caller must not keep a
+        writeable view of it. A template larger than the whole cache is
+        returned frozen but not stored.
+        """
+        template = np.asarray(template)
+        template.setflags(write=False)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            if template.nbytes > self._max_bytes:
+                logger.debug(f"Beat template of {template.nbytes} B exceeds the cache size, not stored")
+                return template
+            self._entries[key] = template
+            self._bytes += template.nbytes
+            self._evict()
+        return template
+
+    def clear(self):
+        """Drop every entry; the statistics are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def set_max_bytes(self, max_bytes: int):
+        if max_bytes < 0:
+            raise ValueError(f"Cache size must not be negative, got {max_bytes} B")
+        with self._lock:
+            self._max_bytes = int(max_bytes)
+            self._evict()
+
+    # ── Internal ───────────────────────────────────────────────────────────
+
+    def _evict(self):
+        while self._bytes > self._max_bytes and self._entries:
+            _, template = self._entries.popitem(last=False)
+            self._bytes -= template.nbytes
+            self._evictions += 1
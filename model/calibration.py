@@ -0,0 +1,185 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import toml
+
+from .settings_manager import settings_dir
+from .transducer_model import BRIDGE_GAIN_V_PER_MM_HG
+
+CALIBRATION_FILENAME = "calibration.toml"
+DEFAULT_CHANNELS = ("ao0", "ao1")
+DEFAULT_OUTPUT_RANGE_V = (-10.0, 10.0)
+
+
+@dataclass(frozen=True)
+class ChannelCalibration:
+    """
+    mmHg → volts for one output channel:
+        volts = c0 + c1*p + c2*p**2 + ...   clipped to [min_v, max_v]
+    A plain gain/offset is the two-coefficient case.
+    """
+    coefficients: tuple[float, ...]
+    min_v: float = DEFAULT_OUTPUT_RANGE_V[0]
+    max_v: float = DEFAULT_OUTPUT_RANGE_V[1]
+
+    @classmethod
+    def linear(cls, gain: float, offset: float = 0.0, **limits) -> "ChannelCalibration":
+        return cls((float(offset), float(gain)), **limits)
+
+    @classmethod
+    def from_config(cls, entry: dict) -> "ChannelCalibration":
+        """A [channels.<name>] table: either `coefficients = [c0, c1, ...]` or `gain`/`offset`."""
+        limits = {key: float(entry[key]) for key in ('min_v', 'max_v') if key in entry}
+        if 'coefficients' in entry:
+            coefficients = tuple(float(c) for c in entry['coefficients'])
+            if not coefficients:
+                raise ValueError("Calibration 'coefficients' must not be empty")
+            return cls(coefficients, **limits)
+        return cls.linear(float(entry.get('gain', BRIDGE_GAIN_V_PER_MM_HG)),
+                          float(entry.get('offset', 0.0)), **limits)
+
+    def to_config(self) -> dict:
+        return {'coefficients': list(self.coefficients), 'min_v': self.min_v, 'max_v': self.max_v}
+
+
+class Calibration:
+    """
+    Per-channel calibration table that converts whole pressure buffers to DAC
+    volts in place (float32 or float64), with clip/saturation counters.
+    """
+
+    def __init__(self, channels: dict[str, ChannelCalibration]):
+        self._channels = dict(channels)
+        self._lock = threading.Lock()
+        self._stats = {name: {'samples': 0, 'clipped_low': 0, 'clipped_high': 0}
+                       for name in self._channels}
+
+    @classmethod
+    def bridge_default(cls, channels=DEFAULT_CHANNELS) -> "Calibration":
+        """Every channel drives the R1-R4 bridge: one gain, no offset."""
+        return cls({name: ChannelCalibration.linear(BRIDGE_GAIN_V_PER_MM_HG) for name in channels})
+
+    @property
+    def channels(self) -> list[str]:
+        return list(self._channels)
+
+    def __getitem__(self, channel: str) -> ChannelCalibration:
+        return self._channels[channel]
+
+    def convert(self, channel: str, data_mm_hg: np.ndarray, out: np.ndarray | None = None,
+                scale: float = 1.0, counts: dict | None = None) -> np.ndarray:
+        """
+        Volts for `data_mm_hg` on `channel`, written to `out` (which may be
+        `data_mm_hg` itself for an in-place conversion); `scale` multiplies the
+        volts before clipping. Float input keeps its dtype, anything else
+        becomes float64. This call's samples and clipped_low/clipped_high are
+        added to `counts` if given: stats() mixes every thread's conversions.
+        """
+        calibration = self._channels[channel]
+        data = np.asarray(data_mm_hg)
+        if out is None:
+            out = np.empty(data.shape, dtype=data.dtype if data.dtype.kind == 'f' else np.float64)
+        coefficients = calibration.coefficients
+        gain = coefficients[1] * scale if len(coefficients) > 1 else 0.0
+        offset = coefficients[0] * scale
+
+        if len(coefficients) <= 2:
+            np.multiply(data, gain, out=out)
+            if offset:
+                np.add(out, offset, out=out)
+        else:
+            # Horner from the highest order; keep the input if it is also the output
+            x = data.copy() if np.shares_memory(data, out) else data
+            out[...] = coefficients[-1] * scale
+            for c in reversed(coefficients[:-1]):
+                np.multiply(out, x, out=out)
+                np.add(out, c * scale, out=out)
+
+        low, high = self._clip(channel, calibration, out)
+        if counts is not None:
+            counts['samples'] = counts.get('samples', 0) + out.size
+            counts['clipped_low'] = counts.get('clipped_low', 0) + low
+            counts['clipped_high'] = counts.get('clipped_high', 0) + high
+        return out
+
+    def convert_value(self, channel: str, pressure_mm_hg: float, scale: float = 1.0) -> float:
+        return float(self.convert(channel, np.array([pressure_mm_hg], dtype=np.float64), scale=scale)[0])
+
+    def stats(self) -> dict:
+        """Per channel: samples converted and how many hit the low/high output limit."""
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._stats.items()}
+
+    def reset_stats(self):
+        with self._lock:
+            for counts in self._stats.values():
+                counts.update(samples=0, clipped_low=0, clipped_high=0)
+
+    def _clip(self, channel: str, calibration: ChannelCalibration, out: np.ndarray) -> tuple[int, int]:
+        low = high = 0
+        # Two reductions are cheap; only count (and allocate masks) when something saturates
+        if out.size and out.min() < calibration.min_v:
+            low = int(np.count_nonzero(out < calibration.min_v))
+        if out.size and out.max() > calibration.max_v:
+            high = int(np.count_nonzero(out > calibration.max_v))
+        if low or high:
+            np.clip(out, calibration.min_v, calibration.max_v, out=out)
+            logger.debug(f"Calibration {channel}: {low + high} of {out.size} samples clipped")
+        with self._lock:
+            counts = self._stats[channel]
+            counts['samples'] += out.size
+            counts['clipped_low'] += low
+            counts['clipped_high'] += high
+        return low, high
+
+
+# Parsed calibration files by path, reloaded only when the file changes
+_cache: dict[Path, tuple[int | None, Calibration]] = {}
+_cache_lock = threading.Lock()
+
+
+def calibration_path() -> Path:
+    return settings_dir() / CALIBRATION_FILENAME
+
+
+def load_calibration(path: Path | None = None) -> Calibration:
+    """
+    The calibration in `path` (calibration.toml next to the settings by
+    default), or the R1-R4 bridge default if there is none. Channels missing
+    from the file keep the default. Cached until the file's mtime changes.
+    """
+    path = Path(path) if path is not None else calibration_path()
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = None
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+    if mtime_ns is None:
+        calibration = Calibration.bridge_default()
+        with _cache_lock:
+            _cache[path] = (mtime_ns, calibration)
+        return calibration
+
+    channels = {name: ChannelCalibration.linear(BRIDGE_GAIN_V_PER_MM_HG) for name in DEFAULT_CHANNELS}
+    try:
+        with open(path, "r") as file:
+            config = toml.load(file)
+        for name, entry in config.get('channels', {}).items():
+            channels[name] = ChannelCalibration.from_config(entry)
+    except (OSError, ValueError, TypeError, KeyError, toml.TomlDecodeError) as e:
+        logger.warning(f"Calibration file {path} is invalid, using the bridge default: {e}")
+        return Calibration.bridge_default()
+    calibration = Calibration(channels)
+    logger.info(f"Calibration loaded from {path}: "
+                + ", ".join(f"{name} {c.coefficients}" for name, c in channels.items()))
+    with _cache_lock:
+        _cache[path] = (mtime_ns, calibration)
+    return calibration
@@ -0,0 +1,192 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .usb_hotplug import HotplugMonitor
+
+# Called with the number of samples in the interval; runs on a driver/backend thread
+EveryNSamplesCallback = Callable[[int], None]
+
+
+class DaqBackendError(Exception):
+    """A DAQ operation failed."""
+
+
+class DaqUnderflowError(DaqBackendError):
+    """A non-regenerating output ran out of samples: the output has a gap."""
+
+
+class DaqRangeError(DaqBackendError):
+    """A value outside the channel's configured output range was written."""
+
+
+class DaqDeviceRemovedError(DaqBackendError):
+    """The device disappeared while a task was using it."""
+
+
+class DaqOverflowError(DaqBackendError):
+    """An input task was not read fast enough: acquired samples were overwritten."""
+
+
+def ao_sample_clock_terminal(device_name: str) -> str:
+    """Terminal of the device's analog output sample clock, for input tasks that share it."""
+    return f"/{device_name}/ao/SampleClock"
+
+
+@dataclass(frozen=True)
+class DaqDeviceInfo:
+    name: str               # driver device name, e.g. "Dev1"
+    vendor_id: int
+    product_id: int
+    serial: str = ""
+    max_ao_rate_hz: float | None = None     # fastest analog output update rate, if known
+
+
+class DaqOutputTask(ABC):
+    """
+    One analog output task: a set of channels sharing a sample clock.
+    Mirrors the subset of an nidaqmx Task the application uses; data is always
+    (channels, samples) volts.
+
+    Tasks are reusable: after stop() the next run starts with an empty buffer
+    and total_samples_generated back at 0, without recreating the channels.
+    """
+
+    @property
+    @abstractmethod
+    def num_channels(self) -> int:
+        ...
+
+    @property
+    @abstractmethod
+    def total_samples_generated(self) -> int:
+        """Samples per channel that have left the device since start()."""
+
+    @abstractmethod
+    def configure_timing(self, rate_hz: float, buffer_samples: int, regenerate: bool):
+        """Continuous, hardware-timed output; `regenerate` loops the buffer instead of streaming."""
+
+    @abstractmethod
+    def register_every_n_samples_event(self, num_samples: int, callback: EveryNSamplesCallback):
+        """
+        Call `callback` each time another `num_samples` have been transferred.
+        Before start(); replaces any previous registration.
+        """
+
+    @abstractmethod
+    def write(self, data: np.ndarray, timeout_s: float = 10.0) -> int:
+        """Queue samples, blocking while the buffer is full. Returns samples per channel written."""
+
+    @abstractmethod
+    def write_static(self, values: np.ndarray):
+        """Software-timed: drive each channel to one value immediately."""
+
+    def commit(self):
+        """
+        Reserve the channels and program the hardware now, so start() only has
+        to arm the clock. The task keeps the reservation across stop()/start().
+        """
+
+    def unreserve(self):
+        """Give up the reservation so another task can use the channels; the configuration stays."""
+
+    @abstractmethod
+    def start(self):
+        ...
+
+    @abstractmethod
+    def stop(self):
+        ...
+
+    @abstractmethod
+    def close(self):
+        ...
+
+
+class DaqInputTask(ABC):
+    """
+    One analog input task: a set of channels sharing a sample clock, read as
+    (channels, samples) volts. Reusable across stop()/start() like an output
+    task; each run counts samples from 0.
+    """
+
+    @property
+    @abstractmethod
+    def num_channels(self) -> int:
+        ...
+
+    @property
+    @abstractmethod
+    def total_samples_acquired(self) -> int:
+        """Samples per channel acquired since start()."""
+
+    @property
+    @abstractmethod
+    def samples_available(self) -> int:
+        """Samples per channel acquired but not read yet."""
+
+    @abstractmethod
+    def configure_timing(self, rate_hz: float, buffer_samples: int, clock_source: str | None = None):
+        """
+        Continuous, hardware-timed acquisition into a `buffer_samples` deep
+        buffer. With `clock_source` (e.g. ao_sample_clock_terminal()) a sample
+        is taken on every tick of that clock instead of the task's own, so
+        input sample k lines up with output sample k of a task started later.
+        """
+
+    @abstractmethod
+    def read(self, num_samples: int, timeout_s: float = 10.0) -> np.ndarray:
+        """
+        The next `num_samples`, blocking until they are acquired. Raises
+        DaqOverflowError if unread samples were overwritten.
+        """
+
+    @abstractmethod
+    def start(self):
+        ...
+
+    @abstractmethod
+    def stop(self):
+        ...
+
+    @abstractmethod
+    def close(self):
+        ...
+
+
+class DaqBackend(ABC):
+    """Driver interface: device discovery plus output (and input) task creation."""
+
+    @abstractmethod
+    def find_device(self) -> DaqDeviceInfo | None:
+        """The attached device, or None if it is not plugged in."""
+
+    def list_devices(self) -> list[DaqDeviceInfo]:
+        """Every attached device this backend can drive; find_device() alone unless overridden."""
+        device = self.find_device()
+        return [device] if device is not None else []
+
+    def for_device(self, name: str) -> "DaqBackend":
+        """
+        A backend whose find_device(), tasks and hot-plug monitor concern only
+        the device `name` (as listed by list_devices()), so several units can
+        be driven side by side.
+        """
+        return self
+
+    @abstractmethod
+    def create_output_task(self, channels: list[str], min_val: float = -10.0,
+                           max_val: float = 10.0) -> DaqOutputTask:
+        ...
+
+    def create_input_task(self, channels: list[str], min_val: float = -10.0,
+                          max_val: float = 10.0) -> DaqInputTask:
+        raise DaqBackendError(f"{type(self).__name__} has no analog input")
+
+    def create_hotplug_monitor(self, poll_interval_s: float = 1.0) -> "HotplugMonitor":
+        """Arrival/removal notifications for the device; polls find_device() unless overridden."""
+        from .usb_hotplug import PollingHotplugMonitor
+        return PollingHotplugMonitor(self.find_device, poll_interval_s)
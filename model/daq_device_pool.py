@@ -0,0 +1,201 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, Signal
+
+from model.abp_waveform_file_model import AbpWaveformFileModel
+from model.calibration import Calibration, load_calibration
+from model.daq_backend import DaqBackend
+from model.heart_beat_model import HeartBeatModel
+from model.ni6216daqmx_model import Ni6216DaqMx
+from model.usb_hotplug import HotplugEvent
+
+# Queued on the discovery thread by rescan()
+_RESCAN = "rescan"
+
+
+class DaqDevicePool(QObject):
+    """
+    One Ni6216DaqMx per attached DAQ unit. Each has its own connection thread,
+    tasks, stream writer and generation state, and is fed from the shared beat
+    and recording models (or its own start_generation(source)). A discovery
+    thread adds units plugged in later, on the backend's hot-plug notifications
+    and a slow rescan.
+
+    start_all()/stop_all() fan out to a thread pool. N units then start in
+    about the time one takes, and the caller (the GUI thread) never waits on
+    a device. Units share no lock.
+
+    There is no placeholder unit for a device not yet plugged in: a guessed name
+    ("Dev1") and the unit found later under its real name would both claim it.
+    """
+    device_added = Signal(str)
+    status_message = Signal(str)
+    _discovered = Signal(list)      # discovery thread → owner thread, which creates the units
+
+    def __init__(self, heart_beat_model: HeartBeatModel,
+                 abp_waveform_file_model: AbpWaveformFileModel,
+                 backend: DaqBackend | None = None,
+                 calibration: Calibration | None = None, parent=None):
+        super().__init__(parent)
+        if backend is None:
+            from model.ni_daq_backend import NiDaqBackend     # needs nidaqmx + pyusb
+            backend = NiDaqBackend()
+        self._backend = backend
+        self._heart_beat_model = heart_beat_model
+        self._waveform_file_model = abp_waveform_file_model
+        # One calibration for every unit until units get their own
+        self._calibration = calibration if calibration is not None else load_calibration()
+        self._devices: dict[str, Ni6216DaqMx] = {}     # replaced, never mutated: read from any thread
+        self._sample_rate_hz = None
+        self._stop_event = threading.Event()
+        self._events = queue.Queue()
+        self._discovery_failing = False
+        self._executor = ThreadPoolExecutor(thread_name_prefix="DaqPool")
+
+        self.ACTIVE_SEARCH_SLEEP_S = 1
+        # Units are looked for at every arrival notification, and at least this often
+        self.DISCOVERY_INTERVAL_S = 5.0
+
+        self._discovered.connect(self._add_devices)
+        # Only units actually attached: with none at start-up, the pool starts empty and
+        # the first one plugged in is added under the name the driver gives it
+        self._add_devices(self._discover())
+
+        self._hotplug_monitor = self._backend.create_hotplug_monitor(self.ACTIVE_SEARCH_SLEEP_S)
+        self._thread = threading.Thread(target=self._run, name="DaqDiscovery", daemon=True)
+        self._thread.start()
+
+    @property
+    def device_names(self) -> list[str]:
+        return list(self._devices)
+
+    @property
+    def devices(self) -> list[Ni6216DaqMx]:
+        return list(self._devices.values())
+
+    def device(self, name: str) -> Ni6216DaqMx:
+        return self._devices[name]
+
+    @property
+    def is_connected(self) -> bool:
+        return any(device.is_connected for device in self.devices)
+
+    @property
+    def is_generating(self) -> bool:
+        return any(device.is_generating for device in self.devices)
+
+    @property
+    def sample_rate_hz(self) -> float:
+        if self._sample_rate_hz is not None:
+            return self._sample_rate_hz
+        devices = self.devices
+        return devices[0].sample_rate_hz if devices else 0.0
+
+    def set_sample_rate_hz(self, rate_hz: float):
+        """
+        Output rate of every unit, and of units added later. Raises ValueError,
+        changing nothing, if any unit cannot run at it.
+        """
+        rate_hz = float(rate_hz)
+        for device in self.devices:
+            if not 0 < rate_hz <= device.MAX_AO_RATE_HZ:
+                raise ValueError(f"{device.device_name}: output rate must be in "
+                                 f"(0, {device.MAX_AO_RATE_HZ:g}] Hz, got {rate_hz:g}")
+        self._sample_rate_hz = rate_hz
+        for device in self.devices:
+            device.set_sample_rate_hz(rate_hz)
+
+    def start_all(self) -> list[Future]:
+        """Start waveform output on every connected unit, in parallel; returns without waiting."""
+        return [self._executor.submit(device.start_generation)
+                for device in self.devices if device.is_connected]
+
+    def stop_all(self) -> list[Future]:
+        """Stop every unit's output, in parallel; returns without waiting."""
+        return [self._executor.submit(device.stop_generation)
+                for device in self.devices if device.is_generating]
+
+    def rescan(self):
+        """Look for newly attached units now, on the discovery thread."""
+        self._events.put(_RESCAN)
+
+    def health_snapshot(self) -> dict:
+        """Health metrics of every unit, by device name."""
+        return {name: device.health_snapshot() for name, device in self._devices.items()}
+
+    def stop(self):
+        self._stop_event.set()
+        if self._hotplug_monitor.event_driven:
+            self._hotplug_monitor.stop()
+        self._events.put(None)
+        self._thread.join()
+        for future in [self._executor.submit(device.stop) for device in self.devices]:
+            try:
+                future.result()
+            except Exception as e:
+                logger.warning(f"DAQ pool: stopping a device failed: {e}")
+        self._executor.shutdown()
+
+    def _run(self):
+        # A polling monitor would only repeat the periodic rescan
+        if self._hotplug_monitor.event_driven:
+            try:
+                self._hotplug_monitor.start(self._events.put, self._events.put)
+            except Exception as e:
+                logger.warning(f"DAQ pool: no hot-plug notifications, rescanning every "
+                               f"{self.DISCOVERY_INTERVAL_S:g} s: {e}")
+        while not self._stop_event.is_set():
+            try:
+                item = self._events.get(timeout=self.DISCOVERY_INTERVAL_S)
+            except queue.Empty:
+                item = _RESCAN
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                logger.debug(f"DAQ pool: hot-plug monitor error: {item}")
+                continue
+            if isinstance(item, HotplugEvent) and not item.present:
+                continue            # the unit's own connection thread handles removal
+            new = [name for name in self._discover() if name not in self._devices]
+            if new:
+                self._discovered.emit(new)
+
+    def _discover(self) -> list[str]:
+        try:
+            names = [device.name for device in self._backend.list_devices()]
+        except Exception as e:
+            # Once per failure streak, not every rescan
+            (logger.debug if self._discovery_failing else logger.warning)(
+                f"DAQ pool: device discovery failed: {e}")
+            self._discovery_failing = True
+            return []
+        self._discovery_failing = False
+        return names
+
+    def _add_devices(self, names: list[str]):
+        """Create a unit per new name; on the pool's own thread, where the shared models live."""
+        for name in names:
+            if name in self._devices or self._stop_event.is_set():
+                continue
+            try:
+                backend = self._backend.for_device(name)
+            except Exception as e:
+                logger.warning(f"DAQ pool: cannot drive {name}: {e}")
+                continue
+            device = Ni6216DaqMx(self._heart_beat_model, self._waveform_file_model, backend=backend,
+                                 calibration=self._calibration, device_name=name)
+            if self._sample_rate_hz is not None:
+                try:
+                    device.set_sample_rate_hz(self._sample_rate_hz)
+                except ValueError as e:
+                    logger.warning(f"DAQ pool: {name} keeps {device.sample_rate_hz:g} S/s: {e}")
+            self._devices = {**self._devices, name: device}
+            msg = f"DAQ pool: {name} added ({len(self._devices)} device(s))."
+            logger.info(msg)
+            self.status_message.emit(msg)
+            self.device_added.emit(name)
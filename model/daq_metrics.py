@@ -0,0 +1,137 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import csv
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+# Cumulative counters reported as a per-second rate as well: counter → rate column
+RATE_COUNTERS = {'samples_written': 'write_rate_sps'}
+
+
+class DaqMetrics:
+    """
+    Samples a health snapshot (a flat dict of numbers and short strings) at a
+    fixed rate on its own thread, keeps a bounded history and exports it as
+    CSV. Ticks run on absolute deadlines so the series does not drift; a late
+    tick is recorded in `sampler_late_ms` and missed ticks are skipped, not
+    made up. mark() attaches an event label (a UI action, a restart) to the
+    next sample, so glitches can be lined up with what preceded them.
+    """
+
+    def __init__(self, snapshot: Callable[[], dict], interval_s: float = 0.1,
+                 history_s: float = 600.0, on_sample: Callable[[dict], None] | None = None):
+        self._snapshot = snapshot
+        self._interval_s = interval_s
+        self._on_sample = on_sample
+        self._history = deque(maxlen=max(1, int(round(history_s / interval_s))))
+        self._pending_events = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._start_time = None
+        self._start_wall = None
+        self._samples = 0
+        self._skipped = 0
+        self._late_max_s = 0.0
+        self._snapshot_s = 0.0
+
+    @property
+    def interval_s(self) -> float:
+        return self._interval_s
+
+    def start(self):
+        self._stop_event.clear()
+        self._start_time = time.perf_counter()
+        self._start_wall = time.time()
+        self._thread = threading.Thread(target=self._run, name="DaqMetrics", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def mark(self, label: str):
+        """Record an event; it appears in the `events` column of the next sample."""
+        with self._lock:
+            self._pending_events.append(label)
+
+    def latest(self) -> dict | None:
+        with self._lock:
+            return dict(self._history[-1]) if self._history else None
+
+    def history(self) -> list[dict]:
+        with self._lock:
+            return [dict(row) for row in self._history]
+
+    def stats(self) -> dict:
+        """The sampler's own health: samples taken, ticks skipped, worst lateness, snapshot cost."""
+        return {
+            'samples': self._samples,
+            'skipped': self._skipped,
+            'interval_s': self._interval_s,
+            'late_max_ms': self._late_max_s * 1e3,
+            'snapshot_avg_ms': self._snapshot_s / self._samples * 1e3 if self._samples else 0.0,
+        }
+
+    def export_csv(self, path: str | Path) -> int:
+        """Write the history as CSV, one row per sample; returns the number of rows."""
+        rows = self.history()
+        columns = []
+        for row in rows:
+            columns.extend(key for key in row if key not in columns)
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=columns, restval="")
+            writer.writeheader()
+            writer.writerows(rows)
+        logger.info(f"DAQ metrics: {len(rows)} samples exported to {path}")
+        return len(rows)
+
+    def _run(self):
+        deadline = self._start_time
+        while not self._stop_event.is_set():
+            deadline += self._interval_s
+            if self._stop_event.wait(max(0.0, deadline - time.perf_counter())):
+                break
+            now = time.perf_counter()
+            late = now - deadline
+            if late >= self._interval_s:
+                missed = int(late // self._interval_s)
+                self._skipped += missed
+                deadline += missed * self._interval_s
+                late -= missed * self._interval_s
+            self._sample(now, late)
+
+    def _sample(self, now: float, late: float):
+        try:
+            values = self._snapshot()
+        except Exception as e:
+            logger.debug(f"DAQ metrics snapshot failed: {e}")
+            values = {'snapshot_error': str(e)}
+        elapsed = now - self._start_time
+        row = {
+            't_s': round(elapsed, 4),
+            'wall_time': datetime.fromtimestamp(self._start_wall + elapsed).isoformat(timespec='milliseconds'),
+            **values,
+            'sampler_late_ms': late * 1e3,
+        }
+        self._snapshot_s += time.perf_counter() - now
+        self._samples += 1
+        self._late_max_s = max(self._late_max_s, late)
+        with self._lock:
+            previous = self._history[-1] if self._history else None
+            for counter, rate_key in RATE_COUNTERS.items():
+                if previous is not None and counter in row and counter in previous:
+                    dt = row['t_s'] - previous['t_s']
+                    row[rate_key] = max(0.0, (row[counter] - previous[counter]) / dt) if dt > 0 else 0.0
+            row['events'] = "; ".join(self._pending_events)
+            self._pending_events.clear()
+            self._history.append(row)
+        if self._on_sample:
+            self._on_sample(row)
@@ -0,0 +1,407 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+import numpy as np
+
+from .daq_backend import DaqOutputTask, DaqUnderflowError
+
+WAKE_HISTORY = 256
+
+
+class SampleSource(ABC):
+    """Pull-based producer of multi-channel output samples for DaqStreamWriter."""
+
+    @property
+    @abstractmethod
+    def num_channels(self) -> int:
+        ...
+
+    @abstractmethod
+    def read(self, num_samples: int) -> np.ndarray | None:
+        """
+        Up to `num_samples` next samples, shape (num_channels, k). Returning fewer
+        samples (or None) marks the end of a finite sequence. Called from the
+        writer thread, so it must not block for longer than the latency target.
+        """
+
+    # A source that needs time to get ready (e.g. to fill a read-ahead): the writer then
+    # primes it, prefills and starts the task on its own thread, so start() never waits
+    deferred_start = False
+
+    def prime(self, timeout_s: float) -> bool:
+        """Wait until read() can be served without gaps; False if not ready within `timeout_s`."""
+        return True
+
+    def close(self):
+        """Release whatever the source holds (threads, files); called once the writer is done with it."""
+
+
+class IterableSampleSource(SampleSource):
+    """
+    Adapts any iterable (e.g. a generator) of (num_channels, k) blocks of
+    arbitrary, varying size into a SampleSource, so long non-periodic
+    sequences can be produced lazily.
+    """
+
+    def __init__(self, blocks: Iterable[np.ndarray], num_channels: int):
+        self._blocks = iter(blocks)
+        self._num_channels = num_channels
+        self._carry = np.empty((num_channels, 0))
+
+    @property
+    def num_channels(self) -> int:
+        return self._num_channels
+
+    def read(self, num_samples: int) -> np.ndarray | None:
+        parts, have = [self._carry], self._carry.shape[1]
+        while have < num_samples:
+            block = next(self._blocks, None)
+            if block is None:
+                break
+            block = np.atleast_2d(np.asarray(block, dtype=np.float64))
+            parts.append(block)
+            have += block.shape[1]
+        data = np.concatenate(parts, axis=1) if len(parts) > 1 else self._carry
+        self._carry = data[:, num_samples:]
+        data = data[:, :num_samples]
+        return data if data.shape[1] else None
+
+
+class PrefetchingSampleSource(SampleSource):
+    """
+    Runs another SampleSource ahead of the writer on its own thread, keeping
+    up to `ahead_samples` rendered in `block_samples` blocks, so read() never
+    waits for an expensive source. If the prefetch thread ever falls behind,
+    read() holds the last sample for the missing part instead of blocking
+    (the stream then runs that much behind the source); each stall is logged
+    once when it starts and once when it ends, and counted in stats().
+    An exception in the source is raised from the next read().
+    """
+
+    deferred_start = True
+
+    def __init__(self, source: SampleSource, block_samples: int, ahead_samples: int):
+        if block_samples < 1 or ahead_samples < block_samples:
+            raise ValueError(f"Need 1 <= block_samples <= ahead_samples, got {block_samples}, {ahead_samples}")
+        self._source = source
+        self._block_samples = int(block_samples)
+        self._ahead_samples = int(ahead_samples)
+        self._condition = threading.Condition()
+        self._blocks = deque()
+        self._available = 0
+        self._exhausted = False
+        self._closed = False
+        self._error = None
+        self._last = np.zeros((source.num_channels, 1))
+        self._stalls = 0                # stall episodes: runs of reads the read-ahead fell short for
+        self._stalled_samples = 0
+        self._stall_samples = None      # samples held so far in the current stall, None if not stalled
+        self._min_available = None
+        self._render_s = 0.0
+        self._renders = 0
+        self._thread = threading.Thread(target=self._run, name="PrefetchingSampleSource", daemon=True)
+        self._thread.start()
+
+    @property
+    def num_channels(self) -> int:
+        return self._source.num_channels
+
+    @property
+    def source(self) -> SampleSource:
+        return self._source
+
+    def prime(self, timeout_s: float) -> bool:
+        """Wait until the read-ahead is full or the source ended; False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._available >= self._ahead_samples or self._exhausted or self._error is not None,
+                timeout_s)
+
+    def read(self, num_samples: int) -> np.ndarray | None:
+        parts, have = [], 0
+        with self._condition:
+            if self._error is not None:
+                raise self._error
+            while have < num_samples and self._blocks:
+                block = self._blocks.popleft()
+                take = min(num_samples - have, block.shape[1])
+                parts.append(block[:, :take])
+                if take < block.shape[1]:
+                    self._blocks.appendleft(block[:, take:])
+                have += take
+            self._available -= have
+            # The read-ahead only drains for good once the source has ended
+            if not self._exhausted and (self._min_available is None or self._available < self._min_available):
+                self._min_available = self._available
+            exhausted = self._exhausted and not self._blocks
+            self._condition.notify()
+        if have:
+            self._last = parts[-1][:, -1:]
+        if self._stall_samples is not None and (have == num_samples or exhausted):
+            logger.warning(f"Prefetch caught up after holding the output for {self._stall_samples} samples")
+            self._stall_samples = None
+        if have < num_samples and not exhausted:
+            missing = num_samples - have
+            self._stalled_samples += missing
+            if self._stall_samples is None:
+                self._stalls += 1
+                self._stall_samples = 0
+                logger.warning("Prefetch fell behind: holding the output until it catches up")
+            self._stall_samples += missing
+            parts.append(np.repeat(self._last, missing, axis=1))
+            have = num_samples
+        if not have:
+            return None
+        return parts[0] if len(parts) == 1 else np.concatenate(parts, axis=1)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                'ahead_samples': self._available,
+                'min_ahead_samples': self._min_available or 0,
+                'stalls': self._stalls,
+                'stalling': self._stall_samples is not None,
+                'stalled_samples': self._stalled_samples,
+                'render_avg_ms': self._render_s / self._renders * 1e3 if self._renders else 0.0,
+                'exhausted': self._exhausted,
+            }
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self._source.close()
+
+    def _run(self):
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(
+                        lambda: self._closed or self._available + self._block_samples <= self._ahead_samples)
+                    if self._closed:
+                        return
+                start = time.perf_counter()
+                block = self._source.read(self._block_samples)
+                self._render_s += time.perf_counter() - start
+                self._renders += 1
+                count = 0 if block is None else block.shape[1]
+                with self._condition:
+                    if count:
+                        self._blocks.append(np.ascontiguousarray(block))
+                        self._available += count
+                    if count < self._block_samples:
+                        self._exhausted = True
+                    self._condition.notify_all()
+                if count < self._block_samples:
+                    return
+        except Exception as e:
+            logger.warning(f"Prefetching source failed: {e}")
+            with self._condition:
+                self._error = e
+                self._condition.notify_all()
+
+
+@dataclass(frozen=True)
+class StreamWriterConfig:
+    sample_rate_hz: float
+    # Device buffer size: how long output survives if the writer stalls
+    buffer_s: float = 0.5
+    # Samples kept queued ahead of playback: bounds how late a change reaches the output
+    target_latency_s: float = 0.15
+    # Refill granularity (and every-N-samples event interval)
+    chunk_s: float = 0.025
+    # Wake on the driver's every-N-samples-transferred event rather than by polling
+    use_every_n_samples_event: bool = True
+    write_timeout_s: float = 10.0
+
+    def samples(self, seconds: float) -> int:
+        return max(1, int(round(seconds * self.sample_rate_hz)))
+
+
+class DaqStreamWriter:
+    """
+    Producer/consumer writer for a non-regenerating DAQ output task.
+
+    A dedicated thread keeps about `target_latency_s` of samples queued ahead
+    of playback, pulling chunks from a SampleSource whenever the driver reports
+    that a chunk has been transferred (or, with the event disabled, whenever
+    polling shows the backlog dropped below target). The device buffer is
+    `buffer_s` deep, so the slack between the two is the margin for a late
+    producer. An empty backlog or an underflow error from the driver is
+    counted and reported; a finite source is drained and `on_finished` called.
+    `on_write` sees every block as it is queued, in stream order.
+    """
+
+    def __init__(self, task: DaqOutputTask, source: SampleSource, config: StreamWriterConfig,
+                 on_progress: Callable[[int, int], None] | None = None,
+                 on_error: Callable[[str], None] | None = None,
+                 on_finished: Callable[[], None] | None = None,
+                 on_write: Callable[[np.ndarray], None] | None = None):
+        self._task = task
+        self._source = source
+        self._config = config
+        self._on_progress = on_progress
+        self._on_error = on_error
+        self._on_finished = on_finished
+        self._on_write = on_write
+
+        self._buffer_samples = config.samples(config.buffer_s)
+        self._target_samples = min(config.samples(config.target_latency_s), self._buffer_samples)
+        self._chunk_samples = min(config.samples(config.chunk_s), self._target_samples)
+
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread = None
+        self._written = 0
+        self._generated = 0
+        self._underflows = 0
+        self._min_backlog = None
+        self._write_s = 0.0
+        self._writes = 0
+        self._source_exhausted = False
+        # Recent wake-up intervals, for how regularly the writer gets to run
+        self._wake_intervals = deque(maxlen=WAKE_HISTORY)
+
+        task.configure_timing(config.sample_rate_hz, self._buffer_samples, regenerate=False)
+        if config.use_every_n_samples_event:
+            task.register_every_n_samples_event(self._chunk_samples, self._on_samples_transferred)
+
+    @property
+    def target_latency_s(self) -> float:
+        return self._target_samples / self._config.sample_rate_hz
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Prefill up to the latency target, start the task and the writer thread.
+        For a source with deferred_start, priming, prefill and task start happen
+        on the writer thread instead (failures go to `on_error`).
+        """
+        if not self._source.deferred_start:
+            self._top_up(self._target_samples)
+            self._task.start()
+        self._thread = threading.Thread(target=self._run, name="DaqStreamWriter", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the writer thread and close the source (the task itself is owned,
+        stopped and closed by the caller).
+        """
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(self._config.write_timeout_s)
+        self._thread = None
+        self._source.close()
+
+    def stats(self) -> dict:
+        rate = self._config.sample_rate_hz
+        intervals = np.array(self._wake_intervals.copy())     # copy() is atomic, iterating is not
+        period = self._chunk_samples / rate
+        return {
+            'written': self._written,
+            'generated': self._generated,
+            'underflows': self._underflows,
+            'target_latency_s': self.target_latency_s,
+            'buffer_s': self._buffer_samples / rate,
+            'min_headroom_s': (self._min_backlog or 0) / rate,
+            'write_avg_ms': self._write_s / self._writes * 1e3 if self._writes else 0.0,
+            'wake_interval_avg_ms': float(intervals.mean()) * 1e3 if intervals.size else 0.0,
+            # Largest deviation from the chunk period over the last WAKE_HISTORY wake-ups
+            'wake_jitter_ms': float(np.abs(intervals - period).max()) * 1e3 if intervals.size else 0.0,
+        }
+
+    def _on_samples_transferred(self, num_samples: int):
+        # Runs on a driver thread: only wake the writer
+        self._wake_event.set()
+
+    def _run(self):
+        poll_s = self._chunk_samples / self._config.sample_rate_hz
+        last_wake = None
+        try:
+            if self._source.deferred_start:
+                deadline = time.perf_counter() + self._config.write_timeout_s
+                while (not self._stop_event.is_set() and not self._source.prime(poll_s)
+                       and time.perf_counter() < deadline):
+                    pass
+                if self._stop_event.is_set():
+                    return
+                self._top_up(self._target_samples)
+                self._task.start()
+            while not self._stop_event.is_set():
+                self._wake_event.wait(poll_s)
+                self._wake_event.clear()
+                if self._stop_event.is_set():
+                    break
+                now = time.perf_counter()
+                if last_wake is not None:
+                    self._wake_intervals.append(now - last_wake)
+                last_wake = now
+                self._generated = self._task.total_samples_generated
+                backlog = self._written - self._generated
+                if self._source_exhausted:
+                    if backlog <= 0:
+                        logger.debug(f"Stream finished after {self._written} samples")
+                        if self._on_finished:
+                            self._on_finished()
+                        break
+                    continue
+                self._track_backlog(backlog)
+                deficit = self._target_samples - backlog
+                if deficit >= self._chunk_samples:
+                    self._top_up(deficit - deficit % self._chunk_samples)
+                if self._on_progress:
+                    self._on_progress(self._written, self._generated)
+        except Exception as e:
+            if self._stop_event.is_set():
+                return                  # task stopped underneath a blocked write
+            if isinstance(e, DaqUnderflowError) and self._source_exhausted:
+                # Playback ran past the last sample of a finished source before this poll: its end, not a gap
+                logger.debug(f"Stream finished after {self._written} samples")
+                if self._on_finished:
+                    self._on_finished()
+                return
+            if isinstance(e, DaqUnderflowError):
+                self._underflows += 1
+                message = f"output underflow after {self._generated} samples: {e}"
+            else:
+                message = f"stream write failed: {e}"
+            logger.warning(message)
+            if self._on_error:
+                self._on_error(message)
+
+    def _track_backlog(self, backlog: int):
+        if self._written and backlog <= 0:
+            # Playback caught up with the writer: the output has run (or is about to run) dry
+            self._underflows += 1
+            logger.warning(f"Output buffer ran empty after {self._generated} samples")
+        if self._min_backlog is None or backlog < self._min_backlog:
+            self._min_backlog = max(backlog, 0)
+
+    def _top_up(self, num_samples: int):
+        block = self._source.read(num_samples)
+        count = 0 if block is None else block.shape[1]
+        if count < num_samples:
+            self._source_exhausted = True
+        if count == 0:
+            return
+        start = time.perf_counter()
+        self._task.write(block, timeout_s=self._config.write_timeout_s)
+        self._write_s += time.perf_counter() - start
+        if self._on_write:
+            self._on_write(block)
+        self._writes += 1
+        self._written += count
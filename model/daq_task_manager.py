@@ -0,0 +1,152 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import time
+
+from .daq_backend import DaqBackend, DaqOutputTask
+
+
+class DaqTaskManager:
+    """
+    Keeps the two output tasks of one device alive between runs: a
+    hardware-timed waveform task and an on-demand static task, both on the
+    same AO channels.
+
+    Creating a task, adding its channels and committing it to the hardware is
+    the slow part of starting output, so each task is built once and then only
+    reconfigured when its timing changes. The two tasks share the channels, so
+    acquiring one stops and unreserves the other first. Not thread-safe: the
+    caller serialises access (Ni6216DaqMx holds its task lock).
+    """
+
+    WAVEFORM = 'waveform'
+    STATIC = 'static'
+
+    def __init__(self, backend: DaqBackend, channels: list[str],
+                 min_val: float = -10.0, max_val: float = 10.0):
+        self._backend = backend
+        self._channels = list(channels)
+        self._min_val, self._max_val = min_val, max_val
+        self._tasks: dict[str, DaqOutputTask] = {}
+        self._timing: tuple | None = None       # what the waveform task is configured for
+        self._active: str | None = None         # mode holding the channels
+        self._stats = {'created': 0, 'reused': 0, 'reconfigured': 0, 'setup_s': 0.0}
+
+    @property
+    def channels(self) -> list[str]:
+        return list(self._channels)
+
+    def set_channels(self, channels: list[str]):
+        """Point at other channels (e.g. the device came back under a new name)."""
+        if list(channels) != self._channels:
+            self.close()
+            self._channels = list(channels)
+
+    def prepare_waveform(self, rate_hz: float, buffer_samples: int, regenerate: bool):
+        """Build, configure and commit the waveform task ahead of the first start, while idle."""
+        if self._active is None:
+            self._waveform_task(rate_hz, buffer_samples, regenerate)
+
+    def acquire_waveform(self, rate_hz: float, buffer_samples: int,
+                         regenerate: bool) -> DaqOutputTask:
+        """The waveform task, committed and configured for this timing; ready to write and start."""
+        self._yield_channels(self.WAVEFORM)
+        task = self._waveform_task(rate_hz, buffer_samples, regenerate)
+        self._active = self.WAVEFORM
+        return task
+
+    def acquire_static(self) -> DaqOutputTask:
+        """The static task, holding the channels; ready for write_static()."""
+        self._yield_channels(self.STATIC)
+        start = time.perf_counter()
+        task = self._tasks.get(self.STATIC)
+        if task is None:
+            task = self._create(self.STATIC)
+        else:
+            self._stats['reused'] += 1
+        task.commit()
+        self._stats['setup_s'] += time.perf_counter() - start
+        self._active = self.STATIC
+        return task
+
+    def release(self, task: DaqOutputTask, discard: bool = False):
+        """
+        Stop `task` but keep it configured for the next run; `discard` closes it
+        instead (after an error that may have left it unusable).
+        """
+        mode = next((m for m, t in self._tasks.items() if t is task), None)
+        if mode is None:
+            return
+        if self._active == mode:
+            self._active = None
+        if discard:
+            self._close(mode)
+            return
+        try:
+            task.stop()
+        except Exception as e:
+            logger.warning(f"NI-6216 task stop failed, discarding it: {e}")
+            self._close(mode)
+
+    def close(self):
+        """Close every task, e.g. when the device goes away."""
+        for mode in list(self._tasks):
+            self._close(mode)
+        self._active = None
+
+    def stats(self) -> dict:
+        stats = dict(self._stats)
+        stats['open_tasks'] = sorted(self._tasks)
+        return stats
+
+    def _waveform_task(self, rate_hz: float, buffer_samples: int, regenerate: bool) -> DaqOutputTask:
+        start = time.perf_counter()
+        timing = (rate_hz, buffer_samples, regenerate)
+        task = self._tasks.get(self.WAVEFORM)
+        if task is None:
+            task = self._create(self.WAVEFORM)
+        elif timing != self._timing:
+            self._stats['reconfigured'] += 1
+        else:
+            self._stats['reused'] += 1
+        if timing != self._timing:
+            self._timing = None
+            task.configure_timing(rate_hz, buffer_samples, regenerate)
+            self._timing = timing
+        task.commit()
+        self._stats['setup_s'] += time.perf_counter() - start
+        return task
+
+    def _yield_channels(self, mode: str):
+        """Stop and unreserve the other mode's task so `mode` can reserve the channels."""
+        other = self.STATIC if mode == self.WAVEFORM else self.WAVEFORM
+        task = self._tasks.get(other)
+        if task is None:
+            return
+        try:
+            if self._active == other:
+                task.stop()
+            task.unreserve()
+        except Exception as e:
+            logger.warning(f"NI-6216 {other} task could not release the channels, discarding it: {e}")
+            self._close(other)
+        if self._active == other:
+            self._active = None
+
+    def _create(self, mode: str) -> DaqOutputTask:
+        task = self._backend.create_output_task(self._channels, self._min_val, self._max_val)
+        self._tasks[mode] = task
+        self._stats['created'] += 1
+        logger.debug(f"NI-6216 {mode} task created on {', '.join(self._channels)}")
+        return task
+
+    def _close(self, mode: str):
+        task = self._tasks.pop(mode, None)
+        if mode == self.WAVEFORM:
+            self._timing = None
+        if task is None:
+            return
+        try:
+            task.close()
+        except Exception as e:
+            logger.debug(f"NI-6216 {mode} task close failed: {e}")
@@ -1,19 +1,48 @@
 import logging
 logger = logging.getLogger(__name__)
 
+from .beat_template_cache import BeatTemplateCache
 from .heart_beat_manager import HeartBeatManager
+from .pchip_batch import PchipBatch
 from PySide6.QtCore import QObject, Signal
 from scipy.interpolate import PchipInterpolator
 import numpy as np
 
+# Resolution of the beat rendered while a reference point is being dragged
+PREVIEW_SAMPLES_PER_HEART_BEAT = 250
+DEFAULT_HEART_RATE_BPM = 60.0
+# Waveforms defined in heartBeat.xml: name → features element; all share the beat timebase
+WAVEFORM_FEATURES = {'abp': 'abp_waveform_features', 'cvp': 'cvp_waveform_features'}
+
+
+def _time_samples(percentage_time_points, pressure_points, num_of_samples_per_heart_beat) -> tuple[list, tuple]:
+    """Sample positions of reference points at a beat length, and their indices sorted by time."""
+    time_points = [0 if time_point == 0 else int((time_point * num_of_samples_per_heart_beat) - 1)
+                   for time_point in percentage_time_points]
+    # Sort time and corresponding pressure points together
+    knot_order = tuple(sorted(
+        range(len(time_points)),
+        key=lambda i: (time_points[i], pressure_points[i])
+    ))
+    return time_points, knot_order
+
+
 class HeartBeatModel(QObject):
     
     waveform_data_changed = Signal()
+    waveform_range_changed = Signal(int, int)     # [start, stop) of the samples rewritten
+    waveform_preview_changed = Signal()
+    waveforms_changed = Signal(list)              # names of the waveforms whose samples changed
 
-    def __init__(self):
+    def __init__(self, template_cache: BeatTemplateCache | None = None):
         super().__init__()
 
+        # Rendered beats by reference point set and length: revisiting a shape is a lookup
+        self._template_cache = template_cache if template_cache is not None else BeatTemplateCache()
+
         self._num_of_samples_per_HeartBeat = 1000
+        # One beat lasts 60 / heart rate seconds, which sets the beat's sample rate
+        self._heart_rate_bpm = DEFAULT_HEART_RATE_BPM
 
         self._heart_beat_manager = HeartBeatManager()
         self._heart_beat_manager.load_settings()
@@ -24,6 +53,15 @@ class HeartBeatModel(QObject):
         
         self._abp_waveform_time_points = []
         self._abp_waveform_pressure_points = []
+        self._abp_knot_order = ()                 # reference point indices sorted by time
+        self._abp_waveform_knot_order = ()        # ... as used for the full-resolution beat
+        self._abp_dirty_range = (0, 0)
+
+        self._abp_preview_time_points = np.empty(0)
+        self._abp_preview_pressure_points = np.empty(0)
+        # Reference points as dragged, [samples] and [mmHg]; the committed ones stay as they are
+        self._abp_preview_reference_time_points = []
+        self._abp_preview_reference_pressure_points = []
 
         self._generate_single_abp_beat(self._num_of_samples_per_HeartBeat)
 
@@ -39,46 +77,280 @@ class HeartBeatModel(QObject):
             'abp_ref_waveform_pressure_points': self._abp_reference_pressure_points
         }
 
+    def get_waveform_preview_points(self):
+        return {
+            'abp_waveform_time_points': self._abp_preview_time_points,
+            'abp_waveform_pressure_points': self._abp_preview_pressure_points,
+            'abp_ref_waveform_time_points': self._abp_preview_reference_time_points,
+            'abp_ref_waveform_pressure_points': self._abp_preview_reference_pressure_points
+        }
+
+    def get_dirty_range(self) -> tuple[int, int]:
+        """[start, stop) of the samples rewritten by the last waveform change."""
+        return self._abp_dirty_range
+
+    def get_num_of_samples_per_heart_beat(self) -> int:
+        return self._num_of_samples_per_HeartBeat
+
+    def get_heart_rate_bpm(self) -> float:
+        return self._heart_rate_bpm
+
+    def set_heart_rate_bpm(self, heart_rate_bpm: float):
+        if heart_rate_bpm <= 0:
+            raise ValueError(f"Heart rate must be positive, got {heart_rate_bpm} BPM")
+        if heart_rate_bpm != self._heart_rate_bpm:
+            self._heart_rate_bpm = float(heart_rate_bpm)
+            # Same samples, new duration: consumers that output in real time resample
+            self._emit_waveform_changed(0, self._num_of_samples_per_HeartBeat, self.get_waveform_names())
+
+    def get_sample_rate_hz(self) -> float:
+        """Rate at which the beat's samples play out at the current heart rate."""
+        return self._num_of_samples_per_HeartBeat * self._heart_rate_bpm / 60.0
+
+    def set_num_of_samples_per_heart_beat(self, num_of_samples):
+        if num_of_samples < 2:
+            raise ValueError(f"A heart beat needs at least 2 samples, got {num_of_samples}")
+        self._num_of_samples_per_HeartBeat = int(num_of_samples)
+        # Knots snap to whole samples, so every waveform's shape can shift slightly
+        self._generate_single_abp_beat(self._num_of_samples_per_HeartBeat, self.get_waveform_names())
+
+    def get_beat_interpolator(self) -> PchipInterpolator:
+        """
+        The beat as a PCHIP of beat phase (0 = start, 1 = start of the next beat),
+        for rendering it at any length; the same curve as get_waveform_points().
+        """
+        return PchipInterpolator(*self.get_waveform_knots('abp'))
+
+    def get_waveforms_interpolator(self, waveforms: list[str]) -> PchipBatch:
+        """The beats of `waveforms` over beat phase as one PchipBatch, a row each, in that order."""
+        knots = [self.get_waveform_knots(waveform) for waveform in waveforms]
+        return PchipBatch([x for x, _ in knots], [y for _, y in knots])
+
+    def get_waveform_names(self) -> list[str]:
+        """The waveforms the settings define, 'abp' first."""
+        return [name for name, tag in WAVEFORM_FEATURES.items() if tag in self._waveform_reference_points]
+
+    def get_waveform_knots(self, waveform: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Reference points of `waveform` as PCHIP knots over beat phase (0 = start,
+        1 = start of the next beat), sorted by time and snapped to the beat's
+        samples as in get_waveform_points(): every waveform on one timebase.
+        """
+        num_of_samples = self._num_of_samples_per_HeartBeat
+        _, pressures = self._reference_lists(waveform)
+        time_points, knot_order = self._reference_time_samples(num_of_samples, waveform)
+        # PCHIP is unchanged by scaling its abscissa: knots in samples → knots in phase
+        return (np.array([time_points[i] for i in knot_order], dtype=np.float64) / num_of_samples,
+                np.array([pressures[i] for i in knot_order], dtype=np.float64))
+
+    def get_waveform_reference_point_keys(self, waveform: str) -> list:
+        return list(self._waveform_features(waveform).keys())
+
+    def update_waveform_reference_point(self, waveform: str, key, new_time_pct, new_pressure):
+        """
+        Move a reference point of any waveform; only consumers of that waveform
+        need to regenerate. The point stays between its neighbours in time
+        (see _clamp_reference_time()).
+        """
+        if waveform == 'abp':
+            self.update_reference_point(key, new_time_pct, new_pressure)
+            return
+        point = self._waveform_features(waveform)[key]
+        point['time_s'] = self._clamp_reference_time(waveform, key, new_time_pct)
+        point['pressure_mmHg'] = new_pressure
+        self.waveforms_changed.emit([waveform])
+
+    def get_beat_template(self, num_of_samples_per_heart_beat: int) -> np.ndarray:
+        """
+        The current beat rendered at `num_of_samples_per_heart_beat` samples
+        (read-only, shared through the template cache), leaving the model's own
+        beat length untouched.
+        """
+        num_of_samples = int(num_of_samples_per_heart_beat)
+        if num_of_samples < 2:
+            raise ValueError(f"A heart beat needs at least 2 samples, got {num_of_samples}")
+        key = self._template_key(num_of_samples)
+        template = self._template_cache.get(key)
+        if template is None:
+            time_points, knot_order = self._reference_time_samples(num_of_samples)
+            interpolated_points = PchipInterpolator([time_points[i] for i in knot_order],
+                                                    [self._abp_reference_pressure_points[i] for i in knot_order])
+            template = self._template_cache.put(key, interpolated_points(np.arange(num_of_samples, dtype=np.float64)))
+        return template
+
+    @property
+    def template_cache(self) -> BeatTemplateCache:
+        return self._template_cache
+
     def set_waveform_points(self, value):
         raise NotImplementedError("Direct waveform point assignment is not supported.")
     
-    def _generate_single_abp_beat(self, num_of_samples_per_heart_beat):
-        self._abp_reference_time_points.clear()
-
-        for time_point in self._abp_reference_percentage_time_points: 
-            if time_point == 0:
-                self._abp_reference_time_points.append(0)
-            else:
-                self._abp_reference_time_points.append(int((time_point * num_of_samples_per_heart_beat) - 1))
-        
+    def _template_key(self, num_of_samples_per_heart_beat) -> tuple:
+        return (tuple(zip(self._abp_reference_percentage_time_points, self._abp_reference_pressure_points)),
+                num_of_samples_per_heart_beat)
+
+    def _waveform_features(self, waveform: str) -> dict:
+        if waveform not in WAVEFORM_FEATURES:
+            raise ValueError(f"Unknown waveform '{waveform}', expected one of {list(WAVEFORM_FEATURES)}")
+        features = self._waveform_reference_points.get(WAVEFORM_FEATURES[waveform])
+        if features is None:
+            raise KeyError(f"No {WAVEFORM_FEATURES[waveform]} in the HeartBeat settings")
+        return features
+
+    def _reference_lists(self, waveform: str) -> tuple[list, list]:
+        """(time fractions, pressures) of `waveform`'s reference points, in settings order."""
+        if waveform == 'abp':
+            return self._abp_reference_percentage_time_points, self._abp_reference_pressure_points
+        features = self._waveform_features(waveform).values()
+        return [v['time_s'] for v in features], [v['pressure_mmHg'] for v in features]
+
+    def _clamp_reference_time(self, waveform: str, key, new_time_pct) -> float:
+        """
+        `new_time_pct` for reference point `key` of `waveform`, held strictly
+        between its neighbours' samples at the current beat length: knots on
+        one sample are not strictly increasing, which PCHIP (and so every
+        output render) refuses, and a point passing a neighbour would swap
+        the two features it stands for.
+        """
+        num_of_samples = self._num_of_samples_per_HeartBeat
+        features = self._waveform_features(waveform)
+        if key not in features:
+            raise KeyError(f"No reference point '{key}' in the {waveform} waveform")
+        times, _ = self._reference_time_samples(num_of_samples, waveform)
+        own = times[list(features).index(key)]
+        others = [t for k, t in zip(features, times) if k != key]
+        lowest = max((t for t in others if t < own), default=-1) + 1
+        highest = min((t for t in others if t > own), default=num_of_samples) - 1
+        new_time_pct = min(max(float(new_time_pct), 0.0), 1.0)
+        sample = 0 if new_time_pct == 0 else int((new_time_pct * num_of_samples) - 1)
+        if lowest <= sample <= highest:
+            return new_time_pct
+        sample = min(max(sample, lowest), highest)
+        # The time fraction that snaps to `sample`: the middle of its span
+        return 0.0 if sample == 0 else min((sample + 1.5) / num_of_samples, 1.0)
+
+    def _reference_time_samples(self, num_of_samples_per_heart_beat, waveform: str = 'abp') -> tuple[list, tuple]:
+        """Reference point sample positions at this beat length, and their indices sorted by time."""
+        return _time_samples(*self._reference_lists(waveform), num_of_samples_per_heart_beat)
+
+    def _update_reference_time_points(self, num_of_samples_per_heart_beat):
+        time_points, self._abp_knot_order = self._reference_time_samples(num_of_samples_per_heart_beat)
+        self._abp_reference_time_points[:] = time_points
+
+    def _build_abp_interpolator(self, num_of_samples_per_heart_beat) -> PchipInterpolator:
+        self._update_reference_time_points(num_of_samples_per_heart_beat)
+
         logger.debug(f"Generating ABP waveform with reference time points [samples]: {self._abp_reference_time_points}")
         logger.debug(f"Generating ABP waveform with reference pressure points [mmHg]: {self._abp_reference_pressure_points}")
-                
-        # Sort time and corresponding pressure points together
-        zip_points = zip(self._abp_reference_time_points, self._abp_reference_pressure_points)
-        sorted_points = sorted(zip_points)
-        intermediate_time_points, intermediate_pressure_points = zip(*sorted_points)
+
+        intermediate_time_points = [self._abp_reference_time_points[i] for i in self._abp_knot_order]
+        intermediate_pressure_points = [self._abp_reference_pressure_points[i] for i in self._abp_knot_order]
 
         # Point Interpolation
-        interpolated_points = PchipInterpolator(intermediate_time_points, intermediate_pressure_points)
+        return PchipInterpolator(intermediate_time_points, intermediate_pressure_points)
+
+    def _generate_single_abp_beat(self, num_of_samples_per_heart_beat, waveforms=None):
+        if len(self._abp_waveform_time_points) != num_of_samples_per_heart_beat:
+            self._abp_waveform_time_points = np.linspace(start=0,
+                                                         stop=num_of_samples_per_heart_beat - 1,
+                                                         num=num_of_samples_per_heart_beat,
+                                                         retstep=False,
+                                                         endpoint=True)
+        key = self._template_key(num_of_samples_per_heart_beat)
+        pressure = self._template_cache.get(key)
+        if pressure is None:
+            interpolated_points = self._build_abp_interpolator(num_of_samples_per_heart_beat)
+            pressure = self._template_cache.put(key, interpolated_points(self._abp_waveform_time_points))
+        else:
+            self._update_reference_time_points(num_of_samples_per_heart_beat)
 
-        t = np.linspace(start=0,
-                              stop=num_of_samples_per_heart_beat - 1,
-                              num=num_of_samples_per_heart_beat, 
-                              retstep=False,
-                              endpoint=True)
+        self._abp_waveform_pressure_points = pressure
+        self._abp_waveform_knot_order = self._abp_knot_order
+        self._emit_waveform_changed(0, num_of_samples_per_heart_beat, waveforms)
 
-        self._abp_waveform_time_points = t
-        self._abp_waveform_pressure_points = interpolated_points(t)
+    def _regenerate_abp_range(self, key_index, num_of_samples_per_heart_beat):
+        """
+        Re-evaluate only the samples affected by moving reference point `key_index`.
+
+        PCHIP derivatives at a knot depend only on the two adjacent intervals, so
+        moving knot j changes the derivatives at knots j-1..j+1 and hence the
+        curve between knots j-2 and j+2 (out to the beat edges when that span
+        reaches the first or last knot, which also drive the end derivatives and
+        the extrapolated head/tail). Falls back to a full regeneration when the
+        move reorders the knots or no full-resolution beat exists yet. A shape
+        already in the template cache (an undone edit) is swapped in whole, but
+        reported with the same dirty range since only that span differs.
+        """
+        self._update_reference_time_points(num_of_samples_per_heart_beat)
+        pressure = self._abp_waveform_pressure_points
+        if (self._abp_knot_order != self._abp_waveform_knot_order
+                or len(pressure) != num_of_samples_per_heart_beat):
+            self._generate_single_abp_beat(num_of_samples_per_heart_beat)
+            return
+
+        position = self._abp_knot_order.index(key_index)
+        last = len(self._abp_knot_order) - 1
+        lo, hi = max(position - 2, 0), min(position + 2, last)
+        start = 0 if lo == 0 else self._abp_reference_time_points[self._abp_knot_order[lo]]
+        stop = (num_of_samples_per_heart_beat if hi == last
+                else self._abp_reference_time_points[self._abp_knot_order[hi]] + 1)
+        start, stop = max(int(start), 0), min(int(stop), num_of_samples_per_heart_beat)
+
+        key = self._template_key(num_of_samples_per_heart_beat)
+        cached = self._template_cache.get(key)
+        if cached is not None:
+            self._abp_waveform_pressure_points = cached
+            self._emit_waveform_changed(start, stop)
+            return
+
+        interpolated_points = self._build_abp_interpolator(num_of_samples_per_heart_beat)
+        if not pressure.flags.writeable:          # cached or frozen by a consumer: copy on write
+            pressure = pressure.copy()
+        pressure[start:stop] = interpolated_points(self._abp_waveform_time_points[start:stop])
+        self._abp_waveform_pressure_points = self._template_cache.put(key, pressure)
+        self._emit_waveform_changed(start, stop)
+
+    def _emit_waveform_changed(self, start, stop, waveforms=None):
+        """ABP samples [start, stop) rewritten; `waveforms` (default just 'abp') changed for output."""
+        self._abp_dirty_range = (start, stop)
+        self.waveform_range_changed.emit(start, stop)
         self.waveform_data_changed.emit()
+        self.waveforms_changed.emit(list(waveforms) if waveforms is not None else ['abp'])
     
-    def update_reference_point(self, key, new_time_pct, new_pressure):
+    def _set_reference_point(self, key, new_time_pct, new_pressure):
         self._waveform_reference_points['abp_waveform_features'][key]['time_s'] = new_time_pct
         self._waveform_reference_points['abp_waveform_features'][key]['pressure_mmHg'] = new_pressure
-        # Re-extract and regenerate
+        # Re-extract
         self._abp_reference_percentage_time_points = [v['time_s'] for v in self._waveform_reference_points['abp_waveform_features'].values()]
         self._abp_reference_pressure_points = [v['pressure_mmHg'] for v in self._waveform_reference_points['abp_waveform_features'].values()]
-        self._generate_single_abp_beat(self._num_of_samples_per_HeartBeat)
+
+    def update_reference_point(self, key, new_time_pct, new_pressure):
+        """Move an ABP reference point (kept between its neighbours, see _clamp_reference_time())."""
+        self._set_reference_point(key, self._clamp_reference_time('abp', key, new_time_pct), new_pressure)
+        key_index = self.get_reference_point_keys().index(key)
+        self._regenerate_abp_range(key_index, self._num_of_samples_per_HeartBeat)
+
+    def preview_reference_point(self, key, new_time_pct, new_pressure):
+        """
+        Render a coarse beat with a reference point moved, for on-screen feedback
+        only. The reference points, the full-resolution waveform and so the DAQ
+        output are left untouched until update_reference_point() commits the edit.
+        """
+        num_of_samples = self._num_of_samples_per_HeartBeat
+        index = self.get_reference_point_keys().index(key)
+        percentage_time_points = list(self._abp_reference_percentage_time_points)
+        pressure_points = list(self._abp_reference_pressure_points)
+        percentage_time_points[index] = self._clamp_reference_time('abp', key, new_time_pct)
+        pressure_points[index] = new_pressure
+        time_points, knot_order = _time_samples(percentage_time_points, pressure_points, num_of_samples)
+        interpolated_points = PchipInterpolator([time_points[i] for i in knot_order],
+                                                [pressure_points[i] for i in knot_order])
+        t = np.linspace(0, num_of_samples - 1, num=min(PREVIEW_SAMPLES_PER_HEART_BEAT, num_of_samples))
+        self._abp_preview_time_points = t
+        self._abp_preview_pressure_points = interpolated_points(t)
+        self._abp_preview_reference_time_points = time_points
+        self._abp_preview_reference_pressure_points = pressure_points
+        self.waveform_preview_changed.emit()
     
     def get_reference_point_keys(self) -> list:
         return list(self._waveform_reference_points['abp_waveform_features'].keys())
@@ -92,4 +364,4 @@ class HeartBeatModel(QObject):
         self._abp_reference_pressure_points = [
             v['pressure_mmHg'] for v in self._waveform_reference_points['abp_waveform_features'].values()
         ]
-        self._generate_single_abp_beat(self._num_of_samples_per_HeartBeat)
+        self._generate_single_abp_beat(self._num_of_samples_per_HeartBeat, self.get_waveform_names())
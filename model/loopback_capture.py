@@ -0,0 +1,465 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+from scipy.signal import correlate
+
+from .daq_backend import DaqInputTask, DaqOverflowError
+
+CAPTURE_DTYPE = np.dtype('<f4')
+# Blocks waiting for the disk; beyond this the reader stalls and the input buffer takes up the slack
+MAX_QUEUED_BLOCKS = 64
+# A lag is only trusted if capture and reference correlate at least this well
+MIN_LAG_CORRELATION = 0.5
+
+
+def capture_dir() -> Path:
+    if os.name == "nt":
+        base_dir = Path(os.getenv("LOCALAPPDATA", Path.home()))
+    else:
+        base_dir = Path(os.getenv("XDG_DATA_HOME", Path.home() / ".local" / "share"))
+    return base_dir / "testtoolsuite" / "captures"
+
+
+@dataclass(frozen=True)
+class CaptureConfig:
+    sample_rate_hz: float
+    channel_names: tuple[str, ...] = ("ai0", "ai1")
+    # Sample clock to acquire on (the AO sample clock for a sample-aligned loopback)
+    clock_source: str | None = None
+    # Input buffer depth: how long the reader may stall before samples are lost
+    buffer_s: float = 2.0
+    # Read (and disk write) granularity
+    chunk_s: float = 0.1
+    # Live view: this much history as about `live_points` min/max points, at most every interval
+    live_window_s: float = 5.0
+    live_points: int = 2000
+    live_interval_s: float = 0.1
+    # Rows compared with output channel 0: the direct loopback and the monitor's pressure return
+    loopback_row: int | None = 0
+    monitor_row: int | None = 1
+    # Analysis windows, and the longest output → input delay searched for
+    analysis_window_s: float = 1.0
+    max_latency_s: float = 0.25
+
+    def samples(self, seconds: float) -> int:
+        return max(1, int(round(seconds * self.sample_rate_hz)))
+
+
+class OutputReference:
+    """
+    The most recent output samples by stream index, fed as they are written,
+    so captured input can be compared with what was sent.
+    """
+
+    def __init__(self, num_channels: int, capacity: int):
+        self._ring = np.zeros((num_channels, capacity))
+        self._written = 0
+        self._lock = threading.Lock()
+
+    def push(self, block: np.ndarray):
+        capacity = self._ring.shape[1]
+        newest = block[:, -capacity:]           # only the newest `capacity` samples fit
+        with self._lock:
+            start = (self._written + block.shape[1] - newest.shape[1]) % capacity
+            first = min(newest.shape[1], capacity - start)
+            self._ring[:, start:start + first] = newest[:, :first]
+            self._ring[:, :newest.shape[1] - first] = newest[:, first:]
+            self._written += block.shape[1]
+
+    def get(self, start: int, stop: int) -> np.ndarray | None:
+        """Output samples [start, stop), or None if not written yet or already overwritten."""
+        with self._lock:
+            if start < max(0, self._written - self._ring.shape[1]) or stop > self._written:
+                return None
+            indices = np.arange(start, stop) % self._ring.shape[1]
+            return self._ring[:, indices]
+
+
+class PeriodicReference:
+    """Reference for a regenerated buffer: output sample k is buffer[k % len]."""
+
+    def __init__(self, buffer: np.ndarray):
+        self._buffer = np.array(buffer, dtype=np.float64)
+
+    def get(self, start: int, stop: int) -> np.ndarray | None:
+        if start < 0:
+            return None
+        return self._buffer[:, np.arange(start, stop) % self._buffer.shape[1]]
+
+
+class CaptureFile:
+    """
+    A capture on disk: `<name>.f32` holds little-endian float32 samples,
+    channel-interleaved; `<name>.json` the rate, channel names and sample
+    count. The data file alone stays readable if the sidecar is never
+    finalized (the count follows from its size).
+    """
+
+    def __init__(self, path: Path, sample_rate_hz: float, channel_names: tuple[str, ...],
+                 metadata: dict | None = None):
+        self.data_path = Path(path).with_suffix(".f32")
+        self.meta_path = Path(path).with_suffix(".json")
+        self.data_path.parent.mkdir(parents=True, exist_ok=True)
+        self._meta = {
+            'sample_rate_hz': sample_rate_hz,
+            'channels': list(channel_names),
+            'dtype': CAPTURE_DTYPE.str,
+            'samples': 0,
+            'started': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            **(metadata or {}),
+        }
+        self._file = open(self.data_path, "wb")
+        self._write_meta()
+
+    @property
+    def samples(self) -> int:
+        return self._meta['samples']
+
+    @property
+    def nbytes(self) -> int:
+        return self.samples * len(self._meta['channels']) * CAPTURE_DTYPE.itemsize
+
+    def append(self, block: np.ndarray):
+        """(channels, n) samples, appended in order."""
+        np.ascontiguousarray(block.T, dtype=CAPTURE_DTYPE).tofile(self._file)
+        self._meta['samples'] += block.shape[1]
+
+    def close(self, **metadata):
+        self._file.close()
+        self._meta.update(metadata)
+        self._write_meta()
+
+    def _write_meta(self):
+        with open(self.meta_path, "w") as file:
+            json.dump(self._meta, file, indent=2)
+
+
+def load_capture(path: str | Path) -> tuple[np.ndarray, dict]:
+    """A saved capture as a read-only (samples, channels) memory map, plus its metadata."""
+    path = Path(path)
+    with open(path.with_suffix(".json"), "r") as file:
+        meta = json.load(file)
+    data = np.memmap(path.with_suffix(".f32"), dtype=np.dtype(meta['dtype']), mode='r')
+    num_channels = len(meta['channels'])
+    return data[:data.size - data.size % num_channels].reshape(-1, num_channels), meta
+
+
+def estimate_lag(reference: np.ndarray, signal: np.ndarray, max_lag: int) -> tuple[float, float] | None:
+    """
+    Delay of `signal` behind `reference` in samples, sub-sample by parabolic
+    interpolation, and the correlation at that lag. `reference` starts
+    `max_lag` samples before `signal` and is as much longer. None for a flat
+    signal.
+    """
+    signal = signal - signal.mean()
+    reference = reference - reference.mean()
+    energy = float(np.dot(signal, signal))
+    if energy <= 1e-12 or not np.any(reference):
+        return None
+    # c[j]: signal against the reference shifted by max_lag - j samples
+    c = correlate(reference, signal, mode='valid', method='fft')
+    j = int(np.argmax(c))
+    ref_window = reference[j:j + len(signal)]
+    norm = np.sqrt(energy * float(np.dot(ref_window, ref_window)))
+    if norm == 0.0:
+        return None
+    offset = 0.0
+    if 0 < j < len(c) - 1:
+        denominator = c[j - 1] - 2 * c[j] + c[j + 1]
+        if denominator < 0:
+            offset = 0.5 * (c[j - 1] - c[j + 1]) / denominator
+    return float(max_lag - (j + offset)), float(c[j] / norm)
+
+
+class LoopbackCapture:
+    """
+    Continuous analog input capture alongside an output task.
+
+    A reader thread polls the input task and takes whole chunks as they are
+    acquired. Each block is queued for a disk thread (so a slow disk only
+    eats into the input buffer), folded into a min/max decimated live view,
+    and, given a `reference` of what was output, analysed per window: the
+    loopback channel's delay and deviation from the output (fidelity) and the
+    monitor return's delay (end-to-end latency).
+    """
+
+    def __init__(self, task: DaqInputTask, config: CaptureConfig, path: Path,
+                 reference: OutputReference | PeriodicReference | None = None,
+                 on_live_view: Callable[[np.ndarray, np.ndarray], None] | None = None,
+                 on_error: Callable[[str], None] | None = None):
+        self._task = task
+        self._config = config
+        self._path = Path(path)
+        self._reference = reference
+        self._on_live_view = on_live_view
+        self._on_error = on_error
+
+        self._chunk_samples = config.samples(config.chunk_s)
+        self._buffer_samples = max(config.samples(config.buffer_s), 4 * self._chunk_samples)
+        self._window_samples = config.samples(config.analysis_window_s)
+        self._max_lag = config.samples(config.max_latency_s)
+        # Each live bucket contributes its min and max
+        self._bucket = max(1, config.samples(config.live_window_s) * 2 // config.live_points)
+
+        self._stop_event = threading.Event()
+        self._queue = queue.Queue(maxsize=MAX_QUEUED_BLOCKS)
+        self._reader = None
+        self._disk_thread = None
+        self._file: CaptureFile | None = None
+        self._lock = threading.Lock()
+
+        self._acquired = 0
+        self._reads = 0
+        self._read_s = 0.0
+        self._disk_s = 0.0
+        self._queue_max = 0
+        self._overflows = 0
+        self._error = None
+
+        self._live = deque()                    # (times, values) pieces, oldest first
+        self._live_carry = np.empty((len(config.channel_names), 0))
+        self._last_live = 0.0
+
+        self._window = []                       # blocks not analysed yet
+        self._window_start = 0
+        self._windows = 0
+        self._loopback_lag = 0.0
+        self._error_sq_sum = 0.0
+        self._error_max = 0.0
+        self._compared = 0
+        self._latency = {'measurements': 0, 'last_s': 0.0, 'min_s': float('inf'),
+                         'max_s': 0.0, 'sum_s': 0.0}
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def is_running(self) -> bool:
+        return self._reader is not None and self._reader.is_alive()
+
+    def start(self):
+        """Configure and start the input task (before the output, to catch its first sample)."""
+        config = self._config
+        self._task.configure_timing(config.sample_rate_hz, self._buffer_samples, config.clock_source)
+        self._file = CaptureFile(self._path, config.sample_rate_hz, config.channel_names,
+                                 {'clock_source': config.clock_source})
+        self._task.start()
+        self._disk_thread = threading.Thread(target=self._run_disk, name="CaptureDisk", daemon=True)
+        self._disk_thread.start()
+        self._reader = threading.Thread(target=self._run_reader, name="CaptureReader", daemon=True)
+        self._reader.start()
+        logger.info(f"Loopback capture started: {config.channel_names} at "
+                    f"{config.sample_rate_hz:g} S/s → {self._file.data_path}")
+
+    def stop(self) -> dict:
+        """Read what is left, stop the input task, finish the file. Returns the final statistics."""
+        self._stop_event.set()
+        if self._reader is not None and self._reader is not threading.current_thread():
+            self._reader.join()
+        self._reader = None
+        if self._disk_thread is not None:
+            self._queue.put(None)
+            self._disk_thread.join()
+            self._disk_thread = None
+        if self._file is not None:
+            self._file.close(**{key: value for key, value in self.stats().items()
+                                if key not in ('path', 'samples')})
+        return self.stats()
+
+    def stats(self) -> dict:
+        rate = self._config.sample_rate_hz
+        with self._lock:
+            stats = {
+                'path': str(self._file.data_path) if self._file else str(self._path),
+                'samples': self._acquired,
+                'seconds': self._acquired / rate,
+                'bytes': self._file.nbytes if self._file else 0,
+                'overflows': self._overflows,
+                'error': self._error,
+                'read_avg_ms': self._read_s / self._reads * 1e3 if self._reads else 0.0,
+                'disk_write_avg_ms': self._disk_s / self._reads * 1e3 if self._reads else 0.0,
+                'queue_max': self._queue_max,
+                'windows': self._windows,
+            }
+            if self._compared:
+                stats.update(loopback_lag_s=self._loopback_lag / rate,
+                             fidelity_rms_v=float(np.sqrt(self._error_sq_sum / self._compared)),
+                             fidelity_max_v=self._error_max)
+            latency = self._latency
+            if latency['measurements']:
+                stats.update(latency_last_s=latency['last_s'], latency_min_s=latency['min_s'],
+                             latency_max_s=latency['max_s'],
+                             latency_avg_s=latency['sum_s'] / latency['measurements'])
+        return stats
+
+    def live_view(self) -> tuple[np.ndarray, np.ndarray]:
+        """The decimated recent history: times (s) and (channels, points) volts."""
+        with self._lock:
+            pieces = list(self._live)
+        if not pieces:
+            return np.empty(0), np.empty((len(self._config.channel_names), 0))
+        return (np.concatenate([t for t, _ in pieces]),
+                np.concatenate([v for _, v in pieces], axis=1))
+
+    # ── Threads ───────────────────────────────────────────────────────────
+
+    def _run_reader(self):
+        poll_s = self._chunk_samples / self._config.sample_rate_hz / 2
+        try:
+            while not self._stop_event.is_set():
+                available = self._task.samples_available
+                if available < self._chunk_samples:
+                    self._stop_event.wait(poll_s)
+                    continue
+                self._read(available - available % self._chunk_samples)
+            # Drain: the output has stopped (or is about to), so nothing more is coming
+            available = self._task.samples_available
+            if available:
+                self._read(available)
+        except Exception as e:
+            message = f"capture read failed after {self._acquired} samples: {e}"
+            with self._lock:
+                self._error = str(e)
+                self._overflows += isinstance(e, DaqOverflowError)
+            logger.warning(message)
+            if self._on_error:
+                self._on_error(message)
+        finally:
+            try:
+                self._task.stop()
+            except Exception as e:
+                logger.debug(f"Capture input task stop: {e}")
+            self._emit_live_view()
+
+    def _read(self, num_samples: int):
+        start = time.perf_counter()
+        block = self._task.read(num_samples)
+        first = self._acquired
+        with self._lock:
+            self._read_s += time.perf_counter() - start
+            self._reads += 1
+            self._acquired += block.shape[1]
+        self._queue.put(block.astype(CAPTURE_DTYPE))
+        self._queue_max = max(self._queue_max, self._queue.qsize())
+        self._update_live_view(first, block)
+        if self._reference is not None:
+            self._analyse(first, block)
+
+    def _run_disk(self):
+        while True:
+            block = self._queue.get()
+            if block is None:
+                return
+            start = time.perf_counter()
+            try:
+                self._file.append(block)
+            except OSError as e:
+                message = f"capture file write failed: {e}"
+                logger.warning(message)
+                with self._lock:
+                    self._error = str(e)
+                self._stop_event.set()
+                if self._on_error:
+                    self._on_error(message)
+                # Keep consuming so the reader never blocks on a full queue
+                while self._queue.get() is not None:
+                    pass
+                return
+            with self._lock:
+                self._disk_s += time.perf_counter() - start
+
+    # ── Live view ─────────────────────────────────────────────────────────
+
+    def _update_live_view(self, first: int, block: np.ndarray):
+        bucket = self._bucket
+        data = np.concatenate((self._live_carry, block), axis=1)
+        first -= self._live_carry.shape[1]
+        full = data.shape[1] - data.shape[1] % bucket
+        self._live_carry = data[:, full:]
+        if full:
+            if bucket == 1:
+                times, values = np.arange(first, first + full), data[:, :full]
+            else:
+                blocks = data[:, :full].reshape(data.shape[0], -1, bucket)
+                i_min, i_max = blocks.argmin(axis=2), blocks.argmax(axis=2)
+                lo = np.take_along_axis(blocks, i_min[..., None], axis=2)[..., 0]
+                hi = np.take_along_axis(blocks, i_max[..., None], axis=2)[..., 0]
+                # Each bucket's extremes in the order they occurred, at shared times
+                min_first = i_min <= i_max
+                values = np.empty((data.shape[0], 2 * lo.shape[1]))
+                values[:, 0::2] = np.where(min_first, lo, hi)
+                values[:, 1::2] = np.where(min_first, hi, lo)
+                starts = first + np.arange(lo.shape[1]) * bucket
+                times = np.repeat(starts, 2) + np.tile([0, bucket // 2], lo.shape[1])
+            rate = self._config.sample_rate_hz
+            horizon = (first + full) / rate - self._config.live_window_s
+            with self._lock:
+                self._live.append((times / rate, values))
+                while self._live and self._live[0][0][-1] < horizon:
+                    self._live.popleft()
+        now = time.perf_counter()
+        if now - self._last_live >= self._config.live_interval_s:
+            self._last_live = now
+            self._emit_live_view()
+
+    def _emit_live_view(self):
+        if self._on_live_view:
+            times, values = self.live_view()
+            self._on_live_view(times, values)
+
+    # ── Analysis ──────────────────────────────────────────────────────────
+
+    def _analyse(self, first: int, block: np.ndarray):
+        if not self._window:
+            self._window_start = first
+        self._window.append(block)
+        if sum(b.shape[1] for b in self._window) < self._window_samples:
+            return
+        signal = np.concatenate(self._window, axis=1)
+        start = self._window_start
+        self._window = []
+        reference = self._reference.get(start - self._max_lag, start + signal.shape[1])
+        if reference is None:
+            return
+        reference = reference[0]
+        config = self._config
+        rate = config.sample_rate_hz
+        with self._lock:
+            self._windows += 1
+
+        if config.loopback_row is not None:
+            estimate = estimate_lag(reference, signal[config.loopback_row], self._max_lag)
+            if estimate is not None and estimate[1] >= MIN_LAG_CORRELATION:
+                self._loopback_lag = estimate[0]
+            lag = int(round(self._loopback_lag))
+            expected = reference[self._max_lag - lag:self._max_lag - lag + signal.shape[1]]
+            error = np.abs(signal[config.loopback_row] - expected)
+            with self._lock:
+                self._error_sq_sum += float(np.dot(error, error))
+                self._error_max = max(self._error_max, float(error.max()))
+                self._compared += error.size
+
+        if config.monitor_row is not None:
+            estimate = estimate_lag(reference, signal[config.monitor_row], self._max_lag)
+            if estimate is None or estimate[1] < MIN_LAG_CORRELATION:
+                return
+            latency_s = estimate[0] / rate
+            with self._lock:
+                latency = self._latency
+                latency['measurements'] += 1
+                latency['last_s'] = latency_s
+                latency['sum_s'] += latency_s
+                latency['min_s'] = min(latency['min_s'], latency_s)
+                latency['max_s'] = max(latency['max_s'], latency_s)
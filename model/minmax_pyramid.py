@@ -0,0 +1,95 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import threading
+import time
+
+import numpy as np
+
+from .waveform_decimation import minmax_decimate
+
+
+class MinMaxPyramid:
+    """
+    Precomputed min/max pyramid over a 1-D signal.
+
+    Level k holds, for every block of 2**k samples, the index of its minimum and
+    of its maximum. A zoom window is then served from the coarsest level whose
+    blocks still fit about two per pixel column, so the cost of drawing any
+    window is O(pixels) rather than O(samples). Building is O(n), vectorized,
+    and can run on a background thread; until it completes, decimate() falls
+    back to direct min/max bucketing of the window.
+    """
+
+    def __init__(self, samples: np.ndarray, background: bool = False):
+        self._samples = np.asarray(samples)
+        self._levels: list[tuple[np.ndarray, np.ndarray]] = []
+        self._ready = threading.Event()
+        if background:
+            threading.Thread(target=self._build, name="MinMaxPyramid", daemon=True).start()
+        else:
+            self._build()
+
+    @property
+    def samples(self) -> np.ndarray:
+        return self._samples
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(lo.nbytes + hi.nbytes for lo, hi in self._levels)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def query(self, start: int, stop: int, num_buckets: int) -> np.ndarray | None:
+        """
+        Sample indices of the per-block minima and maxima covering [start, stop),
+        in sample order, from the finest level with at most ~`num_buckets`
+        blocks in the window. None if the window is small enough to draw raw,
+        or the pyramid is still being built.
+        """
+        span = stop - start
+        if span <= 2 * num_buckets or not self._ready.is_set():
+            return None
+        k = int(np.ceil(np.log2(span / num_buckets)))   # block size 2**k, k ≥ 1
+        k = min(max(k, 1), len(self._levels))
+        idx_min, idx_max = self._levels[k - 1]
+        first, last = start >> k, ((stop - 1) >> k) + 1
+        lo, hi = idx_min[first:last], idx_max[first:last]
+
+        indices = np.empty(2 * len(lo), dtype=lo.dtype)
+        indices[0::2] = np.minimum(lo, hi)
+        indices[1::2] = np.maximum(lo, hi)
+        return indices
+
+    def decimate(self, x: np.ndarray, start: int, stop: int,
+                 num_buckets: int) -> tuple[np.ndarray, np.ndarray]:
+        """Decimated (x, y) for the window [start, stop), for a series sharing this pyramid."""
+        indices = self.query(start, stop, num_buckets)
+        if indices is None:
+            return minmax_decimate(x[start:stop], self._samples[start:stop], num_buckets)
+        return x[indices], self._samples[indices]
+
+    def _build(self):
+        t0 = time.perf_counter()
+        y = self._samples
+        index_dtype = np.int32 if len(y) < np.iinfo(np.int32).max else np.int64
+        idx_min = idx_max = np.arange(len(y), dtype=index_dtype)
+        levels = []
+        while len(idx_min) > 1:
+            if len(idx_min) % 2:                     # ragged tail: pair the last block with itself
+                idx_min = np.append(idx_min, idx_min[-1])
+                idx_max = np.append(idx_max, idx_max[-1])
+            a, b = idx_min[0::2], idx_min[1::2]
+            idx_min = np.where(y[b] < y[a], b, a)
+            a, b = idx_max[0::2], idx_max[1::2]
+            idx_max = np.where(y[b] > y[a], b, a)
+            levels.append((idx_min, idx_max))
+        self._levels = levels
+        self._ready.set()
+        logger.debug(f"Min/max pyramid: {len(y)} samples, {len(levels)} levels, "
+                     f"{self.nbytes} B in {(time.perf_counter() - t0) * 1e3:.1f} ms")
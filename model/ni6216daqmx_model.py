@@ -1,30 +1,56 @@
 import logging
 logger = logging.getLogger(__name__)
 
+import queue
 import threading
-import usb.core
-import nidaqmx
+import time
+from datetime import datetime
 import numpy as np
 
-from nidaqmx.constants import AcquisitionType, RegenerationMode
-
 from PySide6.QtCore import QObject, Signal
-from nidaqmx.stream_writers import AnalogMultiChannelWriter
-from model.transducer_model import mm_hg_to_volts
+from model.daq_backend import DaqBackend, ao_sample_clock_terminal
+from model.daq_metrics import DaqMetrics
+from model.calibration import Calibration, load_calibration
 from model.heart_beat_model import HeartBeatModel
 from model.abp_waveform_file_model import AbpWaveformFileModel
-
-NI_6216_VID = 0x3923
-NI_6216_PID = 0x733B
+from model.beat_sequence import BeatSequence, BeatSequenceSource, BeatVariability, BpmSchedule
+from model.beat_slot_source import DoubleBufferedBeatSource
+from model.daq_stream_writer import DaqStreamWriter, PrefetchingSampleSource, SampleSource, StreamWriterConfig
+from model.daq_task_manager import DaqTaskManager
+from model.loopback_capture import CaptureConfig, LoopbackCapture, OutputReference, PeriodicReference, capture_dir
+from model.pchip_batch import PchipBatch
+from model.resampler import ResamplingSampleSource, resample
+from model.scenario import Scenario, ScenarioRenderer, ScenarioSource
+from model.usb_hotplug import HotplugEvent, HotplugMonitor
+
+# Analog outputs, in the order of the output task's channels and of every written block
+AO_CHANNELS = ("ao0", "ao1")
 
 class Ni6216DaqMx(QObject):
     status_message = Signal(str)
     connection_changed = Signal(bool)
     generation_state_changed = Signal(bool)
+    waveform_switched = Signal(float)       # seconds from the edit to the new waveform reaching the output
+    capture_view = Signal(object, object)   # loopback capture: times (s), (channels, points) volts
+    metrics_updated = Signal(dict)          # one health_snapshot() row, at METRICS_INTERVAL_S
+
+    # Health metrics sampling period and history kept; the sampler is built with them,
+    # so they are class settings (override on a subclass, not on an instance)
+    METRICS_INTERVAL_S = 0.1
+    METRICS_HISTORY_S = 600.0
 
     def __init__(self, heart_beat_model: HeartBeatModel,
-                 abp_waveform_file_model: AbpWaveformFileModel, parent=None):
+                 abp_waveform_file_model: AbpWaveformFileModel,
+                 backend: DaqBackend | None = None,
+                 hotplug_monitor: HotplugMonitor | None = None,
+                 calibration: Calibration | None = None, device_name: str = "Dev1", parent=None):
         super().__init__(parent)
+        if backend is None:
+            from model.ni_daq_backend import NiDaqBackend     # needs nidaqmx + pyusb
+            backend = NiDaqBackend(device_name)
+        self._backend = backend
+        self._calibration = calibration if calibration is not None else load_calibration()
+        self._device_name = device_name
         self._heart_beat_model = heart_beat_model
         self._waveform_file_model = abp_waveform_file_model
         self._task_lock = threading.Lock()
@@ -32,24 +58,96 @@ class Ni6216DaqMx(QObject):
         self._stop_event = threading.Event()
         self._is_connected = False
         self._task = None
-
+        self._task_mode = None          # DaqTaskManager.WAVEFORM / STATIC while output is active
+        self._task_manager = DaqTaskManager(backend, self._output_channels())
+        self._start_latency = {}        # mode -> start-to-first-sample statistics
+        self._last_start_s = 0.0
+        self._requested_at = None       # start request of the current output run
+        self._task_stops = 0
+        self._last_stop_s = 0.0
+        # Counters of finished runs, so health metrics count over the whole session
+        self._totals = {'written': 0, 'underflows': 0, 'overflows': 0, 'switches': 0}
+        # Held while a finished run moves into _totals, so a snapshot never counts it twice or not at all
+        self._metrics_lock = threading.Lock()
+
+        # Streaming (non-regenerating) output state
+        self._stream_source = None
+        self._beat_sequence = None      # BeatSequence being streamed, which takes beat edits
+        self._beat_sequence_waveforms = []      # ... and the waveforms it renders, a template row each
+        self._scenario_source = None    # PrefetchingSampleSource of the scenario being streamed
+        self._stream_writer = None
+        self._switch_stats = {}
+        self._last_stream_stats = {}
+
+        # Analog input capture running alongside waveform output
+        self._capture = None
+        self._input_task = None
+        self._last_capture_stats = {}
+
+        # Hot-plug events (or monitor errors) queued for the connection thread
+        self._hotplug_events = queue.Queue()
+        self._hotplug_stats = {'events': 0, 'latency_last_s': 0.0, 'latency_max_s': 0.0,
+                               'latency_sum_s': 0.0}
+
+        # Poll interval when neither libusb hotplug nor udev is available
         self.ACTIVE_SEARCH_SLEEP_S = 1
         self.SINGLE_ENDED_REF_VOLTAGE = 0.0
+        # HeartBeatModel waveform driven on each analog output; None holds SINGLE_ENDED_REF_VOLTAGE.
+        # A recording goes to the 'abp' channel, every other channel holds the reference.
+        self.CHANNEL_MAP = {"ao0": "abp", "ao1": "cvp"}
+        # Recordings are output at a tenth of the beat editor's volts
+        self.FILE_WAVEFORM_SCALE = 0.1
 
         self.SAMPLES_PER_SECOND = 1000
+        # Until a device reports its own limit (NI-6216: 250 kS/s)
+        self.MAX_AO_RATE_HZ = 250_000.0
+        # A recording resampled to more samples than this is refused (~160 MB per channel)
+        self.MAX_OUTPUT_SAMPLES = 20_000_000
+
+        # Stream samples from double-buffered waveform slots instead of letting the
+        # device regenerate one buffer, so edits swap in at the next beat boundary
+        # without restarting the task (and without an output dropout)
+        self.STREAMING_OUTPUT = True
+        self.STREAM_BUFFER_S = 0.5
+        self.STREAM_TARGET_LATENCY_S = 0.15
+        self.STREAM_CHUNK_S = 0.025
+        self.STREAM_WRITE_TIMEOUT_S = 10.0
+        # Scenarios are rendered on their own thread this far ahead of the writer, in blocks
+        self.SCENARIO_AHEAD_S = 2.0
+        self.SCENARIO_BLOCK_S = 0.1
+
+        # Capture the output on the AO sample clock with every waveform run:
+        # ai0 wired back from ao0, ai1 from the patient monitor's pressure output
+        self.LOOPBACK_CAPTURE = False
+        self.CAPTURE_CHANNELS = ("ai0", "ai1")
+        self.CAPTURE_DIR = capture_dir()
+        self.CAPTURE_BUFFER_S = 2.0
+        # Output history kept to compare with the capture, beyond the device and capture buffers
+        self.CAPTURE_REFERENCE_S = 2.0
+
+        # Health metrics sampled off the GUI thread; the history is what export_metrics() writes
+        self._metrics = DaqMetrics(self.health_snapshot, self.METRICS_INTERVAL_S, self.METRICS_HISTORY_S,
+                                   on_sample=self.metrics_updated.emit)
 
         # Build initial waveform from HeartBeatModel
-        self._ao0_waveform = None
-        self._ao1_ref = None
+        self._waveforms = {}            # AO channel → one loop of output volts
+        self._waveform_origin = "beat"  # "beat" or "file": what _waveforms were built from
         self._sync_waveform()
 
-        # Connect to "waveform_data_changed" from "heart_beat_model"
-        self._heart_beat_model.waveform_data_changed.connect(self._on_waveform_changed)
+        # Connect to "waveforms_changed" from "heart_beat_model"
+        self._heart_beat_model.waveforms_changed.connect(self._on_waveform_changed)
         # Connect to "waveform_data_changed" from "waveform_file_model"
         self._waveform_file_model.waveform_changed.connect(self._on_waveform_file_changed)
 
+        self._hotplug_monitor = (hotplug_monitor if hotplug_monitor is not None
+                                 else self._backend.create_hotplug_monitor(self.ACTIVE_SEARCH_SLEEP_S))
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._thread.start()
+        self._metrics.start()
+
+    @property
+    def device_name(self) -> str:
+        return self._device_name
 
     @property
     def is_connected(self) -> bool:
@@ -62,181 +160,814 @@ class Ni6216DaqMx(QObject):
     def _set_connected(self, value: bool):
         if self._is_connected != value:
             self._is_connected = value
+            self._metrics.mark("connected" if value else "disconnected")
             self.connection_changed.emit(value)
             # If device is unplugged mid-generation, stop the task
             if not value and self.is_generating:
                 self.stop_generation()
+            with self._task_lock:
+                if value:
+                    self._prepare_tasks()
+                else:
+                    self._task_manager.close()
+                    self._close_input_task_locked()
+
+    def _prepare_tasks(self):
+        """Have the waveform task built and committed before the first start. Caller holds _task_lock."""
+        self._task_manager.set_channels(self._output_channels())
+        if self._task is not None or not self.STREAMING_OUTPUT:
+            return
+        config = self._stream_config()
+        try:
+            self._task_manager.prepare_waveform(config.sample_rate_hz, config.samples(config.buffer_s),
+                                                regenerate=False)
+        except Exception as e:
+            logger.warning(f"NI-6216: could not prepare the waveform task: {e}")
 
     def _run(self):
+        try:
+            self._hotplug_monitor.start(self._hotplug_events.put, self._hotplug_events.put)
+        except Exception as e:
+            self._hotplug_events.put(e)
         while not self._stop_event.is_set():
-            try:
-                device = usb.core.find(idVendor=NI_6216_VID, idProduct=NI_6216_PID)
-                if device is not None:
-                    if not self._is_connected:
-                        self._set_connected(True)
-                        self.status_message.emit(
-                            f"NI-6216 Connected: "
-                            f"[VID:{device.idVendor:04X},PID:{device.idProduct:04X}]"
-                        )
-                else:
-                    if self._is_connected:  # ← only on transition
-                        self._set_connected(False)
-                        self.status_message.emit("NI-6216: device not found.")
-            except Exception as e:
-                error_msg = f"USB error: {e}"
+            item = self._hotplug_events.get()
+            if item is None:
+                break
+            if isinstance(item, HotplugEvent):
+                self._on_hotplug_event(item)
+            else:
+                error_msg = f"USB error: {item}"
                 self._set_connected(False)
                 self.status_message.emit(error_msg)
                 logger.warning(error_msg)
-            self._stop_event.wait(self.ACTIVE_SEARCH_SLEEP_S)
 
-    def start_generation(self):
+    def _on_hotplug_event(self, event: HotplugEvent):
+        try:
+            if event.present:
+                device = event.device or self._backend.find_device()
+                if device is not None and not self._is_connected:
+                    self._device_name = device.name
+                    if device.max_ao_rate_hz:
+                        self.MAX_AO_RATE_HZ = device.max_ao_rate_hz
+                    self._set_connected(True)
+                    self.status_message.emit(
+                        f"NI-6216 Connected: "
+                        f"[VID:{device.vendor_id:04X},PID:{device.product_id:04X}]"
+                    )
+            elif self._is_connected:  # ← only on transition
+                # Monitors without a serial to match report any identical unit leaving
+                if self._backend.find_device() is not None:
+                    logger.debug("NI-6216: removal notification, but the device is still attached")
+                    return
+                self._set_connected(False)
+                self.status_message.emit("NI-6216: device not found.")
+        except Exception as e:
+            error_msg = f"USB error: {e}"
+            self._set_connected(False)
+            self.status_message.emit(error_msg)
+            logger.warning(error_msg)
+            return
+        latency = time.perf_counter() - event.timestamp
+        stats = self._hotplug_stats
+        stats['events'] += 1
+        stats['latency_last_s'] = latency
+        stats['latency_sum_s'] += latency
+        stats['latency_max_s'] = max(stats['latency_max_s'], latency)
+        logger.debug(f"NI-6216 hot-plug ({'arrived' if event.present else 'removed'}) "
+                     f"handled in {latency * 1e3:.1f} ms")
+
+    def hotplug_stats(self) -> dict:
+        """Hot-plug events handled and the time from notification to connection state updated."""
+        stats = dict(self._hotplug_stats)
+        stats['monitor'] = type(self._hotplug_monitor).__name__
+        stats['event_driven'] = self._hotplug_monitor.event_driven
+        if stats['events']:
+            stats['latency_avg_s'] = stats['latency_sum_s'] / stats['events']
+        return stats
+
+    @property
+    def sample_rate_hz(self) -> float:
+        return self.SAMPLES_PER_SECOND
+
+    def set_sample_rate_hz(self, rate_hz: float):
+        """
+        Change the analog output rate. Beats and recordings are resampled to
+        it; running output restarts at the new rate.
+        """
+        rate_hz = float(rate_hz)
+        if not 0 < rate_hz <= self.MAX_AO_RATE_HZ:
+            raise ValueError(f"Output rate must be in (0, {self.MAX_AO_RATE_HZ:g}] Hz, got {rate_hz:g}")
+        if rate_hz == self.SAMPLES_PER_SECOND:
+            return
+        self._metrics.mark(f"output rate {rate_hz:g} S/s")
         with self._task_lock:
-            if self._task is not None or not self._is_connected:
+            was_generating = self._task_mode == DaqTaskManager.WAVEFORM
+        if was_generating:
+            self.stop_generation()
+        self.SAMPLES_PER_SECOND = rate_hz
+        if self._waveform_origin == "file":
+            self._sync_file_waveform()
+        else:
+            self._sync_waveform()
+        with self._task_lock:
+            if self._is_connected:
+                self._prepare_tasks()
+        msg = f"NI-6216: output rate {rate_hz:g} S/s."
+        logger.info(msg)
+        self.status_message.emit(msg)
+        if was_generating:
+            self.start_generation()
+
+    def start_generation(self, source: SampleSource | None = None,
+                         source_rate_hz: float | None = None):
+        """
+        Output the current waveform in a loop, or stream `source` (any, possibly
+        non-periodic, sequence of [ao0, ao1] volts) until it runs out; a source
+        at `source_rate_hz` is resampled to the output rate on the fly. Takes
+        over from a static pressure output without a gap.
+        """
+        requested_at = time.perf_counter()
+        with self._task_lock:
+            if not self._is_connected or self._task_mode == DaqTaskManager.WAVEFORM:
+                if source is not None:
+                    source.close()
+                return
+            self._metrics.mark("start generation" if source is None else "start sequence")
+            if source is not None:
+                if source_rate_hz is not None and source_rate_hz != self.SAMPLES_PER_SECOND:
+                    source = ResamplingSampleSource(source, source_rate_hz, self.SAMPLES_PER_SECOND)
+                self._start_streaming(source, requested_at)
                 return
-            if self._ao0_waveform is None:
+            waveforms = self._stacked_waveforms()
+            if waveforms is None:
                 msg = "NI-6216: analog output ch0, no waveform data available."
                 self.status_message.emit(msg)
                 logger.warning(msg)
                 return
 
-            # Snapshot waveform atomically
-            with self._waveform_lock:
-                ao0 = self._ao0_waveform
-                ao1 = self._ao1_ref
+            if self.STREAMING_OUTPUT:
+                self._start_streaming(DoubleBufferedBeatSource(waveforms), requested_at)
+                return
 
-            samples_per_channel = len(ao0)
+            samples_per_channel = waveforms.shape[1]
+            was_static = self._stop_output_locked()
 
-            self._task = nidaqmx.Task()
             try:
-                #samples_per_channel = len(self._ao0_waveform)
-
-                self._task.ao_channels.add_ao_voltage_chan(
-                    "Dev1/ao0", min_val=-10.0, max_val=10.0
-                )
-                self._task.ao_channels.add_ao_voltage_chan(
-                    "Dev1/ao1", min_val=-10.0, max_val=10.0
+                self._task = self._task_manager.acquire_waveform(
+                    self.SAMPLES_PER_SECOND, samples_per_channel, regenerate=True
                 )
-                self._task.timing.cfg_samp_clk_timing(
-                    rate=self.SAMPLES_PER_SECOND,
-                    sample_mode=AcquisitionType.CONTINUOUS,
-                    samps_per_chan=samples_per_channel
-                )
-                self._task.out_stream.regen_mode = RegenerationMode.ALLOW_REGENERATION
+                self._task_mode = DaqTaskManager.WAVEFORM
 
-                waveforms = np.ascontiguousarray(
-                    np.vstack((ao0, ao1))
-                )
-
-                AnalogMultiChannelWriter(self._task.out_stream).write_many_sample(waveforms)
+                self._task.write(waveforms)
 
+                self._start_capture_locked(PeriodicReference(waveforms))
                 self._task.start()
-                self.generation_state_changed.emit(True)
+                if not was_static:
+                    self.generation_state_changed.emit(True)
                 msg = "NI-6216: waveform generation started."
                 logger.debug(msg)
                 self.status_message.emit(msg)
+                self._measure_first_sample(self._task, requested_at)
 
             except Exception as e:
                 error_msg = f"NI-6216 generation error: {e}"
-                self._task.close()
+                if self._task is not None:
+                    self._task_manager.release(self._task, discard=True)
                 self._task = None
+                self._task_mode = None
+                self._stop_capture_locked()
                 self.generation_state_changed.emit(False)
                 logger.warning(error_msg)
                 self.status_message.emit(error_msg)
 
+    def start_beat_sequence(self, schedule: BpmSchedule, variability: BeatVariability | None = None,
+                            seed: int | None = None, systole_fraction: float | None = None):
+        """
+        Stream the current beats as a beat train following `schedule`, each
+        beat time-warped to its RR interval, until the schedule ends: every
+        mapped output plays its waveform, all on the same beat timing. Beat
+        edits apply from the next beat on.
+        """
+        waveforms = self._sequence_waveforms()
+        sequence = BeatSequence.from_heart_beat_model(
+            self._heart_beat_model, schedule, self.SAMPLES_PER_SECOND, waveforms=waveforms,
+            variability=variability, seed=seed, systole_fraction=systole_fraction,
+        )
+
+        def _to_volts(channel: str, pressure: np.ndarray) -> np.ndarray:
+            # Writer thread: convert the fresh chunk in place, clipping is counted in calibration_stats()
+            return self._calibration.convert(channel, pressure, out=pressure)
+
+        outputs = [(channel, waveforms.index(self.CHANNEL_MAP[channel])
+                    if self.CHANNEL_MAP.get(channel) in waveforms else None) for channel in AO_CHANNELS]
+        self._beat_sequence_waveforms = waveforms
+        self.start_generation(BeatSequenceSource(sequence, outputs, _to_volts, self.SINGLE_ENDED_REF_VOLTAGE))
+
+    def _sequence_waveforms(self) -> list[str]:
+        """The waveforms a beat sequence renders: those mapped to an output ('abp' if none is)."""
+        names = self._heart_beat_model.get_waveform_names()
+        mapped = [self.CHANNEL_MAP.get(channel) for channel in AO_CHANNELS]
+        return list(dict.fromkeys(waveform for waveform in mapped if waveform in names)) or ['abp']
+
+    def start_scenario(self, scenario: Scenario):
+        """
+        Stream a clinical scenario (see model.scenario) until it ends: every
+        mapped output plays its waveform, using the HeartBeatModel's current
+        beats as templates unless the scenario brings its own. The scenario
+        is rendered on a separate thread SCENARIO_AHEAD_S ahead of the
+        writer, which waits for the read-ahead on its own thread before the
+        output starts: neither the caller nor the writer waits for rendering.
+        """
+        heart_beat = self._heart_beat_model
+        templates = {name: heart_beat.get_waveform_knots(name) for name in heart_beat.get_waveform_names()}
+        renderer = ScenarioRenderer(scenario, templates, self.SAMPLES_PER_SECOND)
+
+        def _to_volts(channel: str, pressure: np.ndarray) -> np.ndarray:
+            # Prefetch thread: convert the fresh block in place, clipping is counted in calibration_stats()
+            return self._calibration.convert(channel, pressure, out=pressure)
+
+        outputs = [(channel, self.CHANNEL_MAP.get(channel)) for channel in AO_CHANNELS]
+        source = PrefetchingSampleSource(
+            ScenarioSource(renderer, outputs, _to_volts, self.SINGLE_ENDED_REF_VOLTAGE),
+            block_samples=max(1, int(self.SCENARIO_BLOCK_S * self.SAMPLES_PER_SECOND)),
+            ahead_samples=max(1, int(self.SCENARIO_AHEAD_S * self.SAMPLES_PER_SECOND)),
+        )
+        msg = f"NI-6216: scenario '{scenario.name}' ({scenario.duration_s:g} s)."
+        logger.info(msg)
+        self.status_message.emit(msg)
+        self.start_generation(source)
+
+    def scenario_stats(self) -> dict:
+        """Progress of the running (or last) scenario and its read-ahead; empty if none was run."""
+        source = self._scenario_source
+        if source is None:
+            return {}
+        return {**source.source.renderer.stats(), **source.stats()}
+
+    def _stream_config(self) -> StreamWriterConfig:
+        return StreamWriterConfig(
+            sample_rate_hz=self.SAMPLES_PER_SECOND,
+            buffer_s=self.STREAM_BUFFER_S,
+            target_latency_s=self.STREAM_TARGET_LATENCY_S,
+            chunk_s=self.STREAM_CHUNK_S,
+            write_timeout_s=self.STREAM_WRITE_TIMEOUT_S,
+        )
+
+    def _start_streaming(self, source: SampleSource, requested_at: float):
+        """Feed the non-regenerating waveform task from a DaqStreamWriter. Caller holds _task_lock."""
+        config = self._stream_config()
+        was_static = self._stop_output_locked()
+        try:
+            self._task = self._task_manager.acquire_waveform(
+                config.sample_rate_hz, config.samples(config.buffer_s), regenerate=False
+            )
+            self._task_mode = DaqTaskManager.WAVEFORM
+            reference = None
+            if self.LOOPBACK_CAPTURE:
+                reference = OutputReference(source.num_channels, config.samples(
+                    config.buffer_s + self.CAPTURE_BUFFER_S + self.CAPTURE_REFERENCE_S))
+            writer = DaqStreamWriter(
+                self._task, source, config,
+                on_progress=self._on_stream_progress,
+                on_error=self._on_stream_error,
+                on_finished=self._on_stream_finished,
+                on_write=reference.push if reference is not None else None,
+            )
+            self._switch_stats = {'switches': 0, 'latency_max_s': 0.0, 'latency_sum_s': 0.0}
+            # Only a looping beat source or a beat sequence can take waveform edits
+            self._stream_source = source if isinstance(source, DoubleBufferedBeatSource) else None
+            self._beat_sequence = source.sequence if isinstance(source, BeatSequenceSource) else None
+            if isinstance(source, PrefetchingSampleSource) and isinstance(source.source, ScenarioSource):
+                self._scenario_source = source
+            self._stream_writer = writer
+            self._start_capture_locked(reference)
+            writer.start()
+            if not was_static:
+                self.generation_state_changed.emit(True)
+            msg = (f"NI-6216: waveform streaming started "
+                   f"({writer.target_latency_s * 1e3:.0f} ms ahead, "
+                   f"{self.STREAM_BUFFER_S * 1e3:.0f} ms buffer).")
+            logger.debug(msg)
+            self.status_message.emit(msg)
+            self._measure_first_sample(self._task, requested_at)
+
+        except Exception as e:
+            error_msg = f"NI-6216 generation error: {e}"
+            if self._task is not None:
+                self._task_manager.release(self._task, discard=True)
+            self._task = None
+            self._task_mode = None
+            self._stream_source = None
+            self._beat_sequence = None
+            self._stream_writer = None
+            source.close()
+            self._stop_capture_locked()
+            self.generation_state_changed.emit(False)
+            logger.warning(error_msg)
+            self.status_message.emit(error_msg)
+
+    def _measure_first_sample(self, task, requested_at: float):
+        """Time from the start request until the first sample left the device, off the caller's thread."""
+        rate = self.SAMPLES_PER_SECOND
+        self._requested_at = requested_at
+
+        def _probe():
+            deadline = time.perf_counter() + 1.0
+            # The task object is reused, so also check this is still the same run
+            while (self._task is task and self._requested_at == requested_at
+                   and time.perf_counter() < deadline):
+                try:
+                    generated = task.total_samples_generated
+                except Exception:
+                    return
+                if generated > 0:
+                    first_sample_at = time.perf_counter() - (generated - 1) / rate
+                    self._record_start_latency(DaqTaskManager.WAVEFORM,
+                                               max(0.0, first_sample_at - requested_at))
+                    return
+                time.sleep(0.0005)
+
+        threading.Thread(target=_probe, name="FirstSampleProbe", daemon=True).start()
+
+    def _record_start_latency(self, mode: str, latency: float):
+        stats = self._start_latency.setdefault(mode, {'starts': 0, 'last_s': 0.0, 'max_s': 0.0,
+                                                      'sum_s': 0.0})
+        stats['starts'] += 1
+        stats['last_s'] = latency
+        self._last_start_s = latency
+        stats['sum_s'] += latency
+        stats['max_s'] = max(stats['max_s'], latency)
+        logger.info(f"NI-6216 {mode} output: first sample {latency * 1e3:.1f} ms after the request")
+
+    def task_stats(self) -> dict:
+        """Task reuse counters and start-to-first-sample latency per output mode."""
+        stats = {'tasks': self._task_manager.stats()}
+        for mode, latency in self._start_latency.items():
+            stats[mode] = dict(latency, avg_s=latency['sum_s'] / latency['starts'])
+        return stats
+
+    # ── Health metrics ────────────────────────────────────────────────────
+
+    def health_snapshot(self) -> dict:
+        """
+        Flat health metrics, counted over the whole session. Only reads state
+        the output threads keep anyway (no driver calls), so it is cheap to
+        sample from any thread.
+        """
+        with self._metrics_lock:
+            writer = self._stream_writer
+            stream = writer.stats() if writer is not None else {}
+            capture = self._capture
+            capture_stats = capture.stats() if capture is not None else {}
+            switches = self._switch_stats if writer is not None else {}
+            totals = dict(self._totals)
+        monitor = self._hotplug_monitor.stats()
+        rate = self.SAMPLES_PER_SECOND
+        backlog = stream.get('written', 0) - stream.get('generated', 0)
+        buffer_samples = stream.get('buffer_s', 0.0) * rate
+        return {
+            'connected': int(self._is_connected),
+            'mode': self._task_mode or "idle",
+            'sample_rate_hz': rate,
+            'samples_written': totals['written'] + stream.get('written', 0),
+            'buffer_fill_pct': 100.0 * backlog / buffer_samples if buffer_samples else 0.0,
+            'backlog_ms': backlog / rate * 1e3,
+            'min_headroom_ms': stream.get('min_headroom_s', 0.0) * 1e3,
+            'underflows': totals['underflows'] + stream.get('underflows', 0),
+            'overflows': totals['overflows'] + capture_stats.get('overflows', 0),
+            'writer_jitter_ms': stream.get('wake_jitter_ms', 0.0),
+            'write_avg_ms': stream.get('write_avg_ms', 0.0),
+            'task_starts': sum(latency['starts'] for latency in self._start_latency.values()),
+            'task_start_last_ms': self._last_start_s * 1e3,
+            'task_stops': self._task_stops,
+            'task_stop_last_ms': self._last_stop_s * 1e3,
+            'tasks_created': self._task_manager.stats()['created'],
+            'hotplug_events': self._hotplug_stats['events'],
+            'hotplug_latency_last_ms': self._hotplug_stats['latency_last_s'] * 1e3,
+            'usb_poll_last_ms': monitor.get('poll_last_s', 0.0) * 1e3,
+            'swaps': totals['switches'] + switches.get('switches', 0),
+            'swap_latency_last_ms': switches.get('latency_last_s', 0.0) * 1e3,
+            'capture_samples': capture_stats.get('samples', 0),
+        }
+
+    def mark_event(self, label: str):
+        """Label the next metrics sample, e.g. with the UI action that just happened."""
+        self._metrics.mark(label)
+
+    def metrics_history(self) -> list[dict]:
+        return self._metrics.history()
+
+    def metrics_stats(self) -> dict:
+        return self._metrics.stats()
+
+    def export_metrics(self, path) -> int:
+        """Write the metrics history as CSV; returns the number of samples written."""
+        return self._metrics.export_csv(path)
+
+    def _on_stream_progress(self, written: int, generated: int):
+        """Writer thread, after each top-up: report beat-boundary switches that went out."""
+        source = self._stream_source
+        if source is None:
+            return
+        for switch in source.pop_switches():
+            # Time since the edit, plus the time for playback to reach the first new sample
+            ahead = max(0, switch.sample_index - generated) / self.SAMPLES_PER_SECOND
+            latency = (time.perf_counter() - switch.queued_at) + ahead
+            stats = self._switch_stats
+            stats['switches'] += 1
+            stats['latency_last_s'] = latency
+            stats['latency_sum_s'] += latency
+            stats['latency_max_s'] = max(stats['latency_max_s'], latency)
+            logger.debug(f"NI-6216: waveform switched at sample {switch.sample_index}, "
+                         f"latency {latency * 1e3:.1f} ms")
+            self.waveform_switched.emit(latency)
+            self.status_message.emit(
+                f"NI-6216: new waveform live at beat boundary ({latency * 1e3:.0f} ms after the edit)."
+            )
+
+    def _on_stream_error(self, message: str):
+        self._metrics.mark(f"stream error: {message}")
+        error_msg = f"NI-6216 streaming error (output interrupted): {message}"
+        self.status_message.emit(error_msg)
+        # Called on the writer thread, which stop_generation() joins
+        threading.Thread(target=self.stop_generation, daemon=True).start()
+
+    def _on_stream_finished(self):
+        self.status_message.emit("NI-6216: sequence finished.")
+        threading.Thread(target=self.stop_generation, daemon=True).start()
+
+    def stream_stats(self) -> dict:
+        """Writer statistics plus beat-boundary switch latency of the current/last stream."""
+        writer = self._stream_writer
+        stats = dict(self._last_stream_stats if writer is None else writer.stats())
+        stats.update(self._switch_stats)
+        if stats.get('switches'):
+            stats['latency_avg_s'] = stats['latency_sum_s'] / stats['switches']
+        return stats
+
     def stop_generation(self):
         with self._task_lock:
-            if self._task is None:
-                return
-            try:
-                self._task.stop()
-                self._task.close()
-            except Exception as e:
-                error_msg = f"NI-6216 stop error: {e}"
-                logger.warning(error_msg)
-                self.status_message.emit(error_msg)
-            finally:
+            if self._task is not None:
+                self._metrics.mark("stop generation")
+            if self._stop_output_locked():
                 msg = "NI-6216: waveform generation stopped."
-                self._task = None
                 self.generation_state_changed.emit(False)
                 logger.debug(msg)
                 self.status_message.emit(msg)
 
+    def _stop_output_locked(self) -> bool:
+        """Stop whatever output is active, keeping its task for reuse. Caller holds _task_lock."""
+        if self._task is None:
+            return False
+        stop_started = time.perf_counter()
+        if self._stream_writer is not None:
+            self._stream_writer.stop()
+            self._last_stream_stats = self._stream_writer.stats()
+            stats = self.stream_stats()
+            # Totals first, writer last, in one step for health_snapshot()
+            with self._metrics_lock:
+                self._totals['written'] += stats['written']
+                self._totals['underflows'] += stats['underflows']
+                self._totals['switches'] += stats['switches']
+                self._stream_writer = None
+            self._stream_source = None
+            self._beat_sequence = None
+            logger.info(f"NI-6216 stream: {stats['written']} samples, "
+                        f"{stats['switches']} waveform switches "
+                        f"(max latency {stats['latency_max_s'] * 1e3:.1f} ms), "
+                        f"{stats['underflows']} underflows, "
+                        f"min headroom {stats['min_headroom_s'] * 1e3:.0f} ms")
+        try:
+            self._task_manager.release(self._task)
+        except Exception as e:
+            error_msg = f"NI-6216 stop error: {e}"
+            logger.warning(error_msg)
+            self.status_message.emit(error_msg)
+        finally:
+            self._task = None
+            self._task_mode = None
+            self._task_stops += 1
+            self._last_stop_s = time.perf_counter() - stop_started
+            # The AO sample clock has stopped, so the capture has every sample of the run
+            self._stop_capture_locked()
+        return True
+
+    # ── Loopback capture ──────────────────────────────────────────────────
+
+    @property
+    def loopback_capture_enabled(self) -> bool:
+        return self.LOOPBACK_CAPTURE
+
+    def set_loopback_capture(self, enabled: bool):
+        """Capture ai0/ai1 with every waveform run from the next start; disabling ends a capture at once."""
+        self.LOOPBACK_CAPTURE = bool(enabled)
+        with self._task_lock:
+            if not enabled:
+                self._stop_capture_locked()
+            elif self._task_mode == DaqTaskManager.WAVEFORM and self._capture is None:
+                self.status_message.emit("NI-6216: loopback capture starts with the next generation.")
+
+    def capture_stats(self) -> dict:
+        """Samples captured, file, fidelity and monitor latency of the current/last capture."""
+        capture = self._capture
+        return capture.stats() if capture is not None else dict(self._last_capture_stats)
+
+    def _start_capture_locked(self, reference: OutputReference | PeriodicReference | None):
+        """Arm the input task on the AO sample clock before the output starts. Caller holds _task_lock."""
+        if not self.LOOPBACK_CAPTURE:
+            return
+        config = CaptureConfig(
+            sample_rate_hz=self.SAMPLES_PER_SECOND,
+            channel_names=self.CAPTURE_CHANNELS,
+            clock_source=ao_sample_clock_terminal(self._device_name),
+            buffer_s=self.CAPTURE_BUFFER_S,
+        )
+        # Millisecond stamp: a restart within the same second must not overwrite the last capture,
+        # device name: nor may another unit's capture started at the same time
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        path = self.CAPTURE_DIR / f"loopback_{self._device_name}_{stamp}"
+        try:
+            if self._input_task is None:
+                self._input_task = self._backend.create_input_task(
+                    [f"{self._device_name}/{channel}" for channel in self.CAPTURE_CHANNELS]
+                )
+            capture = LoopbackCapture(self._input_task, config, path, reference,
+                                      on_live_view=self.capture_view.emit,
+                                      on_error=self._on_capture_error)
+            capture.start()
+        except Exception as e:
+            msg = f"NI-6216: loopback capture unavailable, output continues without it: {e}"
+            logger.warning(msg)
+            self.status_message.emit(msg)
+            return
+        self._capture = capture
+        self.status_message.emit(f"NI-6216: loopback capture to {path}.")
+
+    def _stop_capture_locked(self):
+        capture = self._capture
+        if capture is None:
+            return
+        stats = capture.stop()
+        self._last_capture_stats = stats
+        with self._metrics_lock:
+            self._totals['overflows'] += stats['overflows']
+            self._capture = None
+        msg = f"NI-6216: loopback capture saved, {stats['seconds']:.1f} s in {stats['path']}"
+        if 'fidelity_rms_v' in stats:
+            msg += f", output error {stats['fidelity_rms_v'] * 1e3:.2f} mV rms"
+        if 'latency_avg_s' in stats:
+            msg += f", monitor latency {stats['latency_avg_s'] * 1e3:.1f} ms"
+        logger.info(msg)
+        self.status_message.emit(msg + ".")
+
+    def _on_capture_error(self, message: str):
+        # Reader thread; the output keeps going, only the capture ends
+        self.status_message.emit(f"NI-6216 capture error: {message}")
+
+    def _close_input_task_locked(self):
+        self._stop_capture_locked()
+        if self._input_task is not None:
+            try:
+                self._input_task.close()
+            except Exception as e:
+                logger.debug(f"NI-6216: closing the input task: {e}")
+            self._input_task = None
+
     def set_static_pressure(self, pressure_mmhg: float = 0.0):
+        """Drive a fixed pressure; replaces waveform output (or a previous static value) directly."""
+        requested_at = time.perf_counter()
         with self._task_lock:
-            if self._task is not None or not self._is_connected:
+            if not self._is_connected:
                 logger.debug(f"Task Status: {self._task} Connection Status:{self._is_connected}")
                 return
 
             logger.info(f"Zero Pressure requested at {pressure_mmhg} mmHg")
-            task = nidaqmx.Task()
+            self._metrics.mark(f"static pressure {pressure_mmhg} mmHg")
+            was_active = self._task is not None
+            if self._task_mode == DaqTaskManager.WAVEFORM:
+                self._stop_output_locked()
+            task = None
             try:
-                task.ao_channels.add_ao_voltage_chan("Dev1/ao0", min_val=-10.0, max_val=10.0)
-                task.ao_channels.add_ao_voltage_chan("Dev1/ao1", min_val=-10.0, max_val=10.0)
+                task = self._task_manager.acquire_static()
 
-                voltage = mm_hg_to_volts(pressure_mmhg)
-                AnalogMultiChannelWriter(task.out_stream).write_one_sample(
-                    np.array([voltage, self.SINGLE_ENDED_REF_VOLTAGE])
-                )
+                voltage = self._calibration.convert_value("ao0", pressure_mmhg)
+                task.write_static(np.array([voltage, self.SINGLE_ENDED_REF_VOLTAGE]))
 
-                task.start()
+                if self._task is None:
+                    task.start()
+                self._record_start_latency(DaqTaskManager.STATIC, time.perf_counter() - requested_at)
                 self._task = task
-                self.generation_state_changed.emit(True)
+                self._task_mode = DaqTaskManager.STATIC
+                if not was_active:
+                    self.generation_state_changed.emit(True)
                 msg = f"NI-6216: fixed pressure output {pressure_mmhg} mmHg ({voltage:.3f} V)."
                 logger.debug(msg)
                 self.status_message.emit(msg)
 
             except Exception as e:
                 error_msg = f"NI-6216 zero pressure error: {e}"
-                task.close()
+                if task is not None:
+                    self._task_manager.release(task, discard=True)
+                self._task = None
+                self._task_mode = None
                 self.generation_state_changed.emit(False)
                 logger.warning(error_msg)
                 self.status_message.emit(error_msg)
 
+    def _output_channels(self) -> list[str]:
+        return [f"{self._device_name}/{channel}" for channel in AO_CHANNELS]
+
     def stop(self):
         self.stop_generation()
+        self._metrics.stop()
         self._stop_event.set()
+        self._hotplug_monitor.stop()
+        self._hotplug_events.put(None)
         self._thread.join()
-
-    def _sync_waveform(self):
-        """Pull latest pressure points from HeartBeatModel and convert to volts."""
-        waveform = self._heart_beat_model.get_waveform_points()
-        pressure_points = np.array(waveform['abp_waveform_pressure_points'])
-        ao0 = np.array([mm_hg_to_volts(p) for p in pressure_points])
-        ao1 = np.full(len(ao0), self.SINGLE_ENDED_REF_VOLTAGE)
+        with self._task_lock:
+            self._task_manager.close()
+            self._close_input_task_locked()
+
+    def set_channel_map(self, channel_map: dict):
+        """
+        Choose the HeartBeatModel waveform driven on each analog output (None
+        holds the reference voltage); channels left out keep their mapping.
+        Beat output re-renders and running output switches at the next beat.
+        """
+        names = self._heart_beat_model.get_waveform_names()
+        for channel, waveform in channel_map.items():
+            if channel not in AO_CHANNELS:
+                raise ValueError(f"Unknown analog output '{channel}', expected one of {list(AO_CHANNELS)}")
+            if waveform is not None and waveform not in names:
+                raise ValueError(f"Unknown waveform '{waveform}' for {channel}, expected one of {names}")
+        self.CHANNEL_MAP = {**self.CHANNEL_MAP, **channel_map}
+        if self._waveform_origin == "file":
+            if not self._sync_file_waveform():
+                return
+        else:
+            self._sync_waveform()
+        self._queue_stream_waveform(at_boundary=True)
+
+    def _sync_waveform(self, waveforms: list[str] | None = None) -> list[str]:
+        """
+        Render one beat at the output rate on every analog output mapped to one
+        of `waveforms` (all when None) and convert it to volts. The mapped
+        waveforms are evaluated together, in one batched PCHIP pass over the
+        shared beat timebase; other channels keep their buffers unless the beat
+        length changed. Returns the channels that were rewritten.
+        """
+        heart_beat = self._heart_beat_model
+        num_out = max(2, round(heart_beat.get_num_of_samples_per_heart_beat() * self.SAMPLES_PER_SECOND
+                               / heart_beat.get_sample_rate_hz()))
+        with self._waveform_lock:
+            current = dict(self._waveforms) if self._waveform_origin == "beat" else {}
+        stale = [channel for channel in AO_CHANNELS
+                 if waveforms is None or self.CHANNEL_MAP.get(channel) in waveforms
+                 or channel not in current or len(current[channel]) != num_out]
+        if not stale:
+            return []
+
+        available = heart_beat.get_waveform_names()
+        rendered = [channel for channel in stale if self.CHANNEL_MAP.get(channel) in available]
+        updated = {channel: np.full(num_out, self.SINGLE_ENDED_REF_VOLTAGE)
+                   for channel in stale if channel not in rendered}
+        if rendered:
+            pressure = self._render_output_beats([self.CHANNEL_MAP[channel] for channel in rendered], num_out)
+            for channel, row in zip(rendered, pressure):
+                # The render is shared (read-only): convert into a fresh buffer
+                updated[channel] = self._pressure_to_volts(row, channel=channel)
         # Assign atomically under a dedicated waveform lock
         with self._waveform_lock:
-            self._ao0_waveform = ao0
-            self._ao1_ref = ao1
-
-    def _sync_file_waveform(self):
-        """Pull latest pressure points from HeartBeatModel and convert to volts."""
-        pressure_points = np.array(self._waveform_file_model.pressure_points)
-        ao0 = (np.array([mm_hg_to_volts(p) for p in pressure_points]))/10
-        ao0 = np.clip(ao0, -10.0, 10.0)
-        ao1 = np.full(len(ao0), self.SINGLE_ENDED_REF_VOLTAGE)
+            self._waveforms = {**current, **updated}
+            self._waveform_origin = "beat"
+        return stale
+
+    def _render_output_beats(self, waveforms: list[str], num_out: int) -> np.ndarray:
+        """
+        One beat of each of `waveforms` at `num_out` samples, (waveforms, num_out)
+        mmHg, read-only. Renders go through the HeartBeatModel's template cache,
+        keyed by the knots, so units of a DaqDevicePool sharing the model render
+        an edit once and only calibrate it each.
+        """
+        heart_beat = self._heart_beat_model
+        knots = [heart_beat.get_waveform_knots(waveform) for waveform in waveforms]
+        key = ('output', num_out, tuple((tuple(x.tolist()), tuple(y.tolist())) for x, y in knots))
+        cache = heart_beat.template_cache
+        pressure = cache.get(key)
+        if pressure is None:
+            batch = PchipBatch([x for x, _ in knots], [y for _, y in knots])
+            pressure = cache.put(key, batch(np.arange(num_out) / num_out))
+        return pressure
+
+    def _stacked_waveforms(self) -> np.ndarray | None:
+        """One loop of every analog output, shape (channels, samples), or None before any sync."""
+        with self._waveform_lock:
+            waveforms = self._waveforms
+        if not waveforms:
+            return None
+        return np.vstack([waveforms[channel] for channel in AO_CHANNELS])
+
+    def _sync_file_waveform(self) -> bool:
+        """
+        Pull latest pressure points from AbpWaveformFileModel, resample to the
+        output rate, convert to volts on the channel mapped to 'abp' (ao0 if
+        none is). False if the recording was refused.
+        """
+        channel = next((c for c in AO_CHANNELS if self.CHANNEL_MAP.get(c) == 'abp'), AO_CHANNELS[0])
+        pressure = self._waveform_file_model.pressure_points
+        source_rate = self._waveform_file_model.sample_rate_hz
+        if len(pressure) and source_rate != self.SAMPLES_PER_SECOND:
+            num_out = -(-len(pressure) * self.SAMPLES_PER_SECOND // source_rate)
+            if num_out > self.MAX_OUTPUT_SAMPLES:
+                msg = (f"NI-6216: recording too long to output at {self.SAMPLES_PER_SECOND:g} S/s "
+                       f"({num_out:.0f} samples, limit {self.MAX_OUTPUT_SAMPLES}); waveform unchanged.")
+                logger.warning(msg)
+                self.status_message.emit(msg)
+                return False
+            ao0 = self._pressure_to_volts(resample(pressure, source_rate, self.SAMPLES_PER_SECOND),
+                                          scale=self.FILE_WAVEFORM_SCALE, in_place=True, channel=channel)
+            logger.debug(f"NI-6216: recording resampled {source_rate:g} → "
+                         f"{self.SAMPLES_PER_SECOND:g} Hz ({len(pressure)} → {len(ao0)} samples)")
+        else:
+            ao0 = self._pressure_to_volts(pressure, scale=self.FILE_WAVEFORM_SCALE, channel=channel)
+        waveforms = {other: np.full(len(ao0), self.SINGLE_ENDED_REF_VOLTAGE) for other in AO_CHANNELS}
+        waveforms[channel] = ao0
         # Assign atomically under a dedicated waveform lock
         with self._waveform_lock:
-            self._ao0_waveform = ao0
-            self._ao1_ref = ao1
-
-    def _on_waveform_changed(self):
+            self._waveforms = waveforms
+            self._waveform_origin = "file"
+        return True
+
+    def _pressure_to_volts(self, pressure_points, scale: float = 1.0,
+                           in_place: bool = False, channel: str = "ao0") -> np.ndarray:
+        """
+        Calibrated volts for `channel`, in a fresh buffer unless `in_place` (for
+        a float64 buffer the caller owns); reports clipping.
+        """
+        pressure = np.asarray(pressure_points, dtype=np.float64)
+        counts = {}
+        volts = self._calibration.convert(channel, pressure, out=pressure if in_place else None,
+                                          scale=scale, counts=counts)
+        clipped = counts['clipped_low'] + counts['clipped_high']
+        if clipped:
+            calibration = self._calibration[channel]
+            msg = (f"NI-6216: {clipped} of {len(volts)} samples clipped to "
+                   f"{calibration.min_v:g}..{calibration.max_v:g} V on {channel}.")
+            logger.warning(msg)
+            self.status_message.emit(msg)
+        return volts
+
+    def calibration_stats(self) -> dict:
+        return self._calibration.stats()
+
+    def _queue_stream_waveform(self, at_boundary: bool) -> bool:
+        """Hand the synced waveform to a running stream; False if not streaming."""
+        with self._task_lock:
+            streaming = self._stream_writer is not None
+            source = self._stream_source
+        if source is None:
+            return streaming        # a custom sequence keeps playing untouched
+        source.queue(self._stacked_waveforms(), at_boundary=at_boundary)
+        return True
+
+    def _on_waveform_changed(self, waveforms: list):
+        self._metrics.mark("beat edited")
+        if not self._sync_waveform(waveforms):
+            return                  # none of the edited waveforms is on an output
+        sequence = self._beat_sequence
+        if sequence is not None:
+            # The sequence renders the waveforms mapped when it started, in that order
+            sequence_waveforms = self._beat_sequence_waveforms
+            if any(waveform in sequence_waveforms for waveform in waveforms):
+                sequence.set_template(self._heart_beat_model.get_waveforms_interpolator(sequence_waveforms))
+                self.status_message.emit("NI-6216: beat sequence template updated (next beat).")
+            return
+        # Streaming: the edited beat takes over at the next beat boundary, task untouched
+        if self._queue_stream_waveform(at_boundary=True):
+            self.status_message.emit("NI-6216: waveform updated from HeartBeat model (next beat).")
+            return
         with self._task_lock:
             was_generating = self._task is not None
         #was_generating = self.is_generating
         if was_generating:
             self.stop_generation()
-        self._sync_waveform()
         self.status_message.emit("NI-6216: waveform updated from HeartBeat model.")
         if was_generating:
             self.start_generation()
 
     def _on_waveform_file_changed(self):
+        self._metrics.mark("recording changed")
+        if not self._sync_file_waveform():
+            return
+        # A different recording replaces the stimulus outright rather than waiting for it to loop
+        if self._queue_stream_waveform(at_boundary=False):
+            self.status_message.emit("NI-6216: waveform updated from waveform file model.")
+            return
         with self._task_lock:
             was_generating = self._task is not None
         #was_generating = self.is_generating
         if was_generating:
             self.stop_generation()
-        self._sync_file_waveform()
         self.status_message.emit("NI-6216: waveform updated from waveform file model.")
         if was_generating:
             self.start_generation()
@@ -0,0 +1,343 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import numpy as np
+import nidaqmx
+import nidaqmx.system
+import usb.core
+from nidaqmx.constants import AcquisitionType, RegenerationMode, TaskMode, TerminalConfiguration
+from nidaqmx.error_codes import DAQmxErrors
+from nidaqmx.errors import DaqError
+from nidaqmx.stream_readers import AnalogMultiChannelReader
+from nidaqmx.stream_writers import AnalogMultiChannelWriter
+
+from .daq_backend import (
+    DaqBackend,
+    DaqBackendError,
+    DaqDeviceInfo,
+    DaqDeviceRemovedError,
+    DaqInputTask,
+    DaqOutputTask,
+    DaqOverflowError,
+    DaqRangeError,
+    DaqUnderflowError,
+    EveryNSamplesCallback,
+)
+from .usb_hotplug import FilteredHotplugMonitor, HotplugMonitor, create_usb_hotplug_monitor
+
+NI_6216_VID = 0x3923
+NI_6216_PID = 0x733B
+NI_6216_MAX_AO_RATE_HZ = 250_000.0
+
+# Driver errors meaning the device ran out of samples to generate
+UNDERFLOW_ERROR_CODES = frozenset(error.value for error in (
+    DAQmxErrors.GEN_STOPPED_TO_PREVENT_REGEN_OF_OLD_SAMPLES,
+    DAQmxErrors.GEN_STOPPED_TO_PREVENT_INTERMEDIATE_BUFFER_REGEN_OF_OLD_SAMPLES,
+    DAQmxErrors.OUTPUT_FIFO_UNDERFLOW,
+    DAQmxErrors.OUTPUT_FIFO_UNDERFLOW_2,
+    DAQmxErrors.DAC_UNDERFLOW,
+))
+RANGE_ERROR_CODES = frozenset(error.value for error in (
+    DAQmxErrors.INVALID_AO_DATA_WRITE,
+    DAQmxErrors.SUPPLIED_VOLTAGE_DATA_OUTSIDE_SPECIFIED_RANGE,
+    DAQmxErrors.AO_MIN_MAX_NOT_IN_DAC_RANGE,
+))
+DEVICE_REMOVED_ERROR_CODES = frozenset(error.value for error in (
+    DAQmxErrors.DEVICE_REMOVED,
+    DAQmxErrors.DEV_ABSENT_OR_UNAVAILABLE,
+))
+# Driver errors meaning acquired samples were lost before they were read
+OVERFLOW_ERROR_CODES = frozenset(error.value for error in (
+    DAQmxErrors.SAMPLES_NO_LONGER_AVAILABLE,
+    DAQmxErrors.ACQ_STOPPED_TO_PREVENT_INPUT_BUFFER_OVERWRITE,
+    DAQmxErrors.ACQ_STOPPED_TO_PREVENT_INTERMEDIATE_BUFFER_OVERFLOW,
+    DAQmxErrors.INPUT_FIFO_OVERFLOW,
+    DAQmxErrors.INPUT_FIFO_OVERFLOW_2,
+))
+
+
+def _translate(e: DaqError) -> DaqBackendError:
+    code = getattr(e, 'error_code', None)
+    if code in UNDERFLOW_ERROR_CODES:
+        return DaqUnderflowError(str(e))
+    if code in RANGE_ERROR_CODES:
+        return DaqRangeError(str(e))
+    if code in DEVICE_REMOVED_ERROR_CODES:
+        return DaqDeviceRemovedError(str(e))
+    if code in OVERFLOW_ERROR_CODES:
+        return DaqOverflowError(str(e))
+    return DaqBackendError(str(e))
+
+
+class NiOutputTask(DaqOutputTask):
+    """DaqOutputTask on a real nidaqmx Task."""
+
+    def __init__(self, channels: list[str], min_val: float, max_val: float):
+        self._task = nidaqmx.Task()
+        try:
+            for channel in channels:
+                self._task.ao_channels.add_ao_voltage_chan(channel, min_val=min_val, max_val=max_val)
+        except DaqError as e:
+            self._task.close()
+            raise _translate(e) from e
+        self._num_channels = len(channels)
+        self._writer = AnalogMultiChannelWriter(self._task.out_stream)
+        self._timing = None
+        self._every_n_samples = None
+        self._every_n_callback = None
+        self._every_n_target = None
+
+    @property
+    def num_channels(self) -> int:
+        return self._num_channels
+
+    @property
+    def total_samples_generated(self) -> int:
+        try:
+            return self._task.out_stream.total_samp_per_chan_generated
+        except DaqError as e:
+            raise _translate(e) from e
+
+    def configure_timing(self, rate_hz: float, buffer_samples: int, regenerate: bool):
+        timing = (rate_hz, buffer_samples, regenerate)
+        if timing == self._timing:
+            return          # reconfiguring would uncommit the task for nothing
+        try:
+            self._task.timing.cfg_samp_clk_timing(
+                rate=rate_hz,
+                sample_mode=AcquisitionType.CONTINUOUS,
+                samps_per_chan=buffer_samples
+            )
+            self._task.out_stream.regen_mode = (RegenerationMode.ALLOW_REGENERATION if regenerate
+                                                else RegenerationMode.DONT_ALLOW_REGENERATION)
+            self._task.out_stream.output_buf_size = buffer_samples
+        except DaqError as e:
+            raise _translate(e) from e
+        self._timing = timing
+
+    def register_every_n_samples_event(self, num_samples: int, callback: EveryNSamplesCallback):
+        # The driver callback stays registered across runs; only its target changes
+        self._every_n_target = callback
+        if num_samples == self._every_n_samples:
+            return
+
+        def _driver_callback(task_handle, event_type, n, callback_data):
+            target = self._every_n_target
+            if target is not None:
+                target(n)
+            return 0
+        try:
+            if self._every_n_samples is not None:
+                self._task.register_every_n_samples_transferred_from_buffer_event(
+                    self._every_n_samples, None)
+            self._task.register_every_n_samples_transferred_from_buffer_event(num_samples, _driver_callback)
+        except DaqError as e:
+            raise _translate(e) from e
+        self._every_n_callback = _driver_callback      # keep it alive while the driver holds it
+        self._every_n_samples = num_samples
+
+    def write(self, data: np.ndarray, timeout_s: float = 10.0) -> int:
+        try:
+            return self._writer.write_many_sample(np.ascontiguousarray(data, dtype=np.float64),
+                                                  timeout=timeout_s)
+        except DaqError as e:
+            raise _translate(e) from e
+
+    def write_static(self, values: np.ndarray):
+        try:
+            self._writer.write_one_sample(np.asarray(values, dtype=np.float64))
+        except DaqError as e:
+            raise _translate(e) from e
+
+    def commit(self):
+        try:
+            self._task.control(TaskMode.TASK_COMMIT)
+        except DaqError as e:
+            raise _translate(e) from e
+
+    def unreserve(self):
+        try:
+            self._task.control(TaskMode.TASK_UNRESERVE)
+        except DaqError as e:
+            raise _translate(e) from e
+
+    def start(self):
+        try:
+            self._task.start()
+        except DaqError as e:
+            raise _translate(e) from e
+
+    def stop(self):
+        try:
+            self._task.stop()
+        except DaqError as e:
+            raise _translate(e) from e
+
+    def close(self):
+        self._task.close()
+
+
+class NiInputTask(DaqInputTask):
+    """DaqInputTask on a real nidaqmx Task; single-ended (RSE) voltage channels."""
+
+    def __init__(self, channels: list[str], min_val: float, max_val: float):
+        self._task = nidaqmx.Task()
+        try:
+            for channel in channels:
+                self._task.ai_channels.add_ai_voltage_chan(
+                    channel, terminal_config=TerminalConfiguration.RSE, min_val=min_val, max_val=max_val
+                )
+        except DaqError as e:
+            self._task.close()
+            raise _translate(e) from e
+        self._num_channels = len(channels)
+        self._reader = AnalogMultiChannelReader(self._task.in_stream)
+        self._timing = None
+
+    @property
+    def num_channels(self) -> int:
+        return self._num_channels
+
+    @property
+    def total_samples_acquired(self) -> int:
+        try:
+            return self._task.in_stream.total_samp_per_chan_acquired
+        except DaqError as e:
+            raise _translate(e) from e
+
+    @property
+    def samples_available(self) -> int:
+        try:
+            return self._task.in_stream.avail_samp_per_chan
+        except DaqError as e:
+            raise _translate(e) from e
+
+    def configure_timing(self, rate_hz: float, buffer_samples: int, clock_source: str | None = None):
+        timing = (rate_hz, buffer_samples, clock_source)
+        if timing == self._timing:
+            return
+        try:
+            self._task.timing.cfg_samp_clk_timing(
+                rate=rate_hz,
+                source=clock_source or "",
+                sample_mode=AcquisitionType.CONTINUOUS,
+                samps_per_chan=buffer_samples
+            )
+            self._task.in_stream.input_buf_size = buffer_samples
+        except DaqError as e:
+            raise _translate(e) from e
+        self._timing = timing
+
+    def read(self, num_samples: int, timeout_s: float = 10.0) -> np.ndarray:
+        data = np.empty((self._num_channels, num_samples))
+        try:
+            self._reader.read_many_sample(data, number_of_samples_per_channel=num_samples,
+                                          timeout=timeout_s)
+        except DaqError as e:
+            raise _translate(e) from e
+        return data
+
+    def start(self):
+        try:
+            self._task.start()
+        except DaqError as e:
+            raise _translate(e) from e
+
+    def stop(self):
+        try:
+            self._task.stop()
+        except DaqError as e:
+            raise _translate(e) from e
+
+    def close(self):
+        self._task.close()
+
+
+def _usb_serial(device) -> str:
+    """An NI device's USB serial string as the driver shows it (upper-case hex, no padding)."""
+    try:
+        return f"{int(device.serial_number, 16):X}"
+    except (TypeError, ValueError, usb.core.USBError, NotImplementedError):
+        return ""     # no permission to read string descriptors, or not a hex serial
+
+
+class NiDaqBackend(DaqBackend):
+    """
+    The NI-6216 over NI-DAQmx, detected on USB by vendor/product id. With
+    `serial` set, only the unit with that serial number counts, so several
+    NI-6216s can each have their own backend (see for_device()).
+    """
+
+    def __init__(self, device_name: str = "Dev1", vendor_id: int = NI_6216_VID,
+                 product_id: int = NI_6216_PID, serial: str = ""):
+        self._device_name = device_name
+        self._vendor_id = vendor_id
+        self._product_id = product_id
+        self._serial = serial
+
+    def find_device(self) -> DaqDeviceInfo | None:
+        devices = usb.core.find(find_all=True, idVendor=self._vendor_id, idProduct=self._product_id)
+        for device in devices:
+            if self._serial and _usb_serial(device) != self._serial:
+                continue
+            return DaqDeviceInfo(self._device_name, device.idVendor, device.idProduct, self._serial,
+                                 max_ao_rate_hz=self._max_ao_rate_hz())
+        return None
+
+    def list_devices(self) -> list[DaqDeviceInfo]:
+        """Attached NI-6216s under their driver names, matched to the USB bus by serial number."""
+        attached = {_usb_serial(device) for device in
+                    usb.core.find(find_all=True, idVendor=self._vendor_id, idProduct=self._product_id)}
+        if not attached:
+            return []
+        devices = []
+        try:
+            for device in nidaqmx.system.System.local().devices:
+                # The driver's product number is the USB product id
+                if device.product_num != self._product_id:
+                    continue
+                serial = f"{device.dev_serial_num:X}"
+                if serial in attached:
+                    devices.append(DaqDeviceInfo(device.name, self._vendor_id, self._product_id, serial,
+                                                 max_ao_rate_hz=device.ao_max_rate))
+        except DaqError as e:
+            logger.debug(f"NI-DAQmx device list unavailable ({e}), assuming {self._device_name}")
+        if not devices:
+            device = self.find_device()
+            return [device] if device is not None else []
+        return sorted(devices, key=lambda device: device.name)
+
+    def for_device(self, name: str) -> "NiDaqBackend":
+        try:
+            devices = self.list_devices()
+        except (usb.core.USBError, usb.core.NoBackendError) as e:
+            logger.debug(f"USB device list unavailable ({e}), {name} is matched by vendor/product id")
+            devices = []
+        for device in devices:
+            if device.name == name:
+                return NiDaqBackend(name, self._vendor_id, self._product_id, device.serial)
+        # Not attached (yet): follow whichever NI-6216 shows up, as a single-device setup does
+        return NiDaqBackend(name, self._vendor_id, self._product_id)
+
+    def _max_ao_rate_hz(self) -> float:
+        try:
+            return nidaqmx.system.Device(self._device_name).ao_max_rate
+        except DaqError as e:
+            logger.debug(f"AO max rate of {self._device_name} unavailable ({e}), assuming NI-6216")
+            return NI_6216_MAX_AO_RATE_HZ
+
+    def create_output_task(self, channels: list[str], min_val: float = -10.0,
+                           max_val: float = 10.0) -> DaqOutputTask:
+        return NiOutputTask(channels, min_val, max_val)
+
+    def create_input_task(self, channels: list[str], min_val: float = -10.0,
+                          max_val: float = 10.0) -> DaqInputTask:
+        return NiInputTask(channels, min_val, max_val)
+
+    def create_hotplug_monitor(self, poll_interval_s: float = 1.0) -> HotplugMonitor:
+        monitor = create_usb_hotplug_monitor(self.find_device, self._vendor_id, self._product_id,
+                                             self._device_name, poll_interval_s)
+        if self._serial and monitor.event_driven:
+            # Notifications are per vendor/product id: any unit plugging in or out
+            monitor = FilteredHotplugMonitor(monitor, self.find_device)
+        return monitor
@@ -0,0 +1,211 @@
+import logging
+logger = logging.getLogger(__name__)
+
+from typing import Sequence
+
+import numpy as np
+
+# Mean samples per knot interval from which intervals are evaluated slice by slice
+# with scalar coefficients; shorter runs spread the coefficients with repeat()
+SLICE_RUN_SAMPLES = 1024
+
+
+class PchipBatch:
+    """
+    Several PCHIP curves, each with its own knots, evaluated together on one
+    shared timebase.
+
+    The curves are the same as scipy's PchipInterpolator (Fritsch-Carlson
+    slopes, one-sided three-point ends, extrapolation with the end cubics),
+    but every channel's knots and cubic coefficients are stored back to back
+    and evaluated together into one (channels, samples) array:
+
+    - ascending times (a beat timebase) are split into runs per interval with
+      one searchsorted() of all knots at once; short runs are evaluated in one
+      pass with the coefficients spread by repeat(), long runs slice by slice
+      with scalar coefficients, never materializing per-sample coefficients
+    - arbitrary times are located with a single searchsorted() against the
+      union of all knots, and a (channels, union interval) table maps that to
+      each channel's own interval
+    """
+
+    def __init__(self, knots_x: Sequence[np.ndarray], knots_y: Sequence[np.ndarray]):
+        """
+        One channel per entry of `knots_x`/`knots_y`; (channels, knots) arrays,
+        where every channel has as many knots, are taken without a per-channel
+        loop (thousands of beat variants at once).
+        """
+        if len(knots_x) != len(knots_y):
+            raise ValueError(f"Got knot times for {len(knots_x)} channels but values for {len(knots_y)}")
+        if not len(knots_x):
+            raise ValueError("A PCHIP batch needs at least one channel")
+        if isinstance(knots_x, np.ndarray) and knots_x.ndim == 2:
+            x = np.asarray(knots_x, dtype=np.float64)
+            y = np.asarray(knots_y, dtype=np.float64)
+            if x.shape != y.shape:
+                raise ValueError(f"Knot times of shape {x.shape} but values of shape {y.shape}")
+            if x.shape[1] < 2:
+                raise ValueError(f"A PCHIP needs at least 2 knots, got {x.shape[1]}")
+            unordered = np.flatnonzero(np.any(np.diff(x, axis=1) <= 0, axis=1))
+            if len(unordered):
+                raise ValueError(f"Channel {unordered[0]}: knot times must be strictly increasing")
+            counts = np.full(x.shape[0], x.shape[1])
+            self._x = x.ravel()
+            y = y.ravel()
+        else:
+            xs = [np.asarray(x, dtype=np.float64).ravel() for x in knots_x]
+            ys = [np.asarray(y, dtype=np.float64).ravel() for y in knots_y]
+            for channel, (x, y) in enumerate(zip(xs, ys)):
+                if len(x) != len(y):
+                    raise ValueError(f"Channel {channel}: {len(x)} knot times but {len(y)} values")
+                if len(x) < 2:
+                    raise ValueError(f"Channel {channel}: a PCHIP needs at least 2 knots, got {len(x)}")
+                if np.any(np.diff(x) <= 0):
+                    raise ValueError(f"Channel {channel}: knot times must be strictly increasing")
+            counts = np.array([len(x) for x in xs])
+            self._x = np.concatenate(xs)
+            y = np.concatenate(ys)
+        self._starts = np.concatenate(([0], np.cumsum(counts)))
+        d = self._slopes(self._x, y, self._starts)
+
+        # Per-interval cubic in local form y0 + d0*dx + c2*dx**2 + c3*dx**3 (as PPoly);
+        # entries straddling two channels are garbage but never indexed
+        h = np.diff(self._x)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = np.diff(y) / h
+            t = (d[:-1] + d[1:] - 2 * slope) / h
+            self._c3 = t / h
+            self._c2 = (slope - d[:-1]) / h - t
+        self._c1 = d[:-1]
+        self._c0 = y[:-1]
+
+        # Built on the first evaluation at unsorted times
+        self._union = None
+        self._table = None
+
+    @property
+    def num_channels(self) -> int:
+        return len(self._starts) - 1
+
+    def __call__(self, t: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Every channel at times `t` (1-D), shape (channels, len(t)), into `out`
+        (C-contiguous float64) if given.
+        """
+        t = np.asarray(t, dtype=np.float64).ravel()
+        shape = (self.num_channels, len(t))
+        if out is None:
+            out = np.empty(shape, dtype=np.float64)
+        elif out.shape != shape or out.dtype != np.float64 or not out.flags.c_contiguous:
+            raise ValueError(f"out must be a C-contiguous float64 array of shape {shape}")
+        if len(t) > 1 and np.all(t[1:] >= t[:-1]):
+            # Ascending times: each interval covers a run of samples
+            counts = self._run_lengths(t)
+            if len(t) >= SLICE_RUN_SAMPLES * (len(self._x) - self.num_channels) / self.num_channels:
+                return self._evaluate_runs(t, counts, out)
+            coefficients = [np.repeat(c, counts).reshape(shape)
+                            for c in (self._x[:-1], self._c3, self._c2, self._c1, self._c0)]
+        else:
+            if self._table is None:
+                self._build_union_table()
+            segments = self._table[:, np.searchsorted(self._union, t, side='right')]
+            coefficients = [c[segments] for c in (self._x, self._c3, self._c2, self._c1, self._c0)]
+        x0, c3, c2, c1, c0 = coefficients
+        dx = np.subtract(t, x0, out=x0)
+        # Horner, highest order first
+        np.multiply(c3, dx, out=out)
+        out += c2
+        out *= dx
+        out += c1
+        out *= dx
+        out += c0
+        return out
+
+    def _evaluate_runs(self, t: np.ndarray, counts: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Interval by interval over the flattened output, scalar coefficients, one dx buffer."""
+        n = len(t)
+        flat = out.reshape(-1)
+        bounds = np.concatenate(([0], np.cumsum(counts))).tolist()
+        x0, c3, c2, c1, c0 = (c.tolist() for c in (self._x[:-1], self._c3, self._c2, self._c1, self._c0))
+        buffer = np.empty(n)
+        for i in np.flatnonzero(counts).tolist():
+            start, stop = bounds[i], bounds[i + 1]
+            offset = start // n * n             # row start: the run's times are t[start - offset:...]
+            dx = np.subtract(t[start - offset:stop - offset], x0[i], out=buffer[:stop - start])
+            run = flat[start:stop]
+            np.multiply(dx, c3[i], out=run)
+            run += c2[i]
+            run *= dx
+            run += c1[i]
+            run *= dx
+            run += c0[i]
+        return out
+
+    def _build_union_table(self):
+        """
+        Union interval (searchsorted 'right' of a time in the union of all
+        knots) → interval of each channel, clamped to its end intervals.
+        """
+        self._union = np.unique(self._x)
+        self._table = np.empty((self.num_channels, len(self._union) + 1), dtype=np.intp)
+        for channel in range(self.num_channels):
+            start, stop = self._starts[channel], self._starts[channel + 1]
+            interval = np.searchsorted(self._x[start:stop], self._union, side='right') - 1
+            self._table[channel, 0] = 0
+            self._table[channel, 1:] = np.clip(interval, 0, stop - start - 2)
+            self._table[channel] += start
+
+    def _run_lengths(self, t: np.ndarray) -> np.ndarray:
+        """
+        Samples of ascending `t` in each interval, for the intervals of every
+        channel back to back (zero for the seams between channels), summing to
+        channels * len(t).
+        """
+        # A channel's interval j starts at its knot j, except the first, which also takes
+        # everything before the first knot; the last takes everything from its last inner knot on
+        starts = np.searchsorted(t, self._x, side='left')
+        first, last = self._starts[:-1], self._starts[1:] - 1
+        starts[first] = 0
+        starts[last] = len(t)
+        counts = np.diff(starts)
+        counts[last[:-1]] = 0               # seam: last knot of one channel → first of the next
+        return counts
+
+    @staticmethod
+    def _slopes(x: np.ndarray, y: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        """PCHIP knot derivatives for channels stored back to back, delimited by `starts`."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            h = np.diff(x)
+            m = np.diff(y) / h
+        d = np.empty_like(y)
+        first, last = starts[:-1], starts[1:] - 1
+
+        interior = np.ones(len(x), dtype=bool)
+        interior[first] = False
+        interior[last] = False
+        i = np.flatnonzero(interior)
+        hl, hr, ml, mr = h[i - 1], h[i], m[i - 1], m[i]
+        # Weighted harmonic mean of the adjacent secants, zero at a local extremum
+        w1 = 2 * hr + hl
+        w2 = hr + 2 * hl
+        extremum = (np.sign(ml) != np.sign(mr)) | (ml == 0) | (mr == 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            whmean = (w1 / ml + w2 / mr) / (w1 + w2)
+            d[i] = np.where(extremum, 0.0, 1.0 / whmean)
+
+        # Two knots: a straight line
+        linear = last - first == 1
+        d[first[linear]] = m[first[linear]]
+        d[last[linear]] = m[first[linear]]
+        # Ends: one-sided three-point estimate, kept shape-preserving
+        left, right = first[~linear], last[~linear]
+        d[left] = PchipBatch._edge(h[left], h[left + 1], m[left], m[left + 1])
+        d[right] = PchipBatch._edge(h[right - 1], h[right - 2], m[right - 1], m[right - 2])
+        return d
+
+    @staticmethod
+    def _edge(h0, h1, m0, m1):
+        d = ((2 * h0 + h1) * m0 - h0 * m1) / (h0 + h1)
+        d = np.where(np.sign(d) != np.sign(m0), 0.0, d)
+        overshoot = (np.sign(m0) != np.sign(m1)) & (np.abs(d) > 3.0 * np.abs(m0))
+        return np.where(overshoot, 3.0 * m0, d)
@@ -0,0 +1,193 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import math
+from fractions import Fraction
+from functools import lru_cache
+
+import numpy as np
+from scipy.signal import firwin, resample as fft_resample, resample_poly
+
+from .daq_stream_writer import SampleSource
+
+# Rates are matched to a ratio up/down with at most this denominator
+MAX_RATIO_DENOMINATOR = 1000
+# Anti-aliasing filter: Kaiser-windowed sinc, 10 zero crossings each side per rate step
+FILTER_ZERO_CROSSINGS = 10
+KAISER_BETA = 5.0
+# Above this many taps a periodic beat is resampled by FFT instead (exact for a loop)
+MAX_PERIODIC_FILTER_TAPS = 200_001
+
+
+def rational_ratio(src_rate_hz: float, dst_rate_hz: float,
+                   max_denominator: int = MAX_RATIO_DENOMINATOR) -> tuple[int, int]:
+    """(up, down) with dst/src ≈ up/down, in lowest terms."""
+    if src_rate_hz <= 0 or dst_rate_hz <= 0:
+        raise ValueError(f"Sample rates must be positive, got {src_rate_hz} → {dst_rate_hz} Hz")
+    ratio = Fraction(dst_rate_hz / src_rate_hz).limit_denominator(max_denominator)
+    if ratio == 0:
+        raise ValueError(f"Cannot resample {src_rate_hz} Hz down to {dst_rate_hz} Hz")
+    return ratio.numerator, ratio.denominator
+
+
+@lru_cache(maxsize=32)
+def design_filter(up: int, down: int) -> np.ndarray:
+    """Linear-phase low-pass FIR for an up/down rate change, cut off at the lower Nyquist rate."""
+    max_rate = max(up, down)
+    half_len = FILTER_ZERO_CROSSINGS * max_rate
+    taps = firwin(2 * half_len + 1, 1.0 / max_rate, window=('kaiser', KAISER_BETA))
+    taps.setflags(write=False)      # shared through the cache
+    return taps
+
+
+def resample(data: np.ndarray, src_rate_hz: float, dst_rate_hz: float) -> np.ndarray:
+    """
+    One-shot polyphase resampling of `data` along its last axis. The ends are
+    padded by extending the signal linearly, so a recording does not ramp in
+    from zero.
+    """
+    up, down = rational_ratio(src_rate_hz, dst_rate_hz)
+    data = np.asarray(data, dtype=np.float64)
+    if up == down:
+        return data.copy()
+    return resample_poly(data, up, down, axis=-1, window=design_filter(up, down), padtype='line')
+
+
+def resample_periodic(data: np.ndarray, num_out: int) -> np.ndarray:
+    """
+    Resample one period of a looping signal (a heart beat) to exactly
+    `num_out` samples, filtering across the loop boundary so the seam stays
+    smooth when it repeats.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    num_in = data.shape[-1]
+    if num_out == num_in:
+        return data.copy()
+    g = math.gcd(num_out, num_in)
+    up, down = num_out // g, num_in // g
+    if 2 * FILTER_ZERO_CROSSINGS * max(up, down) + 1 > MAX_PERIODIC_FILTER_TAPS:
+        return fft_resample(data, num_out, axis=-1)
+    taps = design_filter(up, down)
+    # Wrap enough whole `down` blocks around the period that the filter never sees an edge
+    blocks = -(-((len(taps) // 2) // up + 2) // down)
+    pad = blocks * down
+    wrapped = np.take(data, np.arange(-pad, num_in + pad) % num_in, axis=-1)
+    out = resample_poly(wrapped, up, down, axis=-1, window=taps)
+    start = pad * up // down
+    return np.ascontiguousarray(out[..., start:start + num_out])
+
+
+class StreamingResampler:
+    """
+    Polyphase resampler for a signal that arrives in chunks: process() returns
+    every output sample the input so far determines, flush() the tail. The
+    concatenated output equals resample_poly() on the whole signal with
+    zero padding (the same filter), for any chunking.
+    """
+
+    def __init__(self, up: int, down: int, num_channels: int = 1):
+        self.up, self.down = up, down
+        self._num_channels = num_channels
+        taps = design_filter(up, down) * up
+        self._half_len = (len(taps) - 1) // 2
+        self._taps_per_phase = -(-len(taps) // up)
+        # phases[p, q]: tap for input sample i - (K-1) + q of an output in phase p
+        padded = np.zeros(up * self._taps_per_phase)
+        padded[:len(taps)] = taps
+        self._phases = np.ascontiguousarray(padded.reshape(self._taps_per_phase, up).T[:, ::-1])
+        self._history = np.zeros((num_channels, self._taps_per_phase - 1))
+        self._samples_in = 0
+        self._samples_out = 0
+
+    @classmethod
+    def for_rates(cls, src_rate_hz: float, dst_rate_hz: float,
+                  num_channels: int = 1) -> "StreamingResampler":
+        return cls(*rational_ratio(src_rate_hz, dst_rate_hz), num_channels=num_channels)
+
+    @property
+    def samples_in(self) -> int:
+        return self._samples_in
+
+    @property
+    def samples_out(self) -> int:
+        return self._samples_out
+
+    def output_length(self, num_input_samples: int) -> int:
+        """Output samples in total for a signal of `num_input_samples`, as resample_poly gives."""
+        return -(-num_input_samples * self.up // self.down)
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """Feed (channels, n) samples; returns the (channels, m) outputs now complete."""
+        chunk = np.atleast_2d(np.asarray(chunk, dtype=np.float64))
+        if chunk.shape[0] != self._num_channels:
+            raise ValueError(f"Expected {self._num_channels} channels, got {chunk.shape[0]}")
+        k = self._taps_per_phase
+        start_index = self._samples_in - (k - 1)      # input index of extended[:, 0]
+        extended = np.concatenate((self._history, chunk), axis=1)
+        self._samples_in += chunk.shape[1]
+        self._history = extended[:, extended.shape[1] - (k - 1):]
+
+        # Output m needs input up to (m*down + half_len) // up
+        last = (self._samples_in * self.up - 1 - self._half_len) // self.down
+        count = max(0, last - self._samples_out + 1)
+        if count == 0:
+            return np.empty((self._num_channels, 0))
+        positions = np.arange(self._samples_out, self._samples_out + count) * self.down + self._half_len
+        newest = positions // self.up - start_index
+        windows = np.lib.stride_tricks.sliding_window_view(extended, k, axis=1)
+        out = np.einsum('cmq,mq->cm', windows[:, newest - (k - 1)], self._phases[positions % self.up])
+        self._samples_out += count
+        return out
+
+    def flush(self) -> np.ndarray:
+        """Remaining output for a signal that ended, as if followed by silence."""
+        total = self.output_length(self._samples_in)
+        tail = self._half_len // self.up + 2
+        samples_in = self._samples_in
+        out = self.process(np.zeros((self._num_channels, tail)))
+        keep = max(0, total - (self._samples_out - out.shape[1]))
+        self._samples_in = samples_in
+        self._samples_out -= out.shape[1] - keep
+        return out[:, :keep]
+
+
+class ResamplingSampleSource(SampleSource):
+    """A SampleSource at `src_rate_hz` played at `dst_rate_hz`, resampled chunk by chunk."""
+
+    def __init__(self, source: SampleSource, src_rate_hz: float, dst_rate_hz: float):
+        self._source = source
+        self._resampler = StreamingResampler.for_rates(src_rate_hz, dst_rate_hz, source.num_channels)
+        self._pending = np.empty((source.num_channels, 0))
+        self._exhausted = False
+
+    @property
+    def num_channels(self) -> int:
+        return self._source.num_channels
+
+    def read(self, num_samples: int) -> np.ndarray | None:
+        resampler = self._resampler
+        while self._pending.shape[1] < num_samples and not self._exhausted:
+            needed = num_samples - self._pending.shape[1]
+            block_size = max(1, -(-needed * resampler.down // resampler.up))
+            block = self._source.read(block_size)
+            parts = [self._pending]
+            if block is not None and block.shape[1]:
+                parts.append(resampler.process(block))
+            if block is None or block.shape[1] < block_size:
+                self._exhausted = True
+                parts.append(resampler.flush())
+            self._pending = np.concatenate(parts, axis=1)
+        out, self._pending = self._pending[:, :num_samples], self._pending[:, num_samples:]
+        if out.shape[1] == 0 and self._exhausted:
+            return None
+        return np.ascontiguousarray(out)
+
+    @property
+    def deferred_start(self) -> bool:
+        return self._source.deferred_start
+
+    def prime(self, timeout_s: float) -> bool:
+        return self._source.prime(timeout_s)
+
+    def close(self):
+        self._source.close()
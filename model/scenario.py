@@ -0,0 +1,640 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import hashlib
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator, Mapping, Sequence
+
+import numpy as np
+import toml
+from scipy.signal import bilinear, lfilter, lfilter_zi
+
+from .beat_sequence import BeatRhythm, BeatSequence, BeatVariability, BpmSchedule
+from .daq_stream_writer import SampleSource
+from .pchip_batch import PchipBatch
+
+# Scenarios shipped with the application
+DEFAULT_SCENARIO_DIR = Path(__file__).resolve().parent / "scenarios"
+
+# Ectopic beat defaults by kind: premature ventricular beats arrive earlier, eject less,
+# reset nothing (full compensatory pause) and potentiate the next beat; atrial ones reset the rhythm
+ECTOPIC_DEFAULTS = {
+    'pvc': {'coupling': 0.6, 'amplitude': 0.5, 'post_amplitude': 1.2, 'compensatory': True},
+    'pac': {'coupling': 0.75, 'amplitude': 0.85, 'post_amplitude': 1.0, 'compensatory': False},
+}
+ARTIFACT_KINDS = ("motion", "flush")
+# Sinusoids summed into the shape of one motion artifact, and their frequency range
+MOTION_COMPONENTS = 3
+MOTION_FREQUENCY_HZ = (0.5, 6.0)
+# Rise and fall of a fast-flush square wave
+FLUSH_EDGE_S = 0.01
+
+
+# ── Scenario description ──────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class Keyframe:
+    """From `at_s` on, move to `value`, linearly over `ramp_s` seconds (a step when 0)."""
+    at_s: float
+    value: float
+    ramp_s: float = 0.0
+
+    def __post_init__(self):
+        if self.at_s < 0 or self.ramp_s < 0:
+            raise ValueError(f"Keyframe times must not be negative, got at_s={self.at_s}, ramp_s={self.ramp_s}")
+
+
+@dataclass(frozen=True)
+class PressureTrend:
+    """pressure → scale * pressure + offset_mmHg on `channel`, each following its keyframes."""
+    channel: str
+    scale: tuple[Keyframe, ...] = ()
+    offset_mmHg: tuple[Keyframe, ...] = ()
+
+
+@dataclass(frozen=True)
+class EctopicEpisode:
+    """
+    Ectopic beats between `start_s` and `stop_s`: every `every_n_beats`-th beat
+    (2 = bigeminy, 3 = trigeminy), or else each beat with `probability`. The
+    beat before an ectopic one is cut short to `coupling` of its interval; the
+    ectopic beat has `amplitude` of the normal pulse and is followed by a
+    compensatory pause (or a reset, for atrial beats); the beat after it has
+    `post_amplitude`.
+    """
+    kind: str
+    start_s: float
+    stop_s: float
+    every_n_beats: int | None
+    probability: float
+    coupling: float
+    amplitude: float
+    post_amplitude: float
+    compensatory: bool
+
+    @classmethod
+    def of_kind(cls, kind: str, start_s: float, stop_s: float, every_n_beats: int | None = None,
+                probability: float = 0.0, **overrides) -> "EctopicEpisode":
+        if kind not in ECTOPIC_DEFAULTS:
+            raise ValueError(f"Unknown ectopic beat kind '{kind}', expected one of {list(ECTOPIC_DEFAULTS)}")
+        return cls(kind, start_s, stop_s, every_n_beats, probability, **{**ECTOPIC_DEFAULTS[kind], **overrides})
+
+    def __post_init__(self):
+        if not self.start_s < self.stop_s:
+            raise ValueError(f"Ectopic episode must end after it starts, got {self.start_s}..{self.stop_s} s")
+        if self.every_n_beats is not None and self.every_n_beats < 2:
+            raise ValueError(f"every_n_beats must be at least 2, got {self.every_n_beats}")
+        if not 0 <= self.probability <= 1:
+            raise ValueError(f"Ectopic probability must be in [0, 1], got {self.probability}")
+        if not 0.2 <= self.coupling < 1:
+            raise ValueError(f"Coupling must be in [0.2, 1), got {self.coupling}")
+
+
+@dataclass(frozen=True)
+class Respiration:
+    """
+    Breathing at `rate_bpm`: adds `swing_mmHg[channel]` × sin to each channel
+    and modulates the heart rate by ±`rsa_fraction` (respiratory sinus
+    arrhythmia), from `start_s` to `stop_s` (the end when None).
+    """
+    rate_bpm: float = 12.0
+    swing_mmHg: Mapping[str, float] = field(default_factory=dict)
+    rsa_fraction: float = 0.0
+    start_s: float = 0.0
+    stop_s: float | None = None
+
+    def __post_init__(self):
+        if not self.rate_bpm > 0:
+            raise ValueError(f"Respiration rate must be positive, got {self.rate_bpm}")
+        if not 0 <= self.rsa_fraction < 0.5:
+            raise ValueError(f"rsa_fraction must be in [0, 0.5), got {self.rsa_fraction}")
+
+    def active(self, t_s):
+        return (t_s >= self.start_s) & (t_s < (math.inf if self.stop_s is None else self.stop_s))
+
+
+@dataclass(frozen=True)
+class DampingEpisode:
+    """
+    A catheter/transducer of natural frequency `natural_hz` and damping ratio
+    `damping_ratio` (< 0.5 rings, > 1 is overdamped) on `channels`.
+    """
+    channels: tuple[str, ...]
+    start_s: float
+    stop_s: float
+    natural_hz: float
+    damping_ratio: float
+
+    def __post_init__(self):
+        if not self.start_s < self.stop_s:
+            raise ValueError(f"Damping episode must end after it starts, got {self.start_s}..{self.stop_s} s")
+        if not self.natural_hz > 0 or not self.damping_ratio > 0:
+            raise ValueError(f"Damping needs a positive natural frequency and damping ratio, "
+                             f"got {self.natural_hz} Hz, {self.damping_ratio}")
+
+
+@dataclass(frozen=True)
+class ArtifactEpisode:
+    """
+    Additive artifacts on `channels`: "motion" (a random wobble) or "flush" (a
+    fast-flush square wave), each `duration_s` long and up to `amplitude_mmHg`,
+    at `times_s` or at random (Poisson, `rate_per_min`) between `start_s` and `stop_s`.
+    """
+    kind: str
+    channels: tuple[str, ...]
+    duration_s: float
+    amplitude_mmHg: float
+    times_s: tuple[float, ...] = ()
+    rate_per_min: float = 0.0
+    start_s: float = 0.0
+    stop_s: float | None = None
+
+    def __post_init__(self):
+        if self.kind not in ARTIFACT_KINDS:
+            raise ValueError(f"Unknown artifact kind '{self.kind}', expected one of {list(ARTIFACT_KINDS)}")
+        if not self.duration_s > 0:
+            raise ValueError(f"Artifact duration must be positive, got {self.duration_s}")
+        if self.rate_per_min < 0:
+            raise ValueError(f"Artifact rate must not be negative, got {self.rate_per_min}")
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """A clinical scenario: what happens to the waveforms over `duration_s`, reproducible from `seed`."""
+    name: str
+    duration_s: float
+    seed: int = 0
+    heart_rate_bpm: float = 60.0
+    heart_rate: tuple[Keyframe, ...] = ()
+    variability: BeatVariability | None = None
+    systole_fraction: float | None = None
+    trends: tuple[PressureTrend, ...] = ()
+    ectopics: tuple[EctopicEpisode, ...] = ()
+    respiration: Respiration | None = None
+    damping: tuple[DampingEpisode, ...] = ()
+    artifacts: tuple[ArtifactEpisode, ...] = ()
+    # Waveform name → (phase knots, pressure knots); others come from the caller's templates
+    templates: Mapping[str, tuple[tuple[float, ...], tuple[float, ...]]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if not self.duration_s > 0:
+            raise ValueError(f"Scenario duration must be positive, got {self.duration_s}")
+        if not self.heart_rate_bpm > 0 or any(not k.value > 0 for k in self.heart_rate):
+            raise ValueError("Heart rates must be positive")
+
+    def channels_used(self) -> set[str]:
+        """Waveforms the scenario's events refer to."""
+        used = {trend.channel for trend in self.trends}
+        used.update(channel for episode in (*self.damping, *self.artifacts) for channel in episode.channels)
+        if self.respiration is not None:
+            used.update(self.respiration.swing_mmHg)
+        return used
+
+
+# ── Loading ───────────────────────────────────────────────────────────────
+
+def load_scenario(path: str | Path) -> Scenario:
+    """Parse a scenario TOML file; ValueError (naming the file) if it is malformed."""
+    path = Path(path)
+    try:
+        data = toml.load(path)
+    except toml.TomlDecodeError as e:
+        raise ValueError(f"{path.name}: not valid TOML: {e}") from e
+    return parse_scenario(data, source=path.name)
+
+
+def parse_scenario(data: dict, source: str = "scenario") -> Scenario:
+    """A Scenario from the tables of a scenario file (see model/scenarios/*.toml)."""
+    try:
+        _check_keys(data, {'scenario', 'variability', 'heart_rate', 'trend', 'ectopic', 'respiration',
+                           'damping', 'artifact', 'templates'}, "file")
+        header = _table(data, 'scenario')
+        _check_keys(header, {'name', 'duration_s', 'seed', 'heart_rate_bpm', 'systole_fraction'}, "[scenario]")
+        if 'duration_s' not in header:
+            raise ValueError("[scenario] needs duration_s")
+
+        variability = None
+        if 'variability' in data:
+            table = _table(data, 'variability')
+            _check_keys(table, {'sdnn_fraction', 'correlation'}, "[variability]")
+            variability = BeatVariability(**table)
+
+        heart_rate = []
+        for entry in _array(data, 'heart_rate'):
+            _check_keys(entry, {'at_s', 'bpm', 'ramp_s'}, "[[heart_rate]]")
+            heart_rate.append(Keyframe(entry['at_s'], entry['bpm'], entry.get('ramp_s', 0.0)))
+
+        trends = {}
+        for entry in _array(data, 'trend'):
+            _check_keys(entry, {'channel', 'at_s', 'ramp_s', 'scale', 'offset_mmHg'}, "[[trend]]")
+            scale, offset = trends.setdefault(entry['channel'], ([], []))
+            ramp = entry.get('ramp_s', 0.0)
+            if 'scale' in entry:
+                scale.append(Keyframe(entry['at_s'], entry['scale'], ramp))
+            if 'offset_mmHg' in entry:
+                offset.append(Keyframe(entry['at_s'], entry['offset_mmHg'], ramp))
+
+        ectopics = []
+        for entry in _array(data, 'ectopic'):
+            _check_keys(entry, {'kind', 'start_s', 'stop_s', 'every_n_beats', 'probability', 'coupling',
+                                'amplitude', 'post_amplitude', 'compensatory'}, "[[ectopic]]")
+            ectopics.append(EctopicEpisode.of_kind(**entry))
+
+        respiration = None
+        if 'respiration' in data:
+            table = dict(_table(data, 'respiration'))
+            _check_keys(table, {'rate_bpm', 'swing_mmHg', 'rsa_fraction', 'start_s', 'stop_s'}, "[respiration]")
+            table['swing_mmHg'] = {str(k): float(v) for k, v in table.get('swing_mmHg', {}).items()}
+            respiration = Respiration(**table)
+
+        damping = []
+        for entry in _array(data, 'damping'):
+            _check_keys(entry, {'channels', 'start_s', 'stop_s', 'natural_hz', 'damping_ratio'}, "[[damping]]")
+            damping.append(DampingEpisode(tuple(entry.get('channels', ['abp'])), entry['start_s'], entry['stop_s'],
+                                          entry['natural_hz'], entry['damping_ratio']))
+
+        artifacts = []
+        for entry in _array(data, 'artifact'):
+            _check_keys(entry, {'kind', 'channels', 'duration_s', 'amplitude_mmHg', 'times_s', 'rate_per_min',
+                                'start_s', 'stop_s'}, "[[artifact]]")
+            entry = dict(entry)
+            entry['channels'] = tuple(entry.get('channels', ['abp']))
+            entry['times_s'] = tuple(float(t) for t in entry.get('times_s', ()))
+            artifacts.append(ArtifactEpisode(**entry))
+
+        templates = {}
+        for name, table in _table(data, 'templates').items():
+            _check_keys(table, {'points'}, f"[templates.{name}]")
+            points = sorted((float(phase), float(pressure)) for phase, pressure in table['points'])
+            templates[name] = (tuple(p for p, _ in points), tuple(v for _, v in points))
+
+        return Scenario(
+            name=str(header.get('name', source)),
+            duration_s=float(header['duration_s']),
+            seed=int(header.get('seed', 0)),
+            heart_rate_bpm=float(header.get('heart_rate_bpm', 60.0)),
+            heart_rate=tuple(heart_rate),
+            variability=variability,
+            systole_fraction=header.get('systole_fraction'),
+            trends=tuple(PressureTrend(channel, tuple(scale), tuple(offset))
+                         for channel, (scale, offset) in trends.items()),
+            ectopics=tuple(ectopics),
+            respiration=respiration,
+            damping=tuple(damping),
+            artifacts=tuple(artifacts),
+            templates=templates,
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        detail = f"missing {e}" if isinstance(e, KeyError) else str(e)
+        raise ValueError(f"{source}: {detail}") from e
+
+
+def _table(data: dict, key: str) -> dict:
+    table = data.get(key, {})
+    if not isinstance(table, dict):
+        raise ValueError(f"[{key}] must be a table")
+    return table
+
+
+def _array(data: dict, key: str) -> list:
+    entries = data.get(key, [])
+    if not isinstance(entries, list) or not all(isinstance(e, dict) for e in entries):
+        raise ValueError(f"{key} must be an array of tables ([[{key}]])")
+    return entries
+
+
+def _check_keys(table: dict, allowed: set, where: str):
+    unknown = set(table) - allowed
+    if unknown:
+        raise ValueError(f"unknown key(s) in {where}: {', '.join(sorted(unknown))}")
+
+
+# ── Compiled timelines ────────────────────────────────────────────────────
+
+class Timeline:
+    """A value over time: `initial` until the first keyframe, then from one keyframe to the next."""
+
+    def __init__(self, initial: float, keyframes: Sequence[Keyframe] = ()):
+        keyframes = sorted(keyframes, key=lambda k: k.at_s)
+        self._initial = float(initial)
+        self._at = np.array([k.at_s for k in keyframes], dtype=np.float64)
+        self._to = np.array([k.value for k in keyframes], dtype=np.float64)
+        self._ramp = np.array([k.ramp_s for k in keyframes], dtype=np.float64)
+        # Each ramp starts from wherever the previous one had got to
+        self._from = np.empty_like(self._to)
+        value = self._initial
+        for i in range(len(keyframes)):
+            if i:
+                ramp = self._ramp[i - 1]
+                fraction = min((self._at[i] - self._at[i - 1]) / ramp, 1.0) if ramp > 0 else 1.0
+                value = self._from[i - 1] + (self._to[i - 1] - self._from[i - 1]) * fraction
+            self._from[i] = value
+
+    @property
+    def is_constant(self) -> bool:
+        return not len(self._at)
+
+    def at(self, t_s: float) -> float:
+        return float(self(np.array([t_s]))[0])
+
+    def __call__(self, t_s: np.ndarray) -> np.ndarray:
+        out = np.full(np.shape(t_s), self._initial)
+        i = np.searchsorted(self._at, t_s, side='right') - 1
+        started = i >= 0
+        i = i[started]
+        ramp = self._ramp[i]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.where(ramp > 0, np.clip((t_s[started] - self._at[i]) / ramp, 0.0, 1.0), 1.0)
+        out[started] = self._from[i] + (self._to[i] - self._from[i]) * fraction
+        return out
+
+
+class ScenarioBpm(BpmSchedule):
+    """A heart-rate timeline, modulated by breathing (respiratory sinus arrhythmia)."""
+
+    def __init__(self, timeline: Timeline, duration_s: float, respiration: Respiration | None = None):
+        self._timeline = timeline
+        self._duration_s = duration_s
+        self._respiration = respiration
+
+    @property
+    def duration_s(self) -> float:
+        return self._duration_s
+
+    def bpm_at(self, t_s: float) -> float:
+        bpm = self._timeline.at(t_s)
+        respiration = self._respiration
+        if respiration is not None and respiration.rsa_fraction and respiration.active(t_s):
+            bpm *= 1.0 + respiration.rsa_fraction * math.sin(2.0 * math.pi * respiration.rate_bpm / 60.0 * t_s)
+        return bpm
+
+
+class EctopicRhythm(BeatRhythm):
+    """Inserts the ectopic beats of a scenario's episodes; one RNG draw per scheduled beat."""
+
+    def __init__(self, episodes: Sequence[EctopicEpisode], seed: np.random.SeedSequence | int | None):
+        self._episodes = list(episodes)
+        self._rng = np.random.default_rng(seed)
+        self._counts = [0] * len(self._episodes)
+        self._next_amplitude = 1.0
+        self.ectopic_beats = 0
+
+    def beats(self, t_s: float, rr_s: float) -> list[tuple[float, float]]:
+        draw = self._rng.random()
+        amplitude, self._next_amplitude = self._next_amplitude, 1.0
+        for index, episode in enumerate(self._episodes):
+            if episode.start_s <= t_s < episode.stop_s:
+                break
+        else:
+            return [(rr_s, amplitude)]
+        self._counts[index] += 1
+        if episode.every_n_beats is not None:
+            # One ectopic beat after every n - 1 normal ones
+            ectopic = self._counts[index] % (episode.every_n_beats - 1) == 0
+        else:
+            ectopic = draw < episode.probability
+        if not ectopic:
+            return [(rr_s, amplitude)]
+        self.ectopic_beats += 1
+        self._next_amplitude = episode.post_amplitude
+        pause = (2.0 - episode.coupling) * rr_s if episode.compensatory else rr_s
+        return [(episode.coupling * rr_s, amplitude), (pause, episode.amplitude)]
+
+
+@dataclass(frozen=True)
+class _ArtifactEvents:
+    """Every artifact of one episode, drawn when the scenario is compiled."""
+    episode: ArtifactEpisode
+    channels: tuple[int, ...]
+    starts: np.ndarray
+    amplitudes: np.ndarray              # signed, mmHg
+    frequencies: np.ndarray             # (events, MOTION_COMPONENTS), Hz
+    phases: np.ndarray                  # (events, MOTION_COMPONENTS), rad
+
+
+# ── Renderer ──────────────────────────────────────────────────────────────
+
+class ScenarioRenderer:
+    """
+    A scenario compiled into a chunked generator of pressure samples, one row
+    per waveform (ABP, CVP, ...) on a shared timebase at `sample_rate_hz`.
+
+    Beats come from a BeatSequence over every waveform at once (a PchipBatch
+    template), following the heart-rate timeline, beat-to-beat variability
+    and ectopic beats; pressure trends, breathing, artifacts and then
+    catheter damping are applied per sample at absolute stream time, with
+    the filter state carried across chunks. All randomness is drawn from
+    `scenario.seed`, so the output is bit-for-bit the same on every run and
+    whatever chunk sizes it is rendered in.
+
+    `templates` maps waveform names to (phase, pressure) PCHIP knots, e.g.
+    HeartBeatModel.get_waveform_knots(); the scenario's own templates
+    override them.
+    """
+
+    def __init__(self, scenario: Scenario, templates: Mapping[str, tuple[np.ndarray, np.ndarray]],
+                 sample_rate_hz: float):
+        templates = {**templates, **scenario.templates}
+        missing = scenario.channels_used() - set(templates)
+        if missing:
+            raise ValueError(f"Scenario '{scenario.name}' uses waveform(s) without a template: "
+                             f"{', '.join(sorted(missing))}")
+        self._scenario = scenario
+        self._channels = list(templates)
+        self._rate = float(sample_rate_hz)
+        index = {name: i for i, name in enumerate(self._channels)}
+
+        variability_seed, rhythm_seed, artifact_seed = np.random.SeedSequence(scenario.seed).spawn(3)
+        self._rhythm = EctopicRhythm(scenario.ectopics, rhythm_seed)
+        schedule = ScenarioBpm(Timeline(scenario.heart_rate_bpm, scenario.heart_rate), scenario.duration_s,
+                               scenario.respiration)
+        batch = PchipBatch([templates[name][0] for name in self._channels],
+                           [templates[name][1] for name in self._channels])
+        self._sequence = BeatSequence(batch, schedule, self._rate, variability=scenario.variability,
+                                      seed=variability_seed, systole_fraction=scenario.systole_fraction,
+                                      rhythm=self._rhythm)
+
+        self._trends = [(index[trend.channel], Timeline(1.0, trend.scale), Timeline(0.0, trend.offset_mmHg))
+                        for trend in scenario.trends]
+        respiration = scenario.respiration
+        self._swing = ([(index[name], amplitude) for name, amplitude in respiration.swing_mmHg.items()]
+                       if respiration is not None else [])
+        self._artifacts = [self._draw_artifacts(episode, index, seed)
+                           for episode, seed in zip(scenario.artifacts, artifact_seed.spawn(len(scenario.artifacts)))]
+        self._damping = []
+        for episode in scenario.damping:
+            wn = 2.0 * math.pi * episode.natural_hz
+            b, a = bilinear([wn * wn], [1.0, 2.0 * episode.damping_ratio * wn, wn * wn], fs=self._rate)
+            # Per channel: filter state, None until the episode starts
+            self._damping.append((episode, b, a, lfilter_zi(b, a), {index[c]: None for c in episode.channels}))
+
+    @property
+    def scenario(self) -> Scenario:
+        return self._scenario
+
+    @property
+    def channels(self) -> list[str]:
+        return list(self._channels)
+
+    @property
+    def sample_rate_hz(self) -> float:
+        return self._rate
+
+    @property
+    def samples_rendered(self) -> int:
+        return self._sequence.samples_rendered
+
+    @property
+    def finished(self) -> bool:
+        return self._sequence.finished
+
+    def stats(self) -> dict:
+        return {
+            'samples': self._sequence.samples_rendered,
+            'beats': self._sequence.beats_rendered,
+            'ectopic_beats': self._rhythm.ectopic_beats,
+            'seconds': self._sequence.samples_rendered / self._rate,
+            'duration_s': self._scenario.duration_s,
+        }
+
+    def render(self, num_samples: int) -> np.ndarray:
+        """The next (up to) `num_samples`, shape (channels, n) mmHg; fewer only at the end."""
+        start = self._sequence.samples_rendered
+        pressure = self._sequence.render(num_samples)
+        count = pressure.shape[-1]
+        if not count:
+            return pressure
+        t = np.arange(start, start + count, dtype=np.float64) / self._rate
+
+        for channel, scale, offset in self._trends:
+            if not scale.is_constant:
+                pressure[channel] *= scale(t)
+            if not offset.is_constant:
+                pressure[channel] += offset(t)
+
+        respiration = self._scenario.respiration
+        if self._swing:
+            active = respiration.active(t)
+            if active.any():
+                breath = np.sin(2.0 * math.pi * respiration.rate_bpm / 60.0 * t) * active
+                for channel, amplitude in self._swing:
+                    pressure[channel] += amplitude * breath
+
+        for events in self._artifacts:
+            self._add_artifacts(events, t, pressure)
+
+        for episode, b, a, zi, states in self._damping:
+            inside = np.flatnonzero((t >= episode.start_s) & (t < episode.stop_s))
+            if not len(inside):
+                continue
+            segment = slice(inside[0], inside[-1] + 1)
+            for channel, state in states.items():
+                x = pressure[channel, segment]
+                if state is None:
+                    state = zi * x[0]           # settle on the pressure the episode starts at
+                pressure[channel, segment], states[channel] = lfilter(b, a, x, zi=state)
+        return pressure
+
+    def chunks(self, chunk_samples: int) -> Iterator[np.ndarray]:
+        """Render to the end of the scenario, `chunk_samples` at a time."""
+        while True:
+            chunk = self.render(chunk_samples)
+            if not chunk.shape[-1]:
+                return
+            yield chunk
+
+    def _draw_artifacts(self, episode: ArtifactEpisode, index: dict, seed: np.random.SeedSequence) -> _ArtifactEvents:
+        rng = np.random.default_rng(seed)
+        starts = list(episode.times_s)
+        if episode.rate_per_min > 0:
+            stop = min(episode.stop_s if episode.stop_s is not None else math.inf, self._scenario.duration_s)
+            t = episode.start_s + rng.exponential(60.0 / episode.rate_per_min)
+            while t < stop:
+                starts.append(t)
+                t += rng.exponential(60.0 / episode.rate_per_min)
+        starts = np.sort(np.array(starts, dtype=np.float64))
+        n = len(starts)
+        if episode.kind == "flush":
+            amplitudes = np.full(n, float(episode.amplitude_mmHg))
+        else:
+            amplitudes = episode.amplitude_mmHg * rng.uniform(0.5, 1.0, n) * rng.choice([-1.0, 1.0], n)
+        return _ArtifactEvents(
+            episode=episode,
+            channels=tuple(index[c] for c in episode.channels),
+            starts=starts,
+            amplitudes=amplitudes,
+            frequencies=rng.uniform(*MOTION_FREQUENCY_HZ, (n, MOTION_COMPONENTS)),
+            phases=rng.uniform(0.0, 2.0 * math.pi, (n, MOTION_COMPONENTS)),
+        )
+
+    @staticmethod
+    def _add_artifacts(events: _ArtifactEvents, t: np.ndarray, pressure: np.ndarray):
+        duration = events.episode.duration_s
+        first = np.searchsorted(events.starts, t[0] - duration, side='right')
+        last = np.searchsorted(events.starts, t[-1], side='right')
+        for event in range(first, last):
+            t0 = events.starts[event]
+            inside = np.flatnonzero((t >= t0) & (t < t0 + duration))
+            if not len(inside):
+                continue
+            local = t[inside[0]:inside[-1] + 1] - t0
+            if events.episode.kind == "flush":
+                edge = min(FLUSH_EDGE_S, duration / 2)
+                shape = np.minimum(np.minimum(local, duration - local) / edge, 1.0)
+            else:
+                envelope = np.sin(math.pi * local / duration) ** 2
+                shape = envelope * sum(np.sin(2.0 * math.pi * f * local + p) for f, p in
+                                       zip(events.frequencies[event], events.phases[event])) / MOTION_COMPONENTS
+            for channel in events.channels:
+                pressure[channel, inside[0]:inside[-1] + 1] += events.amplitudes[event] * shape
+
+
+def scenario_digest(renderer: ScenarioRenderer, chunk_samples: int = 65_536) -> str:
+    """Render `renderer` to the end and return the BLAKE2 digest of its samples, for replay checks."""
+    digest = hashlib.blake2b(digest_size=16)
+    for chunk in renderer.chunks(chunk_samples):
+        digest.update(np.ascontiguousarray(chunk.T).tobytes())     # sample-major, independent of chunking
+    return digest.hexdigest()
+
+
+class ScenarioSource(SampleSource):
+    """
+    A ScenarioRenderer as DAQ output volts: one row per (output channel,
+    waveform) pair of `outputs`, converted with `to_volts(channel, pressure)`
+    (which may convert in place); a channel without a waveform holds
+    `reference_v`.
+    """
+
+    def __init__(self, renderer: ScenarioRenderer, outputs: Sequence[tuple[str, str | None]],
+                 to_volts: Callable[[str, np.ndarray], np.ndarray], reference_v: float = 0.0):
+        self._renderer = renderer
+        self._outputs = [(channel, renderer.channels.index(waveform) if waveform in renderer.channels else None)
+                         for channel, waveform in outputs]
+        self._to_volts = to_volts
+        self._reference_v = reference_v
+        rows = [row for _, row in self._outputs if row is not None]
+        # A waveform played on two outputs is converted from a copy, not twice in place
+        self._shared_rows = {row for row in rows if rows.count(row) > 1}
+
+    @property
+    def renderer(self) -> ScenarioRenderer:
+        return self._renderer
+
+    @property
+    def num_channels(self) -> int:
+        return len(self._outputs)
+
+    def read(self, num_samples: int) -> np.ndarray | None:
+        pressure = self._renderer.render(num_samples)
+        if not pressure.shape[-1]:
+            return None
+        out = np.empty((len(self._outputs), pressure.shape[-1]))
+        for row, (channel, waveform) in enumerate(self._outputs):
+            if waveform is None:
+                out[row] = self._reference_v
+            else:
+                out[row] = self._to_volts(channel, pressure[waveform].copy() if waveform in self._shared_rows
+                                          else pressure[waveform])
+        return out
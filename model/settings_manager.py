@@ -3,6 +3,18 @@ import toml
 from pathlib import Path
 
 
+def settings_dir() -> Path:
+    # Determine the user-specific directory based on the OS
+    if os.name == "nt":  # Windows
+        base_dir = Path(os.getenv("APPDATA", ""))
+    else:  # Linux and other Unix-like systems
+        base_dir = Path(os.getenv("XDG_CONFIG_HOME", Path.home() / ".config"))
+
+    path = base_dir / "pyside6-mvvm"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
 class SettingsManager:
     def __init__(self, filename="settings.toml"):
         self.filename = filename
@@ -10,15 +22,7 @@ class SettingsManager:
         self.settings = self.load_settings()
 
     def get_settings_path(self):
-        # Determine the user-specific directory based on the OS
-        if os.name == "nt":  # Windows
-            base_dir = Path(os.getenv("APPDATA", ""))
-        else:  # Linux and other Unix-like systems
-            base_dir = Path(os.getenv("XDG_CONFIG_HOME", Path.home() / ".config"))
-
-        settings_dir = base_dir / "pyside6-mvvm"
-        settings_dir.mkdir(parents=True, exist_ok=True)
-        return settings_dir / self.filename
+        return settings_dir() / self.filename
 
     def load_settings(self):
         if self.settings_path.is_file():
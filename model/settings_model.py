@@ -7,6 +7,9 @@ class SettingsModel(QObject):
     debugModeChanged = Signal()
     fontFamilyChanged = Signal()
     tabSizeChanged = Signal()
+    daqBackendChanged = Signal()
+    daqSampleRateHzChanged = Signal()
+    daqSimulatedDevicesChanged = Signal()
 
     def __init__(self):
         super().__init__()
@@ -15,12 +18,20 @@ class SettingsModel(QObject):
         self._debug_mode = True if self.settings_manager.get("debug-mode", False) else False
         self._font_family = self.settings_manager.get("font-family", "Arial")
         self._tab_size = int(self.settings_manager.get("tab-size", 4))
+        # "nidaqmx" drives the real NI-6216; "simulated" runs an in-process device
+        self._daq_backend = self.settings_manager.get("daq-backend", "nidaqmx")
+        self._daq_sample_rate_hz = float(self.settings_manager.get("daq-sample-rate-hz", 1000.0))
+        # Units the "simulated" backend provides (Dev1..DevN)
+        self._daq_simulated_devices = int(self.settings_manager.get("daq-simulated-devices", 1))
 
     def save_settings(self):
         self.settings_manager.set("theme", self._theme)
         self.settings_manager.set("debug-mode", self._debug_mode)
         self.settings_manager.set("font-family", self._font_family)
         self.settings_manager.set("tab-size", self._tab_size)
+        self.settings_manager.set("daq-backend", self._daq_backend)
+        self.settings_manager.set("daq-sample-rate-hz", self._daq_sample_rate_hz)
+        self.settings_manager.set("daq-simulated-devices", self._daq_simulated_devices)
         self.settings_manager.save_settings()
 
     @Property(str, notify=themeChanged)
@@ -62,3 +73,33 @@ class SettingsModel(QObject):
         if self._tab_size != value:
             self._tab_size = value
             self.tabSizeChanged.emit()
+
+    @Property(str, notify=daqBackendChanged)
+    def daqBackend(self):
+        return self._daq_backend
+
+    @daqBackend.setter
+    def daqBackend(self, value):
+        if self._daq_backend != value:
+            self._daq_backend = value
+            self.daqBackendChanged.emit()
+
+    @Property(float, notify=daqSampleRateHzChanged)
+    def daqSampleRateHz(self):
+        return self._daq_sample_rate_hz
+
+    @daqSampleRateHz.setter
+    def daqSampleRateHz(self, value):
+        if self._daq_sample_rate_hz != value:
+            self._daq_sample_rate_hz = float(value)
+            self.daqSampleRateHzChanged.emit()
+
+    @Property(int, notify=daqSimulatedDevicesChanged)
+    def daqSimulatedDevices(self):
+        return self._daq_simulated_devices
+
+    @daqSimulatedDevices.setter
+    def daqSimulatedDevices(self, value):
+        if self._daq_simulated_devices != value:
+            self._daq_simulated_devices = int(value)
+            self.daqSimulatedDevicesChanged.emit()
@@ -0,0 +1,781 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import bisect
+import re
+import threading
+import time
+from typing import Callable
+
+import numpy as np
+
+from .daq_backend import (
+    DaqBackend,
+    DaqBackendError,
+    DaqDeviceInfo,
+    DaqDeviceRemovedError,
+    DaqInputTask,
+    DaqOutputTask,
+    DaqOverflowError,
+    DaqRangeError,
+    DaqUnderflowError,
+    EveryNSamplesCallback,
+)
+from .usb_hotplug import HotplugCallback, HotplugErrorCallback, ManualHotplugMonitor
+
+# NI USB-6216 analog output capabilities
+SIM_AO_CHANNELS = 2
+SIM_AO_RANGE_V = (-10.0, 10.0)
+SIM_MAX_AO_RATE_HZ = 250_000.0
+SIM_VENDOR_ID = 0x3923
+SIM_PRODUCT_ID = 0x733B
+# ... and analog input (single-ended)
+SIM_AI_CHANNELS = 16
+SIM_AI_RANGE_V = (-10.0, 10.0)
+# ai0 wired straight back from ao0; ai1 a pressure monitor's return of ao0, 5 ms behind
+SIM_LOOPBACK = {0: (0, 0.0), 1: (0, 0.005)}
+SIM_OUTPUT_HISTORY_S = 60.0         # generated output kept for captured_output() and loopback reads
+
+
+class SimulatedDaqDevice:
+    """
+    In-process stand-in for an NI-6216: AO channel count, output range and
+    maximum update rate, plus plug()/unplug() for hot-plug testing. Unplugging
+    fails every open task with DaqDeviceRemovedError, as the driver does.
+
+    Only one task at a time may reserve the AO channels. `task_create_s` and
+    `commit_s` add the driver's task-creation and commit overhead (zero by
+    default) for measuring what task reuse saves.
+
+    `loopback` wires analog inputs to outputs: ai index → (ao index, delay s).
+    Unwired inputs read 0 V; `ai_noise_v` adds Gaussian noise to every input.
+
+    Output tasks keep the last `output_history_s` seconds they generated
+    (all of it when None), so a long simulated run does not grow without bound.
+    """
+
+    def __init__(self, name: str = "Dev1", num_ao_channels: int = SIM_AO_CHANNELS,
+                 ao_range_v: tuple[float, float] = SIM_AO_RANGE_V,
+                 max_ao_rate_hz: float = SIM_MAX_AO_RATE_HZ, plugged_in: bool = True,
+                 vendor_id: int = SIM_VENDOR_ID, product_id: int = SIM_PRODUCT_ID,
+                 serial: str = "SIM0001", task_create_s: float = 0.0, commit_s: float = 0.0,
+                 num_ai_channels: int = SIM_AI_CHANNELS, ai_range_v: tuple[float, float] = SIM_AI_RANGE_V,
+                 loopback: dict[int, tuple[int, float]] | None = None, ai_noise_v: float = 0.0,
+                 output_history_s: float | None = SIM_OUTPUT_HISTORY_S):
+        self.name = name
+        self.num_ao_channels = num_ao_channels
+        self.ao_range_v = ao_range_v
+        self.max_ao_rate_hz = max_ao_rate_hz
+        self.num_ai_channels = num_ai_channels
+        self.ai_range_v = ai_range_v
+        self.loopback = dict(SIM_LOOPBACK if loopback is None else loopback)
+        self.ai_noise_v = ai_noise_v
+        self.output_history_s = output_history_s
+        self.task_create_s = task_create_s
+        self.commit_s = commit_s
+        self.info = DaqDeviceInfo(name, vendor_id, product_id, serial, max_ao_rate_hz)
+        self._lock = threading.Lock()
+        self._present = plugged_in
+        self._tasks: list["SimulatedOutputTask | SimulatedInputTask"] = []
+        self._reserved_by: "SimulatedOutputTask | None" = None
+        self._hotplug_listeners: list[Callable[[bool], None]] = []
+        self.static_history: list[tuple[float, np.ndarray]] = []
+
+    @property
+    def is_present(self) -> bool:
+        return self._present
+
+    def add_hotplug_listener(self, callback: Callable[[bool], None]):
+        """`callback(present)` on every plug()/unplug(), from the calling thread."""
+        self._hotplug_listeners.append(callback)
+
+    def remove_hotplug_listener(self, callback: Callable[[bool], None]):
+        if callback in self._hotplug_listeners:
+            self._hotplug_listeners.remove(callback)
+
+    def plug(self):
+        self._set_present(True)
+
+    def unplug(self):
+        with self._lock:
+            tasks = list(self._tasks)
+        for task in tasks:
+            task._fail(DaqDeviceRemovedError(f"{self.name} was removed"))
+        self._set_present(False)
+
+    def _set_present(self, present: bool):
+        if self._present == present:
+            return
+        self._present = present
+        logger.debug(f"Simulated device {self.name} {'plugged in' if present else 'unplugged'}")
+        for callback in list(self._hotplug_listeners):
+            callback(present)
+
+    def _attach(self, task: "SimulatedOutputTask | SimulatedInputTask"):
+        with self._lock:
+            self._tasks.append(task)
+
+    def _detach(self, task: "SimulatedOutputTask | SimulatedInputTask"):
+        with self._lock:
+            if task in self._tasks:
+                self._tasks.remove(task)
+            if self._reserved_by is task:
+                self._reserved_by = None
+
+    def _reserve(self, task: "SimulatedOutputTask") -> bool:
+        """Reserve the AO channels for `task`; True if it did not hold them already."""
+        with self._lock:
+            if self._reserved_by is task:
+                return False
+            if self._reserved_by is not None:
+                raise DaqBackendError(f"{self.name}: analog output channels are reserved by another task")
+            self._reserved_by = task
+            return True
+
+    def _release(self, task: "SimulatedOutputTask"):
+        with self._lock:
+            if self._reserved_by is task:
+                self._reserved_by = None
+
+    def _running_output(self) -> "tuple[SimulatedOutputTask, _OutputRun] | None":
+        """The output task generating right now (it holds the AO sample clock) and its run."""
+        with self._lock:
+            task = self._reserved_by
+        if task is None:
+            return None
+        return task._current_run()
+
+    def _output_started(self, task: "SimulatedOutputTask", run: "_OutputRun"):
+        """Clock the input tasks that wait on the AO sample clock from this run."""
+        with self._lock:
+            inputs = [t for t in self._tasks if isinstance(t, SimulatedInputTask)]
+        for input_task in inputs:
+            input_task._on_output_started(task, run)
+
+
+class _OutputRun:
+    """
+    The samples written for one run of a simulated output task and how many
+    of them went out. Input tasks on the AO sample clock keep reading a run
+    after its task has been reset for the next one. Chunks generated more
+    than `history_s` ago are dropped (never those of a regenerated buffer).
+    """
+
+    def __init__(self, num_channels: int, rate_hz: float | None, regenerate: bool,
+                 history_s: float | None = None):
+        self.num_channels = num_channels
+        self.rate_hz = rate_hz
+        self.regenerate = regenerate
+        self.chunks: list[np.ndarray] = []
+        self.offsets = [0]          # first sample of each chunk, then the total written
+        self.generated = 0          # samples out, as of the last freeze
+        self._joined = None
+        self._keep = None if history_s is None or rate_hz is None or regenerate else int(history_s * rate_hz)
+
+    @property
+    def written(self) -> int:
+        return self.offsets[-1]
+
+    @property
+    def first_kept(self) -> int:
+        """First sample still held; earlier ones were dropped."""
+        return self.offsets[0]
+
+    def forget(self, generated: int):
+        """Drop the chunks that went out more than the history limit before sample `generated`."""
+        if self._keep is None:
+            return
+        while len(self.chunks) > 1 and self.offsets[1] <= generated - self._keep:
+            self.chunks.pop(0)
+            self.offsets.pop(0)
+
+    def append(self, data: np.ndarray):
+        self.chunks.append(data.copy())
+        self.offsets.append(self.offsets[-1] + data.shape[1])
+        self._joined = None
+
+    def samples(self, start: int, stop: int) -> np.ndarray:
+        """Output samples [start, stop) of the run; a regenerated buffer repeats."""
+        if stop <= start or not self.chunks:
+            return np.empty((self.num_channels, 0))
+        if start < self.first_kept:
+            raise DaqBackendError(f"Output samples before {self.first_kept} are no longer kept")
+        if self.regenerate:
+            if self._joined is None:
+                self._joined = np.concatenate(self.chunks, axis=1)
+            return self._joined[:, np.arange(start, stop) % self._joined.shape[1]]
+        parts = []
+        i = bisect.bisect_right(self.offsets, start) - 1
+        position = start
+        while position < stop and i < len(self.chunks):
+            part = self.chunks[i][:, position - self.offsets[i]:stop - self.offsets[i]]
+            parts.append(part)
+            position += part.shape[1]
+            i += 1
+        return np.concatenate(parts, axis=1)
+
+
+class SimulatedOutputTask(DaqOutputTask):
+    """
+    Analog output task on a SimulatedDaqDevice, clocked by time.perf_counter().
+
+    Generation advances in real time at the configured rate. Without
+    regeneration the output consumes written samples and, if it catches up
+    with the writer, stops and fails the next write with DaqUnderflowError;
+    writes block while the buffer is full. With regeneration the samples
+    written before start() are looped. The generated samples of the current
+    (or last) run, up to the device's `output_history_s`, are kept, so
+    captured_output() returns exactly what the device last put out.
+    """
+
+    def __init__(self, device: SimulatedDaqDevice, channels: list[str],
+                 min_val: float, max_val: float):
+        self._device = device
+        self._num_channels = len(channels)
+        self._ao_rows = {int(channel.rsplit("ao", 1)[1]): row for row, channel in enumerate(channels)}
+        self._min_val, self._max_val = min_val, max_val
+        self._lock = threading.Lock()
+
+        self._rate = None
+        self._buffer_samples = 0
+        self._regenerate = False
+        self._run = _OutputRun(self._num_channels, None, False)
+        self._start_time = None
+        self._error: DaqBackendError | None = None
+        self._underflow_at = None
+        self._committed = False
+        self._reset_pending = False     # stop() ended a run; the next use starts a fresh one
+
+        self._every_n = None
+        self._event_thread = None
+        self._stop_event = threading.Event()
+        device._attach(self)
+
+    # ── DaqOutputTask ─────────────────────────────────────────────────────
+
+    @property
+    def num_channels(self) -> int:
+        return self._num_channels
+
+    @property
+    def total_samples_generated(self) -> int:
+        with self._lock:
+            generated = self._generated_locked()
+            # Like the driver, a failed task reports its error on the next query
+            if self._error is not None:
+                raise self._error
+            return generated
+
+    @property
+    def underflow_at(self) -> int | None:
+        """Stream position where the output ran dry, if it did."""
+        return self._underflow_at
+
+    def configure_timing(self, rate_hz: float, buffer_samples: int, regenerate: bool):
+        if rate_hz <= 0 or rate_hz > self._device.max_ao_rate_hz:
+            raise DaqBackendError(f"Sample rate {rate_hz} Hz outside 0..{self._device.max_ao_rate_hz} Hz")
+        if buffer_samples < 2:
+            raise DaqBackendError("Buffered output needs at least 2 samples")
+        if (self._rate, self._buffer_samples, self._regenerate) == (rate_hz, buffer_samples, regenerate):
+            return
+        with self._lock:
+            if self._start_time is not None:
+                raise DaqBackendError("Cannot change timing while the task is running")
+            # Changing timing uncommits the task, as in the driver
+            self._committed = False
+            self._device._release(self)
+            self._rate = float(rate_hz)
+            self._buffer_samples = int(buffer_samples)
+            self._regenerate = regenerate
+            self._reset_locked()
+
+    def register_every_n_samples_event(self, num_samples: int, callback: EveryNSamplesCallback):
+        if self._start_time is not None:
+            raise DaqBackendError("Register events before starting the task")
+        self._every_n = (int(num_samples), callback)
+
+    def write(self, data: np.ndarray, timeout_s: float = 10.0) -> int:
+        data = self._validate(np.atleast_2d(np.asarray(data, dtype=np.float64)))
+        n = data.shape[1]
+        if self._rate is None:
+            raise DaqBackendError("Buffered write on a task without sample timing")
+        deadline = time.perf_counter() + timeout_s
+        while True:
+            with self._lock:
+                if self._reset_pending:
+                    self._reset_locked()
+                if self._error is not None:
+                    raise self._error
+                if self._start_time is None:
+                    if self._run.written + n > self._buffer_samples and not self._regenerate:
+                        raise DaqBackendError(
+                            f"Write of {n} samples exceeds the {self._buffer_samples}-sample buffer"
+                        )
+                    return self._append_locked(data)
+                if self._regenerate:
+                    raise DaqBackendError("The simulator only regenerates samples written before start()")
+                backlog = self._run.written - self._generated_locked()
+                if self._error is not None:
+                    raise self._error
+                space = self._buffer_samples - backlog
+                if space >= n:
+                    return self._append_locked(data)
+                wait_s = (n - space) / self._rate
+            if time.perf_counter() + wait_s > deadline:
+                raise DaqBackendError(f"Write timed out after {timeout_s} s waiting for buffer space")
+            time.sleep(wait_s)
+
+    def write_static(self, values: np.ndarray):
+        values = self._validate(np.asarray(values, dtype=np.float64).reshape(-1, 1))[:, 0]
+        with self._lock:
+            if self._error is not None:
+                raise self._error
+            running = self._start_time is not None
+        # An on-demand write holds the channels only while it runs, unless the task does
+        if self._device._reserve(self) and not self._committed:
+            time.sleep(self._device.commit_s)
+        self._device.static_history.append((time.perf_counter(), values.copy()))
+        if not (running or self._committed):
+            self._device._release(self)
+
+    def commit(self):
+        if self._device._reserve(self) or not self._committed:
+            time.sleep(self._device.commit_s)
+        self._committed = True
+
+    def unreserve(self):
+        with self._lock:
+            if self._start_time is not None:
+                raise DaqBackendError("Cannot unreserve a running task")
+            self._committed = False
+        self._device._release(self)
+
+    def start(self):
+        if self._device._reserve(self) and not self._committed:
+            time.sleep(self._device.commit_s)       # implicit commit, undone again by stop()
+        with self._lock:
+            if self._reset_pending:
+                self._reset_locked()
+            if self._error is not None:
+                raise self._error
+            if not self._device.is_present:
+                raise DaqDeviceRemovedError(f"{self._device.name} is not present")
+            if self._rate is not None and self._run.written == 0:
+                raise DaqBackendError("Write samples before starting a buffered output task")
+            self._start_time = time.perf_counter()
+            run = self._run
+        if self._rate is not None:
+            self._device._output_started(self, run)
+        if self._every_n is not None and self._rate is not None:
+            self._stop_event.clear()
+            self._event_thread = threading.Thread(target=self._run_every_n_events,
+                                                  name="SimulatedEveryN", daemon=True)
+            self._event_thread.start()
+
+    def stop(self):
+        with self._lock:
+            self._freeze_locked()
+            self._reset_pending = True
+        self._stop_event.set()
+        if self._event_thread is not None and self._event_thread is not threading.current_thread():
+            self._event_thread.join()
+        self._event_thread = None
+        if not self._committed:
+            self._device._release(self)
+
+    def close(self):
+        self.stop()
+        self._device._detach(self)
+
+    # ── Simulation ────────────────────────────────────────────────────────
+
+    def captured_output(self) -> np.ndarray:
+        """
+        The samples generated so far, (channels, samples): all of them, or the
+        last `output_history_s` seconds' worth of chunks on a longer run.
+        """
+        with self._lock:
+            generated = self._generated_locked()
+            run = self._run
+            first = min(run.first_kept, generated)
+        return run.samples(first, generated)
+
+    def _current_run(self) -> "tuple[SimulatedOutputTask, _OutputRun] | None":
+        with self._lock:
+            return (self, self._run) if self._start_time is not None and self._rate is not None else None
+
+    def _run_generated(self, run: _OutputRun) -> int:
+        """Samples `run` has put out so far; frozen once it stopped."""
+        with self._lock:
+            if run is self._run and self._start_time is not None:
+                return self._generated_locked()
+            return run.generated
+
+    def _reset_locked(self):
+        """Empty buffer, counter at 0; a removed device stays an error."""
+        self._run = _OutputRun(self._num_channels, self._rate, self._regenerate,
+                               self._device.output_history_s)
+        self._underflow_at = None
+        self._reset_pending = False
+        if not isinstance(self._error, DaqDeviceRemovedError):
+            self._error = None
+
+    def _append_locked(self, data: np.ndarray) -> int:
+        self._run.forget(self._generated_locked())
+        self._run.append(data)
+        return data.shape[1]
+
+    def _generated_locked(self) -> int:
+        run = self._run
+        if self._start_time is None or self._rate is None:
+            return run.generated
+        clock = int((time.perf_counter() - self._start_time) * self._rate)
+        if self._regenerate or clock <= run.written:
+            return clock
+        # Ran out of samples: a non-regenerating task stops rather than repeat old data
+        self._underflow_at = run.written
+        self._error = DaqUnderflowError(
+            f"Output underflow: generation reached sample {run.written}, nothing more written"
+        )
+        self._start_time = None
+        run.generated = run.written
+        logger.debug(f"Simulated task underflow after {run.written} samples")
+        return run.written
+
+    def _freeze_locked(self):
+        self._run.generated = self._generated_locked()
+        self._start_time = None
+
+    def _fail(self, error: DaqBackendError):
+        with self._lock:
+            self._freeze_locked()
+            self._error = error
+        self._stop_event.set()
+
+    def _validate(self, data: np.ndarray) -> np.ndarray:
+        if data.shape[0] != self._num_channels:
+            raise DaqBackendError(f"Expected {self._num_channels} channels, got {data.shape[0]}")
+        if not self._device.is_present:
+            raise DaqDeviceRemovedError(f"{self._device.name} is not present")
+        if data.size and (data.min() < self._min_val or data.max() > self._max_val):
+            raise DaqRangeError(
+                f"Output {data.min():.3f}..{data.max():.3f} V outside "
+                f"{self._min_val}..{self._max_val} V"
+            )
+        return data
+
+    def _run_every_n_events(self):
+        interval, callback = self._every_n
+        boundary = interval
+        while not self._stop_event.is_set():
+            start_time = self._start_time
+            if start_time is None:
+                break
+            due = start_time + boundary / self._rate
+            if self._stop_event.wait(max(0.0, due - time.perf_counter())):
+                break
+            try:
+                generated = self.total_samples_generated
+            except DaqBackendError:
+                break               # the task failed: the driver fires no more events
+            if generated >= boundary:
+                callback(interval)
+                boundary += interval
+
+
+class SimulatedInputTask(DaqInputTask):
+    """
+    Analog input task on a SimulatedDaqDevice. Inputs wired in the device's
+    `loopback` table read back an output channel, delayed and with noise;
+    the rest read 0 V.
+
+    On the AO sample clock every sample an output task generates is acquired
+    once, so input sample k is output sample k of the first run started after
+    this task (runs that follow continue the count). On its own clock a wired
+    input sees the last static output value.
+    """
+
+    def __init__(self, device: SimulatedDaqDevice, channels: list[str],
+                 min_val: float, max_val: float):
+        self._device = device
+        self._ai_indices = [int(channel.rsplit("ai", 1)[1]) for channel in channels]
+        self._min_val, self._max_val = min_val, max_val
+        self._lock = threading.Lock()
+        self._rng = np.random.default_rng()
+
+        self._rate = None
+        self._buffer_samples = 0
+        self._clock_source = None
+        self._running = False
+        self._start_time = None
+        self._frozen_acquired = 0
+        self._read_position = 0
+        # [output task, run, first run sample] of each clock run since start(), oldest first
+        self._clock_runs: list[list] = []
+        self._dropped_acquired = 0      # samples of clock runs already read and forgotten
+        self._error: DaqBackendError | None = None
+        device._attach(self)
+
+    # ── DaqInputTask ──────────────────────────────────────────────────────
+
+    @property
+    def num_channels(self) -> int:
+        return len(self._ai_indices)
+
+    @property
+    def total_samples_acquired(self) -> int:
+        with self._lock:
+            if self._error is not None:
+                raise self._error
+            return self._acquired_locked()
+
+    @property
+    def samples_available(self) -> int:
+        with self._lock:
+            if self._error is not None:
+                raise self._error
+            return self._acquired_locked() - self._read_position
+
+    def configure_timing(self, rate_hz: float, buffer_samples: int, clock_source: str | None = None):
+        if rate_hz <= 0:
+            raise DaqBackendError(f"Sample rate {rate_hz} Hz must be positive")
+        if buffer_samples < 2:
+            raise DaqBackendError("Buffered input needs at least 2 samples")
+        with self._lock:
+            if self._running:
+                raise DaqBackendError("Cannot change timing while the task is running")
+            self._rate = float(rate_hz)
+            self._buffer_samples = int(buffer_samples)
+            self._clock_source = clock_source
+
+    def read(self, num_samples: int, timeout_s: float = 10.0) -> np.ndarray:
+        deadline = time.perf_counter() + timeout_s
+        while True:
+            with self._lock:
+                if self._error is not None:
+                    raise self._error
+                acquired = self._acquired_locked()
+                unread = acquired - self._read_position
+                if unread > self._buffer_samples:
+                    self._freeze_locked()
+                    self._error = DaqOverflowError(
+                        f"Input overflow: {unread} samples unread, buffer holds {self._buffer_samples}"
+                    )
+                    raise self._error
+                if unread >= num_samples:
+                    data = self._samples_locked(self._read_position, self._read_position + num_samples)
+                    self._read_position += num_samples
+                    self._forget_read_runs_locked()
+                    return data
+                if not self._running:
+                    raise DaqBackendError(f"Read of {num_samples} samples from a stopped task "
+                                          f"with {unread} left")
+                wait_s = (num_samples - unread) / self._rate
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise DaqBackendError(f"Read timed out after {timeout_s} s waiting for samples")
+            time.sleep(min(wait_s, remaining))
+
+    def start(self):
+        if self._rate is None:
+            raise DaqBackendError("Configure timing before starting an input task")
+        if not self._device.is_present:
+            raise DaqDeviceRemovedError(f"{self._device.name} is not present")
+        with self._lock:
+            if not isinstance(self._error, DaqDeviceRemovedError):
+                self._error = None
+            if self._error is not None:
+                raise self._error
+            self._frozen_acquired = 0
+            self._read_position = 0
+            self._clock_runs = []
+            self._dropped_acquired = 0
+            self._start_time = time.perf_counter()
+            self._running = True
+        if self._clock_source is not None:
+            # Joining a clock that is already running: acquisition starts at its next tick
+            running = self._device._running_output()
+            if running is not None:
+                task, run = running
+                with self._lock:
+                    self._clock_runs.append([task, run, task._run_generated(run)])
+
+    def stop(self):
+        with self._lock:
+            self._freeze_locked()
+
+    def close(self):
+        self.stop()
+        self._device._detach(self)
+
+    # ── Simulation ────────────────────────────────────────────────────────
+
+    def _on_output_started(self, task: "SimulatedOutputTask", run: _OutputRun):
+        with self._lock:
+            if (self._running and self._clock_source is not None
+                    and all(entry[1] is not run for entry in self._clock_runs)):
+                self._clock_runs.append([task, run, 0])
+
+    def _acquired_locked(self) -> int:
+        if not self._running:
+            return self._frozen_acquired
+        if self._clock_source is None:
+            return int((time.perf_counter() - self._start_time) * self._rate)
+        return self._dropped_acquired + sum(task._run_generated(run) - first
+                                            for task, run, first in self._clock_runs)
+
+    def _freeze_locked(self):
+        if self._running:
+            acquired = self._acquired_locked()
+            # Later output runs no longer clock this task; pin the counts of the ones it saw
+            for entry in self._clock_runs:
+                task, run, first = entry
+                entry.append(task._run_generated(run))
+            self._frozen_acquired = acquired
+            self._running = False
+
+    def _run_span_locked(self, entry: list) -> int:
+        task, run, first = entry[:3]
+        generated = entry[3] if len(entry) > 3 else task._run_generated(run)
+        return generated - first
+
+    def _samples_locked(self, start: int, stop: int) -> np.ndarray:
+        out = np.zeros((len(self._ai_indices), stop - start))
+        if self._clock_source is None:
+            history = self._device.static_history
+            static = history[-1][1] if history else None
+            for row, ai in enumerate(self._ai_indices):
+                wiring = self._device.loopback.get(ai)
+                if wiring is not None and static is not None and wiring[0] < len(static):
+                    out[row] = static[wiring[0]]
+        else:
+            position = self._dropped_acquired
+            for entry in self._clock_runs:
+                task, run, first = entry[:3]
+                span = self._run_span_locked(entry)
+                lo, hi = max(start, position), min(stop, position + span)
+                if lo < hi:
+                    self._fill_from_run(out[:, lo - start:hi - start], task, run,
+                                        first + lo - position, first + hi - position)
+                position += span
+                if position >= stop:
+                    break
+        if self._device.ai_noise_v:
+            out += self._rng.normal(0.0, self._device.ai_noise_v, out.shape)
+        np.clip(out, self._min_val, self._max_val, out=out)
+        return out
+
+    def _fill_from_run(self, out: np.ndarray, task: "SimulatedOutputTask", run: _OutputRun,
+                       start: int, stop: int):
+        """Wired inputs for output samples [start, stop) of `run`; before the run the output was 0 V."""
+        for row, ai in enumerate(self._ai_indices):
+            wiring = self._device.loopback.get(ai)
+            if wiring is None or wiring[0] not in task._ao_rows:
+                continue
+            ao, delay_s = wiring
+            delay = int(round(delay_s * (run.rate_hz or self._rate)))
+            first, last = start - delay, stop - delay
+            lead = min(max(0, -first), stop - start)
+            if last > 0:
+                out[row, lead:] = run.samples(max(first, 0), last)[task._ao_rows[ao]]
+
+    def _forget_read_runs_locked(self):
+        """Drop finished clock runs that have been read completely."""
+        while self._clock_runs:
+            entry = self._clock_runs[0]
+            task, run = entry[:2]
+            if len(entry) == 3 and task._current_run() == (task, run):
+                return      # still generating
+            span = self._run_span_locked(entry)
+            if self._dropped_acquired + span > self._read_position:
+                return
+            self._dropped_acquired += span
+            self._clock_runs.pop(0)
+
+    def _fail(self, error: DaqBackendError):
+        with self._lock:
+            self._freeze_locked()
+            self._error = error
+
+
+class SimulatedHotplugMonitor(ManualHotplugMonitor):
+    """Hot-plug events straight from SimulatedDaqDevice.plug()/unplug(), like an OS notification."""
+
+    def __init__(self, device: SimulatedDaqDevice):
+        super().__init__(device.is_present, device.info)
+        self._sim_device = device
+
+    def start(self, on_event: HotplugCallback, on_error: HotplugErrorCallback):
+        self._sim_device.add_hotplug_listener(self.inject)
+        self._present = self._sim_device.is_present
+        super().start(on_event, on_error)
+
+    def stop(self):
+        self._sim_device.remove_hotplug_listener(self.inject)
+        super().stop()
+
+
+class SimulatedDaqBackend(DaqBackend):
+    """
+    DaqBackend on a SimulatedDaqDevice; runs anywhere, no driver or hardware
+    needed. `more_devices` adds further units for multi-device setups; tasks
+    and hot-plug of this backend concern `device`, for_device() binds the others.
+    """
+
+    def __init__(self, device: SimulatedDaqDevice | None = None,
+                 more_devices: list[SimulatedDaqDevice] | None = None):
+        self.device = device or SimulatedDaqDevice()
+        self.devices = [self.device, *(more_devices or [])]
+        self.last_task: SimulatedOutputTask | None = None      # for capture after the fact
+
+    @classmethod
+    def with_devices(cls, count: int, **device_kwargs) -> "SimulatedDaqBackend":
+        """`count` identical units, Dev1..DevN, with serials SIM0001..; kwargs as SimulatedDaqDevice."""
+        devices = [SimulatedDaqDevice(f"Dev{i}", serial=f"SIM{i:04d}", **device_kwargs)
+                   for i in range(1, max(1, count) + 1)]
+        return cls(devices[0], devices[1:])
+
+    def find_device(self) -> DaqDeviceInfo | None:
+        return self.device.info if self.device.is_present else None
+
+    def list_devices(self) -> list[DaqDeviceInfo]:
+        return [device.info for device in self.devices if device.is_present]
+
+    def for_device(self, name: str) -> "SimulatedDaqBackend":
+        for device in self.devices:
+            if device.name == name:
+                return self if device is self.device else SimulatedDaqBackend(device)
+        raise DaqBackendError(f"No simulated device named {name!r}")
+
+    def create_output_task(self, channels: list[str], min_val: float = -10.0,
+                           max_val: float = 10.0) -> SimulatedOutputTask:
+        if not self.device.is_present:
+            raise DaqDeviceRemovedError(f"{self.device.name} is not present")
+        lo, hi = self.device.ao_range_v
+        if min_val < lo or max_val > hi:
+            raise DaqRangeError(f"Requested {min_val}..{max_val} V, device supports {lo}..{hi} V")
+        for channel in channels:
+            match = re.fullmatch(rf"{re.escape(self.device.name)}/ao(\d+)", channel)
+            if match is None or int(match.group(1)) >= self.device.num_ao_channels:
+                raise DaqBackendError(f"Unknown physical channel {channel!r}")
+        time.sleep(self.device.task_create_s)
+        task = SimulatedOutputTask(self.device, channels, min_val, max_val)
+        self.last_task = task
+        return task
+
+    def create_input_task(self, channels: list[str], min_val: float = -10.0,
+                          max_val: float = 10.0) -> SimulatedInputTask:
+        if not self.device.is_present:
+            raise DaqDeviceRemovedError(f"{self.device.name} is not present")
+        lo, hi = self.device.ai_range_v
+        if min_val < lo or max_val > hi:
+            raise DaqRangeError(f"Requested {min_val}..{max_val} V, device supports {lo}..{hi} V")
+        for channel in channels:
+            match = re.fullmatch(rf"{re.escape(self.device.name)}/ai(\d+)", channel)
+            if match is None or int(match.group(1)) >= self.device.num_ai_channels:
+                raise DaqBackendError(f"Unknown physical channel {channel!r}")
+        time.sleep(self.device.task_create_s)
+        return SimulatedInputTask(self.device, channels, min_val, max_val)
+
+    def create_hotplug_monitor(self, poll_interval_s: float = 1.0) -> SimulatedHotplugMonitor:
+        return SimulatedHotplugMonitor(self.device)
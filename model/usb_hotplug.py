@@ -0,0 +1,293 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable
+
+from .daq_backend import DaqDeviceInfo
+
+
+@dataclass(frozen=True)
+class HotplugEvent:
+    present: bool               # True = arrived, False = left
+    timestamp: float            # time.perf_counter() when the event source saw it
+    device: DaqDeviceInfo | None = None
+
+
+HotplugCallback = Callable[[HotplugEvent], None]
+HotplugErrorCallback = Callable[[Exception], None]
+
+
+class HotplugMonitor(ABC):
+    """
+    Source of arrival/removal notifications for one USB device. Callbacks run
+    on the monitor's own thread and must return quickly.
+    """
+
+    # Polling monitors only notice changes at their next poll
+    event_driven = True
+
+    @abstractmethod
+    def start(self, on_event: HotplugCallback, on_error: HotplugErrorCallback):
+        """Begin watching; the current state is reported once straight away."""
+
+    @abstractmethod
+    def stop(self):
+        ...
+
+    def stats(self) -> dict:
+        """Monitor-specific counters (e.g. poll timing); empty if there are none."""
+        return {}
+
+
+class PollingHotplugMonitor(HotplugMonitor):
+    """Fallback: calls `find_device` every `interval_s` and reports transitions."""
+
+    event_driven = False
+
+    def __init__(self, find_device: Callable[[], DaqDeviceInfo | None], interval_s: float = 1.0):
+        self._find_device = find_device
+        self._interval_s = interval_s
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._polls = 0
+        self._poll_last_s = 0.0
+        self._poll_max_s = 0.0
+
+    def start(self, on_event: HotplugCallback, on_error: HotplugErrorCallback):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(on_event, on_error),
+                                        name="UsbHotplugPoll", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def stats(self) -> dict:
+        """Polls made and how long a device lookup takes (the USB bus scan)."""
+        return {'polls': self._polls, 'poll_last_s': self._poll_last_s, 'poll_max_s': self._poll_max_s}
+
+    def _run(self, on_event: HotplugCallback, on_error: HotplugErrorCallback):
+        present = None
+        failing = False
+        while not self._stop_event.is_set():
+            try:
+                start = time.perf_counter()
+                device = self._find_device()
+                self._poll_last_s = time.perf_counter() - start
+                self._poll_max_s = max(self._poll_max_s, self._poll_last_s)
+                self._polls += 1
+                failing = False
+                if (device is not None) != present:
+                    present = device is not None
+                    on_event(HotplugEvent(present, time.perf_counter(), device))
+            except Exception as e:
+                if not failing:             # report once per failure streak, not every poll
+                    on_error(e)
+                failing = True
+                present = None
+            self._stop_event.wait(self._interval_s)
+
+
+class FilteredHotplugMonitor(HotplugMonitor):
+    """
+    Narrows a vendor/product id monitor to one unit when several identical
+    devices are attached: every notification is re-checked with `find_device`
+    (which matches e.g. the serial number), and only that unit's transitions
+    are reported.
+    """
+
+    def __init__(self, monitor: HotplugMonitor, find_device: Callable[[], DaqDeviceInfo | None]):
+        self._monitor = monitor
+        self._find_device = find_device
+        self._present = None
+        self.event_driven = monitor.event_driven
+
+    def start(self, on_event: HotplugCallback, on_error: HotplugErrorCallback):
+        def _on_event(event: HotplugEvent):
+            try:
+                device = self._find_device()
+            except Exception as e:
+                on_error(e)
+                return
+            if (device is not None) != self._present:
+                self._present = device is not None
+                on_event(HotplugEvent(self._present, event.timestamp, device))
+
+        self._present = None
+        self._monitor.start(_on_event, on_error)
+
+    def stop(self):
+        self._monitor.stop()
+
+    def stats(self) -> dict:
+        return self._monitor.stats()
+
+
+class LibusbHotplugMonitor(HotplugMonitor):
+    """libusb hotplug callbacks (python-libusb1), filtered on vendor/product id."""
+
+    EVENT_TIMEOUT_S = 0.25
+
+    def __init__(self, vendor_id: int, product_id: int, device_name: str):
+        import usb1
+        self._usb1 = usb1
+        self._vendor_id = vendor_id
+        self._product_id = product_id
+        self._device_name = device_name
+        self._context = usb1.USBContext()
+        if not self._context.hasCapability(usb1.CAP_HAS_HOTPLUG):
+            self._context.close()
+            raise OSError("libusb on this platform has no hotplug support")
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._handle = None
+
+    def start(self, on_event: HotplugCallback, on_error: HotplugErrorCallback):
+        usb1 = self._usb1
+
+        reported = []
+
+        def _callback(context, device, event):
+            now = time.perf_counter()
+            present = event == usb1.HOTPLUG_EVENT_DEVICE_ARRIVED
+            info = DaqDeviceInfo(self._device_name, self._vendor_id, self._product_id)
+            reported.append(present)
+            on_event(HotplugEvent(present, now, info if present else None))
+            return False            # stay registered
+
+        # HOTPLUG_ENUMERATE reports an already-attached device during registration
+        self._handle = self._context.hotplugRegisterCallback(
+            _callback,
+            events=usb1.HOTPLUG_EVENT_DEVICE_ARRIVED | usb1.HOTPLUG_EVENT_DEVICE_LEFT,
+            flags=usb1.HOTPLUG_ENUMERATE,
+            vendor_id=self._vendor_id,
+            product_id=self._product_id,
+        )
+        if not reported:
+            on_event(HotplugEvent(False, time.perf_counter()))
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(on_error,),
+                                        name="UsbHotplugLibusb", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        if self._handle is not None:
+            self._context.hotplugDeregisterCallback(self._handle)
+            self._handle = None
+        self._context.close()
+
+    def _run(self, on_error: HotplugErrorCallback):
+        while not self._stop_event.is_set():
+            try:
+                self._context.handleEventsTimeout(tv=self.EVENT_TIMEOUT_S)
+            except Exception as e:
+                on_error(e)
+                self._stop_event.wait(self.EVENT_TIMEOUT_S)
+
+
+class UdevHotplugMonitor(HotplugMonitor):
+    """udev netlink monitoring (pyudev, Linux), filtered on vendor/product id."""
+
+    def __init__(self, vendor_id: int, product_id: int, device_name: str):
+        import pyudev
+        self._pyudev = pyudev
+        self._vendor_id = vendor_id
+        self._product_id = product_id
+        self._device_name = device_name
+        self._context = pyudev.Context()
+        self._observer = None
+
+    def _matches(self, device) -> bool:
+        # PRODUCT is "vid/pid/bcdDevice" in unpadded hex; also present on remove events
+        product = device.properties.get('PRODUCT', '').split('/')
+        try:
+            return (int(product[0], 16), int(product[1], 16)) == (self._vendor_id, self._product_id)
+        except (IndexError, ValueError):
+            return False
+
+    def start(self, on_event: HotplugCallback, on_error: HotplugErrorCallback):
+        pyudev = self._pyudev
+        info = DaqDeviceInfo(self._device_name, self._vendor_id, self._product_id)
+
+        def _callback(device):
+            now = time.perf_counter()
+            if device.action not in ('add', 'remove') or not self._matches(device):
+                return
+            try:
+                present = device.action == 'add'
+                on_event(HotplugEvent(present, now, info if present else None))
+            except Exception as e:
+                on_error(e)
+
+        monitor = pyudev.Monitor.from_netlink(self._context)
+        monitor.filter_by(subsystem='usb', device_type='usb_device')
+        # Start listening before enumerating so an arrival in between is not lost
+        self._observer = pyudev.MonitorObserver(monitor, callback=_callback, name="UsbHotplugUdev")
+        self._observer.start()
+        present = any(self._matches(device) for device in
+                      self._context.list_devices(subsystem='usb', DEVTYPE='usb_device'))
+        on_event(HotplugEvent(present, time.perf_counter(), info if present else None))
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+
+class ManualHotplugMonitor(HotplugMonitor):
+    """
+    Injectable event source: inject() delivers an arrival/removal as if the OS
+    had reported it, so connect/disconnect handling (and its latency) can be
+    exercised without hardware.
+    """
+
+    def __init__(self, present: bool = False, device: DaqDeviceInfo | None = None):
+        self._present = present
+        self._device = device
+        self._on_event = None
+
+    def start(self, on_event: HotplugCallback, on_error: HotplugErrorCallback):
+        self._on_event = on_event
+        on_event(HotplugEvent(self._present, time.perf_counter(),
+                              self._device if self._present else None))
+
+    def stop(self):
+        self._on_event = None
+
+    def inject(self, present: bool, device: DaqDeviceInfo | None = None) -> HotplugEvent:
+        self._present = present
+        if device is not None:
+            self._device = device
+        event = HotplugEvent(present, time.perf_counter(), self._device if present else None)
+        if self._on_event is not None:
+            self._on_event(event)
+        return event
+
+
+def create_usb_hotplug_monitor(find_device: Callable[[], DaqDeviceInfo | None],
+                               vendor_id: int, product_id: int, device_name: str,
+                               poll_interval_s: float = 1.0) -> HotplugMonitor:
+    """
+    The best notification source available here: libusb hotplug, then udev,
+    then polling `find_device` every `poll_interval_s`.
+    """
+    for monitor_class in (LibusbHotplugMonitor, UdevHotplugMonitor):
+        try:
+            monitor = monitor_class(vendor_id, product_id, device_name)
+            logger.debug(f"USB hot-plug: using {monitor_class.__name__}")
+            return monitor
+        except Exception as e:      # module missing, no hotplug capability, no udev
+            logger.debug(f"USB hot-plug: {monitor_class.__name__} unavailable ({e})")
+    logger.debug(f"USB hot-plug: polling every {poll_interval_s} s")
+    return PollingHotplugMonitor(find_device, poll_interval_s)
@@ -0,0 +1,229 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from .waveform_file_loader import load_waveform_file
+
+DEFAULT_MAX_CACHE_BYTES = 512 * 1024 * 1024
+HASH_CHUNK_BYTES = 1024 * 1024
+INDEX_FILENAME = "index.json"
+# Part of every entry name: bump it when the loader parses a file differently, so old entries go stale
+ENTRY_VERSION = 2
+
+
+class WaveformCache:
+    """
+    Content-addressed on-disk cache of parsed waveform recordings.
+
+    Each parsed recording is stored as a .npy file named after the BLAKE2 digest
+    of the source file contents, so it can be reopened memory-mapped instead of
+    re-parsing the text. A source path is only re-hashed when its size or mtime
+    changes. Total cache size is bounded; least recently used entries are
+    evicted first.
+    """
+
+    def __init__(self, cache_dir: Path | None = None,
+                 max_bytes: int = DEFAULT_MAX_CACHE_BYTES):
+        self._cache_dir = Path(cache_dir) if cache_dir else self.get_cache_path()
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._index_path = self._cache_dir / INDEX_FILENAME
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        # "sources": resolved source path → {size, mtime_ns, digest}
+        # "entries": cache file name → {bytes, last_access}
+        self._index = self._load_index()
+
+    @staticmethod
+    def get_cache_path() -> Path:
+        if os.name == "nt":
+            base_dir = Path(os.getenv("LOCALAPPDATA", Path.home()))
+        else:
+            base_dir = Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache"))
+        return base_dir / "testtoolsuite" / "waveform_cache"
+
+    @property
+    def cache_dir(self) -> Path:
+        return self._cache_dir
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'entries': len(self._index['entries']),
+                'bytes': self._total_bytes(),
+                'max_bytes': self._max_bytes,
+            }
+
+    # ── Public API ─────────────────────────────────────────────────────────
+
+    def load(self, path: str | Path, channel: int = 0,
+             loader: Callable[..., np.ndarray] = load_waveform_file) -> np.ndarray:
+        """
+        Return the parsed recording at `path` as a read-only memory-mapped array,
+        parsing it with `loader` and storing the result on a cache miss.
+        """
+        source = str(Path(path).resolve())
+        with self._lock:
+            digest = self._source_digest(source)
+            entry_name = f"{digest}_v{ENTRY_VERSION}_ch{channel}.npy"
+            entry_path = self._cache_dir / entry_name
+
+            if entry_name in self._index['entries'] and entry_path.is_file():
+                try:
+                    samples = np.load(entry_path, mmap_mode="r", allow_pickle=False)
+                    self._index['entries'][entry_name]['last_access'] = time.time()
+                    self._hits += 1
+                    self._save_index()
+                    logger.debug(f"Waveform cache hit: {source} → {entry_name}")
+                    return samples
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Discarding unreadable waveform cache entry {entry_name}: {e}")
+                    self._remove_entry(entry_name)
+
+            self._misses += 1
+
+        # Parse outside the lock so other recordings can be served meanwhile
+        samples = np.ascontiguousarray(loader(path, channel=channel), dtype=np.float64)
+
+        with self._lock:
+            self._store(entry_name, samples)
+            self._evict()
+            self._save_index()
+            logger.debug(f"Waveform cache miss: {source} → {entry_name} ({samples.nbytes} B)")
+            try:
+                return np.load(entry_path, mmap_mode="r", allow_pickle=False)
+            except OSError:
+                return samples
+
+    def invalidate(self, path: str | Path | None = None) -> int:
+        """
+        Drop cached data for `path`, or every stale entry when `path` is None
+        (sources that vanished or changed since they were cached, and cache
+        files no source refers to any more). Returns the number of entries removed.
+        """
+        with self._lock:
+            sources = self._index['sources']
+            if path is not None:
+                targets = [str(Path(path).resolve())]
+            else:
+                targets = [s for s, rec in sources.items() if not self._source_matches(s, rec)]
+
+            removed = 0
+            for source in targets:
+                rec = sources.pop(source, None)
+                if rec is None:
+                    continue
+                still_referenced = any(r['digest'] == rec['digest'] for r in sources.values())
+                if not still_referenced:
+                    for name in [n for n in self._index['entries'] if n.startswith(rec['digest'])]:
+                        self._remove_entry(name)
+                        removed += 1
+
+            if path is None:
+                live_digests = {r['digest'] for r in sources.values()}
+                for name in [n for n in self._index['entries']
+                             if n.split("_ch")[0] not in live_digests]:
+                    self._remove_entry(name)
+                    removed += 1
+
+            self._save_index()
+            return removed
+
+    def clear(self):
+        with self._lock:
+            for name in list(self._index['entries']):
+                self._remove_entry(name)
+            self._index['sources'].clear()
+            self._save_index()
+
+    # ── Private helpers (call with self._lock held) ────────────────────────
+
+    @staticmethod
+    def _source_matches(source: str, rec: dict) -> bool:
+        try:
+            st = os.stat(source)
+        except OSError:
+            return False
+        return st.st_size == rec['size'] and st.st_mtime_ns == rec['mtime_ns']
+
+    def _source_digest(self, source: str) -> str:
+        rec = self._index['sources'].get(source)
+        if rec is not None and self._source_matches(source, rec):
+            return rec['digest']
+
+        st = os.stat(source)
+        hasher = hashlib.blake2b(digest_size=16)
+        with open(source, "rb") as f:
+            while chunk := f.read(HASH_CHUNK_BYTES):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        self._index['sources'][source] = {
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'digest': digest,
+        }
+        return digest
+
+    def _store(self, entry_name: str, samples: np.ndarray):
+        entry_path = self._cache_dir / entry_name
+        tmp_path = entry_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, samples, allow_pickle=False)
+        os.replace(tmp_path, entry_path)
+        self._index['entries'][entry_name] = {
+            'bytes': entry_path.stat().st_size,
+            'last_access': time.time(),
+        }
+
+    def _total_bytes(self) -> int:
+        return sum(e['bytes'] for e in self._index['entries'].values())
+
+    def _evict(self):
+        entries = self._index['entries']
+        total = self._total_bytes()
+        for name in sorted(entries, key=lambda n: entries[n]['last_access']):
+            if total <= self._max_bytes or len(entries) <= 1:
+                break
+            size = entries[name]['bytes']
+            if self._remove_entry(name):
+                total -= size
+                logger.debug(f"Waveform cache evicted {name} ({size} B)")
+
+    def _remove_entry(self, entry_name: str) -> bool:
+        try:
+            (self._cache_dir / entry_name).unlink(missing_ok=True)
+        except OSError as e:
+            # Still memory-mapped by a live array (Windows) — retry on a later eviction
+            logger.debug(f"Waveform cache entry {entry_name} busy: {e}")
+            return False
+        self._index['entries'].pop(entry_name, None)
+        return True
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if isinstance(index.get('sources'), dict) and isinstance(index.get('entries'), dict):
+                return index
+        except (OSError, ValueError):
+            pass
+        return {'sources': {}, 'entries': {}}
+
+    def _save_index(self):
+        tmp_path = self._index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
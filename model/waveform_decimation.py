@@ -0,0 +1,45 @@
+import numpy as np
+
+MIN_BUCKETS = 16
+
+
+def visible_range(x: np.ndarray, x_min: float, x_max: float) -> tuple[int, int]:
+    """
+    [start, stop) indices of the samples of a sorted `x` inside [x_min, x_max],
+    widened by one sample each side so the line reaches the plot edges.
+    """
+    start = int(np.searchsorted(x, x_min, side="left"))
+    stop = int(np.searchsorted(x, x_max, side="right"))
+    return max(start - 1, 0), min(stop + 1, len(x))
+
+
+def minmax_decimate(x: np.ndarray, y: np.ndarray, num_buckets: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce (x, y) to at most 2 * num_buckets points, keeping the minimum and the
+    maximum of each bucket in time order. Unlike averaging or striding, every
+    local extremum wider than a bucket survives, so systolic peaks and dicrotic
+    notches stay visible at any zoom level.
+    """
+    n = len(y)
+    num_buckets = max(int(num_buckets), MIN_BUCKETS)
+    if n <= 2 * num_buckets:
+        return x, y
+
+    bucket = -(-n // num_buckets)           # ceil division
+    full = (n // bucket) * bucket
+    blocks = y[:full].reshape(-1, bucket)
+    offsets = np.arange(0, full, bucket)
+    i_min = offsets + blocks.argmin(axis=1)
+    i_max = offsets + blocks.argmax(axis=1)
+    if full < n:                            # ragged tail bucket
+        tail = y[full:]
+        i_min = np.append(i_min, full + int(tail.argmin()))
+        i_max = np.append(i_max, full + int(tail.argmax()))
+
+    # Interleave each bucket's (min, max) pair in sample order
+    indices = np.empty(2 * len(i_min), dtype=np.intp)
+    indices[0::2] = np.minimum(i_min, i_max)
+    indices[1::2] = np.maximum(i_min, i_max)
+    # Keep the true end points so the trace spans the full range
+    indices = np.concatenate(([0], indices, [n - 1]))
+    return x[indices], y[indices]
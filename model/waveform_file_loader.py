@@ -0,0 +1,191 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import os
+import warnings
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Iterator
+import numpy as np
+
+COMMENT_PREFIX = "#"
+CANDIDATE_DELIMITERS = (",", ";", "\t")
+# Longest line sniffed: lines are always read whole (a row-layout file is one line per channel)
+MAX_LINE_CHARS = 256 * 1024 * 1024
+# A data line with fewer fields than this is one sample of each channel, never a row of samples
+ROW_MIN_FIELDS = 32
+DEFAULT_CHUNK_LINES = 8192
+
+ORIENTATION_COLUMN = "column"   # one sample per line, channels side by side
+ORIENTATION_ROW = "row"         # one channel per line, samples side by side
+
+
+@dataclass(frozen=True)
+class WaveformFileFormat:
+    """Layout of a waveform text file, as detected by sniff_waveform_format()."""
+    delimiter: str | None      # None → runs of whitespace
+    orientation: str           # ORIENTATION_COLUMN | ORIENTATION_ROW
+    skip_lines: int            # leading header / comment / blank lines
+    num_channels: int          # columns (column layout) or data lines (row layout)
+
+
+def _split_fields(line: str, delimiter: str | None) -> list[str]:
+    return [field.strip() for field in line.split(delimiter) if field.strip()]
+
+
+def _is_numeric_line(line: str, delimiter: str | None) -> bool:
+    fields = _split_fields(line, delimiter)
+    if not fields:
+        return False
+    try:
+        for field in fields:
+            float(field)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_content_line(line: str) -> bool:
+    stripped = line.strip()
+    return bool(stripped) and not stripped.startswith(COMMENT_PREFIX)
+
+
+def _is_data_line(line: str) -> bool:
+    stripped = line.strip()
+    return _is_content_line(stripped) and _is_numeric_line(stripped, _detect_delimiter(stripped))
+
+
+def _read_lines(f) -> Iterator[str]:
+    """Whole lines of `f` without their line ends, however long (up to MAX_LINE_CHARS)."""
+    number = 0
+    while line := f.readline(MAX_LINE_CHARS):
+        number += 1
+        if len(line) == MAX_LINE_CHARS and not line.endswith(("\n", "\r")):
+            raise ValueError(f"Line {number} is longer than {MAX_LINE_CHARS} characters.")
+        yield line.rstrip("\r\n")
+
+
+def _detect_delimiter(line: str) -> str | None:
+    counts = {d: line.count(d) for d in CANDIDATE_DELIMITERS}
+    delimiter, count = max(counts.items(), key=lambda item: item[1])
+    return delimiter if count > 0 else None
+
+
+def sniff_waveform_format(path: str | Path, orientation: str | None = None) -> WaveformFileFormat:
+    """
+    Inspect a waveform file and work out how to bulk-parse it: delimiter,
+    orientation, and how many header/comment lines precede the data.
+
+    The file is stored row-wise (one channel per line) when its data lines
+    have at least ROW_MIN_FIELDS fields and are fewer than that, e.g.
+    33_BPM.txt, a single comma separated line of samples. Lines are counted
+    only until that is decided, so a long column-layout file is not read
+    through. Pass `orientation` to skip the guess.
+    """
+    if orientation not in (None, ORIENTATION_COLUMN, ORIENTATION_ROW):
+        raise ValueError(f"Unknown orientation {orientation!r}")
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        lines = _read_lines(f)
+        skip_lines = 0
+        for line in lines:
+            if _is_data_line(line):
+                break
+            skip_lines += 1
+        else:
+            raise ValueError("File contains no valid data rows.")
+
+        first_data_line = line.strip()
+        delimiter = _detect_delimiter(first_data_line)
+        num_fields = len(_split_fields(first_data_line, delimiter))
+        guessed = orientation is None
+        if guessed:
+            orientation = ORIENTATION_ROW if num_fields >= ROW_MIN_FIELDS else ORIENTATION_COLUMN
+        num_data_lines = 1
+        if orientation == ORIENTATION_ROW:
+            for line in lines:
+                if _is_content_line(line):
+                    num_data_lines += 1
+                    if guessed and num_data_lines >= num_fields:
+                        orientation = ORIENTATION_COLUMN     # as many lines as fields: columns after all
+                        break
+
+    num_channels = num_data_lines if orientation == ORIENTATION_ROW else num_fields
+    fmt = WaveformFileFormat(delimiter, orientation, skip_lines, num_channels)
+    logger.debug(f"Sniffed waveform format for {path}: {fmt}")
+    return fmt
+
+
+def load_waveform_file(path: str | Path, channel: int = 0,
+                       fmt: WaveformFileFormat | None = None,
+                       orientation: str | None = None) -> np.ndarray:
+    """
+    Parse a whole waveform file into a float64 array in a single native pass.
+    `channel` selects the column (column layout) or the data line (row layout).
+    Without `fmt` the file is sniffed, with `orientation` forced if given.
+    """
+    if fmt is None:
+        fmt = sniff_waveform_format(path, orientation)
+    if not 0 <= channel < fmt.num_channels:
+        raise ValueError(
+            f"Channel {channel} out of range: file has {fmt.num_channels} channel(s)."
+        )
+
+    try:
+        if fmt.orientation == ORIENTATION_COLUMN:
+            samples = np.loadtxt(path, dtype=np.float64, comments=COMMENT_PREFIX,
+                                 delimiter=fmt.delimiter, skiprows=fmt.skip_lines,
+                                 usecols=channel, ndmin=1, encoding="utf-8")
+        else:
+            samples = np.loadtxt(path, dtype=np.float64, comments=COMMENT_PREFIX,
+                                 delimiter=fmt.delimiter, skiprows=fmt.skip_lines,
+                                 ndmin=2, encoding="utf-8")[channel]
+    except ValueError as e:
+        raise ValueError(f"{Path(path).name}: cannot parse pressure values → {e}") from e
+
+    if samples.size == 0:
+        raise ValueError("File contains no valid data rows.")
+    return samples
+
+
+def iter_waveform_chunks(path: str | Path, channel: int = 0,
+                         fmt: WaveformFileFormat | None = None,
+                         chunk_lines: int = DEFAULT_CHUNK_LINES,
+                         orientation: str | None = None) -> Iterator[tuple[np.ndarray, float]]:
+    """
+    Stream a waveform file as (samples, fraction_done) chunks, so callers can
+    report progress, draw a preview or stop early. Concatenating the chunks
+    gives the same array as load_waveform_file().
+    """
+    if fmt is None:
+        fmt = sniff_waveform_format(path, orientation)
+    if fmt.orientation == ORIENTATION_ROW:
+        # Row layout stores a whole channel on one line — nothing to split on
+        yield load_waveform_file(path, channel, fmt), 1.0
+        return
+    if not 0 <= channel < fmt.num_channels:
+        raise ValueError(
+            f"Channel {channel} out of range: file has {fmt.num_channels} channel(s)."
+        )
+
+    total_bytes = max(os.path.getsize(path), 1)
+    consumed_bytes = 0
+    num_samples = 0
+    with open(path, "rb") as f:
+        for line in islice(f, fmt.skip_lines):
+            consumed_bytes += len(line)
+        while lines := list(islice(f, chunk_lines)):
+            consumed_bytes += sum(len(line) for line in lines)
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", UserWarning)  # comment-only chunk
+                    samples = np.loadtxt(lines, dtype=np.float64, comments=COMMENT_PREFIX,
+                                         delimiter=fmt.delimiter, usecols=channel,
+                                         ndmin=1, encoding="utf-8")
+            except ValueError as e:
+                raise ValueError(f"{Path(path).name}: cannot parse pressure values → {e}") from e
+            num_samples += samples.size
+            yield samples, min(consumed_bytes / total_bytes, 1.0)
+
+    if num_samples == 0:
+        raise ValueError("File contains no valid data rows.")
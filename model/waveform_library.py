@@ -0,0 +1,324 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import multiprocessing
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from .waveform_cache import WaveformCache
+from .waveform_file_loader import load_waveform_file
+
+DEFAULT_WAVEFORM_DB = Path(__file__).resolve().parent / "waveform_db"
+WAVEFORM_FILE_SUFFIXES = (".txt", ".csv")
+INDEX_FILENAME = "waveform_library.sqlite"
+
+DEFAULT_SAMPLE_RATE_HZ = 1000.0     # rate recordings are played back at when no hint is given
+MIN_HEART_RATE_BPM = 20.0
+MAX_HEART_RATE_BPM = 300.0
+MAX_PLAUSIBLE_MM_HG = 400.0         # above this the recording is assumed to be in 0.1 mmHg
+# Below this a process pool costs more than it saves: a spawned worker takes ~0.25 s to
+# start, indexing a typical recording ~6.5 ms (benchmarks/bench_waveform_library.py)
+PARALLEL_SCAN_MIN_FILES = 64
+
+_SAMPLE_RATE_HINT = re.compile(r"(\d+(?:\.\d+)?)\s*HZ", re.IGNORECASE)
+
+SORTABLE_COLUMNS = (
+    "name", "folder", "num_samples", "min_value", "max_value", "mean_value",
+    "heart_rate_bpm", "sample_rate_hint_hz", "mtime_ns",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    path TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS recordings (
+    path                TEXT PRIMARY KEY,
+    folder              TEXT NOT NULL,
+    name                TEXT NOT NULL,
+    size                INTEGER NOT NULL,
+    mtime_ns            INTEGER NOT NULL,
+    num_samples         INTEGER,
+    min_value           REAL,
+    max_value           REAL,
+    mean_value          REAL,
+    heart_rate_bpm      REAL,
+    units               TEXT,
+    scale_to_mm_hg      REAL,
+    sample_rate_hint_hz REAL,
+    error               TEXT,
+    indexed_at          REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_recordings_name ON recordings (name);
+CREATE INDEX IF NOT EXISTS idx_recordings_folder ON recordings (folder);
+CREATE INDEX IF NOT EXISTS idx_recordings_heart_rate ON recordings (heart_rate_bpm);
+CREATE INDEX IF NOT EXISTS idx_recordings_num_samples ON recordings (num_samples);
+"""
+
+
+def sample_rate_hint_hz(name: str) -> float | None:
+    """Sample rate spelled in a recording name, e.g. "593IABP STEFANO 25HZ" → 25.0."""
+    match = _SAMPLE_RATE_HINT.search(name)
+    return float(match.group(1)) if match else None
+
+
+def estimate_heart_rate_bpm(samples: np.ndarray, sample_rate_hz: float) -> float | None:
+    """Dominant beat period from the FFT autocorrelation of the mean-removed signal."""
+    min_lag = int(sample_rate_hz * 60.0 / MAX_HEART_RATE_BPM)
+    max_lag = int(sample_rate_hz * 60.0 / MIN_HEART_RATE_BPM)
+    if samples.size < 2 * max(min_lag, 2) or min_lag < 1:
+        return None
+
+    x = samples - samples.mean()
+    n_fft = 1 << int(2 * x.size - 1).bit_length()
+    spectrum = np.fft.rfft(x, n_fft)
+    autocorr = np.fft.irfft(spectrum * np.conj(spectrum), n_fft)[:x.size]
+    if autocorr[0] <= 0:
+        return None   # flat recording
+
+    max_lag = min(max_lag, x.size // 2)
+    if max_lag <= min_lag:
+        return None
+    # Only genuine local maxima count — the falling edge of the zero-lag peak does not
+    window = autocorr[min_lag - 1:max_lag + 1]
+    peaks = np.flatnonzero((window[1:-1] > window[:-2]) & (window[1:-1] >= window[2:]))
+    if peaks.size == 0:
+        return None
+    lag = min_lag + int(peaks[np.argmax(window[1:-1][peaks])])
+    if autocorr[lag] / autocorr[0] < 0.1:
+        return None   # no convincing periodicity
+    return 60.0 * sample_rate_hz / lag
+
+
+def extract_waveform_metadata(path: str) -> dict:
+    """
+    Per-recording catalogue entry. Module level so a process pool can pickle it;
+    parse errors are recorded in the entry rather than raised.
+    """
+    p = Path(path)
+    st = p.stat()
+    entry = {
+        'path': str(p),
+        'folder': str(p.parent),
+        'name': p.name,
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'num_samples': None,
+        'min_value': None,
+        'max_value': None,
+        'mean_value': None,
+        'heart_rate_bpm': None,
+        'units': None,
+        'scale_to_mm_hg': None,
+        'sample_rate_hint_hz': sample_rate_hint_hz(p.stem),
+        'error': None,
+        'indexed_at': time.time(),
+    }
+    try:
+        samples = load_waveform_file(p)
+    except (OSError, ValueError) as e:
+        entry['error'] = str(e)
+        return entry
+
+    max_value = float(samples.max())
+    if max_value > MAX_PLAUSIBLE_MM_HG:
+        entry['units'], entry['scale_to_mm_hg'] = "0.1 mmHg", 0.1
+    else:
+        entry['units'], entry['scale_to_mm_hg'] = "mmHg", 1.0
+
+    rate = entry['sample_rate_hint_hz'] or DEFAULT_SAMPLE_RATE_HZ
+    entry.update(
+        num_samples=int(samples.size),
+        min_value=float(samples.min()),
+        max_value=max_value,
+        mean_value=float(samples.mean()),
+        heart_rate_bpm=estimate_heart_rate_bpm(samples, rate),
+    )
+    return entry
+
+
+class WaveformLibrary:
+    """
+    Catalogue of waveform recordings found in model/waveform_db and user-added
+    folders, persisted in SQLite. scan() only re-reads files whose size or mtime
+    changed, spreading the work over a process pool; query() filters and sorts
+    in SQL so large catalogues stay responsive.
+    """
+
+    def __init__(self, index_path: Path | None = None, include_default_folder: bool = True):
+        self._index_path = Path(index_path) if index_path else (
+            WaveformCache.get_cache_path().parent / INDEX_FILENAME
+        )
+        self._index_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+        if include_default_folder and DEFAULT_WAVEFORM_DB.is_dir():
+            self.add_folder(DEFAULT_WAVEFORM_DB)
+
+    @property
+    def index_path(self) -> Path:
+        return self._index_path
+
+    # ── Folders ────────────────────────────────────────────────────────────
+
+    def folders(self) -> list[str]:
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT path FROM folders ORDER BY path")]
+
+    def add_folder(self, folder: str | Path):
+        with self._connect() as conn:
+            conn.execute("INSERT OR IGNORE INTO folders (path) VALUES (?)",
+                         (str(Path(folder).resolve()),))
+
+    def remove_folder(self, folder: str | Path):
+        folder = str(Path(folder).resolve())
+        with self._connect() as conn:
+            conn.execute("DELETE FROM folders WHERE path = ?", (folder,))
+            conn.execute("DELETE FROM recordings WHERE path LIKE ? ESCAPE '\\'",
+                         (self._like_prefix(folder),))
+
+    # ── Indexing ───────────────────────────────────────────────────────────
+
+    def scan(self, progress_callback: Callable[[int, int], None] | None = None,
+             max_workers: int | None = None) -> dict:
+        """
+        Bring the index up to date with the registered folders.
+        Returns counts of added, updated, removed and unchanged recordings.
+        """
+        on_disk = {}
+        for folder in self.folders():
+            for root, _dirs, files in os.walk(folder):
+                for filename in files:
+                    if filename.lower().endswith(WAVEFORM_FILE_SUFFIXES):
+                        path = os.path.join(root, filename)
+                        try:
+                            st = os.stat(path)
+                        except OSError:
+                            continue
+                        on_disk[path] = (st.st_size, st.st_mtime_ns)
+
+        with self._connect() as conn:
+            indexed = {
+                row[0]: (row[1], row[2])
+                for row in conn.execute("SELECT path, size, mtime_ns FROM recordings")
+            }
+
+        removed = [p for p in indexed if p not in on_disk]
+        stale = [p for p, stamp in on_disk.items() if indexed.get(p) != stamp]
+        entries = self._extract_all(stale, progress_callback, max_workers)
+
+        columns = list(entries[0].keys()) if entries else []
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM recordings WHERE path = ?", [(p,) for p in removed])
+            if entries:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO recordings ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)})",
+                    [tuple(e[c] for c in columns) for e in entries],
+                )
+
+        result = {
+            'added': sum(1 for p in stale if p not in indexed),
+            'updated': sum(1 for p in stale if p in indexed),
+            'removed': len(removed),
+            'unchanged': len(on_disk) - len(stale),
+        }
+        logger.info(f"Waveform library scan: {result}")
+        return result
+
+    @staticmethod
+    def _extract_all(paths: list[str], progress_callback, max_workers) -> list[dict]:
+        entries = []
+        workers = max_workers or os.cpu_count() or 1
+        if len(paths) < PARALLEL_SCAN_MIN_FILES or workers == 1:
+            for done, path in enumerate(paths, start=1):
+                entries.append(extract_waveform_metadata(path))
+                if progress_callback:
+                    progress_callback(done, len(paths))
+            return entries
+
+        # spawn, not fork: the scan runs while Qt, DAQ and hot-plug threads are alive,
+        # and a forked child can inherit one of their locks held. Workers import only
+        # model.waveform_library and its loaders (model/__init__ is lazy)
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {pool.submit(extract_waveform_metadata, p): p for p in paths}
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    entries.append(future.result())
+                except OSError as e:
+                    logger.warning(f"Waveform library: cannot index {futures[future]}: {e}")
+                if progress_callback:
+                    progress_callback(done, len(paths))
+        return entries
+
+    # ── Queries ────────────────────────────────────────────────────────────
+
+    def query(self, text: str = "", min_heart_rate_bpm: float | None = None,
+              max_heart_rate_bpm: float | None = None, order_by: str = "name",
+              descending: bool = False, limit: int | None = None) -> list[dict]:
+        if order_by not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort waveform library by {order_by!r}")
+
+        clauses, params = [], []
+        if text:
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            params.append(f"%{self._escape_like(text)}%")
+        if min_heart_rate_bpm is not None:
+            clauses.append("heart_rate_bpm >= ?")
+            params.append(min_heart_rate_bpm)
+        if max_heart_rate_bpm is not None:
+            clauses.append("heart_rate_bpm <= ?")
+            params.append(max_heart_rate_bpm)
+
+        sql = "SELECT * FROM recordings"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}, name ASC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    # ── Private helpers ────────────────────────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per call keeps the library usable from worker threads
+        conn = sqlite3.connect(self._index_path, timeout=5.0)
+        return _ClosingConnection(conn)
+
+    @staticmethod
+    def _escape_like(text: str) -> str:
+        return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    @classmethod
+    def _like_prefix(cls, folder: str) -> str:
+        return cls._escape_like(folder.rstrip(os.sep) + os.sep) + "%"
+
+
+class _ClosingConnection:
+    """sqlite3.Connection's context manager commits but never closes; this one does both."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._conn.commit()
+            else:
+                self._conn.rollback()
+        finally:
+            self._conn.close()
@@ -0,0 +1,61 @@
+from PySide6.QtCore import QAbstractTableModel, Qt, QModelIndex
+
+# (catalogue column, header, formatter)
+COLUMNS = [
+    ("name",                "Recording",   str),
+    ("num_samples",         "Samples",     lambda v: f"{v:,}"),
+    ("min_value",           "Min",         lambda v: f"{v:.1f}"),
+    ("max_value",           "Max",         lambda v: f"{v:.1f}"),
+    ("mean_value",          "Mean",        lambda v: f"{v:.1f}"),
+    ("heart_rate_bpm",      "HR (BPM)",    lambda v: f"{v:.0f}"),
+    ("units",               "Units",       str),
+    ("sample_rate_hint_hz", "Rate hint",   lambda v: f"{v:g} Hz"),
+    ("folder",              "Folder",      str),
+]
+
+
+class WaveformLibraryTableModel(QAbstractTableModel):
+    """Read-only table over rows returned by WaveformLibrary.query()."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: list[dict] = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._rows):
+            return None
+        row = self._rows[index.row()]
+        key, _header, fmt = COLUMNS[index.column()]
+        if role == Qt.DisplayRole:
+            value = row.get(key)
+            return "" if value is None else fmt(value)
+        if role == Qt.ToolTipRole:
+            return row.get('error') or row.get('path')
+        if role == Qt.TextAlignmentRole and key not in ("name", "folder", "units"):
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section][1]
+        return None
+
+    def set_rows(self, rows: list[dict]):
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def get_row(self, index: int) -> dict | None:
+        if 0 <= index < len(self._rows):
+            return self._rows[index]
+        return None
+
+    @staticmethod
+    def column_key(section: int) -> str:
+        return COLUMNS[section][0]
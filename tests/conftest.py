@@ -0,0 +1,31 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def app_dirs(tmp_path, monkeypatch):
+    """Per-test settings and cache directories, seeded with the bundled HeartBeat settings."""
+    config, cache = tmp_path / "config", tmp_path / "cache"
+    settings = config / "heartbeat_app" / "model"
+    settings.mkdir(parents=True)
+    shutil.copy(REPO_ROOT / "model" / "heartBeat.xml", settings / "heartBeat.xml")
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(config))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache))
+    return config, cache
+
+
+@pytest.fixture
+def qt_app():
+    from PySide6.QtCore import QCoreApplication
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def heart_beat_model(app_dirs, qt_app):
+    from model.beat_template_cache import BeatTemplateCache
+    from model.heart_beat_model import HeartBeatModel
+    return HeartBeatModel(BeatTemplateCache())
@@ -0,0 +1,140 @@
+import numpy as np
+import pytest
+from scipy.interpolate import PchipInterpolator
+
+from model.beat_batch import (PARALLEL_MIN_BEATS, BeatJitter, jitter_reference_points, load_beat_dataset,
+                              render_beats, write_beat_dataset)
+from model.pchip_batch import PchipBatch
+
+TIMES = np.array([0.0, 0.05, 0.15, 0.2, 0.25, 0.38, 0.4, 0.45, 0.6, 0.8, 1.0])
+PRESSURES = np.array([65.0, 68.0, 115.0, 120.0, 115.0, 80.0, 70.0, 75.0, 71.0, 67.0, 65.0])
+JITTER = BeatJitter(time_sd=0.02, pressure_sd_mmHg=3.0, amplitude=(0.7, 1.3), offset_mmHg=(-10.0, 10.0))
+
+
+def _variants(count: int, seed: int = 1) -> tuple[np.ndarray, np.ndarray]:
+    return jitter_reference_points(TIMES, PRESSURES, count, JITTER, seed=seed)
+
+
+def _scipy_beats(times: np.ndarray, pressures: np.ndarray, num_samples: int) -> np.ndarray:
+    phase = np.arange(num_samples) / num_samples
+    return np.stack([PchipInterpolator(x, y)(phase) for x, y in zip(times, pressures)])
+
+
+# ── PchipBatch ────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("t", [np.linspace(0.0, 1.0, 1001),
+                               np.random.default_rng(0).uniform(-0.2, 1.2, 777)],
+                         ids=["ascending", "arbitrary"])
+def test_pchip_batch_matches_scipy(t):
+    times, pressures = _variants(50)
+    expected = np.stack([PchipInterpolator(x, y)(t) for x, y in zip(times, pressures)])
+
+    np.testing.assert_allclose(PchipBatch(times, pressures)(t), expected, rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(PchipBatch(list(times), list(pressures))(t), expected, rtol=1e-12, atol=1e-9)
+
+
+def test_pchip_batch_channels_with_different_knot_counts():
+    knots_x = [TIMES, np.array([0.0, 0.3, 1.0]), np.array([0.0, 1.0])]
+    knots_y = [PRESSURES, np.array([5.0, 9.0, 5.0]), np.array([1.0, 2.0])]
+    t = np.linspace(0.0, 1.0, 501)
+    expected = np.stack([PchipInterpolator(x, y)(t) for x, y in zip(knots_x, knots_y)])
+    np.testing.assert_allclose(PchipBatch(knots_x, knots_y)(t), expected, rtol=1e-12, atol=1e-9)
+
+
+@pytest.mark.parametrize("t", [np.linspace(0.0, 1.0, 1001),
+                               np.random.default_rng(1).permutation(np.linspace(0.0, 1.0, 1001)),
+                               np.random.default_rng(2).uniform(-0.5, 1.5, 777),
+                               np.array([-1.0, 2.0, 0.5, 1.0, 0.0])],
+                         ids=["sorted", "unsorted", "out-of-range", "few"])
+@pytest.mark.parametrize("num_knots", [(11, 3, 2), (2, 2)], ids=["mixed", "two-knot"])
+def test_pchip_batch_matches_scipy_per_channel(t, num_knots):
+    rng = np.random.default_rng(sum(num_knots))
+    knots_x = [np.concatenate(([0.0], np.sort(rng.uniform(0.01, 0.99, n - 2)), [1.0])) for n in num_knots]
+    knots_y = [rng.uniform(0.0, 150.0, n) for n in num_knots]
+    expected = np.stack([PchipInterpolator(x, y)(t) for x, y in zip(knots_x, knots_y)])
+    np.testing.assert_allclose(PchipBatch(knots_x, knots_y)(t), expected, rtol=1e-12, atol=1e-9)
+
+
+def test_pchip_batch_of_the_heart_beat_waveforms(heart_beat_model):
+    waveforms = heart_beat_model.get_waveform_names()
+    t = np.random.default_rng(3).uniform(-0.2, 1.2, 999)
+    expected = np.stack([PchipInterpolator(*heart_beat_model.get_waveform_knots(waveform))(t)
+                         for waveform in waveforms])
+    np.testing.assert_allclose(heart_beat_model.get_waveforms_interpolator(waveforms)(t), expected,
+                               rtol=1e-12, atol=1e-9)
+
+
+# ── Rendering ─────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("num_samples", [2, 1000, 4096])
+def test_render_beats_matches_scipy(num_samples):
+    times, pressures = _variants(200)
+    expected = _scipy_beats(times, pressures, num_samples)
+
+    np.testing.assert_allclose(render_beats(times, pressures, num_samples), expected, rtol=1e-12, atol=1e-9)
+    out = np.empty((len(times), num_samples), dtype=np.float32)
+    assert render_beats(times, pressures, num_samples, out=out) is out
+    np.testing.assert_allclose(out, expected, rtol=1e-6)
+
+
+def test_render_beats_pool_matches_in_process():
+    times, pressures = _variants(PARALLEL_MIN_BEATS)
+    assert np.array_equal(render_beats(times, pressures, 100, workers=2), render_beats(times, pressures, 100))
+
+
+def test_render_beats_rejects_unordered_points():
+    times, pressures = _variants(3)
+    times[1, [2, 3]] = times[1, [3, 2]]
+    with pytest.raises(ValueError, match="Beat 1"):
+        render_beats(times, pressures, 100)
+
+
+# ── Variants ──────────────────────────────────────────────────────────────
+
+def test_jitter_keeps_order_gap_and_ends():
+    times, pressures = _variants(5000)
+    assert times.shape == pressures.shape == (5000, len(TIMES))
+    assert np.all(np.diff(times, axis=1) >= JITTER.min_gap - 1e-12)
+    assert np.all(times[:, 0] == TIMES[0]) and np.all(times[:, -1] == TIMES[-1])
+
+
+def test_jitter_is_reproducible_from_the_seed():
+    a, b = _variants(100, seed=7), _variants(100, seed=7)
+    assert np.array_equal(a[0], b[0]) and np.array_equal(a[1], b[1])
+    assert not np.array_equal(a[0], _variants(100, seed=8)[0])
+
+
+def test_jitter_sorts_unsorted_input():
+    order = np.random.default_rng(0).permutation(len(TIMES))
+    times, pressures = jitter_reference_points(TIMES[order], PRESSURES[order], 10, JITTER, seed=1)
+    assert np.array_equal(times, _variants(10)[0]) and np.array_equal(pressures, _variants(10)[1])
+
+
+def test_jitter_rejects_points_closer_than_min_gap():
+    with pytest.raises(ValueError):
+        jitter_reference_points(np.array([0.0, 0.001, 1.0]), np.zeros(3), 1, JITTER)
+
+
+# ── Datasets ──────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_dataset_round_trip(tmp_path, workers):
+    times, pressures = _variants(PARALLEL_MIN_BEATS)
+    progress = []
+    written = write_beat_dataset(tmp_path / "beats", times, pressures, 250, workers=workers,
+                                 metadata={'seed': 1}, progress_callback=lambda done, total: progress.append(done))
+    assert written['parallel'] == (workers > 1)
+    assert progress[-1] == PARALLEL_MIN_BEATS
+
+    dataset = load_beat_dataset(tmp_path / "beats")
+    assert dataset.beats.shape == (PARALLEL_MIN_BEATS, 250) and dataset.beats.dtype == np.float32
+    assert np.array_equal(dataset.beats, render_beats(times, pressures, 250).astype(np.float32))
+    assert np.array_equal(dataset.times, times) and np.array_equal(dataset.pressures, pressures)
+    assert dataset.meta['seed'] == 1 and dataset.meta['samples_per_beat'] == 250
+    del dataset
+
+
+def test_load_rejects_other_json(tmp_path):
+    (tmp_path / "other.json").write_text('{"format": "something else"}')
+    with pytest.raises(ValueError):
+        load_beat_dataset(tmp_path / "other")
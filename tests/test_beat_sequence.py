@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from scipy.interpolate import PchipInterpolator
+
+from model.beat_sequence import (BeatRhythm, BeatSequence, BeatSequenceSource, BeatVariability, ConstantBpm,
+                                 RampBpm, ScheduleSequence, SinusoidalBpm)
+from model.pchip_batch import PchipBatch
+
+ABP = (np.array([0.0, 0.05, 0.15, 0.2, 0.25, 0.38, 0.4, 0.45, 0.6, 0.8, 1.0]),
+       np.array([65.0, 68.0, 115.0, 120.0, 115.0, 80.0, 70.0, 75.0, 71.0, 67.0, 65.0]))
+CVP = (np.array([0.0, 0.08, 0.16, 0.22, 0.38, 0.52, 0.66, 1.0]),
+       np.array([6.0, 9.0, 7.0, 8.0, 4.0, 8.5, 4.5, 6.0]))
+SCHEDULE = ScheduleSequence([ConstantBpm(60, 4), RampBpm(60, 150, 6), SinusoidalBpm(100, 20, 5, 6)])
+
+
+class EveryFifthEctopic(BeatRhythm):
+    """Every fifth beat comes early and weak, followed by a compensatory pause."""
+
+    def __init__(self):
+        self._count = 0
+
+    def beats(self, t_s, rr_s):
+        self._count += 1
+        if self._count % 5:
+            return [(rr_s, 1.0)]
+        return [(0.6 * rr_s, 0.6), (1.4 * rr_s, 1.0)]
+
+
+def _render(template, chunk_samples: int, **kwargs) -> np.ndarray:
+    sequence = BeatSequence(template, SCHEDULE, 1000.0, variability=BeatVariability(), seed=3,
+                            systole_fraction=0.35, **kwargs)
+    return np.concatenate(list(sequence.chunks(chunk_samples)), axis=-1)
+
+
+def _render_all(sequence: BeatSequence) -> np.ndarray:
+    return np.concatenate(list(sequence.chunks(4096)), axis=-1)
+
+
+@pytest.mark.parametrize("template", [PchipInterpolator(*ABP), PchipBatch(*zip(ABP, CVP))],
+                         ids=["abp", "abp+cvp"])
+@pytest.mark.parametrize("rhythm", [False, True], ids=["sinus", "ectopic"])
+def test_output_does_not_depend_on_chunk_size(template, rhythm):
+    def render(chunk_samples):
+        return _render(template, chunk_samples, rhythm=EveryFifthEctopic() if rhythm else None)
+
+    reference = render(65_536)
+    assert reference.shape[-1] > 15_000
+    for chunk_samples in (1, 7, 997, 4096):
+        out = render(chunk_samples)
+        assert out.tobytes() == reference.tobytes(), f"chunks of {chunk_samples} differ"
+
+
+def test_constant_rate_loops_the_template():
+    beat = PchipInterpolator(*ABP)(np.arange(1000) / 1000)
+    sequence = BeatSequence.from_samples(beat, ConstantBpm(60, 5), 1000.0)
+    out = np.concatenate(list(sequence.chunks(333)))
+    np.testing.assert_allclose(out, np.tile(beat, 5), atol=1e-9)
+    assert sequence.beats_rendered == 5
+
+
+def test_source_routes_template_rows_to_outputs():
+    sequence = BeatSequence(PchipBatch(*zip(ABP, CVP)), ConstantBpm(75, 2), 1000.0)
+    rendered = _render_all(BeatSequence(PchipBatch(*zip(ABP, CVP)), ConstantBpm(75, 2), 1000.0))
+    source = BeatSequenceSource(sequence, [("ao0", 1), ("ao1", None), ("ao2", 0), ("ao3", 1)],
+                                lambda channel, pressure: np.multiply(pressure, 0.01, out=pressure),
+                                reference_v=0.25)
+    blocks = []
+    while (block := source.read(333)) is not None:
+        blocks.append(block)
+    out = np.concatenate(blocks, axis=1)
+
+    assert out.shape == (4, rendered.shape[1])
+    assert np.array_equal(out[0], rendered[1] * 0.01) and np.array_equal(out[3], rendered[1] * 0.01)
+    assert np.all(out[1] == 0.25)
+    assert np.array_equal(out[2], rendered[0] * 0.01)
+
+
+def test_source_of_a_single_channel_template():
+    sequence = BeatSequence(PchipInterpolator(*ABP), ConstantBpm(60, 1), 500.0)
+    source = BeatSequenceSource(sequence, [("ao0", 0), ("ao1", None)], lambda channel, pressure: pressure)
+    block = source.read(1000)
+    assert block.shape == (2, 500) and source.read(1000) is None
+    assert np.allclose(block[0], PchipInterpolator(*ABP)(np.arange(500) / 500))
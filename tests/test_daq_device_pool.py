@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+
+@pytest.fixture
+def make_pool(heart_beat_model):
+    from model.abp_waveform_file_model import AbpWaveformFileModel
+    from model.daq_device_pool import DaqDevicePool
+
+    pools = []
+
+    def make(backend):
+        pool = DaqDevicePool(heart_beat_model, AbpWaveformFileModel(), backend=backend)
+        pools.append(pool)
+        return pool
+    yield make
+    for pool in pools:
+        pool.stop()
+
+
+def _wait_for(condition, timeout_s: float = 5.0):
+    from PySide6.QtCore import QCoreApplication
+    deadline = time.perf_counter() + timeout_s
+    while not condition():
+        assert time.perf_counter() < deadline, "timed out"
+        QCoreApplication.processEvents()
+        time.sleep(0.005)
+
+
+def test_attached_units_are_added_at_start(make_pool):
+    from model.simulated_daq_backend import SimulatedDaqBackend
+
+    pool = make_pool(SimulatedDaqBackend.with_devices(2))
+    assert pool.device_names == ["Dev1", "Dev2"]
+    _wait_for(lambda: all(device.is_connected for device in pool.devices))
+
+
+def test_unit_plugged_in_later_is_the_only_one_driving_it(make_pool):
+    from model.simulated_daq_backend import SimulatedDaqBackend, SimulatedDaqDevice
+
+    device = SimulatedDaqDevice("Dev3", plugged_in=False)
+    pool = make_pool(SimulatedDaqBackend(device))
+    assert pool.device_names == []
+    assert not pool.is_connected
+
+    added = []
+    pool.device_added.connect(added.append)
+    device.plug()
+    _wait_for(lambda: pool.is_connected)
+    assert pool.device_names == ["Dev3"]
+    assert added == ["Dev3"]
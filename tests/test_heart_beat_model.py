@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+from scipy.interpolate import PchipInterpolator
+
+from model.pchip_batch import PchipBatch
+
+
+def _strictly_increasing(knots) -> bool:
+    return bool(np.all(np.diff(knots[0]) > 0))
+
+
+def test_cvp_point_cannot_land_on_a_neighbour(heart_beat_model):
+    model = heart_beat_model
+    changed = []
+    model.waveforms_changed.connect(changed.append)
+
+    model.update_waveform_reference_point('cvp', 'diastolic_peak', 0.4, 75.0)      # dicrotic_notch is at 0.4
+    model.update_waveform_reference_point('cvp', 'sys_peak_decay_2', 0.9, 80.0)    # past four neighbours
+
+    knots = model.get_waveform_knots('cvp')
+    assert _strictly_increasing(knots)
+    assert changed == [['cvp'], ['cvp']]
+    features = model._waveform_features('cvp')
+    assert 0.4 < features['diastolic_peak']['time_s'] < 0.6
+    assert 0.25 < features['sys_peak_decay_2']['time_s'] < 0.4
+    PchipBatch(*zip(model.get_waveform_knots('abp'), knots))      # what every output render builds
+
+
+@pytest.mark.parametrize("num_samples", [100, 1000, 100_000])
+def test_abp_points_stay_between_neighbours(heart_beat_model, num_samples):
+    model = heart_beat_model
+    model.set_num_of_samples_per_heart_beat(num_samples)
+    keys = model.get_reference_point_keys()
+    rng = np.random.default_rng(num_samples)
+    for _ in range(100):
+        key = keys[rng.integers(len(keys))]
+        model.update_reference_point(key, rng.uniform(-0.1, 1.1), rng.uniform(40.0, 140.0))
+        assert _strictly_increasing(model.get_waveform_knots('abp'))
+    order = [model._waveform_features('abp')[key]['time_s'] for key in keys]
+    assert order == sorted(order)
+
+
+@pytest.mark.parametrize("num_samples", [1000, 100_000])
+def test_patched_regeneration_matches_a_full_render(heart_beat_model, num_samples):
+    model = heart_beat_model
+    model.set_num_of_samples_per_heart_beat(num_samples)
+    keys = model.get_reference_point_keys()
+    ranges = []
+    model.waveform_range_changed.connect(lambda start, stop: ranges.append((start, stop)))
+    rng = np.random.default_rng(num_samples)
+    # Every edit a fresh shape, so none is served whole from the template cache
+    for index in [0, len(keys) - 1, *rng.integers(len(keys), size=40), 0, len(keys) - 1]:
+        key = keys[index]
+        before = model.get_waveform_points()['abp_waveform_pressure_points'].copy()
+        time_s = model._waveform_features('abp')[key]['time_s'] + rng.uniform(-0.03, 0.03)
+        model.update_reference_point(key, time_s, rng.uniform(40.0, 140.0))
+
+        patched = model.get_waveform_points()['abp_waveform_pressure_points']
+        x, y = model.get_waveform_knots('abp')
+        full = PchipInterpolator(x * num_samples, y)(np.arange(num_samples))
+        np.testing.assert_allclose(patched, full, rtol=1e-9, atol=1e-9)
+        start, stop = ranges[-1]
+        assert np.array_equal(patched[:start], before[:start])
+        assert np.array_equal(patched[stop:], before[stop:])
+    assert any(stop - start < num_samples for start, stop in ranges)       # some edits were patched
+
+
+def test_cvp_edit_reaches_the_daq_output(heart_beat_model):
+    from model.abp_waveform_file_model import AbpWaveformFileModel
+    from model.ni6216daqmx_model import Ni6216DaqMx
+    from model.simulated_daq_backend import SimulatedDaqBackend
+
+    daq = Ni6216DaqMx(heart_beat_model, AbpWaveformFileModel(), backend=SimulatedDaqBackend())
+    try:
+        before = daq._stacked_waveforms()
+        heart_beat_model.update_waveform_reference_point('cvp', 'diastolic_peak', 0.4, 90.0)
+        after = daq._stacked_waveforms()
+        assert np.array_equal(before[0], after[0])      # ao0 plays ABP: untouched
+        assert not np.array_equal(before[1], after[1])
+        assert np.all(np.isfinite(after))
+    finally:
+        daq.stop()
+
+
+def test_preview_leaves_the_committed_beat_alone(heart_beat_model):
+    model = heart_beat_model
+    key = model.get_reference_point_keys()[3]
+    features = model._waveform_features('abp')
+    knots = model.get_waveform_knots('abp')
+    beat = model.get_waveform_points()['abp_waveform_pressure_points'].copy()
+    reference = [list(points) for points in model.get_waveform_reference_points().values()]
+    interpolator = model.get_beat_interpolator()
+    phase = np.linspace(0.0, 1.0, 501)
+    previews = []
+    model.waveform_preview_changed.connect(lambda: previews.append(model.get_waveform_preview_points()))
+
+    model.preview_reference_point(key, features[key]['time_s'] + 0.02, features[key]['pressure_mmHg'] + 30.0)
+
+    assert len(previews) == 1
+    index = model.get_reference_point_keys().index(key)
+    assert previews[0]['abp_ref_waveform_pressure_points'][index] == features[key]['pressure_mmHg'] + 30.0
+    assert previews[0]['abp_waveform_pressure_points'].max() > beat.max() + 10.0
+    assert all(np.array_equal(a, b) for a, b in zip(model.get_waveform_knots('abp'), knots))
+    assert np.array_equal(model.get_waveform_points()['abp_waveform_pressure_points'], beat)
+    assert [list(points) for points in model.get_waveform_reference_points().values()] == reference
+    assert np.array_equal(model.get_beat_interpolator()(phase), interpolator(phase))
+
+    model.update_reference_point(key, features[key]['time_s'] + 0.02, features[key]['pressure_mmHg'] + 30.0)
+    assert model.get_waveform_points()['abp_waveform_pressure_points'].max() > beat.max() + 10.0
+
+
+def test_resync_during_a_drag_uses_the_committed_beat(heart_beat_model):
+    model = heart_beat_model
+    key = model.get_reference_point_keys()[3]
+    features = model._waveform_features('abp')
+    pressure = features[key]['pressure_mmHg']
+    model.preview_reference_point(key, features[key]['time_s'], pressure + 30.0)
+    model.set_num_of_samples_per_heart_beat(2000)       # e.g. a sample rate change mid-drag
+    assert features[key]['pressure_mmHg'] == pressure
+    assert model.get_waveform_knots('abp')[1].max() < pressure + 30.0
@@ -0,0 +1,120 @@
+import time
+
+import numpy as np
+import pytest
+
+from model.beat_sequence import BeatSequence, ConstantBpm
+
+
+@pytest.fixture
+def daq(heart_beat_model):
+    from model.abp_waveform_file_model import AbpWaveformFileModel
+    from model.ni6216daqmx_model import Ni6216DaqMx
+    from model.simulated_daq_backend import SimulatedDaqBackend
+
+    backend = SimulatedDaqBackend()
+    daq = Ni6216DaqMx(heart_beat_model, AbpWaveformFileModel(), backend=backend)
+    _wait_for(lambda: daq.is_connected)
+    yield daq, backend
+    daq.stop()
+
+
+def _wait_for(condition, timeout_s: float = 5.0):
+    from PySide6.QtCore import QCoreApplication
+    deadline = time.perf_counter() + timeout_s
+    while not condition():
+        assert time.perf_counter() < deadline, "timed out"
+        QCoreApplication.processEvents()
+        time.sleep(0.005)
+
+
+def _expected_volts(daq, heart_beat_model, schedule, channel_map) -> dict:
+    waveforms = list(dict.fromkeys(w for w in channel_map.values() if w is not None))
+    sequence = BeatSequence.from_heart_beat_model(heart_beat_model, schedule, daq.sample_rate_hz,
+                                                  waveforms=waveforms)
+    pressure = np.concatenate(list(sequence.chunks(4096)), axis=-1)
+    return {channel: daq._calibration.convert(channel, pressure[waveforms.index(waveform)].copy())
+            for channel, waveform in channel_map.items() if waveform is not None}
+
+
+@pytest.mark.parametrize("channel_map", [{"ao0": "abp", "ao1": "cvp"}, {"ao0": None, "ao1": "abp"}],
+                         ids=["abp+cvp", "abp-on-ao1"])
+def test_beat_sequence_plays_every_mapped_waveform(daq, heart_beat_model, channel_map):
+    daq, backend = daq
+    daq.set_channel_map(channel_map)
+    schedule = ConstantBpm(120, 1.0)
+    daq.start_beat_sequence(schedule)
+    _wait_for(lambda: daq.is_generating)
+    _wait_for(lambda: not daq.is_generating)
+
+    out = backend.last_task.captured_output()
+    expected = _expected_volts(daq, heart_beat_model, schedule, channel_map)
+    for row, channel in enumerate(("ao0", "ao1")):
+        if channel in expected:
+            assert np.allclose(out[row, :len(expected[channel])], expected[channel])
+        else:
+            assert np.all(out[row] == daq.SINGLE_ENDED_REF_VOLTAGE)
+
+
+def test_cvp_edit_reaches_a_running_beat_sequence(daq, heart_beat_model):
+    daq, backend = daq
+    messages = []
+    daq.status_message.connect(messages.append)
+    daq.start_beat_sequence(ConstantBpm(60, 2.0))
+    _wait_for(lambda: daq.is_generating)
+    heart_beat_model.update_waveform_reference_point('cvp', 'sys_phase_peak', 0.2, 20.0)
+    assert "NI-6216: beat sequence template updated (next beat)." in messages
+    _wait_for(lambda: not daq.is_generating)
+
+    cvp = backend.last_task.captured_output()[1]
+    first, last = cvp[:1000], cvp[-1000:]
+    assert not np.allclose(first, last)             # the edited beat plays out on ao1
+
+
+@pytest.fixture
+def manual_daq(heart_beat_model):
+    from model.abp_waveform_file_model import AbpWaveformFileModel
+    from model.ni6216daqmx_model import Ni6216DaqMx
+    from model.simulated_daq_backend import SimulatedDaqBackend
+    from model.usb_hotplug import ManualHotplugMonitor
+
+    backend = SimulatedDaqBackend()
+    monitor = ManualHotplugMonitor()            # no unit reported at start
+    daq = Ni6216DaqMx(heart_beat_model, AbpWaveformFileModel(), backend=backend, hotplug_monitor=monitor)
+    yield daq, backend, monitor
+    daq.stop()
+
+
+def _settle(timeout_s: float = 0.2):
+    from PySide6.QtCore import QCoreApplication
+    deadline = time.perf_counter() + timeout_s
+    while time.perf_counter() < deadline:
+        QCoreApplication.processEvents()
+        time.sleep(0.005)
+
+
+def test_hotplug_arrival_connects(manual_daq):
+    daq, backend, monitor = manual_daq
+    _settle()
+    assert not daq.is_connected
+    monitor.inject(True, backend.device.info)
+    _wait_for(lambda: daq.is_connected)
+    assert daq.hotplug_stats()['events'] >= 1
+
+
+def test_hotplug_removal_disconnects(manual_daq):
+    daq, backend, monitor = manual_daq
+    monitor.inject(True, backend.device.info)
+    _wait_for(lambda: daq.is_connected)
+    backend.device.unplug()
+    monitor.inject(False)
+    _wait_for(lambda: not daq.is_connected)
+
+
+def test_removal_of_another_unit_keeps_the_connection(manual_daq):
+    daq, backend, monitor = manual_daq
+    monitor.inject(True, backend.device.info)
+    _wait_for(lambda: daq.is_connected)
+    monitor.inject(False)           # e.g. a second NI-6216 unplugged: ours is still attached
+    _settle()
+    assert daq.is_connected
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from scipy.signal import resample_poly
+
+from model.resampler import StreamingResampler, design_filter
+
+
+def _stream(resampler: StreamingResampler, data: np.ndarray, chunk_sizes) -> np.ndarray:
+    parts, position = [], 0
+    for size in chunk_sizes:
+        if position >= data.shape[1]:
+            break
+        parts.append(resampler.process(data[:, position:position + size]))
+        position += size
+    assert position >= data.shape[1]
+    parts.append(resampler.flush())
+    return np.concatenate(parts, axis=1)
+
+
+@pytest.mark.parametrize("up, down", [(40, 1), (1, 4), (3, 7), (833, 1000), (250, 1)])
+@pytest.mark.parametrize("chunking", ["random", "single", "whole"])
+def test_streaming_matches_resample_poly(up, down, chunking):
+    rng = np.random.default_rng(up * 1000 + down)
+    data = rng.standard_normal((2, 1501))
+    sizes = {
+        "random": rng.integers(1, 400, data.shape[1]),
+        "single": np.ones(data.shape[1], dtype=int),
+        "whole": [data.shape[1]],
+    }[chunking]
+    resampler = StreamingResampler(up, down, num_channels=2)
+
+    out = _stream(resampler, data, sizes)
+
+    expected = resample_poly(data, up, down, axis=-1, window=design_filter(up, down))
+    assert out.shape == expected.shape
+    np.testing.assert_allclose(out, expected, rtol=0, atol=1e-12)
+    assert resampler.samples_out == resampler.output_length(data.shape[1])
+
+
+def test_streaming_rejects_wrong_channel_count():
+    with pytest.raises(ValueError):
+        StreamingResampler(2, 1, num_channels=2).process(np.zeros((1, 10)))
@@ -0,0 +1,63 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from model.scenario import DEFAULT_SCENARIO_DIR, ScenarioRenderer, ScenarioSource, load_scenario, scenario_digest
+
+# An ABP and a CVP beat (phase, mmHg), so the tests do not need the waveform editor
+TEMPLATES = {
+    'abp': (np.array([0.0, 0.05, 0.15, 0.2, 0.25, 0.38, 0.4, 0.45, 0.6, 0.8, 1.0]),
+            np.array([65.0, 68.0, 115.0, 120.0, 115.0, 80.0, 70.0, 75.0, 71.0, 67.0, 65.0])),
+    'cvp': (np.array([0.0, 0.08, 0.16, 0.22, 0.38, 0.52, 0.66, 1.0]),
+            np.array([6.0, 9.0, 7.0, 8.0, 4.0, 8.5, 4.5, 6.0])),
+}
+SCENARIOS = sorted(DEFAULT_SCENARIO_DIR.glob("*.toml"))
+
+
+def test_bundled_scenarios_exist():
+    assert SCENARIOS
+
+
+@pytest.mark.parametrize("path", SCENARIOS, ids=lambda path: path.stem)
+def test_digest_does_not_depend_on_chunk_size(path):
+    scenario = load_scenario(path)
+    digests = {chunk: scenario_digest(ScenarioRenderer(scenario, TEMPLATES, 1000.0), chunk)
+               for chunk in (997, 4096, 65_536)}
+    assert len(set(digests.values())) == 1, digests
+
+    reseeded = dataclasses.replace(scenario, seed=scenario.seed + 1)
+    assert scenario_digest(ScenarioRenderer(reseeded, TEMPLATES, 1000.0)) != digests[65_536]
+
+
+@pytest.mark.parametrize("path", SCENARIOS, ids=lambda path: path.stem)
+def test_source_streams_the_rendered_samples(path):
+    scenario = load_scenario(path)
+    rendered = np.concatenate(list(ScenarioRenderer(scenario, TEMPLATES, 1000.0).chunks(65_536)), axis=1)
+
+    source = ScenarioSource(ScenarioRenderer(scenario, TEMPLATES, 1000.0),
+                            [("ao0", "abp"), ("ao1", "cvp"), ("ao2", None)],
+                            lambda channel, pressure: pressure / 100.0, reference_v=0.5)
+    blocks = []
+    while (block := source.read(1234)) is not None:
+        blocks.append(block)
+    streamed = np.concatenate(blocks, axis=1)
+
+    channels = source.renderer.channels
+    assert streamed.shape == (3, rendered.shape[1])
+    assert np.array_equal(streamed[0], rendered[channels.index("abp")] / 100.0)
+    assert np.array_equal(streamed[1], rendered[channels.index("cvp")] / 100.0)
+    assert np.all(streamed[2] == 0.5)
+
+
+def test_source_converts_a_shared_waveform_once_per_output():
+    scenario = load_scenario(SCENARIOS[0])
+    rendered = np.concatenate(list(ScenarioRenderer(scenario, TEMPLATES, 1000.0).chunks(65_536)), axis=1)
+    source = ScenarioSource(ScenarioRenderer(scenario, TEMPLATES, 1000.0), [("ao0", "abp"), ("ao1", "abp")],
+                            lambda channel, pressure: np.multiply(pressure, 0.01, out=pressure))
+    blocks = []
+    while (block := source.read(4096)) is not None:
+        blocks.append(block)
+    streamed = np.concatenate(blocks, axis=1)
+    expected = rendered[source.renderer.channels.index("abp")] * 0.01
+    assert np.array_equal(streamed[0], expected) and np.array_equal(streamed[1], expected)
@@ -0,0 +1,88 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from model.waveform_file_loader import (ORIENTATION_COLUMN, ORIENTATION_ROW, iter_waveform_chunks,
+                                        load_waveform_file, sniff_waveform_format)
+
+WAVEFORM_DB = Path(__file__).resolve().parent.parent / "model" / "waveform_db" / "BioSiPressureRawFile"
+
+
+def _write(tmp_path: Path, text: str, name: str = "wave.txt") -> Path:
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8", newline="")
+    return path
+
+
+def _chunked(path: Path, channel: int = 0, **kwargs) -> np.ndarray:
+    return np.concatenate([samples for samples, _ in iter_waveform_chunks(path, channel, **kwargs)])
+
+
+def test_single_line_recording_is_a_row():
+    path = WAVEFORM_DB / "33_BPM.txt"
+    fmt = sniff_waveform_format(path)
+    assert (fmt.delimiter, fmt.orientation, fmt.num_channels) == (",", ORIENTATION_ROW, 1)
+    samples = load_waveform_file(path)
+    assert samples.shape == (1805,)
+    assert np.array_equal(samples, load_waveform_file(WAVEFORM_DB / "33_BPM_.txt"))
+
+
+def test_multi_line_row_file(tmp_path):
+    data = np.random.default_rng(0).normal(100.0, 20.0, (2, 20_000)).round(3)
+    path = _write(tmp_path, "\n".join(",".join(map(str, row)) for row in data) + "\n")
+    fmt = sniff_waveform_format(path)
+    assert (fmt.orientation, fmt.num_channels) == (ORIENTATION_ROW, 2)
+    assert np.array_equal(load_waveform_file(path, 1), data[1])
+    assert np.array_equal(_chunked(path, 1), data[1])
+
+
+def test_small_multi_column_file_is_columns(tmp_path):
+    path = _write(tmp_path, "1,2,3,4\n5,6,7,8\n9,10,11,12")
+    fmt = sniff_waveform_format(path)
+    assert (fmt.orientation, fmt.num_channels) == (ORIENTATION_COLUMN, 4)
+    assert np.array_equal(load_waveform_file(path), [1.0, 5.0, 9.0])
+    assert np.array_equal(load_waveform_file(path, 3), [4.0, 8.0, 12.0])
+
+
+def test_orientation_can_be_forced(tmp_path):
+    path = _write(tmp_path, "1,2,3,4\n5,6,7,8\n9,10,11,12")
+    assert sniff_waveform_format(path, ORIENTATION_ROW).num_channels == 3
+    assert np.array_equal(load_waveform_file(path, 2, orientation=ORIENTATION_ROW), [9.0, 10.0, 11.0, 12.0])
+    with pytest.raises(ValueError):
+        sniff_waveform_format(path, "diagonal")
+
+
+def test_header_and_comment_lines_are_skipped(tmp_path):
+    path = _write(tmp_path, "Recording 12\r\nPressure (mmHg)\r\n\r\n# exported\r\n80.5\r\n# gap\r\n81\r\n\r\n82.25\r\n")
+    fmt = sniff_waveform_format(path)
+    assert (fmt.skip_lines, fmt.orientation, fmt.num_channels) == (4, ORIENTATION_COLUMN, 1)
+    assert np.array_equal(load_waveform_file(path), [80.5, 81.0, 82.25])
+
+
+@pytest.mark.parametrize("delimiter", [";", "\t"], ids=["semicolon", "tab"])
+def test_delimiters(tmp_path, delimiter):
+    path = _write(tmp_path, "time;abp\n".replace(";", delimiter)
+                  + "".join(f"{i / 1000}{delimiter}{80 + i % 7}\n" for i in range(100)))
+    fmt = sniff_waveform_format(path)
+    assert (fmt.delimiter, fmt.skip_lines, fmt.num_channels) == (delimiter, 1, 2)
+    assert np.array_equal(load_waveform_file(path, 1), 80.0 + np.arange(100) % 7)
+
+
+def test_no_data_rows(tmp_path):
+    with pytest.raises(ValueError, match="no valid data rows"):
+        sniff_waveform_format(_write(tmp_path, "# nothing\nhere\n"))
+
+
+@pytest.mark.parametrize("name", sorted(path.name for path in WAVEFORM_DB.glob("*.txt")))
+def test_chunks_concatenate_to_the_loaded_file(name):
+    path = WAVEFORM_DB / name
+    assert np.array_equal(_chunked(path, chunk_lines=1000), load_waveform_file(path))
+
+
+def test_chunks_concatenate_with_comments_and_header(tmp_path):
+    lines = ["a b"] + [f"{i} {i * 0.5}" if i % 97 else "# marker" for i in range(5000)]
+    path = _write(tmp_path, "\n".join(lines) + "\n")
+    chunks = list(iter_waveform_chunks(path, 1, chunk_lines=64))
+    assert chunks[-1][1] == 1.0
+    assert np.array_equal(np.concatenate([samples for samples, _ in chunks]), load_waveform_file(path, 1))
@@ -0,0 +1,29 @@
+import subprocess
+import sys
+
+import model.waveform_library as waveform_library
+from model.waveform_library import WaveformLibrary
+
+
+def test_scan_workers_do_not_load_the_app():
+    # What a spawned scan worker imports to unpickle extract_waveform_metadata
+    code = ("import sys, model.waveform_library; "
+            "print(sorted(m for m in ('PySide6', 'scipy', 'nidaqmx', 'usb') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_pool_scan_matches_in_process_scan(app_dirs, tmp_path, monkeypatch):
+    for i in range(6):
+        (tmp_path / f"rec{i}.txt").write_text("\n".join(str(80 + 20 * ((k % 50) < 10)) for k in range(2000 + i)))
+    (tmp_path / "broken.txt").write_text("not a number\n")
+
+    def catalogue(index, **scan_kwargs):
+        library = WaveformLibrary(tmp_path / index, include_default_folder=False)
+        library.add_folder(tmp_path)
+        assert library.scan(**scan_kwargs)['added'] == 7
+        return [{k: v for k, v in row.items() if k != 'indexed_at'} for row in library.query()]
+
+    serial = catalogue("serial.sqlite", max_workers=1)
+    monkeypatch.setattr(waveform_library, "PARALLEL_SCAN_MIN_FILES", 2)
+    assert catalogue("pool.sqlite", max_workers=2) == serial
@@ -1,7 +1,8 @@
 from PyInstaller.utils.hooks import copy_metadata, collect_data_files, collect_submodules
 
 datas = [
-    ('model/heartBeat.xml', 'model')
+    ('model/heartBeat.xml', 'model'),
+    ('model/scenarios/*.toml', 'model/scenarios'),
 ]
 datas += copy_metadata('nidaqmx')
 datas += copy_metadata('numpy')
@@ -1,7 +1,9 @@
+from .daq_device_pool_view import DaqDevicePoolView
 from .heart_beat_view import HeartBeatView
 from .heart_beat_waveform_page_view import HeartBeatWaveformPage
 from .heart_beat_load_from_file_page_view import HeartBeatLoadWaveformFromFilePage
 from .interactive_chart_view import InteractiveChartView
 from .left_panel_view import LeftPanelView
 from .ni_6216_view import NI6216View
+from .waveform_library_page_view import WaveformLibraryPage
 from .themes import *
@@ -0,0 +1,125 @@
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QPushButton,
+    QStackedWidget,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+from view.ni_6216_view import NI6216View
+from viewmodel.daq_device_pool_viewmodel import DaqDevicePoolViewModel
+
+# Device table: metrics key, header, format; after the "Device" and "State" columns
+DEVICE_METRICS_COLUMNS = (
+    ('sample_rate_hz', "Rate", "{:,.0f} S/s"),
+    ('buffer_fill_pct', "Buffer fill", "{:.0f} %"),
+    ('min_headroom_ms', "Min headroom", "{:.0f} ms"),
+    ('underflows', "Underflows", "{}"),
+    ('write_rate_sps', "Write rate", "{:,.0f} S/s"),
+)
+
+class DaqDevicePoolView(QWidget):
+    """Every DAQ unit at a glance, start/stop for all of them, and the selected unit's NI6216View."""
+
+    def __init__(self, viewmodel: DaqDevicePoolViewModel, parent=None):
+        super().__init__(parent)
+        self._viewmodel = viewmodel
+        self._rows = {}         # device name -> table row (= page in the stack)
+
+        main_layout = QVBoxLayout()
+
+        # --- All-devices row ---
+        all_layout = QHBoxLayout()
+        self._start_all_button = QPushButton("Start All")
+        self._start_all_button.clicked.connect(self._viewmodel.start_all)
+        self._stop_all_button = QPushButton("Stop All")
+        self._stop_all_button.clicked.connect(self._viewmodel.stop_all)
+        rescan_button = QPushButton("Rescan")
+        rescan_button.setToolTip("Look for newly attached DAQ devices")
+        rescan_button.clicked.connect(self._viewmodel.rescan)
+        self._summary_label = QLabel()
+        all_layout.addWidget(self._start_all_button)
+        all_layout.addWidget(self._stop_all_button)
+        all_layout.addWidget(rescan_button)
+        all_layout.addWidget(self._summary_label)
+        all_layout.addStretch()
+        main_layout.addLayout(all_layout)
+
+        # --- Device table ---
+        headers = ["Device", "State"] + [header for _, header, _ in DEVICE_METRICS_COLUMNS]
+        self._table = QTableWidget(0, len(headers))
+        self._table.setHorizontalHeaderLabels(headers)
+        self._table.verticalHeader().setVisible(False)
+        self._table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self._table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self._table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self._table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self._table.setMaximumHeight(160)
+        self._table.currentCellChanged.connect(self._on_current_cell_changed)
+        main_layout.addWidget(self._table)
+
+        # --- Selected device ---
+        self._device_stack = QStackedWidget()
+        main_layout.addWidget(self._device_stack)
+        self.setLayout(main_layout)
+
+        # Connect ViewModel signals
+        self._viewmodel.device_added.connect(self._on_device_added)
+        self._viewmodel.device_state_changed.connect(self._on_device_state_changed)
+        self._viewmodel.metrics_updated.connect(self._on_metrics_updated)
+        self._viewmodel.connection_changed.connect(self._update_summary)
+        self._viewmodel.generation_state_changed.connect(self._update_summary)
+        # Set initial state
+        for name in self._viewmodel.device_names:
+            self._on_device_added(name)
+        self._update_summary()
+
+    def _on_device_added(self, name: str):
+        if name in self._rows:
+            return
+        row = self._table.rowCount()
+        self._rows[name] = row
+        self._table.insertRow(row)
+        self._table.setItem(row, 0, QTableWidgetItem(name))
+        for column in range(1, self._table.columnCount()):
+            self._table.setItem(row, column, QTableWidgetItem("–"))
+        self._device_stack.addWidget(NI6216View(self._viewmodel.device_viewmodel(name)))
+        if row == 0:
+            self._table.selectRow(0)
+        self._on_device_state_changed(name)
+
+    def _on_device_state_changed(self, name: str):
+        row = self._rows.get(name)
+        if row is None:
+            return
+        device_viewmodel = self._viewmodel.device_viewmodel(name)
+        if device_viewmodel.is_generating:
+            state = "Generating"
+        else:
+            state = "Connected" if device_viewmodel.is_connected else "Disconnected"
+        self._table.item(row, 1).setText(state)
+        self._update_summary()
+
+    def _on_metrics_updated(self, name: str, metrics: dict):
+        row = self._rows.get(name)
+        if row is None:
+            return
+        for column, (key, _, fmt) in enumerate(DEVICE_METRICS_COLUMNS, start=2):
+            if key in metrics:
+                self._table.item(row, column).setText(fmt.format(metrics[key]))
+
+    def _on_current_cell_changed(self, row: int, column: int, previous_row: int, previous_column: int):
+        if 0 <= row < self._device_stack.count():
+            self._device_stack.setCurrentIndex(row)
+
+    def _update_summary(self, *_):
+        names = self._viewmodel.device_names
+        connected = sum(self._viewmodel.device_viewmodel(name).is_connected for name in names)
+        generating = sum(self._viewmodel.device_viewmodel(name).is_generating for name in names)
+        self._summary_label.setText(f"{len(names)} device(s) · {connected} connected · {generating} generating")
+        self._start_all_button.setEnabled(connected > generating)
+        self._stop_all_button.setEnabled(generating > 0)
@@ -1,7 +1,9 @@
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
+    QHBoxLayout,
     QPushButton,
+    QProgressBar,
     QFileDialog,
     QMessageBox,
 
@@ -24,6 +26,9 @@ class HeartBeatLoadWaveformFromFilePage(QWidget):
         # View listens to ViewModel only
         # View model can send the waveform point or a load error
         self._viewmodel.waveform_loaded.connect(self._on_waveform_loaded)
+        self._viewmodel.waveform_preview.connect(self._on_waveform_preview)
+        self._viewmodel.load_progress.connect(self._on_load_progress)
+        self._viewmodel.loading_state_changed.connect(self._on_loading_state_changed)
         self._viewmodel.load_error.connect(self._on_load_error)
 
         self._init_ui()
@@ -73,18 +78,47 @@ class HeartBeatLoadWaveformFromFilePage(QWidget):
         self.chart_view = InteractiveChartView(self.chart)
         main_layout.addWidget(self.chart_view)
 
-        # --- Load Waveform button ---
+        # --- Load Waveform button + progress / cancel ---
+        load_layout = QHBoxLayout()
         self._load_waveform_button = QPushButton("Load Waveform")
         self._load_waveform_button.setEnabled(True)
         self._load_waveform_button.clicked.connect(self._on_load_waveform_button_clicked)
-        main_layout.addWidget(self._load_waveform_button)
+        load_layout.addWidget(self._load_waveform_button, stretch=1)
+
+        self._load_progress_bar = QProgressBar()
+        self._load_progress_bar.setRange(0, 100)
+        self._load_progress_bar.setVisible(False)
+        load_layout.addWidget(self._load_progress_bar, stretch=1)
+
+        self._cancel_load_button = QPushButton("Cancel")
+        self._cancel_load_button.setVisible(False)
+        self._cancel_load_button.clicked.connect(self._viewmodel.cancel_loading)
+        load_layout.addWidget(self._cancel_load_button)
+        main_layout.addLayout(load_layout)
 
         main_layout.addStretch()
 
     """ To UI """
     def _on_waveform_loaded(self, time, pressure):
+        self.series.setName("Loaded Waveform")
+        self._populate_chart(time, pressure, self._viewmodel.waveform_pyramid)
+
+    """ To UI """
+    def _on_waveform_preview(self, time, pressure):
+        # Coarse preview of what has been parsed so far; replaced by the final load
+        self.series.setName("Loading (preview)…")
         self._populate_chart(time, pressure)
 
+    """ To UI """
+    def _on_load_progress(self, fraction: float):
+        self._load_progress_bar.setValue(int(fraction * 100))
+
+    """ To UI """
+    def _on_loading_state_changed(self, loading: bool):
+        self._load_progress_bar.setValue(0)
+        self._load_progress_bar.setVisible(loading)
+        self._cancel_load_button.setVisible(loading)
+
     """ To UI """
     @staticmethod
     def _on_load_error(msg):
@@ -113,18 +147,14 @@ class HeartBeatLoadWaveformFromFilePage(QWidget):
 
     def _populate_chart(self,
                         time_points: np.ndarray,
-                        pressure_points: np.ndarray):
-        """Clear the series and repaint with new data."""
-        self.series.clear()
-
-        points = [
-            QPointF(t, p)
-            for t, p in zip(time_points, pressure_points)
-        ]
-
-        self.series.replace(points)  # single C++ call, replaces all points at once
-
-        # Rescale axes to fit the loaded data
+                        pressure_points: np.ndarray,
+                        pyramid=None):
+        """Rescale the axes and hand the data to the chart view's level-of-detail path."""
+        if len(time_points) == 0:
+            self.chart_view.set_decimated_series(self.series, time_points, pressure_points)
+            return
+
+        # Rescale axes to fit the loaded data (before decimating to the visible range)
         self.axis_x.setRange(float(np.min(time_points)), float(np.max(time_points)))
         self.axis_x.setTickAnchor(0.0)
         self.axis_x.setTickInterval(100)
@@ -133,3 +163,6 @@ class HeartBeatLoadWaveformFromFilePage(QWidget):
             float(np.max(pressure_points)) + 5
         )
 
+        # Only ~2 points per pixel column are pushed to the QLineSeries
+        self.chart_view.set_decimated_series(self.series, time_points, pressure_points, pyramid)
+
@@ -3,14 +3,17 @@ from view.heart_beat_waveform_page_view import HeartBeatWaveformPage
 import viewmodel
 from view.inner_panel import InnerPanel
 from view.heart_beat_load_from_file_page_view import HeartBeatLoadWaveformFromFilePage
+from view.waveform_library_page_view import WaveformLibraryPage
 
 
 class HeartBeatView(QWidget):
 
-    def __init__(self, waveform_page_viewmodel, load_from_file_page_viewmodel):
+    def __init__(self, waveform_page_viewmodel, load_from_file_page_viewmodel,
+                 waveform_library_viewmodel):
         super().__init__()
         self._heart_beat_waveform_page_viewmodel = waveform_page_viewmodel
         self._heart_beat_load_from_file_page_viewmodel = load_from_file_page_viewmodel
+        self._waveform_library_viewmodel = waveform_library_viewmodel
         self._init_ui()  # ← UI built first
 
     # ── UI Setup ──────────────────────────────────────────────────────────
@@ -35,7 +38,14 @@ class HeartBeatView(QWidget):
             "Load from file",
             self._heart_beat_load_from_file_page
         )
-        # Page 3 — Fixed Values
+        # Page 3 — Indexed waveform library
+        self._waveform_library_page = WaveformLibraryPage(self._waveform_library_viewmodel)
+        self._inner_panel.add_page(
+            "fa5s.database",
+            "Waveform library",
+            self._waveform_library_page
+        )
+        # Page 4 — Fixed Values
         self._inner_panel.add_page(
             "fa5s.flag",
             "Calibration Values",
@@ -9,6 +9,16 @@ from PySide6.QtCore import Qt, QPointF
 from view.interactive_chart_view import InteractiveChartView
 import numpy as np
 
+# Dirty ranges up to this many samples are patched point by point; larger ones
+# (or ones covering more than 1/DIRTY_PATCH_MAX_FRACTION of the beat) are cheaper
+# to push as one replaceNp() of the whole buffer
+DIRTY_PATCH_MAX_POINTS = 512
+DIRTY_PATCH_MAX_FRACTION = 8
+TARGET_X_TICKS = 20
+# Longer beats are drawn through the chart view's min/max level-of-detail path:
+# QtCharts re-lays out every point on each change, far more than a plot can show
+DECIMATE_ABOVE_SAMPLES = 20_000
+
 
 class HeartBeatWaveformPage(QWidget):
     """
@@ -20,8 +30,16 @@ class HeartBeatWaveformPage(QWidget):
     def __init__(self, viewmodel, parent=None):
         super().__init__(parent)
         self._viewmodel = viewmodel
+        # Series-side copy of the beat; reallocated only when the beat length changes
+        self._x_buffer = np.empty(0)
+        self._y_buffer = np.empty(0)
+        self._y_range = None
+        self._x_axis_samples = 0
+        self._series_samples = 0        # beat length the line series currently mirrors
+        self._ref_snapshot = None
         self._init_ui()
         self._viewmodel.waveform_data_changed.connect(self.update_waveform_data)
+        self._viewmodel.waveform_preview_changed.connect(self.update_waveform_preview)
         self.update_waveform_data()
 
     def _init_ui(self):
@@ -74,7 +92,8 @@ class HeartBeatWaveformPage(QWidget):
         self.chart_view = InteractiveChartView(
             self.chart,
             on_point_moved_callback=self._on_reference_point_moved,
-            on_point_clicked_callback=self._on_reference_point_clicked
+            on_point_clicked_callback=self._on_reference_point_clicked,
+            on_point_released_callback=self._on_reference_point_released
         )
         self.chart_view.setRenderHint(QPainter.Antialiasing)
         main_layout.addWidget(self.chart_view)
@@ -134,30 +153,92 @@ class HeartBeatWaveformPage(QWidget):
     # ── All waveform/table methods (unchanged from HeartBeatView) ──────────
 
     def update_waveform_data(self):
-        self.series.clear()
-        self.ref_points_series.clear()
         waveform        = self._viewmodel.abp_waveform
         time_points     = waveform['abp_waveform_time_points']
         pressure_points = waveform['abp_waveform_pressure_points']
         if len(time_points) == 0:
+            self.chart_view.remove_decimated_series(self.series)
+            self._series_samples = 0
+            self.series.clear()
+            self.ref_points_series.clear()
             return
-        for t, p in zip(time_points, pressure_points):
-            self.series.append(float(t), float(p))
+        start, stop = self._viewmodel.dirty_range
+        self._sync_waveform_series(time_points, pressure_points, start, stop)
+
         ref           = self._viewmodel.reference_abp_waveform
         ref_times     = ref['abp_ref_waveform_time_points']
         ref_pressures = ref['abp_ref_waveform_pressure_points']
         keys          = self._viewmodel.reference_point_keys
-        for t, p in zip(ref_times, ref_pressures):
-            self.ref_points_series.append(float(t), float(p))
-        self.chart_view.set_reference_points(
-            [QPointF(float(t), float(p)) for t, p in zip(ref_times, ref_pressures)]
-        )
-        self.axis_x.setRange(float(np.min(time_points)), float(np.max(time_points)))
-        self.axis_x.setTickAnchor(0.0)
-        self.axis_x.setTickInterval(50)
-        self.axis_y.setRange(float(np.min(pressure_points)) - 5,
-                             float(np.max(pressure_points)) + 5)
-        self._update_ref_table(keys, ref_times, ref_pressures)
+        snapshot = (tuple(keys), tuple(ref_times), tuple(ref_pressures))
+        if snapshot != self._ref_snapshot:
+            self._ref_snapshot = snapshot
+            self.ref_points_series.replaceNp(np.asarray(ref_times, dtype=np.float64),
+                                             np.asarray(ref_pressures, dtype=np.float64))
+            self.chart_view.set_reference_points(np.column_stack((ref_times, ref_pressures)))
+            self._update_ref_table(keys, ref_times, ref_pressures)
+        self._update_axes()
+
+    def _sync_waveform_series(self, time_points, pressure_points, start, stop):
+        """
+        Mirror the model's beat into the line series. A new beat length (or a
+        series that was cleared by a preview) is pushed with one replaceNp() of
+        the preallocated buffers; otherwise only [start, stop) is copied into the
+        buffer, and pushed point by point when that span is small.
+        """
+        n = len(time_points)
+        if n != len(self._x_buffer):
+            self._x_buffer = np.empty(n, dtype=np.float64)
+            self._y_buffer = np.empty(n, dtype=np.float64)
+        full_push = self._series_samples != n or (start, stop) == (0, n)
+        if full_push:
+            start, stop = 0, n
+            self._x_buffer[:] = time_points
+        self._y_buffer[start:stop] = pressure_points[start:stop]
+        self._series_samples = n
+
+        span = stop - start
+        if n > DECIMATE_ABOVE_SAMPLES:
+            # Shares the buffers (no copy); redraws only what the plot can resolve
+            self.chart_view.set_decimated_series(self.series, self._x_buffer, self._y_buffer)
+        elif full_push or span > DIRTY_PATCH_MAX_POINTS or span * DIRTY_PATCH_MAX_FRACTION > n:
+            self.chart_view.remove_decimated_series(self.series)
+            self.series.replaceNp(self._x_buffer, self._y_buffer)
+        else:
+            x, y = self._x_buffer, self._y_buffer
+            for i in range(start, stop):
+                self.series.replace(i, x[i], y[i])
+
+    def _update_axes(self):
+        n = len(self._x_buffer)
+        y_range = (float(self._y_buffer.min()) - 5, float(self._y_buffer.max()) + 5)
+        if y_range != self._y_range:
+            self._y_range = y_range
+            self.axis_y.setRange(*y_range)
+        if n != self._x_axis_samples:
+            self._x_axis_samples = n
+            # Keep ~TARGET_X_TICKS grid lines whatever the samples per beat
+            magnitude = 10 ** max(int(np.log10(max(n / TARGET_X_TICKS, 1))), 0)
+            interval = max(50, int(np.ceil(n / TARGET_X_TICKS / magnitude)) * magnitude)
+            self.axis_x.setRange(0.0, float(n - 1))
+            self.axis_x.setTickAnchor(0.0)
+            self.axis_x.setTickInterval(interval)
+
+    def update_waveform_preview(self):
+        """Cheap per-frame redraw while dragging: no axis rescale, no table rebuild."""
+        preview = self._viewmodel.abp_waveform_preview
+        time_points = np.asarray(preview['abp_waveform_time_points'], dtype=np.float64)
+        pressure_points = np.asarray(preview['abp_waveform_pressure_points'], dtype=np.float64)
+        if len(time_points) == 0:
+            return
+        self.chart_view.remove_decimated_series(self.series)
+        self._series_samples = 0        # next full-resolution update repopulates everything
+        self.series.replaceNp(time_points, pressure_points)
+        # The dragged reference points: the committed ones move only when the drag ends
+        ref_times = np.asarray(preview['abp_ref_waveform_time_points'], dtype=np.float64)
+        ref_pressures = np.asarray(preview['abp_ref_waveform_pressure_points'], dtype=np.float64)
+        self.ref_points_series.replaceNp(ref_times, ref_pressures)
+        self.chart_view.set_reference_points(np.column_stack((ref_times, ref_pressures)))
+        self._ref_snapshot = None       # the next full update redraws the committed points
 
     def _update_ref_table(self, keys, ref_times, ref_pressures):
         self.ref_table.blockSignals(True)
@@ -178,6 +259,7 @@ class HeartBeatWaveformPage(QWidget):
         self.ref_table.blockSignals(False)
 
     def _on_table_cell_changed(self, row: int, col: int):
+        self._ref_snapshot = None       # re-render the cell even if the value gets clamped back
         keys          = self._viewmodel.reference_point_keys
         ref           = self._viewmodel.reference_abp_waveform
         ref_times     = ref['abp_ref_waveform_time_points']
@@ -200,14 +282,24 @@ class HeartBeatWaveformPage(QWidget):
         except (ValueError, TypeError):
             self._update_ref_table(keys, ref_times, ref_pressures)
 
-    def _on_reference_point_moved(self, index: int, new_value: QPointF):
+    def _reference_point_args(self, index: int, new_value: QPointF):
         keys = self._viewmodel.reference_point_keys
         if index >= len(keys):
-            return
+            return None
         n_samples    = len(self._viewmodel.abp_waveform['abp_waveform_time_points'])
         new_time_pct = max(0.0, min(1.0, new_value.x() / (n_samples - 1)))
         new_pressure = max(0.0, min(300.0, new_value.y()))
-        self._viewmodel.update_reference_point(keys[index], new_time_pct, new_pressure)
+        return keys[index], new_time_pct, new_pressure
+
+    def _on_reference_point_moved(self, index: int, new_value: QPointF):
+        args = self._reference_point_args(index, new_value)
+        if args is not None:
+            self._viewmodel.drag_reference_point(*args)
+
+    def _on_reference_point_released(self, index: int, new_value: QPointF):
+        args = self._reference_point_args(index, new_value)
+        if args is not None:
+            self._viewmodel.commit_reference_point(*args)
 
     def _on_reference_point_clicked(self, index: int):
         if index >= self.ref_table.columnCount():
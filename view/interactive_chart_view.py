@@ -1,35 +1,88 @@
-from PySide6.QtCharts import QChartView
+from PySide6.QtCharts import QChartView, QXYSeries
 from PySide6.QtCore import Qt, QPointF
-from PySide6.QtGui import QPainter, QMouseEvent, QWheelEvent
+from PySide6.QtGui import QPainter, QMouseEvent, QWheelEvent, QResizeEvent
+import numpy as np
+
+from model.minmax_pyramid import MinMaxPyramid
+from model.waveform_decimation import minmax_decimate, visible_range
 
 ZOOM_FACTOR      = 1.15   # per wheel notch
 PAN_BUTTON       = Qt.MiddleButton
 PAN_MOD_BUTTON   = Qt.LeftButton
 PAN_MODIFIER     = Qt.ControlModifier
+DEFAULT_REFERENCE_KEY = "reference"
 
 
 class InteractiveChartView(QChartView):
 
     def __init__(self, chart, on_point_moved_callback=None,
-                 on_point_clicked_callback=None, parent=None):
+                 on_point_clicked_callback=None, on_point_released_callback=None,
+                 parent=None):
         super().__init__(chart, parent)
         self.setRenderHint(QPainter.Antialiasing)
 
         self._on_point_moved   = on_point_moved_callback
         self._on_point_clicked = on_point_clicked_callback
+        self._on_point_released = on_point_released_callback
 
         self._dragging_index   = None
-        self._ref_points       = []
+        self._dragging_key     = None
+        self._drag_moved       = False
         self._drag_threshold   = 12.0
 
+        # Editable point sets: key → (N×2 chart values, (moved, clicked, released) callbacks)
+        self._ref_sets         = {}
+        # Viewport-space hit-test index over all sets, sorted by x; rebuilt lazily
+        # when the points change or the chart → viewport mapping does
+        self._hit_index        = None
+        self._hit_signature    = None
+
         # Pan state
         self._panning          = False
         self._pan_last_pos     = QPointF()
 
+        # Level-of-detail series: series → (full x, full y, optional pyramid)
+        self._lod_series       = {}
+
     # ── Public ─────────────────────────────────────────────────────────────
 
-    def set_reference_points(self, points: list[QPointF]):
-        self._ref_points = points
+    def set_reference_points(self, points, key: str = DEFAULT_REFERENCE_KEY,
+                             on_moved=None, on_clicked=None, on_released=None):
+        """
+        Make `points` (QPointFs or an N×2 array of chart values) draggable.
+        Several independent sets can be registered under different keys; the
+        callbacks receive the point's index within its own set, and default to
+        the ones given to the constructor.
+        """
+        if len(points) and isinstance(points[0], QPointF):
+            values = np.array([(p.x(), p.y()) for p in points], dtype=np.float64)
+        else:
+            values = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        callbacks = (on_moved or self._on_point_moved,
+                     on_clicked or self._on_point_clicked,
+                     on_released or self._on_point_released)
+        self._ref_sets[key] = (values, callbacks)
+        self._invalidate_hit_index()
+
+    def remove_reference_points(self, key: str = DEFAULT_REFERENCE_KEY):
+        if self._ref_sets.pop(key, None) is not None:
+            self._invalidate_hit_index()
+
+    def set_decimated_series(self, series: QXYSeries, x: np.ndarray, y: np.ndarray,
+                             pyramid: MinMaxPyramid | None = None):
+        """
+        Show (x, y) in `series` at screen resolution: only the visible range is
+        drawn, min/max decimated to about two points per pixel column, and it is
+        recomputed whenever the view is zoomed, panned, reset or resized.
+        A prebuilt pyramid over y (e.g. the model's) makes each refresh O(pixels).
+        """
+        self._lod_series[series] = (np.asarray(x, dtype=np.float64),
+                                    np.asarray(y, dtype=np.float64),
+                                    pyramid)
+        self._refresh_series_lod(series)
+
+    def remove_decimated_series(self, series: QXYSeries):
+        self._lod_series.pop(series, None)
 
     # ── Wheel → Zoom ───────────────────────────────────────────────────────
 
@@ -50,6 +103,8 @@ class InteractiveChartView(QChartView):
         new_cursor_scene = self.chart().mapToScene(cursor_chart)
         delta_scene = cursor_scene - new_cursor_scene
         self.chart().scroll(-delta_scene.x(), delta_scene.y())
+        self._refresh_lod()
+        self._invalidate_hit_index()
 
         event.accept()
 
@@ -68,12 +123,14 @@ class InteractiveChartView(QChartView):
 
         # ── Reference point drag: plain left click ─────────────────────────
         if event.button() == Qt.LeftButton:
-            index = self._nearest_point_index(event.position())
-            if index is not None:
-                self._dragging_index = index
+            hit = self._nearest_point(event.position())
+            if hit is not None:
+                self._dragging_key, self._dragging_index = hit
+                self._drag_moved     = False
                 self.setCursor(Qt.ClosedHandCursor)
-                if self._on_point_clicked:
-                    self._on_point_clicked(index)
+                on_clicked = self._ref_callbacks(self._dragging_key)[1]
+                if on_clicked:
+                    on_clicked(self._dragging_index)
                 event.accept()
                 return
 
@@ -88,22 +145,26 @@ class InteractiveChartView(QChartView):
             self._pan_last_pos = event.position()
             # chart().scroll() takes pixel deltas; Y is inverted (chart Y grows up)
             self.chart().scroll(-delta.x(), delta.y())
+            self._refresh_lod()
+            self._invalidate_hit_index()
             event.accept()
             return
 
         # ── Active point drag ──────────────────────────────────────────────
         if self._dragging_index is not None:
             value = self._pixel_to_chart_value(event.position())
-            if self._on_point_moved:
-                self._on_point_moved(self._dragging_index, value)
+            self._drag_moved = True
+            on_moved = self._ref_callbacks(self._dragging_key)[0]
+            if on_moved:
+                on_moved(self._dragging_index, value)
             event.accept()
             return
 
         # ── Hover cursor hint ──────────────────────────────────────────────
-        idx = self._nearest_point_index(event.position())
+        hit = self._nearest_point(event.position())
         if event.modifiers() & PAN_MODIFIER:
             self.setCursor(Qt.OpenHandCursor)
-        elif idx is not None:
+        elif hit is not None:
             self.setCursor(Qt.OpenHandCursor)
         else:
             self.setCursor(Qt.ArrowCursor)
@@ -122,7 +183,12 @@ class InteractiveChartView(QChartView):
             return
 
         if event.button() == Qt.LeftButton:
+            on_released = self._ref_callbacks(self._dragging_key)[2]
+            if self._drag_moved and on_released:
+                on_released(self._dragging_index, self._pixel_to_chart_value(event.position()))
             self._dragging_index = None
+            self._dragging_key   = None
+            self._drag_moved     = False
             self.setCursor(Qt.ArrowCursor)
 
         super().mouseReleaseEvent(event)
@@ -132,23 +198,102 @@ class InteractiveChartView(QChartView):
     def mouseDoubleClickEvent(self, event: QMouseEvent):
         if event.button() == Qt.LeftButton:
             self.chart().zoomReset()
+            self._refresh_lod()
+            self._invalidate_hit_index()
             event.accept()
             return
         super().mouseDoubleClickEvent(event)
 
+    # ── Resize → new pixel budget ──────────────────────────────────────────
+
+    def resizeEvent(self, event: QResizeEvent):
+        super().resizeEvent(event)
+        self._refresh_lod()
+        self._invalidate_hit_index()
+
     # ── Private helpers ────────────────────────────────────────────────────
 
+    def _refresh_lod(self):
+        for series in self._lod_series:
+            self._refresh_series_lod(series)
+
+    def _refresh_series_lod(self, series: QXYSeries):
+        x, y, pyramid = self._lod_series[series]
+        if len(x) == 0:
+            series.clear()
+            return
+        axes = self.chart().axes(Qt.Horizontal, series)
+        if axes:
+            start, stop = visible_range(x, axes[0].min(), axes[0].max())
+        else:
+            start, stop = 0, len(x)
+        num_buckets = int(self.chart().plotArea().width()) or self.width()
+        if pyramid is not None:
+            x_vis, y_vis = pyramid.decimate(x, start, stop, num_buckets)
+        else:
+            x_vis, y_vis = minmax_decimate(x[start:stop], y[start:stop], num_buckets)
+        series.replaceNp(x_vis, y_vis)   # single C++ call from the numpy buffers
+
     def _pixel_to_chart_value(self, pos) -> QPointF:
         scene_pos = self.mapToScene(pos.toPoint())
         chart_pos = self.chart().mapFromScene(scene_pos)
         return self.chart().mapToValue(chart_pos)
 
-    def _nearest_point_index(self, pos) -> int | None:
-        for i, pt in enumerate(self._ref_points):
-            scene_pt = self.chart().mapToPosition(pt)
-            view_pt  = self.mapFromScene(scene_pt)
-            dx = view_pt.x() - pos.x()
-            dy = view_pt.y() - pos.y()
-            if (dx * dx + dy * dy) ** 0.5 <= self._drag_threshold:
-                return i
-        return None
+    def _ref_callbacks(self, key):
+        entry = self._ref_sets.get(key)
+        return entry[1] if entry else (None, None, None)
+
+    def _invalidate_hit_index(self):
+        self._hit_index = None
+
+    def _mapping_signature(self):
+        """Everything the chart value → viewport mapping depends on, cheap to read."""
+        area = self.chart().plotArea()
+        ranges = tuple((axis.min(), axis.max()) for axis in self.chart().axes()
+                       if hasattr(axis, "min"))
+        return (area.x(), area.y(), area.width(), area.height(), ranges,
+                self.horizontalScrollBar().value(), self.verticalScrollBar().value())
+
+    def _value_to_viewport(self, values: np.ndarray) -> np.ndarray:
+        """
+        Map N×2 chart values to viewport pixels. Value axes are linear, so two
+        mapped corners give the affine transform and the rest is vectorized.
+        """
+        chart = self.chart()
+        transform = self.viewportTransform()
+        origin = transform.map(chart.mapToScene(chart.mapToPosition(QPointF(0.0, 0.0))))
+        unit = transform.map(chart.mapToScene(chart.mapToPosition(QPointF(1.0, 1.0))))
+        scale = np.array([unit.x() - origin.x(), unit.y() - origin.y()])
+        return values * scale + np.array([origin.x(), origin.y()])
+
+    def _build_hit_index(self):
+        keys, indices, coords = [], [], []
+        for key, (values, _) in self._ref_sets.items():
+            if len(values):
+                coords.append(self._value_to_viewport(values))
+                keys.extend([key] * len(values))
+                indices.append(np.arange(len(values)))
+        if not coords:
+            return np.empty(0), np.empty(0), [], np.empty(0, dtype=np.intp)
+        coords = np.concatenate(coords)
+        indices = np.concatenate(indices)
+        order = np.argsort(coords[:, 0], kind="stable")
+        return coords[order, 0], coords[order, 1], [keys[i] for i in order], indices[order]
+
+    def _nearest_point(self, pos) -> tuple[str, int] | None:
+        """(key, index) of the closest editable point within the drag threshold."""
+        signature = self._mapping_signature()
+        if self._hit_index is None or signature != self._hit_signature:
+            self._hit_index = self._build_hit_index()
+            self._hit_signature = signature
+        xs, ys, keys, indices = self._hit_index
+        r = self._drag_threshold
+        lo = int(np.searchsorted(xs, pos.x() - r, side="left"))
+        hi = int(np.searchsorted(xs, pos.x() + r, side="right"))
+        if lo == hi:
+            return None
+        d2 = (xs[lo:hi] - pos.x()) ** 2 + (ys[lo:hi] - pos.y()) ** 2
+        best = int(np.argmin(d2))
+        if d2[best] > r * r:
+            return None
+        return keys[lo + best], int(indices[lo + best])
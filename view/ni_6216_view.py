@@ -1,8 +1,45 @@
-from PySide6.QtWidgets import QWidget, QPushButton, QLabel, QVBoxLayout, QHBoxLayout, QSpinBox
+import numpy as np
+from PySide6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QPainter
+from PySide6.QtWidgets import (
+    QCheckBox,
+    QFileDialog,
+    QGridLayout,
+    QGroupBox,
+    QHBoxLayout,
+    QLabel,
+    QMessageBox,
+    QPushButton,
+    QSpinBox,
+    QVBoxLayout,
+    QWidget,
+)
 from viewmodel.ni_6216_viewmodel import NI6216ViewModel
 
 import qtawesome as qta
 
+# Health panel: metrics key, caption, format; laid out in HEALTH_COLUMNS columns
+HEALTH_FIELDS = (
+    ('buffer_fill_pct', "Buffer fill", "{:.0f} %"),
+    ('backlog_ms', "Backlog", "{:.0f} ms"),
+    ('min_headroom_ms', "Min headroom", "{:.0f} ms"),
+    ('write_rate_sps', "Write rate", "{:,.0f} S/s"),
+    ('samples_written', "Samples written", "{:,}"),
+    ('underflows', "Underflows", "{}"),
+    ('overflows', "Input overflows", "{}"),
+    ('writer_jitter_ms', "Writer jitter", "{:.1f} ms"),
+    ('task_starts', "Task starts", "{}"),
+    ('task_start_last_ms', "Last start", "{:.1f} ms"),
+    ('task_stops', "Task stops", "{}"),
+    ('task_stop_last_ms', "Last stop", "{:.1f} ms"),
+    ('hotplug_latency_last_ms', "Hot-plug latency", "{:.1f} ms"),
+    ('usb_poll_last_ms', "USB poll", "{:.1f} ms"),
+    ('swaps', "Waveform swaps", "{}"),
+    ('swap_latency_last_ms', "Last swap", "{:.0f} ms"),
+)
+HEALTH_COLUMNS = 4
+
 class NI6216View(QWidget):
 
     def __init__(self, viewmodel: NI6216ViewModel, parent=None):
@@ -45,12 +82,61 @@ class NI6216View(QWidget):
         zero_layout.addWidget(self._static_pressure_spinbox)
 
         main_layout.addLayout(zero_layout)
+
+        # --- Loopback capture ---
+        self._capture_checkbox = QCheckBox("Capture output loopback (ai0) and monitor return (ai1)")
+        self._capture_checkbox.setChecked(self._viewmodel.loopback_capture_enabled)
+        self._capture_checkbox.toggled.connect(self._viewmodel.set_loopback_capture)
+        main_layout.addWidget(self._capture_checkbox)
+
+        self._capture_chart = QChart()
+        self._capture_chart.setTheme(QChart.ChartThemeDark)
+        self._capture_axis_x = QValueAxis()
+        self._capture_axis_x.setTitleText("Time (s)")
+        self._capture_axis_y = QValueAxis()
+        self._capture_axis_y.setTitleText("Volts")
+        self._capture_chart.addAxis(self._capture_axis_x, Qt.AlignBottom)
+        self._capture_chart.addAxis(self._capture_axis_y, Qt.AlignLeft)
+        self._capture_series = []
+        for name in ("ai0 loopback", "ai1 monitor"):
+            series = QLineSeries()
+            series.setName(name)
+            self._capture_chart.addSeries(series)
+            series.attachAxis(self._capture_axis_x)
+            series.attachAxis(self._capture_axis_y)
+            self._capture_series.append(series)
+        capture_chart_view = QChartView(self._capture_chart)
+        capture_chart_view.setRenderHint(QPainter.Antialiasing)
+        capture_chart_view.setMinimumHeight(200)
+        main_layout.addWidget(capture_chart_view)
+
+        self._capture_stats_label = QLabel()
+        main_layout.addWidget(self._capture_stats_label)
+
+        # --- Health metrics (updated off the GUI thread at a fixed rate) ---
+        health_box = QGroupBox("DAQ health")
+        health_layout = QGridLayout(health_box)
+        self._health_labels = {}
+        for i, (key, caption, _) in enumerate(HEALTH_FIELDS):
+            row, column = divmod(i, HEALTH_COLUMNS)
+            value_label = QLabel("–")
+            health_layout.addWidget(QLabel(caption + ":"), row, 2 * column)
+            health_layout.addWidget(value_label, row, 2 * column + 1)
+            self._health_labels[key] = value_label
+        self._export_metrics_button = QPushButton("Export Metrics…")
+        self._export_metrics_button.clicked.connect(self._on_export_metrics_clicked)
+        health_layout.addWidget(self._export_metrics_button,
+                                len(HEALTH_FIELDS) // HEALTH_COLUMNS + 1, 0, 1, 2 * HEALTH_COLUMNS)
+        main_layout.addWidget(health_box)
+
         main_layout.addStretch()
         self.setLayout(main_layout)
 
         # Connect ViewModel signals
         self._viewmodel.connection_changed.connect(self._on_connection_changed)
         self._viewmodel.generation_state_changed.connect(self._on_generation_state_changed)
+        self._viewmodel.capture_view.connect(self._on_capture_view)
+        self._viewmodel.metrics_updated.connect(self._on_metrics_updated)
         # Set initial state
         self._on_connection_changed(self._viewmodel.is_connected)
 
@@ -68,12 +154,12 @@ class NI6216View(QWidget):
             self._status_icon.setPixmap(
                 qta.icon("fa5s.circle", color="green").pixmap(16, 16)
             )
-            self._status_label.setText("NI-6216 Connected")
+            self._status_label.setText(f"NI-6216 {self._viewmodel.device_name} Connected")
         else:
             self._status_icon.setPixmap(
                 qta.icon("fa5s.circle", color="red").pixmap(16, 16)
             )
-            self._status_label.setText("NI-6216 Disconnected")
+            self._status_label.setText(f"NI-6216 {self._viewmodel.device_name} Disconnected")
 
             # Stop generation and reset button if device is unplugged mid-run
             if self._gen_button.isChecked():
@@ -93,8 +179,9 @@ class NI6216View(QWidget):
         self._gen_button.setText("Stop Generation" if running else "Start Generation")
         #self._static_pressure_button.setChecked(running)
 
-        self._static_pressure_button.setEnabled(not running and self._viewmodel.is_connected)
-        self._static_pressure_spinbox.setEnabled(not running and self._viewmodel.is_connected)
+        # A fixed pressure can take over from a running waveform directly
+        self._static_pressure_button.setEnabled(self._viewmodel.is_connected)
+        self._static_pressure_spinbox.setEnabled(self._viewmodel.is_connected)
 
         self._gen_button.blockSignals(False)
 
@@ -102,3 +189,44 @@ class NI6216View(QWidget):
 
     
 
+    def _on_capture_view(self, times: np.ndarray, values: np.ndarray):
+        # Already decimated to ~2 points per bucket by the capture thread
+        for series, row in zip(self._capture_series, values):
+            series.replaceNp(times, row)
+        if len(times):
+            self._capture_axis_x.setRange(times[0], max(times[-1], times[0] + 1e-3))
+            low, high = float(values.min()), float(values.max())
+            margin = max(0.05 * (high - low), 0.01)
+            self._capture_axis_y.setRange(low - margin, high + margin)
+
+        stats = self._viewmodel.capture_stats()
+        text = f"{stats.get('seconds', 0.0):.1f} s captured"
+        if 'fidelity_rms_v' in stats:
+            text += (f" · output error {stats['fidelity_rms_v'] * 1e3:.2f} mV rms "
+                     f"(max {stats['fidelity_max_v'] * 1e3:.2f} mV)")
+        if 'latency_last_s' in stats:
+            text += f" · monitor latency {stats['latency_last_s'] * 1e3:.1f} ms"
+        if stats.get('error'):
+            text += f" · error: {stats['error']}"
+        self._capture_stats_label.setText(text)
+
+    def _on_metrics_updated(self, metrics: dict):
+        for key, _, fmt in HEALTH_FIELDS:
+            if key in metrics:
+                self._health_labels[key].setText(fmt.format(metrics[key]))
+
+    def _on_export_metrics_clicked(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export DAQ Metrics",
+            "daq_metrics.csv",
+            "CSV Files (*.csv);;All Files (*)"
+        )
+        if not path:
+            return
+        try:
+            rows = self._viewmodel.export_metrics(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Export DAQ Metrics", f"Could not write {path}:\n{e}")
+            return
+        self._export_metrics_button.setToolTip(f"{rows} samples written to {path}")
@@ -0,0 +1,96 @@
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLineEdit,
+    QPushButton,
+    QProgressBar,
+    QTableView,
+    QHeaderView,
+    QAbstractItemView,
+    QFileDialog,
+)
+from PySide6.QtCore import Qt
+
+
+class WaveformLibraryPage(QWidget):
+    """Filterable, sortable catalogue of indexed recordings; double-click loads one."""
+
+    def __init__(self, viewmodel, parent=None):
+        super().__init__(parent)
+        self._viewmodel = viewmodel
+        self._init_ui()
+
+        self._viewmodel.scan_state_changed.connect(self._on_scan_state_changed)
+        self._viewmodel.scan_progress.connect(self._on_scan_progress)
+
+    def _init_ui(self):
+        main_layout = QVBoxLayout(self)
+        main_layout.setContentsMargins(4, 4, 4, 4)
+        main_layout.setSpacing(4)
+
+        # ── Filter + actions ───────────────────────────────────────────────
+        controls_layout = QHBoxLayout()
+        self._filter_edit = QLineEdit()
+        self._filter_edit.setPlaceholderText("Filter recordings by name…")
+        self._filter_edit.setClearButtonEnabled(True)
+        self._filter_edit.textChanged.connect(self._viewmodel.set_filter)
+        controls_layout.addWidget(self._filter_edit, stretch=1)
+
+        self._add_folder_button = QPushButton("Add Folder…")
+        self._add_folder_button.clicked.connect(self._on_add_folder_clicked)
+        controls_layout.addWidget(self._add_folder_button)
+
+        self._rescan_button = QPushButton("Rescan")
+        self._rescan_button.clicked.connect(self._viewmodel.rescan)
+        controls_layout.addWidget(self._rescan_button)
+        main_layout.addLayout(controls_layout)
+
+        self._scan_progress_bar = QProgressBar()
+        self._scan_progress_bar.setVisible(False)
+        main_layout.addWidget(self._scan_progress_bar)
+
+        # ── Catalogue table ────────────────────────────────────────────────
+        self._table = QTableView()
+        self._table.setModel(self._viewmodel.table_model)
+        self._table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self._table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self._table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self._table.setAlternatingRowColors(True)
+        self._table.verticalHeader().setVisible(False)
+        header = self._table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setStretchLastSection(True)
+        # Sorting is done by the SQLite index, not by the view
+        header.setSectionsClickable(True)
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(0, Qt.AscendingOrder)
+        header.sortIndicatorChanged.connect(self._on_sort_indicator_changed)
+        self._table.doubleClicked.connect(self._on_row_double_clicked)
+        main_layout.addWidget(self._table)
+
+    """ From UI """
+    def _on_add_folder_clicked(self):
+        folder = QFileDialog.getExistingDirectory(self, "Add Waveform Folder")
+        if folder:
+            self._viewmodel.add_folder(folder)
+
+    """ From UI """
+    def _on_sort_indicator_changed(self, column: int, order: Qt.SortOrder):
+        self._viewmodel.set_sort(column, order == Qt.DescendingOrder)
+
+    """ From UI """
+    def _on_row_double_clicked(self, index):
+        self._viewmodel.load_recording(index.row())
+
+    """ To UI """
+    def _on_scan_state_changed(self, scanning: bool):
+        self._rescan_button.setEnabled(not scanning)
+        self._add_folder_button.setEnabled(not scanning)
+        self._scan_progress_bar.setVisible(scanning)
+        self._scan_progress_bar.setRange(0, 0)   # busy until the first progress report
+
+    """ To UI """
+    def _on_scan_progress(self, done: int, total: int):
+        self._scan_progress_bar.setRange(0, max(total, 1))
+        self._scan_progress_bar.setValue(done)
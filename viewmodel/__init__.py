@@ -1,4 +1,6 @@
+from .daq_device_pool_viewmodel import DaqDevicePoolViewModel
 from .heart_beat_waveform_page_viewmodel import HeartBeatWaveformPageViewModel
 from .heart_beat_load_from_file_page_viewmodel import HeartBeatLoadWaveformFromFilePageViewModel
 from .item_list_viewmodel import ItemListViewModel
-from .ni_6216_viewmodel import NI6216ViewModel
\ No newline at end of file
+from .ni_6216_viewmodel import NI6216ViewModel
+from .waveform_library_viewmodel import WaveformLibraryViewModel
\ No newline at end of file
@@ -0,0 +1,126 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import time
+from typing import Callable
+
+from PySide6.QtCore import QObject, QTimer, Qt
+from PySide6.QtGui import QGuiApplication
+
+DEFAULT_REFRESH_RATE_HZ = 60.0
+DEFAULT_QUIET_PERIOD_MS = 250
+
+
+class CoalescingUpdateScheduler(QObject):
+    """
+    Latest-wins update scheduler for high-rate UI input such as point drags.
+
+    submit() only records the newest payload; at most once per display frame the
+    pending payload is handed to `on_frame` (a cheap preview), and any payloads
+    that arrived in between are dropped. The expensive `on_commit` runs once,
+    when commit() is called (e.g. on mouse release) or after `quiet_period_ms`
+    without new input. Events dropped and per-frame latency (oldest undelivered
+    submit → preview rendered) are recorded for each drag session.
+    """
+
+    def __init__(self, on_frame: Callable[[object], None], on_commit: Callable[[object], None],
+                 quiet_period_ms: int = DEFAULT_QUIET_PERIOD_MS, parent=None):
+        super().__init__(parent)
+        self._on_frame = on_frame
+        self._on_commit = on_commit
+
+        self._frame_interval_s = 1.0 / self._display_refresh_rate()
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setSingleShot(True)
+        self._frame_timer.setTimerType(Qt.PreciseTimer)
+        self._frame_timer.timeout.connect(self._deliver_frame)
+
+        self._quiet_timer = QTimer(self)
+        self._quiet_timer.setSingleShot(True)
+        self._quiet_timer.setInterval(quiet_period_ms)
+        self._quiet_timer.timeout.connect(self.commit)
+
+        self._pending = None
+        self._pending_since = 0.0
+        self._last_payload = None
+        self._last_frame_at = 0.0
+        self._last_session_stats: dict = {}
+        self._reset_stats()
+
+    @property
+    def frame_interval_ms(self) -> float:
+        return self._frame_interval_s * 1e3
+
+    @property
+    def last_session_stats(self) -> dict:
+        """stats() of the most recently committed drag session."""
+        return self._last_session_stats
+
+    def stats(self) -> dict:
+        latencies = self._frame_latencies_ms
+        return {
+            'submitted': self._submitted,
+            'frames': len(latencies),
+            'dropped': self._dropped,
+            'latency_avg_ms': sum(latencies) / len(latencies) if latencies else 0.0,
+            'latency_max_ms': max(latencies, default=0.0),
+            'commit_ms': self._commit_ms,
+        }
+
+    def submit(self, payload):
+        now = time.perf_counter()
+        self._submitted += 1
+        if self._pending is not None:
+            self._dropped += 1          # superseded before it reached the screen
+        else:
+            self._pending_since = now
+        self._pending = payload
+        self._last_payload = payload
+
+        if not self._frame_timer.isActive():
+            wait_s = self._last_frame_at + self._frame_interval_s - now
+            self._frame_timer.start(max(0, int(wait_s * 1e3)))
+        self._quiet_timer.start()
+
+    def commit(self, payload=None):
+        """Flush to the full-resolution handler; `payload` overrides the latest submitted one."""
+        self._frame_timer.stop()
+        self._quiet_timer.stop()
+        payload = payload if payload is not None else self._last_payload
+        self._pending = None
+        self._last_payload = None
+        if payload is None:
+            return
+
+        start = time.perf_counter()
+        self._on_commit(payload)
+        self._commit_ms = (time.perf_counter() - start) * 1e3
+
+        stats = self._last_session_stats = self.stats()
+        logger.debug(
+            f"Drag updates: {stats['submitted']} events, {stats['frames']} frames, "
+            f"{stats['dropped']} dropped, latency avg {stats['latency_avg_ms']:.1f} ms "
+            f"/ max {stats['latency_max_ms']:.1f} ms, commit {stats['commit_ms']:.1f} ms"
+        )
+        self._reset_stats()
+
+    def _deliver_frame(self):
+        if self._pending is None:
+            return
+        payload, self._pending = self._pending, None
+        self._on_frame(payload)
+        now = time.perf_counter()
+        self._last_frame_at = now
+        self._frame_latencies_ms.append((now - self._pending_since) * 1e3)
+
+    def _reset_stats(self):
+        self._submitted = 0
+        self._dropped = 0
+        self._frame_latencies_ms: list[float] = []
+        self._commit_ms = 0.0
+
+    @staticmethod
+    def _display_refresh_rate() -> float:
+        screen = QGuiApplication.primaryScreen()
+        rate = screen.refreshRate() if screen is not None else 0.0
+        return rate if rate > 0 else DEFAULT_REFRESH_RATE_HZ
@@ -0,0 +1,76 @@
+from PySide6.QtCore import QObject, Signal
+from model.daq_device_pool import DaqDevicePool
+from viewmodel.ni_6216_viewmodel import NI6216ViewModel
+
+class DaqDevicePoolViewModel(QObject):
+    device_added = Signal(str)
+    device_state_changed = Signal(str)          # device name: connected or generating changed
+    metrics_updated = Signal(str, dict)         # device name, health_snapshot() row
+    connection_changed = Signal(bool)           # any device connected
+    generation_state_changed = Signal(bool)     # any device generating
+    status_message = Signal(str)
+
+    def __init__(self, pool: DaqDevicePool, parent=None):
+        super().__init__(parent)
+        self._pool = pool
+        self._viewmodels: dict[str, NI6216ViewModel] = {}
+        self._connected = False
+        self._generating = False
+
+        self._pool.device_added.connect(self._on_device_added)
+        self._pool.status_message.connect(self.status_message)
+        for name in self._pool.device_names:
+            self._on_device_added(name)
+
+    @property
+    def device_names(self) -> list[str]:
+        return list(self._viewmodels)
+
+    def device_viewmodel(self, name: str) -> NI6216ViewModel:
+        return self._viewmodels[name]
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+
+    @property
+    def is_generating(self) -> bool:
+        return self._generating
+
+    def start_all(self):
+        self._pool.start_all()      # runs on the pool's threads
+
+    def stop_all(self):
+        self._pool.stop_all()
+
+    def rescan(self):
+        self._pool.rescan()
+
+    def _on_device_added(self, name: str):
+        if name in self._viewmodels:
+            return
+        device_viewmodel = NI6216ViewModel(self._pool.device(name), self)
+        self._viewmodels[name] = device_viewmodel
+        # Device signals arrive here already queued to this thread
+        device_viewmodel.connection_changed.connect(lambda _, name=name: self._on_device_state_changed(name))
+        device_viewmodel.generation_state_changed.connect(
+            lambda _, name=name: self._on_device_state_changed(name))
+        device_viewmodel.status_message.connect(lambda message, name=name: self._on_status_message(name, message))
+        device_viewmodel.metrics_updated.connect(lambda metrics, name=name: self.metrics_updated.emit(name, metrics))
+        self.device_added.emit(name)
+        self._on_device_state_changed(name)
+
+    def _on_device_state_changed(self, name: str):
+        self.device_state_changed.emit(name)
+        connected = any(vm.is_connected for vm in self._viewmodels.values())
+        generating = any(vm.is_generating for vm in self._viewmodels.values())
+        if connected != self._connected:
+            self._connected = connected
+            self.connection_changed.emit(connected)
+        if generating != self._generating:
+            self._generating = generating
+            self.generation_state_changed.emit(generating)
+
+    def _on_status_message(self, name: str, message: str):
+        # Say which unit it was once there is more than one
+        self.status_message.emit(f"{name}: {message}" if len(self._viewmodels) > 1 else message)
@@ -1,54 +1,115 @@
-from PySide6.QtCore import QObject, Signal, Property
-import csv
+from pathlib import Path
+
+from PySide6.QtCore import QObject, QThreadPool, Signal, Property
+from model.waveform_cache import WaveformCache
+from model.waveform_library import sample_rate_hint_hz
+from viewmodel.waveform_load_worker import WaveformLoadWorker
 
 class HeartBeatLoadWaveformFromFilePageViewModel(QObject):
-    waveform_loaded = Signal(list, list)
+    waveform_loaded = Signal(object, object)
+    waveform_preview = Signal(object, object)
+    load_progress = Signal(float)
+    loading_state_changed = Signal(bool)
     load_error = Signal(str)
 
-    def __init__(self, model):
+    def __init__(self, model, waveform_cache: WaveformCache | None = None):
         super().__init__()
         self._heart_beat_from_file_model = model
+        self._waveform_cache = waveform_cache if waveform_cache is not None else WaveformCache()
+        self._thread_pool = QThreadPool.globalInstance()
+        self._active_worker: WaveformLoadWorker | None = None
+        self._job_counter = 0
         # ViewModel listens to model (the model emits waveform_changed)
         self._heart_beat_from_file_model.waveform_changed.connect(self._on_waveform_changed)
 
-    ''' Public called by "view" when a new abp waveform is selected. '''
+    @property
+    def waveform_pyramid(self):
+        return self._heart_beat_from_file_model.pyramid
+
+    @property
+    def is_loading(self) -> bool:
+        return self._active_worker is not None
+
+    '''
+    Public called by "view" when a new abp waveform is selected.
+    Parsing runs on the thread pool; a new request supersedes any load in flight.
+    '''
     def new_file_loaded(self, path: str):
-        try:
-            pressure_points = self._parse_csv(path)  # returns a plain list
-            ''' 
-            1. set_waveform() in the model is the single entry point for writing data 
-            2. fills the model arrays
-            3. triggers waveform_changed
-            '''
-            self._heart_beat_from_file_model.set_waveform(pressure_points)
-
-        except Exception as e:
-            self.load_error.emit(str(e))
-
-    ''' 
+        self._cancel_active_worker()
+
+        self._job_counter += 1
+        worker = WaveformLoadWorker(self._job_counter, path, self._waveform_cache)
+        worker.signals.progress.connect(self._on_worker_progress)
+        worker.signals.preview.connect(self._on_worker_preview)
+        worker.signals.finished.connect(self._on_worker_finished)
+        worker.signals.failed.connect(self._on_worker_failed)
+        worker.signals.cancelled.connect(self._on_worker_cancelled)
+        self._active_worker = worker
+        self.loading_state_changed.emit(True)
+        self._thread_pool.start(worker)
+
+    def cancel_loading(self):
+        if self._cancel_active_worker():
+            # Drop the partial preview, show whatever the model last committed
+            self._on_waveform_changed()
+
+    def _cancel_active_worker(self) -> bool:
+        if self._active_worker is None:
+            return False
+        self._active_worker.cancel()
+        self._active_worker = None
+        self.loading_state_changed.emit(False)
+        return True
+
+    def invalidate_cache(self, path: str | None = None) -> int:
+        return self._waveform_cache.invalidate(path)
+
+    '''
     Triggered by Signal emitted from model layer.
-    Forward message and argument to view layer 
+    Forward message and argument to view layer
     '''
     def _on_waveform_changed(self):
         self.waveform_loaded.emit(
             self._heart_beat_from_file_model.time_points,
             self._heart_beat_from_file_model.pressure_points)
 
-    @staticmethod
-    def _parse_csv(path: str) -> list:
-        pressure_points = []
-        with open(path, newline="", encoding="utf-8") as f:
-            reader = csv.reader(f)
-            for line_num, row in enumerate(reader, start=1):
-                if not row or row[0].strip().startswith("#"):
-                    continue
-                try:
-                    pressure_points.append(float(row[0].strip()))
-                except ValueError:
-                    raise ValueError(
-                        f"Line {line_num}: cannot parse pressure value → {row[0]!r}"
-                    )
-        if not pressure_points:
-            raise ValueError("File contains no valid data rows.")
-        return pressure_points
+    # ── Worker callbacks (queued onto the GUI thread) ──────────────────────
+    # Results from superseded or cancelled jobs are dropped by job id.
+
+    def _is_current(self, job_id: int) -> bool:
+        return self._active_worker is not None and self._active_worker.job_id == job_id
+
+    def _on_worker_progress(self, job_id: int, fraction: float):
+        if self._is_current(job_id):
+            self.load_progress.emit(fraction)
+
+    def _on_worker_preview(self, job_id: int, time_points, pressure_points):
+        if self._is_current(job_id):
+            self.waveform_preview.emit(time_points, pressure_points)
+
+    def _on_worker_finished(self, job_id: int, pressure_points):
+        if not self._is_current(job_id):
+            return
+        path = self._active_worker.path
+        self._active_worker = None
+        self.loading_state_changed.emit(False)
+        '''
+        1. set_waveform() in the model is the single entry point for writing data
+        2. fills the model arrays
+        3. triggers waveform_changed
+        '''
+        # The rate is spelled in the recording name ("... 25HZ"); otherwise the default
+        self._heart_beat_from_file_model.set_waveform(pressure_points,
+                                                      sample_rate_hint_hz(Path(path).stem))
+
+    def _on_worker_failed(self, job_id: int, msg: str):
+        if not self._is_current(job_id):
+            return
+        self._active_worker = None
+        self.loading_state_changed.emit(False)
+        self.load_error.emit(msg)
 
+    def _on_worker_cancelled(self, job_id: int):
+        if self._is_current(job_id):
+            self._active_worker = None
+            self.loading_state_changed.emit(False)
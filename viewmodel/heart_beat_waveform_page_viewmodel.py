@@ -1,15 +1,28 @@
 from PySide6.QtCore import QObject, Signal, Property
 
+from viewmodel.coalescing_update_scheduler import CoalescingUpdateScheduler
+
 # This class represents the bridge between the model and the view for the HeartBeat Functionalities
 class HeartBeatWaveformPageViewModel(QObject):
     waveform_data_changed = Signal()
     reference_waveform_data_changed = Signal()
+    waveform_range_changed = Signal(int, int)
+    waveform_preview_changed = Signal()
 
     def __init__(self, model):
         super().__init__()
         self._heart_beat_model = model
         self._heart_beat_model.waveform_data_changed.connect(self.waveform_data_changed)
         self._heart_beat_model.waveform_data_changed.connect(self.reference_waveform_data_changed)
+        self._heart_beat_model.waveform_range_changed.connect(self.waveform_range_changed)
+        self._heart_beat_model.waveform_preview_changed.connect(self.waveform_preview_changed)
+
+        # Drags arrive at mouse rate; preview at most once per frame, regenerate once on release
+        self._drag_scheduler = CoalescingUpdateScheduler(
+            on_frame=lambda args: self._heart_beat_model.preview_reference_point(*args),
+            on_commit=lambda args: self._heart_beat_model.update_reference_point(*args),
+            parent=self,
+        )
 
     @Property(object, notify=waveform_data_changed)
     def abp_waveform(self):
@@ -19,6 +32,14 @@ class HeartBeatWaveformPageViewModel(QObject):
     def abp_waveform(self, value):
         raise NotImplementedError("Direct waveform assignment is not yet supported.") 
 
+    @Property(object, notify=waveform_range_changed)
+    def dirty_range(self):
+        return self._heart_beat_model.get_dirty_range()
+
+    @Property(object, notify=waveform_preview_changed)
+    def abp_waveform_preview(self):
+        return self._heart_beat_model.get_waveform_preview_points()
+
     @Property(object, notify=reference_waveform_data_changed)
     def reference_abp_waveform(self):
         return self._heart_beat_model.get_waveform_reference_points()
@@ -27,6 +48,28 @@ class HeartBeatWaveformPageViewModel(QObject):
         new_time_pct = max(0.0, min(1.0, new_time_pct))
         new_pressure = max(0.0, new_pressure)   # pressure cannot be negative
         self._heart_beat_model.update_reference_point(key, new_time_pct, new_pressure)
+
+    def update_waveform_reference_point(self, waveform: str, key: str, new_time_pct: float, new_pressure: float):
+        new_time_pct = max(0.0, min(1.0, new_time_pct))
+        new_pressure = max(0.0, new_pressure)
+        self._heart_beat_model.update_waveform_reference_point(waveform, key, new_time_pct, new_pressure)
+
+    @property
+    def waveform_names(self) -> list[str]:
+        return self._heart_beat_model.get_waveform_names()
+
+    def drag_reference_point(self, key: str, new_time_pct: float, new_pressure: float):
+        new_time_pct = max(0.0, min(1.0, new_time_pct))
+        new_pressure = max(0.0, new_pressure)
+        self._drag_scheduler.submit((key, new_time_pct, new_pressure))
+
+    def commit_reference_point(self, key: str, new_time_pct: float, new_pressure: float):
+        new_time_pct = max(0.0, min(1.0, new_time_pct))
+        new_pressure = max(0.0, new_pressure)
+        self._drag_scheduler.commit((key, new_time_pct, new_pressure))
+
+    def drag_stats(self) -> dict:
+        return self._drag_scheduler.last_session_stats
     
     @Property(list, notify=waveform_data_changed)
     def reference_point_keys(self):
@@ -5,6 +5,9 @@ class NI6216ViewModel(QObject):
     connection_changed = Signal(bool)
     generation_state_changed = Signal(bool)
     status_message = Signal(str)
+    waveform_switched = Signal(float)
+    capture_view = Signal(object, object)
+    metrics_updated = Signal(dict)
 
     def __init__(self, daq_model: Ni6216DaqMx, parent=None):
         super().__init__(parent)
@@ -13,6 +16,13 @@ class NI6216ViewModel(QObject):
         self._daq_model.connection_changed.connect(self.connection_changed)
         self._daq_model.generation_state_changed.connect(self.generation_state_changed)
         self._daq_model.status_message.connect(self.status_message)
+        self._daq_model.waveform_switched.connect(self.waveform_switched)
+        self._daq_model.capture_view.connect(self.capture_view)
+        self._daq_model.metrics_updated.connect(self.metrics_updated)
+
+    @property
+    def device_name(self) -> str:
+        return self._daq_model.device_name
 
     @property
     def is_connected(self) -> bool:
@@ -28,5 +38,52 @@ class NI6216ViewModel(QObject):
     def stop_generation(self):
         self._daq_model.stop_generation()    # pure delegation
 
+    def start_beat_sequence(self, schedule, variability=None, seed=None, systole_fraction=None):
+        self._daq_model.start_beat_sequence(schedule, variability, seed, systole_fraction)
+
+    def start_scenario(self, scenario):
+        self._daq_model.start_scenario(scenario)
+
+    def scenario_stats(self) -> dict:
+        return self._daq_model.scenario_stats()
+
+    def stream_stats(self) -> dict:
+        return self._daq_model.stream_stats()
+
+    def hotplug_stats(self) -> dict:
+        return self._daq_model.hotplug_stats()
+
+    def task_stats(self) -> dict:
+        return self._daq_model.task_stats()
+
+    def calibration_stats(self) -> dict:
+        return self._daq_model.calibration_stats()
+
+    def export_metrics(self, path: str) -> int:
+        return self._daq_model.export_metrics(path)
+
+    def mark_event(self, label: str):
+        self._daq_model.mark_event(label)
+
+    @property
+    def loopback_capture_enabled(self) -> bool:
+        return self._daq_model.loopback_capture_enabled
+
+    def set_loopback_capture(self, enabled: bool):
+        self._daq_model.set_loopback_capture(enabled)
+
+    def capture_stats(self) -> dict:
+        return self._daq_model.capture_stats()
+
+    @property
+    def sample_rate_hz(self) -> float:
+        return self._daq_model.sample_rate_hz
+
+    def set_sample_rate_hz(self, rate_hz: float):
+        self._daq_model.set_sample_rate_hz(rate_hz)
+
     def set_static_pressure(self, pressure_mmhg: float):
-        self._daq_model.set_static_pressure(pressure_mmhg)
\ No newline at end of file
+        self._daq_model.set_static_pressure(pressure_mmhg)
+
+    def set_channel_map(self, channel_map: dict):
+        self._daq_model.set_channel_map(channel_map)
@@ -0,0 +1,111 @@
+import logging
+logger = logging.getLogger(__name__)
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from model.waveform_library import WaveformLibrary, SORTABLE_COLUMNS
+from model.waveform_library_table_model import WaveformLibraryTableModel
+
+
+class WaveformLibraryScanWorkerSignals(QObject):
+    progress = Signal(int, int)     # files done, files to index
+    finished = Signal(object)       # scan result counts
+    failed = Signal(str)
+
+
+class WaveformLibraryScanWorker(QRunnable):
+    """Runs WaveformLibrary.scan() off the GUI thread; scan() fans out to processes."""
+
+    def __init__(self, library: WaveformLibrary):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.signals = WaveformLibraryScanWorkerSignals()
+        self._library = library
+
+    def run(self):
+        try:
+            result = self._library.scan(progress_callback=self.signals.progress.emit)
+            self.signals.finished.emit(result)
+        except Exception as e:
+            logger.warning(f"Waveform library scan failed: {e}")
+            self.signals.failed.emit(str(e))
+
+
+class WaveformLibraryViewModel(QObject):
+    scan_state_changed = Signal(bool)
+    scan_progress = Signal(int, int)
+    status_message = Signal(str)
+
+    def __init__(self, library: WaveformLibrary, load_from_file_viewmodel, parent=None):
+        super().__init__(parent)
+        self._library = library
+        self._load_from_file_viewmodel = load_from_file_viewmodel
+        self._table_model = WaveformLibraryTableModel()
+        self._scan_worker: WaveformLibraryScanWorker | None = None
+
+        self._filter_text = ""
+        self._order_by = "name"
+        self._descending = False
+        self._refresh()
+
+    @property
+    def table_model(self) -> WaveformLibraryTableModel:
+        return self._table_model
+
+    @property
+    def is_scanning(self) -> bool:
+        return self._scan_worker is not None
+
+    def rescan(self):
+        if self._scan_worker is not None:
+            return
+        worker = WaveformLibraryScanWorker(self._library)
+        worker.signals.progress.connect(self.scan_progress)
+        worker.signals.finished.connect(self._on_scan_finished)
+        worker.signals.failed.connect(self._on_scan_failed)
+        self._scan_worker = worker
+        self.scan_state_changed.emit(True)
+        QThreadPool.globalInstance().start(worker)
+
+    def add_folder(self, folder: str):
+        self._library.add_folder(folder)
+        self.rescan()
+
+    def set_filter(self, text: str):
+        self._filter_text = text.strip()
+        self._refresh()
+
+    def set_sort(self, column: int, descending: bool):
+        key = self._table_model.column_key(column)
+        if key not in SORTABLE_COLUMNS:
+            return
+        self._order_by, self._descending = key, descending
+        self._refresh()
+
+    def load_recording(self, row: int):
+        entry = self._table_model.get_row(row)
+        if entry is None:
+            return
+        if entry['error']:
+            self.status_message.emit(f"{entry['name']}: {entry['error']}")
+            return
+        self._load_from_file_viewmodel.new_file_loaded(entry['path'])
+
+    def _refresh(self):
+        self._table_model.set_rows(self._library.query(
+            self._filter_text, order_by=self._order_by, descending=self._descending
+        ))
+
+    def _on_scan_finished(self, result: dict):
+        self._scan_worker = None
+        self.scan_state_changed.emit(False)
+        self._refresh()
+        self.status_message.emit(
+            f"Waveform library: {result['added']} added, {result['updated']} updated, "
+            f"{result['removed']} removed, {result['unchanged']} unchanged."
+        )
+
+    def _on_scan_failed(self, msg: str):
+        self._scan_worker = None
+        self.scan_state_changed.emit(False)
+        self.status_message.emit(f"Waveform library scan failed: {msg}")
@@ -0,0 +1,94 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import threading
+import time
+
+import numpy as np
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+from model.waveform_cache import WaveformCache
+from model.waveform_file_loader import iter_waveform_chunks
+
+PREVIEW_MAX_POINTS = 2000
+PREVIEW_INTERVAL_S = 0.1
+
+
+class WaveformLoadCancelled(Exception):
+    pass
+
+
+class WaveformLoadWorkerSignals(QObject):
+    """Signals live on a QObject since QRunnable itself cannot emit."""
+    progress = Signal(int, float)           # job id, fraction done [0..1]
+    preview = Signal(int, object, object)   # job id, time points, pressure points
+    finished = Signal(int, object)          # job id, full pressure array
+    failed = Signal(int, str)               # job id, error message
+    cancelled = Signal(int)                 # job id
+
+
+class WaveformLoadWorker(QRunnable):
+    """
+    Parses one waveform file on a QThreadPool thread.
+    Goes through the WaveformCache, so a cached recording finishes at once;
+    otherwise the file is streamed in chunks, reporting progress and a coarse
+    (stride-decimated) preview of what has been read so far.
+    """
+
+    def __init__(self, job_id: int, path: str, cache: WaveformCache, channel: int = 0):
+        super().__init__()
+        self.setAutoDelete(False)   # the viewmodel keeps a reference to cancel / match job ids
+        self.signals = WaveformLoadWorkerSignals()
+        self._job_id = job_id
+        self._path = path
+        self._cache = cache
+        self._channel = channel
+        self._cancel_event = threading.Event()
+
+    @property
+    def job_id(self) -> int:
+        return self._job_id
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def run(self):
+        try:
+            samples = self._cache.load(self._path, channel=self._channel, loader=self._stream)
+            if self._cancel_event.is_set():
+                raise WaveformLoadCancelled()
+            self.signals.progress.emit(self._job_id, 1.0)
+            self.signals.finished.emit(self._job_id, samples)
+        except WaveformLoadCancelled:
+            logger.debug(f"Waveform load #{self._job_id} cancelled: {self._path}")
+            self.signals.cancelled.emit(self._job_id)
+        except Exception as e:
+            logger.warning(f"Waveform load #{self._job_id} failed: {e}")
+            self.signals.failed.emit(self._job_id, str(e))
+
+    def _stream(self, path, channel: int = 0) -> np.ndarray:
+        chunks = []
+        num_samples = 0
+        last_preview = 0.0
+        for samples, fraction in iter_waveform_chunks(path, channel=channel):
+            if self._cancel_event.is_set():
+                raise WaveformLoadCancelled()
+            chunks.append(samples)
+            num_samples += samples.size
+            self.signals.progress.emit(self._job_id, fraction)
+
+            now = time.monotonic()
+            if len(chunks) == 1 or now - last_preview >= PREVIEW_INTERVAL_S:
+                last_preview = now
+                self._emit_preview(chunks, num_samples)
+        return np.concatenate(chunks)
+
+    def _emit_preview(self, chunks: list, num_samples: int):
+        stride = max(1, num_samples // PREVIEW_MAX_POINTS)
+        pressure = np.concatenate(chunks)[::stride]
+        time_points = np.arange(0, stride * len(pressure), stride)
+        self.signals.preview.emit(self._job_id, time_points, pressure)